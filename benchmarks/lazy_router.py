@@ -0,0 +1,74 @@
+"""
+benchmark of the startup of an app with the crud routers of many tables, the eager and the lazy routers
+
+    python -m benchmarks.lazy_router
+"""
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, Integer, Numeric, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.lazy_route import materialize_crud_routes
+from src.fastapi_quickcrud.misc.type import SqlType
+
+Base = declarative_base()
+
+TABLES = 100
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(bind=engine)
+
+models = [type(f'Table{i}', (Base,), {'__tablename__': f'benchmark_table_{i}',
+                                       'id': Column(Integer, primary_key=True, autoincrement=True),
+                                       'name': Column(String),
+                                       'price': Column(Numeric),
+                                       'created_at': Column(DateTime)})
+          for i in range(TABLES)]
+
+
+def get_session():
+    db = session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def build_app(lazy):
+    app = FastAPI()
+    for model in models:
+        app.include_router(crud_router_builder(db_model=model,
+                                               db_session=get_session,
+                                               sql_type=SqlType.sqlite,
+                                               async_mode=False,
+                                               lazy=lazy,
+                                               prefix=f'/{model.__tablename__}',
+                                               tags=[model.__tablename__]))
+    return app
+
+
+def main():
+    Base.metadata.create_all(engine)
+    start = time.perf_counter()
+    build_app(lazy=False)
+    print(f'{"eager startup":<20}{time.perf_counter() - start:>10.2f} s')
+
+    start = time.perf_counter()
+    app = build_app(lazy=True)
+    print(f'{"lazy startup":<20}{time.perf_counter() - start:>10.2f} s')
+
+    start = time.perf_counter()
+    assert TestClient(app).get('/benchmark_table_0').status_code == 204
+    print(f'{"lazy first request":<20}{time.perf_counter() - start:>10.2f} s')
+
+    build_seconds = materialize_crud_routes(app)
+    slowest = sorted(build_seconds.items(), key=lambda item: item[1], reverse=True)[:3]
+    print('slowest tables', ', '.join(f'{table} {seconds:.3f} s' for table, seconds in slowest))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+microbenchmark of building the response dicts of the find many api from the rows of a join statement
+
+    python -m benchmarks.row_mapping
+"""
+import copy
+import time
+
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, select
+from sqlalchemy.orm import declarative_base
+
+from src.fastapi_quickcrud.misc.utils import row_mapping_plan
+
+Base = declarative_base()
+
+WIDE_COLUMNS = 30
+ROWS = 50000
+
+
+class Parent(Base):
+    __tablename__ = 'benchmark_parent'
+    id = Column(Integer, primary_key=True)
+    locals().update({f'value_{i}': Column(String) for i in range(WIDE_COLUMNS)})
+
+
+class Child(Base):
+    __tablename__ = 'benchmark_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('benchmark_parent.id'))
+    name = Column(String)
+
+
+def unflatten_rows(rows):
+    # the parsing before the row mapping plan
+    response = []
+    for i in rows:
+        i = dict(i)
+        result__ = copy.deepcopy(i)
+        tmp = {}
+        for key_, value_ in result__.items():
+            if '_____' in key_:
+                key, foreign_column = key_.split('_____')
+                if key not in tmp:
+                    tmp[key] = {foreign_column: value_}
+                else:
+                    tmp[key][foreign_column] = value_
+            else:
+                tmp[key_] = value_
+        response.append(tmp)
+    return response
+
+
+def plan_rows(result, rows):
+    plan = row_mapping_plan(tuple(result.keys()))
+    return [plan(i) for i in rows]
+
+
+def run(name, func):
+    start = time.perf_counter()
+    response = func()
+    elapsed = time.perf_counter() - start
+    print(f'{name:<20}{len(response) / elapsed:>14,.0f} rows/s')
+    return response
+
+
+def main():
+    engine = create_engine('sqlite://', future=True)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Parent.__table__.insert(),
+                           [{'id': i, **{f'value_{j}': f'{i}_{j}' for j in range(WIDE_COLUMNS)}} for i in range(ROWS)])
+        connection.execute(Child.__table__.insert(),
+                           [{'id': i, 'parent_id': i, 'name': f'child_{i}'} for i in range(ROWS)])
+        stmt = select(Parent.__table__,
+                      *[column.label(f'benchmark_child_foreign_____{column.name}') for column in Child.__table__.c]) \
+            .join(Child.__table__, Parent.id == Child.parent_id)
+        result = connection.execute(stmt)
+        rows = result.fetchall()
+
+    before = run('dict + deepcopy', lambda: unflatten_rows(rows))
+    after = run('row mapping plan', lambda: plan_rows(result, rows))
+    assert before == after
+
+
+if __name__ == '__main__':
+    main()
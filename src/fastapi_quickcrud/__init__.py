@@ -1,5 +1,9 @@
 from .misc.utils import sqlalchemy_to_pydantic
-from .crud_router import crud_router_builder
-from .misc.type import CrudMethods
+from .crud_router import crud_router_builder, metadata_crud_router_builder
+from .misc.type import CrudMethods, TotalCountMode, JoinStrategy
+from .misc.lazy_route import LazyCRUDRoute, materialize_crud_routes, lazy_openapi
+from .misc.openapi_cache import cached_openapi
+from .misc.statement_cache import StatementCache
+from .misc.schema_builder import SchemaAnalysisCache
 
 
@@ -4,24 +4,33 @@ from functools import partial
 from typing import \
     Any, \
     List, \
-    TypeVar, Union, Callable, Optional
+    TypeVar, Union, Callable, Optional, Dict
 
 from fastapi import \
     Depends, APIRouter
 from pydantic import \
     BaseModel
+from sqlalchemy import MetaData
+from sqlalchemy.orm import DeclarativeMeta
 from sqlalchemy.sql.schema import Table
 
 from . import sqlalchemy_to_pydantic
 from .misc.abstract_execute import SQLALchemyExecuteService
 from .misc.abstract_parser import SQLAlchemyGeneralSQLeResultParse
 from .misc.abstract_query import SQLAlchemyPGSQLQueryService, \
-    SQLAlchemySQLITEQueryService, SQLAlchemyNotSupportQueryService
+    SQLAlchemySQLITEQueryService, SQLAlchemyNotSupportQueryService, SQLAlchemyMySQLQueryService, \
+    SQLAlchemyMariaDBQueryService
 from .misc.abstract_route import SQLAlchemySQLLiteRouteSource, SQLAlchemyPGSQLRouteSource, \
-    SQLAlchemyNotSupportRouteSource
+    SQLAlchemyNotSupportRouteSource, SQLAlchemyMySQLRouteSource, SQLAlchemyMariadbRouteSource
 from .misc.crud_model import CRUDModel
+from .misc.exceptions import PrimaryMissing, JoinStrategyNotSupportedException, LazyRouterPrefixMissing, \
+    BulkLoadNotSupportedException, SchemaFingerprintMismatchException
+from .misc.lazy_route import LazyCRUDRoute
 from .misc.memory_sql import async_memory_db, sync_memory_db
-from .misc.type import CrudMethods, SqlType
+from .misc.openapi_cache import router_fingerprint
+from .misc.schema_builder import SchemaAnalysisCache, schema_fingerprint
+from .misc.statement_cache import StatementCache
+from .misc.type import CrudMethods, SqlType, TotalCountMode, JoinStrategy
 from .misc.utils import convert_table_to_model, Base
 
 BaseModel.Config.arbitrary_types_allowed = True
@@ -43,6 +52,18 @@ def crud_router_builder(
         async_mode: Optional[bool] = None,
         foreign_include: Optional[Base] = None,
         sql_type: Optional[SqlType] = None,
+        statement_cache: Optional[StatementCache] = None,
+        statement_cache_warm_up: Optional[List[dict]] = None,
+        cursor_pagination: bool = False,
+        bulk_chunk_size: int = 1000,
+        stream_yield_per: int = 1000,
+        total_count_mode: TotalCountMode = TotalCountMode.page,
+        total_count_ttl: float = 60,
+        trusted_response: bool = False,
+        join_strategy: JoinStrategy = JoinStrategy.join,
+        lazy: bool = False,
+        fast_query_parser: bool = False,
+        schema_analysis_cache: Optional[SchemaAnalysisCache] = None,
         **router_kwargs: Any) -> APIRouter:
     """
     @param db_model:
@@ -75,7 +96,10 @@ def crud_router_builder(
         A variable that will be added to the path operation decorators.
 
     @param crud_models:
-        You can use the sqlalchemy_to_pydantic() to build your own Pydantic model CRUD set
+        You can use the sqlalchemy_to_pydantic() to build your own Pydantic model CRUD set,
+        or the crud_models of the module generated by fastapi_quickcrud.misc.codegen, it raises
+        SchemaFingerprintMismatchException if the tables or the options of the router are not the same as
+        the module is generated from
 
     @param async_mode:
         As your database connection
@@ -86,6 +110,75 @@ def crud_router_builder(
     @param sql_type:
         You sql database type
 
+    @param statement_cache:
+        The cache of the select statement templates, keyed by the statement shape of the request,
+        a new StatementCache() is used by default, pass StatementCache(max_size=0) to disable it,
+        the hits and misses counters are in statement_cache.info()
+
+    @param statement_cache_warm_up:
+        example query params of the find many api, the statements of them will be built and cached
+        when the router is built
+        example:
+            [{'limit': 100}, {'name____str': ['%a%'], 'order_by_columns': ['id:DESC']}]
+
+    @param cursor_pagination:
+        set True to add the cursor query param into the find many apis (include the foreign tree apis),
+        the rows are ordered by the order_by_columns and the primary key, and the x-next-cursor header
+        is returned when the page is full, use it as the cursor param of the request of the next page
+        note:
+            it requires a primary key, and the order by columns should not be nullable
+
+    @param bulk_chunk_size:
+        the max number of rows in one statement of the bulk operations,
+        e.g. the delete apis delete the rows by primary key in chunks if DELETE ... RETURNING is not supported,
+        and the create many api inserts the rows in chunks by INSERT ... RETURNING if it is supported
+
+    @param stream_yield_per:
+        the find many apis (include the foreign tree apis) stream the rows as NDJSON if the request
+        accepts application/x-ndjson, the rows are fetched from a server side cursor by this number of rows,
+        so are the rows of the export api
+
+    @param total_count_mode:
+        how the x-total-count header of the find many apis (include the foreign tree apis) is counted
+        page: the number of the rows in the page
+        exact: COUNT(*) of the rows matched by the filters
+        window: COUNT(*) OVER() in the same statement of the page
+        estimated: the row estimate of the planner in PostgreSQL, the row count of the table in sqlite_stat1 of SQLite,
+            the exact count is used if the estimate is not available
+        cached: the exact count cached for total_count_ttl seconds by the filters
+
+    @param total_count_ttl:
+        the seconds of the cached total count of the cached total_count_mode
+
+    @param trusted_response:
+        set True to return the json response of the find one/many apis (include the foreign tree apis)
+        converted from the rows by the column types directly, the rows are not validated by the response model
+
+    @param join_strategy:
+        how the rows of the join_foreign_table are selected
+        join: JOIN the tables, the rows of the main table are repeated for each row of the join table
+        aggregate: the rows of the join table are aggregated into a json array by the database
+            (json_agg in PostgreSQL, json_group_array in SQLite), one row for each row of the main table
+        select_in: select the rows of the main table first, then the rows of each join table
+            by one WHERE IN query of the keys of the selected rows
+
+    @param lazy:
+        set True to build the models and the routes of the router when a request matches the prefix of it first,
+        instead of building them when the router is built, the router must have a prefix.
+        the routes are not in the OpenAPI until they are built, call lazy_openapi(app) to build them
+        when the OpenAPI is generated first, or materialize_crud_routes(app) to build them at once,
+        it returns the build seconds of each router
+
+    @param fast_query_parser:
+        set True to parse the query string of the find many api (and the foreign tree and the export apis) by the
+        query parser of the request query model, only the query parameters in the query string are validated,
+        instead of every field of the model.
+        the OpenAPI schema of the api is the same
+
+    @param schema_analysis_cache:
+        the analysis of the tables shared by the routers, the fields and the foreign tables of each table
+        are analysed once, it is shared by the routers of metadata_crud_router_builder
+
     @param router_kwargs:
         other argument for FastApi's views
 
@@ -93,6 +186,7 @@ def crud_router_builder(
         APIRouter for fastapi
     """
 
+    table_or_model = db_model
     db_model, NO_PRIMARY_KEY = convert_table_to_model(db_model)
 
     constraints = db_model.__table__.constraints
@@ -122,6 +216,9 @@ def crud_router_builder(
             raise RuntimeError("Some unknown problem occurred error, maybe you are uvicorn.run with reload=True. "
                                "Try declaring sql_type for crud_router_builder yourself using from fastapi_quickcrud.misc.type import SqlType")
 
+    if cursor_pagination and NO_PRIMARY_KEY:
+        raise PrimaryMissing("The cursor pagination requires a primary key")
+
     if not crud_methods and NO_PRIMARY_KEY == False:
         crud_methods = CrudMethods.get_declarative_model_full_crud_method()
     if not crud_methods and NO_PRIMARY_KEY == True:
@@ -134,10 +231,74 @@ def crud_router_builder(
     elif sql_type == SqlType.postgresql:
         routes_source = SQLAlchemyPGSQLRouteSource
         query_service = SQLAlchemyPGSQLQueryService
+    elif sql_type == SqlType.mysql:
+        routes_source = SQLAlchemyMySQLRouteSource
+        query_service = SQLAlchemyMySQLQueryService
+    elif sql_type == SqlType.mariadb:
+        routes_source = SQLAlchemyMariadbRouteSource
+        query_service = SQLAlchemyMariaDBQueryService
     else:
         routes_source = SQLAlchemyNotSupportRouteSource
         query_service = SQLAlchemyNotSupportQueryService
 
+    if join_strategy == JoinStrategy.aggregate and not query_service.json_aggregate_supported:
+        raise JoinStrategyNotSupportedException(f"The aggregate join strategy is not supported by {sql_type}")
+
+    if CrudMethods.BULK_LOAD in crud_methods and not routes_source.bulk_load_supported:
+        raise BulkLoadNotSupportedException(f"The bulk load api is not supported by {sql_type}")
+
+    if crud_models is not None and crud_models.SCHEMA_FINGERPRINT is not None:
+        fingerprint = schema_fingerprint(db_model,
+                                         sql_type=sql_type,
+                                         exclude_columns=exclude_columns,
+                                         constraints=constraints,
+                                         foreign_include=foreign_include,
+                                         exclude_primary_key=NO_PRIMARY_KEY)
+        if fingerprint != crud_models.SCHEMA_FINGERPRINT:
+            # the tables or the options are changed since the module of the models was generated
+            raise SchemaFingerprintMismatchException(f"The crud models are generated from other tables or options "
+                                                     f"than {db_model.__tablename__}, generate them again")
+
+    # the options of the router, the lazy router is built by them, and the names of the models are derived from them
+    options = dict(db_model=table_or_model,
+                   db_session=db_session,
+                   autocommit=autocommit,
+                   crud_methods=crud_methods,
+                   exclude_columns=exclude_columns,
+                   dependencies=dependencies,
+                   crud_models=crud_models,
+                   async_mode=async_mode,
+                   foreign_include=foreign_include,
+                   sql_type=sql_type,
+                   statement_cache=statement_cache,
+                   statement_cache_warm_up=statement_cache_warm_up,
+                   cursor_pagination=cursor_pagination,
+                   bulk_chunk_size=bulk_chunk_size,
+                   stream_yield_per=stream_yield_per,
+                   total_count_mode=total_count_mode,
+                   total_count_ttl=total_count_ttl,
+                   trusted_response=trusted_response,
+                   join_strategy=join_strategy,
+                   fast_query_parser=fast_query_parser,
+                   schema_analysis_cache=schema_analysis_cache,
+                   **router_kwargs)
+    options_fingerprint = router_fingerprint(table_or_model, options)
+
+    if lazy:
+        if not router_kwargs.get('prefix', None):
+            # the placeholder route matches the paths under the prefix, it would match every path without it
+            raise LazyRouterPrefixMissing("The lazy router requires a prefix")
+        api = APIRouter(**router_kwargs)
+        router_builder = partial(crud_router_builder, **options)
+
+        def build_router() -> APIRouter:
+            return router_builder()
+
+        # the OpenAPI cache identifies the lazy router by it before the router is built
+        build_router.fingerprint = options_fingerprint
+        api.routes.append(LazyCRUDRoute(api.prefix, build_router, name=db_model.__tablename__))
+        return api
+
     if not crud_models:
         crud_models_builder: CRUDModel = sqlalchemy_to_pydantic
         crud_models: CRUDModel = crud_models_builder(db_model=db_model,
@@ -146,20 +307,30 @@ def crud_router_builder(
                                                      exclude_columns=exclude_columns,
                                                      sql_type=sql_type,
                                                      foreign_include=foreign_include,
-                                                     exclude_primary_key=NO_PRIMARY_KEY)
+                                                     exclude_primary_key=NO_PRIMARY_KEY,
+                                                     analysis_cache=schema_analysis_cache,
+                                                     options_fingerprint=options_fingerprint)
 
     foreign_table_mapping = {db_model.__tablename__: db_model}
     if foreign_include:
         for i in foreign_include:
             model , _= convert_table_to_model(i)
             foreign_table_mapping[model.__tablename__] = i
-    crud_service = query_service(model=db_model, async_mode=async_mode, foreign_table_mapping=foreign_table_mapping)
+    crud_service = query_service(model=db_model,
+                                 async_mode=async_mode,
+                                 foreign_table_mapping=foreign_table_mapping,
+                                 statement_cache=statement_cache,
+                                 bulk_chunk_size=bulk_chunk_size,
+                                 total_count_ttl=total_count_ttl,
+                                 join_strategy=join_strategy)
     # else:
     #     crud_service = SQLAlchemyPostgreQueryService(model=db_model, async_mode=async_mode)
 
     result_parser = result_parser_builder(async_model=async_mode,
                                           crud_models=crud_models,
-                                          autocommit=autocommit)
+                                          autocommit=autocommit,
+                                          trusted_response=trusted_response,
+                                          join_strategy=join_strategy)
     methods_dependencies = crud_models.get_available_request_method()
     primary_name = crud_models.PRIMARY_KEY_NAME
     if primary_name:
@@ -198,7 +369,14 @@ def crud_router_builder(
                                 execute_service=execute_service,
                                 dependencies=dependencies,
                                 api=api,
-                                async_mode=async_mode)
+                                async_mode=async_mode,
+                                cursor_pagination=cursor_pagination,
+                                stream_yield_per=stream_yield_per,
+                                total_count_mode=total_count_mode,
+                                fast_query_parser=fast_query_parser)
+        if statement_cache_warm_up:
+            crud_service.warm_up(request_query_model=_request_query_model,
+                                 queries=statement_cache_warm_up)
 
     def upsert_one_api(request_response_model: dict, dependencies):
         _request_body_model = request_response_model.get('requestBodyModel', None)
@@ -262,6 +440,40 @@ def crud_router_builder(
                                   unique_list=unique_list,
                                   async_mode=async_mode)
 
+    def bulk_load_api(request_response_model: dict, dependencies):
+        _request_query_model = request_response_model.get('requestQueryModel', None)
+        _request_body_model = request_response_model.get('requestBodyModel', None)
+        _response_model = request_response_model.get('responseModel', None)
+
+        routes_source.bulk_load(path="/bulk_load",
+                                request_query_model=_request_query_model,
+                                request_body_model=_request_body_model,
+                                response_model=_response_model,
+                                db_session=db_session,
+                                query_service=crud_service,
+                                parsing_service=result_parser,
+                                execute_service=execute_service,
+                                dependencies=dependencies,
+                                api=api,
+                                unique_list=unique_list,
+                                async_mode=async_mode)
+
+    def export_api(request_response_model: dict, dependencies):
+        _request_query_model = request_response_model.get('requestQueryModel', None)
+        _response_model = request_response_model.get('responseModel', None)
+        routes_source.export(path="/export",
+                             request_query_model=_request_query_model,
+                             response_model=_response_model,
+                             db_session=db_session,
+                             query_service=crud_service,
+                             parsing_service=result_parser,
+                             execute_service=execute_service,
+                             dependencies=dependencies,
+                             api=api,
+                             async_mode=async_mode,
+                             stream_yield_per=stream_yield_per,
+                             fast_query_parser=fast_query_parser)
+
     def delete_one_api(request_response_model: dict, dependencies):
         _request_query_model = request_response_model.get('requestQueryModel', None)
         _request_url_model = request_response_model.get('requestUrlParamModel', None)
@@ -419,7 +631,11 @@ def crud_router_builder(
                                                  dependencies=dependencies,
                                                  api=api,
                                                  async_mode=async_mode,
-                                                 function_name=_function_name)
+                                                 function_name=_function_name,
+                                                 cursor_pagination=cursor_pagination,
+                                                 stream_yield_per=stream_yield_per,
+                                                 total_count_mode=total_count_mode,
+                                                 fast_query_parser=fast_query_parser)
 
     api_register = {
         CrudMethods.FIND_ONE.value: find_one_api,
@@ -428,6 +644,8 @@ def crud_router_builder(
         CrudMethods.UPSERT_MANY.value: upsert_many_api,
         CrudMethods.CREATE_MANY.value: create_many_api,
         CrudMethods.CREATE_ONE.value: create_one_api,
+        CrudMethods.BULK_LOAD.value: bulk_load_api,
+        CrudMethods.EXPORT.value: export_api,
         CrudMethods.DELETE_ONE.value: delete_one_api,
         CrudMethods.DELETE_MANY.value: delete_many_api,
         CrudMethods.POST_REDIRECT_GET.value: post_redirect_get_api,
@@ -445,7 +663,9 @@ def crud_router_builder(
     dependencies = [Depends(dep) for dep in dependencies]
     for request_method in methods_dependencies:
         value_of_dict_crud_model = crud_models.get_model_by_request_method(request_method)
-        crud_model_of_this_request_methods = value_of_dict_crud_model.keys()
+        # the static paths (/export) are registered before the path of the primary key, else they are matched by it
+        crud_model_of_this_request_methods = sorted(value_of_dict_crud_model.keys(),
+                                                    key=lambda i: i.value != CrudMethods.EXPORT.value)
         for crud_model_of_this_request_method in crud_model_of_this_request_methods:
             request_response_model_of_this_request_method = value_of_dict_crud_model[crud_model_of_this_request_method]
             api_register[crud_model_of_this_request_method.value](request_response_model_of_this_request_method,
@@ -454,5 +674,64 @@ def crud_router_builder(
     return api
 
 
+def metadata_crud_router_builder(
+        *,
+        metadata_or_base: Union[MetaData, DeclarativeMeta],
+        tables: Optional[List[str]] = None,
+        table_options: Optional[Dict[str, dict]] = None,
+        schema_analysis_cache: Optional[SchemaAnalysisCache] = None,
+        **kwargs: Any) -> Dict[str, APIRouter]:
+    """
+    @param metadata_or_base:
+        The MetaData or the declarative Base of the tables, the mapped classes of the declarative Base are used,
+        so the relationships of them are used to build the join_foreign_table param
+
+    @param tables:
+        the names of the tables to build the routers, all the tables by default,
+        the name of a table in a schema is qualified by the schema, e.g. app.user
+
+    @param table_options:
+        the arguments of crud_router_builder of each table by the table name, they override the kwargs
+        example:
+            {'user': {'crud_methods': [CrudMethods.FIND_ONE], 'exclude_columns': ['password']}}
+
+    @param schema_analysis_cache:
+        the analysis of the tables shared by the routers, a new SchemaAnalysisCache() is used by default,
+        so each table is analysed once even though it is a foreign table of many routers
+
+    @param kwargs:
+        the arguments of crud_router_builder of all the tables, the prefix and the tags are the table name by default,
+        the dot of the schema is replaced by _ in them, e.g. /app_user
+
+    @return:
+        the APIRouter of each table by the table name
+    """
+    if isinstance(metadata_or_base, MetaData):
+        metadata = metadata_or_base
+        mapped_models = {}
+    else:
+        metadata = metadata_or_base.metadata
+        mapped_models = {mapper.local_table: mapper.class_ for mapper in metadata_or_base.registry.mappers}
+    if schema_analysis_cache is None:
+        schema_analysis_cache = SchemaAnalysisCache()
+    if table_options is None:
+        table_options = {}
+
+    routers = {}
+    for table_name, table in metadata.tables.items():
+        if tables is not None and table_name not in tables:
+            continue
+        # the table name is qualified by the schema of it, e.g. app.user, the prefix is /app_user
+        default_name = table_name.replace('.', '_')
+        router_kwargs = {'prefix': f'/{default_name}',
+                         'tags': [default_name],
+                         **kwargs,
+                         **table_options.get(table_name, {})}
+        routers[table_name] = crud_router_builder(db_model=mapped_models.get(table, table),
+                                                  schema_analysis_cache=schema_analysis_cache,
+                                                  **router_kwargs)
+    return routers
+
+
 pgsql_crud_router_builder = partial(crud_router_builder)
 generic_sql_crud_router_builder = partial(crud_router_builder)
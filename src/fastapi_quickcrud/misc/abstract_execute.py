@@ -1,7 +1,37 @@
-from typing import Any
+import asyncio
+import io
+import queue
+import threading
+from contextlib import suppress
+from typing import Any, AsyncIterator, Iterator
 
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql.elements import BinaryExpression
 
+from .bulk_load import CopyRows
+from .export import COPY_QUEUE_SIZE, ChunkBuffer, CopyQuery
+
+
+def _copy_integrity_error(e: Exception, statement: str) -> Exception:
+    # the errors of the driver connection are not wrapped by SQLAlchemy, the integrity errors are
+    # the SQLSTATE class 23 of pgcode (psycopg2) or sqlstate (asyncpg)
+    sqlstate = getattr(e, 'pgcode', None) or getattr(e, 'sqlstate', None) or ''
+    if sqlstate.startswith('23'):
+        return IntegrityError(statement, None, e)
+    return e
+
+
+class _CopyStopped(Exception):
+    # raised by the write of copy_expert, so COPY is aborted if the response is closed before the end of it
+    pass
+
+
+class _CopyFile(object):
+
+    def __init__(self, write):
+        self.write = write
+
 
 class SQLALchemyExecuteService(object):
 
@@ -37,10 +67,156 @@ class SQLALchemyExecuteService(object):
         session.flush()
 
     @staticmethod
-    async def async_execute(session, stmt: BinaryExpression) -> Any:
-        return await session.execute(stmt)
+    async def async_execute(session, stmt: BinaryExpression, params: dict = None) -> Any:
+        return await session.execute(stmt, params)
+
+    @staticmethod
+    def execute(session, stmt: BinaryExpression, params: dict = None) -> Any:
+        return session.execute(stmt, params)
+
+    @staticmethod
+    async def async_rollback(session) -> Any:
+        await session.rollback()
+
+    @staticmethod
+    def rollback(session) -> Any:
+        session.rollback()
+
+    @staticmethod
+    async def async_stream(session, stmt: BinaryExpression, params: dict = None) -> Any:
+        return await session.stream(stmt, params)
+
+    @staticmethod
+    def stream(session, stmt: BinaryExpression, params: dict = None) -> Any:
+        return session.execute(stmt, params, execution_options={'stream_results': True})
+
+    @staticmethod
+    async def async_copy(session, copy_rows: CopyRows) -> Any:
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        if not driver_connection.is_in_transaction():
+            # the transaction of the connection is begun by SQLAlchemy on the first statement, COPY runs in it
+            await session.execute(text('SELECT 1'))
+        try:
+            await driver_connection.copy_records_to_table(copy_rows.table_name,
+                                                          schema_name=copy_rows.schema_name,
+                                                          columns=list(copy_rows.columns),
+                                                          records=copy_rows.records())
+        except Exception as e:
+            error = _copy_integrity_error(e, copy_rows.sql())
+            if error is e:
+                raise
+            raise error from e
+
+    @staticmethod
+    def copy(session, copy_rows: CopyRows) -> Any:
+        cursor = session.connection().connection.cursor()
+        try:
+            cursor.copy_expert(copy_rows.sql(), io.StringIO(copy_rows.csv()))
+        except Exception as e:
+            error = _copy_integrity_error(e, copy_rows.sql())
+            if error is e:
+                raise
+            raise error from e
+        finally:
+            cursor.close()
 
     @staticmethod
-    def execute(session, stmt: BinaryExpression) -> Any:
-        return session.execute(stmt)
+    async def async_copy_to(session, copy_query: CopyQuery) -> AsyncIterator[bytes]:
+        '''
+        the CSV chunks of COPY TO STDOUT by copy_from_query of asyncpg, the chunks are passed through the bounded
+        queue, so the memory is constant while the rows are copied
+        '''
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        chunks = asyncio.Queue(maxsize=COPY_QUEUE_SIZE)
+        buffer = ChunkBuffer()
+
+        async def write(data):
+            chunk = buffer.write(data)
+            if chunk:
+                await chunks.put(chunk)
+
+        async def copy():
+            try:
+                await driver_connection.copy_from_query(copy_query.numbered_select(), *copy_query.args,
+                                                        output=write, format='csv', header=True)
+                chunk = buffer.flush()
+                if chunk:
+                    await chunks.put(chunk)
+                await chunks.put(None)
+            except Exception as e:
+                await chunks.put(e)
+
+        task = asyncio.ensure_future(copy())
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    @staticmethod
+    def copy_to(session, copy_query: CopyQuery) -> Iterator[bytes]:
+        '''
+        the CSV chunks of COPY TO STDOUT by copy_expert of psycopg2, copy_expert writes the rows into the file
+        in a thread until the end of COPY, the chunks are passed through the bounded queue, so the memory is constant
+        '''
+        connection = session.connection().connection
+        chunks = queue.Queue(maxsize=COPY_QUEUE_SIZE)
+        stopped = threading.Event()
+        buffer = ChunkBuffer()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            raise _CopyStopped()
+
+        def write(data):
+            chunk = buffer.write(data)
+            if chunk:
+                put(chunk)
+
+        def copy():
+            cursor = connection.cursor()
+            try:
+                cursor.copy_expert(cursor.mogrify(copy_query.sql(), copy_query.args), _CopyFile(write))
+                chunk = buffer.flush()
+                if chunk:
+                    put(chunk)
+                end = None
+            except _CopyStopped:
+                return
+            except Exception as e:
+                end = e
+            finally:
+                cursor.close()
+            with suppress(_CopyStopped):
+                put(end)
 
+        thread = threading.Thread(target=copy, daemon=True)
+        thread.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stopped.set()
+            thread.join()
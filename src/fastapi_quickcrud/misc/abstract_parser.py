@@ -1,27 +1,65 @@
-import copy
+import json
 from http import HTTPStatus
 from urllib.parse import urlencode
 from pydantic import parse_obj_as
-from starlette.responses import Response, RedirectResponse
+from starlette.responses import Response, RedirectResponse, StreamingResponse, JSONResponse
 
-from .utils import group_find_many_join
+from .bulk_load import copy_csv_line
+from .export import EXPORT_MEDIA_TYPES
+from .utils import group_find_many_join, iter_group_find_many_join, join_group_key, encode_cursor, \
+    row_mapping_plan, stitch_select_in_rows, TOTAL_COUNT_LABEL
 from .exceptions import FindOneApiNotRegister
+from .response_encoder import ResponseEncoder
+from .type import JoinStrategy, DataFormat
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
 
 
 class SQLAlchemyGeneralSQLeResultParse(object):
 
-    def __init__(self, async_model, crud_models, autocommit):
+    def __init__(self, async_model, crud_models, autocommit, trusted_response=False,
+                 join_strategy=JoinStrategy.join):
 
         """
         :param async_model: bool
         :param crud_models: pre ready
         :param autocommit: bool
+        :param trusted_response: bool, the find apis return the json response of the rows without the validation
+        :param join_strategy: JoinStrategy, the rows of the join strategy need to be grouped by the main table row
         """
 
         self.async_mode = async_model
         self.crud_models = crud_models
         self.primary_name = crud_models.PRIMARY_KEY_NAME
         self.autocommit = autocommit
+        self.trusted_response = trusted_response
+        self.response_encoders = {}
+        self.join_strategy = join_strategy
+
+    def get_grouping_join_mode(self, **kwargs):
+        """
+        the join mode if the rows of the join_foreign_table are selected in the rows of the main table
+        """
+        if self.join_strategy != JoinStrategy.join:
+            return None
+        return kwargs.get('join_mode', None)
+
+    @staticmethod
+    def load_select_in_rows(rows, **kwargs):
+        """
+        the rows of the join tables of the rows of the main table, selected by the select in loader of the route
+        """
+        select_in_loader = kwargs.get('select_in_loader', None)
+        if select_in_loader is None or not rows:
+            return None
+        return select_in_loader(rows)
+
+    @staticmethod
+    async def async_load_select_in_rows(rows, **kwargs):
+        select_in_loader = kwargs.get('select_in_loader', None)
+        if select_in_loader is None or not rows:
+            return None
+        return await select_in_loader(rows)
 
     async def async_commit(self, session):
         await session.flush()
@@ -104,82 +142,275 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         return result
 
     @staticmethod
-    def find_one_sub_func(sql_execute_result, response_model, fastapi_response, **kwargs):
-        join = kwargs.get('join_mode', None)
+    def update_returning_sub_func(response_model, sql_execute_result, fastapi_response):
+        updated_rows = [dict(i) for i in sql_execute_result.fetchall()]
+        if not updated_rows:
+            return Response(status_code=HTTPStatus.NO_CONTENT)
+        fastapi_response.headers["x-total-count"] = str(len(updated_rows))
+        return parse_obj_as(response_model, updated_rows)
+
+    def update_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.update_returning_sub_func(response_model, sql_execute_result, fastapi_response)
+        self.commit(kwargs.get('session'))
+        return result
+
+    async def async_update_returning(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.update_returning_sub_func(response_model, sql_execute_result, fastapi_response)
+        await self.async_commit(kwargs.get('session'))
+        return result
+
+    def find_one_sub_func(self, keys, one_row_data, response_model, fastapi_response, **kwargs):
+        join = self.get_grouping_join_mode(**kwargs)
 
-        one_row_data = sql_execute_result.fetchall()
         if not one_row_data:
             return Response('specific data not found', status_code=HTTPStatus.NOT_FOUND)
-        response = []
-        for i in one_row_data:
-            i = dict(i)
-            result__ = copy.deepcopy(i)
-            tmp = {}
-            for key_, value_ in result__.items():
-                if '_____' in key_:
-                    key, foreign_column = key_.split('_____')
-                    if key not in tmp:
-                        tmp[key] = {foreign_column: value_}
-                    else:
-                        tmp[key][foreign_column] = value_
-                else:
-                    tmp[key_] = value_
-            response.append(tmp)
+        plan = row_mapping_plan(tuple(keys))
+        response = [plan(i) for i in one_row_data]
+        foreign_rows = kwargs.get('foreign_rows', None)
+        if foreign_rows:
+            response = stitch_select_in_rows(response, foreign_rows)
         if join:
-            response = group_find_many_join(response)
+            response = group_find_many_join(response, kwargs.get('primary_keys', None))
         if isinstance(response, list):
             response = response[0]
         fastapi_response.headers["x-total-count"] = str(1)
+        if self.trusted_response:
+            return self.trusted_json_response(response_model, response, fastapi_response)
         return response
 
     async def async_find_one(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
-        result = self.find_one_sub_func(sql_execute_result, response_model, fastapi_response, **kwargs)
+        rows = sql_execute_result.fetchall()
+        foreign_rows = await self.async_load_select_in_rows(rows, **kwargs)
+        result = self.find_one_sub_func(sql_execute_result.keys(), rows, response_model, fastapi_response,
+                                        foreign_rows=foreign_rows, **kwargs)
         await self.async_commit(kwargs.get('session'))
         return result
 
     def find_one(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
-        result = self.find_one_sub_func(sql_execute_result, response_model, fastapi_response, **kwargs)
+        rows = sql_execute_result.fetchall()
+        foreign_rows = self.load_select_in_rows(rows, **kwargs)
+        result = self.find_one_sub_func(sql_execute_result.keys(), rows, response_model, fastapi_response,
+                                        foreign_rows=foreign_rows, **kwargs)
         self.commit(kwargs.get('session'))
         return result
 
     @staticmethod
-    def find_many_sub_func(response_model, sql_execute_result, fastapi_response, **kwargs):
-        join = kwargs.get('join_mode', None)
-        result = sql_execute_result.fetchall()
+    def is_stream_request(request) -> bool:
+        return NDJSON_MEDIA_TYPE in request.headers.get('accept', '')
+
+    @staticmethod
+    def response_item_model(response_model):
+        """
+        the item model of the list response model, used to validate the rows one by one
+        """
+        root_field = response_model.__fields__.get('__root__', None)
+        if root_field is None:
+            return response_model
+        for field in root_field.sub_fields or []:
+            if field.outer_type_ is not field.type_:
+                return field.type_
+        return root_field.type_
+
+    def response_encoder(self, response_model) -> ResponseEncoder:
+        encoder = self.response_encoders.get(response_model, None)
+        if encoder is None:
+            encoder = ResponseEncoder(self.response_item_model(response_model))
+            self.response_encoders[response_model] = encoder
+        return encoder
+
+    def trusted_json_response(self, response_model, response, fastapi_response):
+        """
+        the json response of the rows converted by the field types of the response model,
+        FastAPI returns it as it is, so the rows are not validated by the response model
+        """
+        encoder = self.response_encoder(response_model)
+        if isinstance(response, list):
+            response = [encoder.convert(i) for i in response]
+        else:
+            response = encoder.convert(response)
+        json_response = JSONResponse(response)
+        json_response.headers.raw.extend(fastapi_response.headers.raw)
+        return json_response
+
+    @staticmethod
+    def stream_response(content, **kwargs):
+        response = StreamingResponse(content, media_type=NDJSON_MEDIA_TYPE)
+        total_count = kwargs.get('total_count', None)
+        if total_count is not None:
+            response.headers["x-total-count"] = str(total_count)
+        return response
+
+    def find_many_stream_sub_func(self, response_model, rows, **kwargs):
+        if self.get_grouping_join_mode(**kwargs):
+            rows = iter_group_find_many_join(rows)
+        if self.trusted_response:
+            encoder = self.response_encoder(response_model)
+            for row in rows:
+                yield json.dumps(encoder.convert(row)) + '\n'
+            return
+        item_model = self.response_item_model(response_model)
+        for row in rows:
+            yield item_model.parse_obj(row).json(exclude_unset=True) + '\n'
+
+    async def async_find_many_stream(self, *, response_model, sql_execute_result, yield_per, **kwargs):
+        join = self.get_grouping_join_mode(**kwargs)
+
+        plan = row_mapping_plan(tuple(sql_execute_result.keys()))
+
+        async def stream():
+            pending = []
+            async for partition in sql_execute_result.partitions(yield_per):
+                foreign_rows = await self.async_load_select_in_rows(partition, **kwargs)
+                rows = [plan(row) for row in partition]
+                if foreign_rows:
+                    rows = stitch_select_in_rows(rows, foreign_rows)
+                rows = pending + rows
+                pending = []
+                if join:
+                    # the last parent row may continue in the next partition, hold its rows back
+                    last_key = join_group_key(rows[-1])
+                    while rows and join_group_key(rows[-1]) == last_key:
+                        pending.insert(0, rows.pop())
+                for line in self.find_many_stream_sub_func(response_model, rows, **kwargs):
+                    yield line
+            for line in self.find_many_stream_sub_func(response_model, pending, **kwargs):
+                yield line
+            await self.async_commit(kwargs.get('session'))
+
+        return self.stream_response(stream(), **kwargs)
+
+    def find_many_stream(self, *, response_model, sql_execute_result, yield_per, **kwargs):
+        plan = row_mapping_plan(tuple(sql_execute_result.keys()))
+
+        def rows():
+            for partition in sql_execute_result.partitions(yield_per):
+                foreign_rows = self.load_select_in_rows(partition, **kwargs)
+                if foreign_rows:
+                    yield from stitch_select_in_rows([plan(row) for row in partition], foreign_rows)
+                    continue
+                for row in partition:
+                    yield plan(row)
+
+        def stream():
+            yield from self.find_many_stream_sub_func(response_model, rows(), **kwargs)
+            self.commit(kwargs.get('session'))
+
+        return self.stream_response(stream(), **kwargs)
+
+    def find_many_sub_func(self, response_model, keys, result, fastapi_response, **kwargs):
+        join = self.get_grouping_join_mode(**kwargs)
         if not result:
             return Response(status_code=HTTPStatus.NO_CONTENT)
-        response = []
-        for i in result:
-            i = dict(i)
-            result__ = copy.deepcopy(i)
-            tmp = {}
-            for key_, value_ in result__.items():
-                if '_____' in key_:
-                    key, foreign_column = key_.split('_____')
-                    if key not in tmp:
-                        tmp[key] = {foreign_column: value_}
-                    else:
-                        tmp[key][foreign_column] = value_
-                else:
-                    tmp[key_] = value_
-            response.append(tmp)
-
-        fastapi_response.headers["x-total-count"] = str(len(response))
+        plan = row_mapping_plan(tuple(keys))
+        response = [plan(i) for i in result]
+        foreign_rows = kwargs.get('foreign_rows', None)
+        if foreign_rows:
+            response = stitch_select_in_rows(response, foreign_rows)
+        cursor_columns = kwargs.get('cursor_columns', None)
+        page_size = len(result)
+        if cursor_columns and join:
+            # the limit of the join strategy counts the parents, the rows of a parent are in the same page
+            page_size = len({tuple(i[column] for column in cursor_columns) for i in response})
+        next_page = cursor_columns and page_size == kwargs.get('limit', None)
+
+        total_count = kwargs.get('total_count', None)
+        if TOTAL_COUNT_LABEL in response[0]:
+            total_count = response[0][TOTAL_COUNT_LABEL]
+            for i in response:
+                i.pop(TOTAL_COUNT_LABEL)
+        fastapi_response.headers["x-total-count"] = str(len(response) if total_count is None else total_count)
+        if next_page:
+            last_row = response[-1]
+            fastapi_response.headers["x-next-cursor"] = encode_cursor([last_row[i] for i in cursor_columns])
         if join:
-            response = group_find_many_join(response)
+            response = group_find_many_join(response, kwargs.get('primary_keys', None))
+        if self.trusted_response:
+            return self.trusted_json_response(response_model, response, fastapi_response)
         response = parse_obj_as(response_model, response)
         return response
 
     async def async_find_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
-        result = self.find_many_sub_func(response_model, sql_execute_result, fastapi_response, **kwargs)
+        rows = sql_execute_result.fetchall()
+        foreign_rows = await self.async_load_select_in_rows(rows, **kwargs)
+        result = self.find_many_sub_func(response_model, sql_execute_result.keys(), rows, fastapi_response,
+                                         foreign_rows=foreign_rows, **kwargs)
         await self.async_commit(kwargs.get('session'))
         return result
 
     def find_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
-        result = self.find_many_sub_func(response_model, sql_execute_result, fastapi_response, **kwargs)
+        rows = sql_execute_result.fetchall()
+        foreign_rows = self.load_select_in_rows(rows, **kwargs)
+        result = self.find_many_sub_func(response_model, sql_execute_result.keys(), rows, fastapi_response,
+                                         foreign_rows=foreign_rows, **kwargs)
         self.commit(kwargs.get('session'))
         return result
 
+    @staticmethod
+    def export_response(content, export_format):
+        return StreamingResponse(content, media_type=EXPORT_MEDIA_TYPES[export_format])
+
+    def export_sub_func(self, response_model, keys, export_format, json_columns):
+        """
+        the encoder of the rows of a partition into the lines of the export, the CSV of COPY,
+        or the json of the rows converted by the field types of the row model, the rows are not validated by it
+        """
+        if export_format == DataFormat.csv:
+            is_json = [i in json_columns for i in keys]
+
+            def encode(rows):
+                return ''.join(copy_csv_line(row, is_json) for row in rows)
+        else:
+            encoder = self.response_encoder(response_model)
+            plan = row_mapping_plan(tuple(keys))
+
+            def encode(rows):
+                return ''.join(json.dumps(encoder.convert(plan(row))) + '\n' for row in rows)
+        return encode
+
+    async def async_export(self, *, response_model, sql_execute_result, yield_per, export_format, json_columns,
+                           **kwargs):
+        keys = list(sql_execute_result.keys())
+        encode = self.export_sub_func(response_model, keys, export_format, json_columns)
+
+        async def stream():
+            if export_format == DataFormat.csv:
+                yield copy_csv_line(keys, [False] * len(keys))
+            async for partition in sql_execute_result.partitions(yield_per):
+                yield encode(partition)
+            await self.async_commit(kwargs.get('session'))
+
+        return self.export_response(stream(), export_format)
+
+    def export(self, *, response_model, sql_execute_result, yield_per, export_format, json_columns, **kwargs):
+        keys = list(sql_execute_result.keys())
+        encode = self.export_sub_func(response_model, keys, export_format, json_columns)
+
+        def stream():
+            if export_format == DataFormat.csv:
+                yield copy_csv_line(keys, [False] * len(keys))
+            for partition in sql_execute_result.partitions(yield_per):
+                yield encode(partition)
+            self.commit(kwargs.get('session'))
+
+        return self.export_response(stream(), export_format)
+
+    async def async_export_copy(self, *, sql_execute_result, **kwargs):
+        # the chunks of COPY TO STDOUT, they are the CSV with the header already
+
+        async def stream():
+            async for chunk in sql_execute_result:
+                yield chunk
+            await self.async_commit(kwargs.get('session'))
+
+        return self.export_response(stream(), DataFormat.csv)
+
+    def export_copy(self, *, sql_execute_result, **kwargs):
+        def stream():
+            yield from sql_execute_result
+            self.commit(kwargs.get('session'))
+
+        return self.export_response(stream(), DataFormat.csv)
+
     # @staticmethod
     # def update_one_sub_func(response_model, sql_execute_result, fastapi_response):
     #     result = parse_obj_as(response_model, sql_execute_result)
@@ -249,8 +480,8 @@ class SQLAlchemyGeneralSQLeResultParse(object):
 
     @staticmethod
     def upsert_one_sub_func(response_model, sql_execute_result, fastapi_response):
-        sql_execute_result = sql_execute_result.fetchone()
-        result = parse_obj_as(response_model, dict(sql_execute_result))
+        upserted_data, = sql_execute_result
+        result = parse_obj_as(response_model, upserted_data)
         fastapi_response.headers["x-total-count"] = str(1)
         return result
 
@@ -266,9 +497,8 @@ class SQLAlchemyGeneralSQLeResultParse(object):
 
     @staticmethod
     def upsert_many_sub_func(response_model, sql_execute_result, fastapi_response):
-        insert_result_list = sql_execute_result.fetchall()
-        result = parse_obj_as(response_model, insert_result_list)
-        fastapi_response.headers["x-total-count"] = str(len(insert_result_list))
+        result = parse_obj_as(response_model, sql_execute_result)
+        fastapi_response.headers["x-total-count"] = str(len(sql_execute_result))
         return result
 
     async def async_upsert_many(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
@@ -281,6 +511,22 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         self.commit(kwargs.get('session'))
         return result
 
+    @staticmethod
+    def bulk_load_sub_func(response_model, sql_execute_result, fastapi_response):
+        result = parse_obj_as(response_model, {'loaded': sql_execute_result})
+        fastapi_response.headers["x-total-count"] = str(sql_execute_result)
+        return result
+
+    async def async_bulk_load(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.bulk_load_sub_func(response_model, sql_execute_result, fastapi_response)
+        await self.async_commit(kwargs.get('session'))
+        return result
+
+    def bulk_load(self, *, response_model, sql_execute_result, fastapi_response, **kwargs):
+        result = self.bulk_load_sub_func(response_model, sql_execute_result, fastapi_response)
+        self.commit(kwargs.get('session'))
+        return result
+
     def delete_one_sub_func(self, response_model, sql_execute_result, fastapi_response, **kwargs):
         if not sql_execute_result:
             return Response(status_code=HTTPStatus.NOT_FOUND)
@@ -330,6 +576,22 @@ class SQLAlchemyGeneralSQLeResultParse(object):
         await self.async_commit(session)
         return result
 
+    def delete_rows_sub_func(self, response_model, sql_execute_results, fastapi_response, delete_one):
+        deleted_rows = [dict(i) for i in sql_execute_results]
+        if delete_one:
+            return self.delete_one_sub_func(response_model, deleted_rows[0] if deleted_rows else None, fastapi_response)
+        return self.delete_many_sub_func(response_model, deleted_rows, fastapi_response)
+
+    def delete_rows(self, *, response_model, sql_execute_results, fastapi_response, delete_one, **kwargs):
+        result = self.delete_rows_sub_func(response_model, sql_execute_results, fastapi_response, delete_one)
+        self.commit(kwargs.get('session'))
+        return result
+
+    async def async_delete_rows(self, *, response_model, sql_execute_results, fastapi_response, delete_one, **kwargs):
+        result = self.delete_rows_sub_func(response_model, sql_execute_results, fastapi_response, delete_one)
+        await self.async_commit(kwargs.get('session'))
+        return result
+
     def has_end_point(self, fastapi_request) -> bool:
         redirect_end_point = fastapi_request.url.path + "/{" + self.primary_name + "}"
         redirect_url_exist = False
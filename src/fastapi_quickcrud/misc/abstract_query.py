@@ -1,37 +1,164 @@
+import json
+import uuid
 from abc import ABC
-from typing import List, Union
+from itertools import groupby
+from typing import List, Union, Tuple, Optional, Iterator
 
-from sqlalchemy import and_, select, text
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import and_, select, text, bindparam, update, delete, insert, tuple_, inspect, func, exists, \
+    literal_column, type_coerce, JSON, false
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.sql.elements import BinaryExpression
 from sqlalchemy.sql.schema import Table
 
+from .bulk_load import CopyRows, group_rows
+from .export import CopyQuery
 from .exceptions import UnknownOrderType, UnknownColumn, UpdateColumnEmptyException
-from .type import Ordering
-from .utils import clean_input_fields, path_query_builder
-from .utils import find_query_builder
+from .statement_cache import StatementCache, CountCache, fill_query_default
+from .type import Ordering, JoinStrategy
+from .utils import clean_input_fields, path_query_builder, path_query_values, seek_query_builder, decode_cursor
+from .utils import find_query_builder, find_query_values, build_filter_plan, query_shape, TOTAL_COUNT_LABEL, \
+    SELECT_IN_KEY_LABEL
+
+# the bind parameters limit of a statement, e.g. 32767 of asyncpg
+MAX_BIND_PARAMS = 32767
+# the drivers of which the bulk load copies the rows by COPY FROM STDIN, and the export by COPY TO STDOUT
+COPY_DRIVERS = ('psycopg2', 'asyncpg')
+
+
+def deduplicate_rows(rows: List[dict], key: List[str]) -> List[dict]:
+    '''
+    the rows with the same values of the key columns are replaced by the last one of them, at the position of the
+    first one, the rows without a value of the key columns (the NULL of the unique columns) are kept
+    '''
+    rows_by_key = {}
+    for index, row in enumerate(rows):
+        values = tuple(row.get(i, None) for i in key)
+        if None in values:
+            values = index
+        rows_by_key[values] = row
+    return list(rows_by_key.values())
 
 
 class SQLAlchemyGeneralSQLQueryService(ABC):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
 
         """
         :param model: declarative_base model
         :param async_mode: bool
+        :param statement_cache: StatementCache, the select statement templates cache
+        :param bulk_chunk_size: int, the max number of rows in one bulk statement
+        :param total_count_ttl: float, the seconds of the cached total count of the find many api
+        :param join_strategy: JoinStrategy, how the join_foreign_table rows are selected
         """
 
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
         self.foreign_table_mapping = foreign_table_mapping
+        if statement_cache is None:
+            statement_cache = StatementCache()
+        self.statement_cache = statement_cache
+        self.bulk_chunk_size = bulk_chunk_size
+        self.count_cache = CountCache(ttl=total_count_ttl)
+        self.join_strategy = join_strategy
+        self.orm_delete_cascade = None
+        self.filter_plans = {}
+        self.get_filter_plan(model)
+
+    def get_filter_plan(self, model) -> dict:
+        if model not in self.filter_plans:
+            self.filter_plans[model] = build_filter_plan(model)
+        return self.filter_plans[model]
+
+    def get_cached_statement(self, cache_key: tuple, statement_builder) -> BinaryExpression:
+        # the cache can be shared by the routers, the statements differ by the model and the join strategy
+        cache_key = (self.model, self.join_strategy) + cache_key
+        stmt = self.statement_cache.get(cache_key)
+        if stmt is None:
+            stmt = statement_builder()
+            self.statement_cache.set(cache_key, stmt)
+        return stmt
+
+    def get_order_by_spec(self, order_by_columns) -> List[Tuple[str, bool]]:
+        order_by_spec = []
+        if not order_by_columns:
+            return order_by_spec
+        for order_by_column in order_by_columns:
+            if not order_by_column:
+                continue
+            sort_column, order_by = (order_by_column.replace(' ', '').split(':') + [None])[:2]
+            if not hasattr(self.model_columns, sort_column):
+                raise UnknownColumn(f'column {sort_column} is not exited')
+            if not order_by or order_by.upper() == Ordering.ASC.upper():
+                order_by_spec.append((sort_column, False))
+            elif order_by.upper() == Ordering.DESC.upper():
+                order_by_spec.append((sort_column, True))
+            else:
+                raise UnknownOrderType(f"Unknown order type {order_by}, only accept DESC or ASC")
+        return order_by_spec
+
+    def get_primary_keys(self, target_model=None) -> List[str]:
+        model = self.model
+        if target_model:
+            model = self.foreign_table_mapping[target_model]
+        table = model if isinstance(model, Table) else model.__table__
+        return [column.key for column in table.primary_key.columns]
+
+    def get_keyset(self, model, order_by_spec: List[Tuple[str, bool]]) -> List[Tuple[str, bool]]:
+        '''
+        the ordering columns of cursor pagination, the order by columns and the primary key as the tie-breaker,
+        it is a list of (column name of the table, desc)
+        '''
+        table = model if isinstance(model, Table) else model.__table__
+        keyset = []
+        for sort_column, desc in order_by_spec:
+            if isinstance(model, Table):
+                if sort_column not in table.c:
+                    raise UnknownColumn(f'column {sort_column} is not exited')
+                keyset.append((table.c[sort_column].key, desc))
+                continue
+            if not hasattr(model, sort_column):
+                raise UnknownColumn(f'column {sort_column} is not exited')
+            keyset.append((getattr(model, sort_column).expression.key, desc))
+        keyset_columns = [column_name for column_name, _ in keyset]
+        tie_breaker_desc = keyset[-1][1] if keyset else False
+        for column in table.primary_key.columns:
+            if column.key not in keyset_columns:
+                keyset.append((column.key, tie_breaker_desc))
+        return keyset
 
     def get_many(self, *,
                  join_mode,
                  query,
                  target_model=None,
                  abstract_param=None
-                 ) -> BinaryExpression:
+                 ) -> Tuple[BinaryExpression, dict]:
+        stmt, params, _ = self.get_many_statement(join_mode=join_mode,
+                                                  query=query,
+                                                  target_model=target_model,
+                                                  abstract_param=abstract_param)
+        return stmt, params
+
+    def get_many_statement(self, *,
+                           join_mode,
+                           query,
+                           target_model=None,
+                           abstract_param=None,
+                           cursor_pagination=False,
+                           cursor=None,
+                           window_count=False
+                           ) -> Tuple[BinaryExpression, dict, Optional[List[str]]]:
+        '''
+        return the statement, the bind params and the keyset columns of cursor pagination.
+        with cursor pagination the rows after the cursor are selected by the seek predicate of the keyset,
+        instead of skipping the offset rows, so every page costs the same as the first one.
+        with window_count the total count of the matched rows is selected by COUNT(*) OVER() in the same statement
+        '''
         filter_args = query
         limit = filter_args.pop('limit', None)
         offset = filter_args.pop('offset', None)
@@ -39,63 +166,261 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
         model = self.model
         if target_model:
             model = self.foreign_table_mapping[target_model]
-        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
-                                                                 model=model)
-        path_filter_list: List[BinaryExpression] = path_query_builder(params=abstract_param,
-                                                                      model=self.foreign_table_mapping)
-        join_table_instance_list: list = self.get_join_select_fields(join_mode)
+        filter_plan = self.get_filter_plan(model)
+        order_by_spec = self.get_order_by_spec(order_by_columns)
+        table = model if isinstance(model, Table) else model.__table__
+        keyset = None
+        cursor_values = None
+        if cursor_pagination:
+            keyset = self.get_keyset(model, order_by_spec)
+            if cursor is not None:
+                cursor_values = decode_cursor(cursor, [table.c[column_name] for column_name, _ in keyset])
+                offset = None
 
-
-        if not isinstance(self.model, Table):
-            model = model.__table__
-
-        stmt = select(*[model] + join_table_instance_list).filter(and_(*filter_list+path_filter_list))
-        if order_by_columns:
+        def statement_builder():
             order_by_query_list = []
+            seek_filter_list = []
+            if keyset:
+                keyset_columns = [table.c[column_name] for column_name, _ in keyset]
+                if cursor_values is not None:
+                    # the NULL values of the cursor are not bound, the seek predicate is built for them
+                    seek_filter_list.append(seek_query_builder(keyset_columns,
+                                                               [desc for _, desc in keyset],
+                                                               [None if value is None else
+                                                                bindparam(f'cursor_{index}', type_=column.type)
+                                                                for index, (column, value) in
+                                                                enumerate(zip(keyset_columns, cursor_values))],
+                                                               nulls_first=self.nulls_first))
+                for column, (_, desc) in zip(keyset_columns, keyset):
+                    order_by_query_list.append(column.desc() if desc else column.asc())
+            else:
+                for sort_column, desc in order_by_spec:
+                    column = getattr(self.model_columns, sort_column)
+                    order_by_query_list.append(column.desc() if desc else column.asc())
+                if join_mode and self.join_strategy == JoinStrategy.join:
+                    # the joined rows of a parent are adjacent, the stream groups the rows of the parent in order
+                    order_by_query_list += [column.asc() for column in table.primary_key.columns]
 
-            for order_by_column in order_by_columns:
-                if not order_by_column:
-                    continue
-                sort_column, order_by = (order_by_column.replace(' ', '').split(':') + [None])[:2]
-                if not hasattr(self.model_columns, sort_column):
-                    raise UnknownColumn(f'column {sort_column} is not exited')
-                if not order_by:
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).asc())
-                elif order_by.upper() == Ordering.DESC.upper():
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).desc())
-                elif order_by.upper() == Ordering.ASC.upper():
-                    order_by_query_list.append(getattr(self.model_columns, sort_column).asc())
-                else:
-                    raise UnknownOrderType(f"Unknown order type {order_by}, only accept DESC or ASC")
+            extra_columns = []
+            if window_count:
+                extra_columns.append(func.count().over().label(TOTAL_COUNT_LABEL))
+            if keyset and join_mode and self.join_strategy == JoinStrategy.join and limit is not None:
+                return self.get_join_page_select(model=model,
+                                                 keyset=keyset,
+                                                 filter_args=filter_args,
+                                                 filter_plan=filter_plan,
+                                                 abstract_param=abstract_param,
+                                                 join_mode=join_mode,
+                                                 seek_filter_list=seek_filter_list,
+                                                 order_by_query_list=order_by_query_list,
+                                                 offset=offset)
+            stmt = self.get_many_select(model=model,
+                                        filter_args=filter_args,
+                                        filter_plan=filter_plan,
+                                        abstract_param=abstract_param,
+                                        join_mode=join_mode,
+                                        extra_filter_list=seek_filter_list,
+                                        extra_columns=extra_columns)
             if order_by_query_list:
                 stmt = stmt.order_by(*order_by_query_list)
-        stmt = stmt.limit(limit).offset(offset)
+            if limit is not None:
+                stmt = stmt.limit(bindparam('limit'))
+            if offset is not None:
+                stmt = stmt.offset(bindparam('offset'))
+            return stmt
+
+        cache_key = ('get_many',
+                     target_model,
+                     query_shape(filter_args),
+                     query_shape(abstract_param),
+                     tuple(order_by_spec),
+                     tuple(keyset) if keyset else None,
+                     None if cursor_values is None else tuple(value is None for value in cursor_values),
+                     limit is None,
+                     offset is None,
+                     window_count,
+                     tuple(join_mode or ()))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+
+        params = find_query_values(filter_args, model, {}, filter_plan)
+        path_query_values(abstract_param, params)
+        if cursor_values is not None:
+            for index, value in enumerate(cursor_values):
+                if value is not None:
+                    params[f'cursor_{index}'] = value
+        if limit is not None:
+            params['limit'] = limit
+        if offset is not None:
+            params['offset'] = offset
+        cursor_columns = [column_name for column_name, _ in keyset] if keyset else None
+        return stmt, params, cursor_columns
+
+    def get_join_page_select(self, *,
+                             model,
+                             keyset,
+                             filter_args,
+                             filter_plan,
+                             abstract_param,
+                             join_mode,
+                             seek_filter_list,
+                             order_by_query_list,
+                             offset):
+        '''
+        the cursor page of the join strategy, the limit and the seek predicate select the keys of the parents
+        in a subquery, and the joined rows are selected for them, so a page never ends in the middle of the rows
+        of a parent
+        '''
+        table = model if isinstance(model, Table) else model.__table__
+        keyset_columns = [table.c[column_name] for column_name, _ in keyset]
+        page = self.get_many_select(model=model,
+                                    filter_args=filter_args,
+                                    filter_plan=filter_plan,
+                                    abstract_param=abstract_param,
+                                    join_mode=join_mode,
+                                    extra_filter_list=seek_filter_list,
+                                    join_columns=False)
+        page = page.with_only_columns(*keyset_columns).distinct().order_by(*order_by_query_list) \
+            .limit(bindparam('limit'))
+        if offset is not None:
+            page = page.offset(bindparam('offset'))
+        page = page.subquery()
+        stmt = select(*[table] + self.get_join_select_fields(join_mode))
         stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
-        return stmt
+        stmt = stmt.join(page, and_(*[column == page.c[column.key] for column in table.primary_key.columns]))
+        return stmt.order_by(*order_by_query_list)
+
+    def get_export_statement(self, *,
+                             query,
+                             columns: List[str]) -> Tuple[BinaryExpression, dict]:
+        '''
+        the find many statement of the columns of the export, the foreign tables are not joined,
+        so a row of the table is a flat row of the export
+        '''
+        stmt, params, _ = self.get_many_statement(join_mode=None, query=query)
+        table = self.model.__table__
+        return stmt.with_only_columns(*[table.c[i] for i in columns]), params
+
+    def get_many_select(self, *,
+                        model,
+                        filter_args,
+                        filter_plan,
+                        abstract_param=None,
+                        join_mode=None,
+                        extra_filter_list=None,
+                        extra_columns=None,
+                        join_columns=True):
+        bind_params = {}
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                 model=model,
+                                                                 filter_plan=filter_plan,
+                                                                 bind_params=bind_params)
+        path_filter_list: List[BinaryExpression] = path_query_builder(params=abstract_param,
+                                                                      model=self.foreign_table_mapping,
+                                                                      bind_params=bind_params)
+        join_table_instance_list: list = self.get_join_select_fields(join_mode) if join_columns else []
+        table = model if isinstance(model, Table) else model.__table__
+        stmt = select(*[table] + join_table_instance_list + (extra_columns or [])).filter(
+            and_(*filter_list + path_filter_list + (extra_filter_list or [])))
+        return self.get_join_by_excpression(stmt, join_mode=join_mode)
+
+    def get_count_select(self, *,
+                         join_mode,
+                         query,
+                         target_model=None,
+                         abstract_param=None) -> Tuple[BinaryExpression, dict, tuple]:
+        '''
+        return the select of the rows matched by the find many api without the limit, offset and order,
+        the bind params and the cache key of the statement
+        '''
+        filter_args = {k: v for k, v in query.items() if k not in ('limit', 'offset', 'order_by_columns')}
+        model = self.model
+        if target_model:
+            model = self.foreign_table_mapping[target_model]
+        filter_plan = self.get_filter_plan(model)
+
+        def statement_builder():
+            stmt = self.get_many_select(model=model,
+                                        filter_args=filter_args,
+                                        filter_plan=filter_plan,
+                                        abstract_param=abstract_param,
+                                        join_mode=join_mode,
+                                        join_columns=False)
+            if join_mode and self.join_strategy == JoinStrategy.join:
+                # the parent is repeated for each joined row, the distinct parents are counted
+                table = model if isinstance(model, Table) else model.__table__
+                stmt = stmt.with_only_columns(*(list(table.primary_key.columns) or list(table.c))).distinct()
+            return stmt
+
+        cache_key = ('count_select',
+                     target_model,
+                     query_shape(filter_args),
+                     query_shape(abstract_param),
+                     tuple(join_mode or ()))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+        params = find_query_values(filter_args, model, {}, filter_plan)
+        path_query_values(abstract_param, params)
+        return stmt, params, cache_key
+
+    def get_count_statement(self, **kwargs) -> Tuple[BinaryExpression, dict, tuple]:
+        '''
+        return the COUNT(*) statement of the rows matched by the find many api, the bind params
+        and the key of the count in the count cache (the shape and the values of the filters)
+        '''
+        select_stmt, params, cache_key = self.get_count_select(**kwargs)
+        stmt = self.get_cached_statement(('count',) + cache_key,
+                                         lambda: select(func.count()).select_from(select_stmt.subquery()))
+        count_key = cache_key + tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
+        return stmt, params, count_key
+
+    def get_estimated_count_statement(self, **kwargs) -> Optional[Tuple[BinaryExpression, dict]]:
+        '''
+        return the statement of the estimated count of the rows matched by the find many api,
+        None if the database is not supported and the exact count is used
+        '''
+        return None
+
+    @staticmethod
+    def parse_estimated_count(value) -> Optional[int]:
+        return None
 
     def get_one(self, *,
                 extra_args: dict,
                 filter_args: dict,
                 join_mode=None
-                ) -> BinaryExpression:
-        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
-                                                                 model=self.model_columns)
+                ) -> Tuple[BinaryExpression, dict]:
+        filter_plan = self.get_filter_plan(self.model)
 
-        extra_query_expression: List[BinaryExpression] = find_query_builder(param=extra_args,
-                                                                            model=self.model)
-        join_table_instance_list: list = self.get_join_select_fields(join_mode)
-        model = self.model
-        if not isinstance(self.model, Table):
-            model = model.__table__
-        stmt = select(*[model] + join_table_instance_list).where(and_(*filter_list + extra_query_expression))
-        # stmt = session.query(*[model] + join_table_instance_list).filter(and_(*filter_list + extra_query_expression))
-        stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
-        return stmt
+        def statement_builder():
+            bind_params = {}
+            filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                     model=self.model_columns,
+                                                                     filter_plan=filter_plan,
+                                                                     bind_params=bind_params)
 
-    def create(self, *,
-               insert_arg,
-               create_one=True,
-               ) -> List[BinaryExpression]:
+            extra_query_expression: List[BinaryExpression] = find_query_builder(param=extra_args,
+                                                                                model=self.model,
+                                                                                filter_plan=filter_plan,
+                                                                                bind_params=bind_params)
+            join_table_instance_list: list = self.get_join_select_fields(join_mode)
+            model = self.model
+            if not isinstance(self.model, Table):
+                model = model.__table__
+            stmt = select(*[model] + join_table_instance_list).where(and_(*filter_list + extra_query_expression))
+            # stmt = session.query(*[model] + join_table_instance_list).filter(and_(*filter_list + extra_query_expression))
+            stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
+            return stmt
+
+        cache_key = ('get_one',
+                     query_shape(filter_args),
+                     query_shape(extra_args),
+                     tuple(join_mode or ()))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+
+        params = find_query_values(filter_args, self.model_columns, {}, filter_plan)
+        find_query_values(extra_args, self.model, params, filter_plan)
+        return stmt, params
+
+    def get_insert_rows(self, *, insert_arg, create_one=True) -> List[dict]:
         insert_arg_dict: Union[list, dict] = insert_arg
         if not create_one:
             insert_arg_list: list = insert_arg_dict.pop('insert', None)
@@ -107,19 +432,182 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
 
         insert_arg_dict: list[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
                                        for insert_arg in insert_arg_dict]
-        if isinstance(insert_arg_dict, list):
-            new_data = []
-            for i in insert_arg_dict:
-                new_data.append(self.model(**i))
+        return insert_arg_dict
+
+    def create(self, *,
+               insert_arg,
+               create_one=True,
+               ) -> List[BinaryExpression]:
+        insert_arg_dict = self.get_insert_rows(insert_arg=insert_arg, create_one=create_one)
+        new_data = []
+        for i in insert_arg_dict:
+            new_data.append(self.model(**i))
         return new_data
 
+    def create_returning(self, *,
+                         insert_arg,
+                         create_one=True,
+                         ) -> Iterator[BinaryExpression]:
+        '''
+        the multiple VALUES INSERT ... RETURNING statements of the rows, without building the model instances,
+        the server default values are returned by RETURNING.
+        the consecutive rows with the same columns are inserted in one statement,
+        with at most bulk_chunk_size rows and MAX_BIND_PARAMS bind parameters
+        '''
+        table = self.model.__table__
+        insert_rows = self.get_insert_rows(insert_arg=insert_arg, create_one=create_one)
+        for columns, rows in groupby(insert_rows, key=lambda row: tuple(row)):
+            rows = list(rows)
+            if not columns:
+                for _ in rows:
+                    yield insert(table).returning(*table.c)
+                continue
+            chunk_size = max(1, min(self.bulk_chunk_size, MAX_BIND_PARAMS // max(1, len(columns))))
+            for index in range(0, len(rows), chunk_size):
+                yield insert(table).values(rows[index:index + chunk_size]).returning(*table.c)
+
+    def get_upsert_rows(self, *, insert_arg, upsert_one=True) -> Tuple[List[dict], Optional[List[str]]]:
+        '''
+        the rows of the upsert request, and the columns updated on conflict, None if on_conflict is not set
+        '''
+        on_conflict = insert_arg.pop('on_conflict', None)
+        insert_rows = self.get_insert_rows(insert_arg=insert_arg, create_one=upsert_one)
+        if on_conflict is None:
+            return insert_rows, None
+        return insert_rows, self.get_update_columns(on_conflict.__dict__.get('update_columns', None))
+
+    def get_update_columns(self, update_columns: Optional[List[str]]) -> List[str]:
+        update_columns = clean_input_fields(update_columns or [], self.model_columns)
+        if not update_columns:
+            raise UpdateColumnEmptyException('update_columns parameter must be a non-empty list ')
+        return update_columns
+
+    def upsert_statement(self, rows: List[dict], *, conflict_list: Optional[List[str]], update_columns):
+        '''
+        the INSERT statement of the rows, the columns of update_columns are updated on the conflict of
+        conflict_list if it is set
+        '''
+        raise NotImplementedError
+
+    def last_inserted_condition(self, table) -> BinaryExpression:
+        '''
+        the condition of the row inserted by the last single row INSERT, the row is selected by it without RETURNING
+        '''
+        raise NotImplementedError
+
     def upsert(self, *,
                insert_arg,
                unique_fields: List[str],
                upsert_one=True,
-               ) -> BinaryExpression:
+               returning=True,
+               ) -> Iterator[Tuple[BinaryExpression, Optional[BinaryExpression]]]:
+        '''
+        the multiple VALUES upsert statements of the rows (upsert_statement),
+        the consecutive rows with the same columns are upserted in one statement,
+        with at most bulk_chunk_size rows and MAX_BIND_PARAMS bind parameters.
+
+        the rows with the same values of the conflict columns are deduplicated, the last one wins,
+        PostgreSQL can't update a row twice in one statement.
+
+        each statement is yielded with the select of the upserted rows if returning is False,
+        the rows are selected by the primary key or the unique columns in them, in the order of the key,
+        the rows without the key are upserted one by one and selected by last_inserted_condition
+        '''
+        table = self.model.__table__
+        insert_rows, update_columns = self.get_upsert_rows(insert_arg=insert_arg, upsert_one=upsert_one)
+        unique_columns = clean_input_fields(model=self.model_columns, param=unique_fields or [])
+        conflict_list = unique_columns if update_columns else None
+        if conflict_list:
+            insert_rows = deduplicate_rows(insert_rows, conflict_list)
+        key_candidates = [list(table.primary_key.columns.keys()), unique_columns]
+
+        def upsert_statement(rows):
+            stmt = self.upsert_statement(rows, conflict_list=conflict_list, update_columns=update_columns)
+            if returning:
+                stmt = stmt.returning(*table.c)
+            return stmt
+
+        def select_statement(rows, key):
+            if returning:
+                return None
+            if not key:
+                return select(table).where(self.last_inserted_condition(table))
+            key_columns = [table.c[i] for i in key]
+            if len(key_columns) == 1:
+                condition = key_columns[0].in_([row[key[0]] for row in rows])
+            else:
+                condition = tuple_(*key_columns).in_([tuple(row[i] for i in key) for row in rows])
+            return select(table).where(condition).order_by(*key_columns)
+
+        for columns, rows in groupby(insert_rows, key=lambda row: tuple(row)):
+            rows = list(rows)
+            key = next((i for i in key_candidates if i and set(i) <= set(columns)), None)
+            if not columns or (not key and not returning):
+                chunk_size = 1
+            else:
+                chunk_size = max(1, min(self.bulk_chunk_size, MAX_BIND_PARAMS // len(columns)))
+            for index in range(0, len(rows), chunk_size):
+                chunk = rows[index:index + chunk_size]
+                yield upsert_statement(chunk), select_statement(chunk, key)
+
+    def get_bulk_load_row_builder(self):
+        '''
+        the builder of the row of the bulk load from the values of the row model, the None values of the columns
+        with the defaults are removed, so the defaults are inserted, the None values of the others are NULL,
+        so the rows of the same columns are loaded together
+        '''
+        table = self.model.__table__
+        column_names = {column.key: column.name for column in table.c}
+        defaulted = {column.name for column in table.c
+                     if column.default is not None or column.server_default is not None
+                     or column.primary_key and column.autoincrement == True}
+
+        def build(values: dict) -> dict:
+            row = {}
+            for key, value in values.items():
+                name = column_names.get(key, key)
+                if value is None and name in defaulted:
+                    continue
+                # the uuid values are bound as the strings, as the uuid columns of the request dataclasses
+                row[name] = str(value) if isinstance(value, uuid.UUID) else value
+            return row
+
+        return build
+
+    def is_copy_supported(self, session) -> bool:
+        '''
+        the rows of the bulk load are copied by COPY FROM STDIN of the driver if it is True (bulk_load_copies),
+        and the CSV of the export by COPY TO STDOUT (get_export_copy)
+        '''
+        return False
+
+    def get_export_copy(self, stmt: BinaryExpression, params: dict) -> CopyQuery:
         raise NotImplementedError
 
+    def get_conflict_list(self, *,
+                          unique_fields: List[str],
+                          update_columns: Optional[List[str]]) -> Optional[List[str]]:
+        unique_columns = clean_input_fields(model=self.model_columns, param=unique_fields or [])
+        return unique_columns if update_columns else None
+
+    def bulk_load_statements(self, rows: List[dict], *,
+                             unique_fields: List[str],
+                             update_columns: Optional[List[str]] = None) -> Iterator[BinaryExpression]:
+        '''
+        the multiple VALUES INSERT statements of the rows of the bulk load (upsert_statement),
+        the columns of update_columns are updated on the conflict of the unique columns if it is set.
+        the rows are deduplicated, chunked and grouped by the columns as upsert does, the rows are not returned
+        '''
+        conflict_list = self.get_conflict_list(unique_fields=unique_fields, update_columns=update_columns)
+        if conflict_list:
+            rows = deduplicate_rows(rows, conflict_list)
+        for columns, rows_ in group_rows(rows):
+            chunk_size = max(1, min(self.bulk_chunk_size, MAX_BIND_PARAMS // len(columns))) if columns else 1
+            for index in range(0, len(rows_), chunk_size):
+                yield self.upsert_statement(rows_[index:index + chunk_size],
+                                            conflict_list=conflict_list,
+                                            update_columns=update_columns)
+
     def insert_one(self, *,
                    insert_args) -> BinaryExpression:
         insert_args = insert_args
@@ -128,10 +616,47 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
         inserted_instance = self.model(**update_columns)
         return inserted_instance
 
+    # the NULLs are before the values in the ascending order of the database if it is True (SQLite, MySQL),
+    # else after them (PostgreSQL), the seek predicate of cursor pagination follows it
+    nulls_first = False
+
+    # the database aggregates the rows of the join_foreign_table into json arrays if it is True,
+    # the query service defines json_array_aggregate(columns) then, e.g. json_agg(json_build_object())
+    json_aggregate_supported = False
+
+    @staticmethod
+    def json_object_arguments(columns: List[Tuple[str, BinaryExpression]]) -> list:
+        arguments = []
+        for name, column in columns:
+            arguments += [literal_column("'{}'".format(name.replace("'", "''"))), column]
+        return arguments
+
+    @staticmethod
+    def get_join_chain(local_reference_pairs_set):
+        '''
+        the join of the tables of the relationship and the predicate that correlates it with the local table
+        '''
+        first_reference = local_reference_pairs_set[0]
+        local_column = getattr(first_reference['local_table_columns'], first_reference['local']['local_column'])
+        reference_column = getattr(first_reference['reference_table_columns'],
+                                   first_reference['reference']['reference_column'])
+        from_ = first_reference['reference_table']
+        for local_reference in local_reference_pairs_set[1:]:
+            from_ = from_.join(local_reference['reference_table'],
+                               getattr(local_reference['local_table_columns'],
+                                       local_reference['local']['local_column']) ==
+                               getattr(local_reference['reference_table_columns'],
+                                       local_reference['reference']['reference_column']))
+        return from_, local_column == reference_column
+
     def get_join_select_fields(self, join_mode=None):
         join_table_instance_list = []
         if not join_mode:
             return join_table_instance_list
+        if self.join_strategy == JoinStrategy.aggregate:
+            return self.get_join_aggregate_fields(join_mode)
+        if self.join_strategy == JoinStrategy.select_in:
+            return join_table_instance_list
         for _, table_instance in join_mode.items():
             for local_reference in table_instance['local_reference_pairs_set']:
                 if 'exclude' in local_reference and local_reference['exclude']:
@@ -142,9 +667,70 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
                         column.label(foreign_table_name + '_foreign_____' + str(column).split('.')[1]))
         return join_table_instance_list
 
+    def get_join_aggregate_fields(self, join_mode):
+        '''
+        a correlated subquery for each join table, it aggregates the rows of the join table into a json array,
+        so one row is selected for each row of the main table
+        '''
+        join_table_instance_list = []
+        for _, table_instance in join_mode.items():
+            local_reference_pairs_set = table_instance['local_reference_pairs_set']
+            from_, correlation = self.get_join_chain(local_reference_pairs_set)
+            for local_reference in local_reference_pairs_set:
+                if 'exclude' in local_reference and local_reference['exclude']:
+                    continue
+                foreign_table_name = local_reference['reference']['reference_table']
+                aggregate = self.json_array_aggregate([(str(column).split('.')[1], column)
+                                                       for column in local_reference['reference_table_columns']])
+                subquery = select(aggregate).select_from(from_).where(correlation).scalar_subquery()
+                join_table_instance_list.append(type_coerce(subquery, JSON).label(foreign_table_name + '_foreign'))
+        return join_table_instance_list
+
+    def get_select_in_statements(self, *, join_mode, rows) -> Iterator[Tuple[str, str, BinaryExpression, dict]]:
+        '''
+        the WHERE IN statements of the rows of the join tables of the selected rows of the main table,
+        the keys of the rows are selected in chunks of at most bulk_chunk_size keys.
+        it is an iterator of (the field of the join table, the key column of the main table, statement, bind params)
+        '''
+        for join_table, table_instance in join_mode.items():
+            local_reference_pairs_set = table_instance['local_reference_pairs_set']
+            first_reference = local_reference_pairs_set[0]
+            local_key = first_reference['local']['local_column']
+            reference_column = getattr(first_reference['reference_table_columns'],
+                                       first_reference['reference']['reference_column'])
+            keys = list(dict.fromkeys(row._mapping[local_key] for row in rows
+                                      if row._mapping[local_key] is not None))
+            if not keys:
+                continue
+            from_, _ = self.get_join_chain(local_reference_pairs_set)
+            for local_reference in local_reference_pairs_set:
+                if 'exclude' in local_reference and local_reference['exclude']:
+                    continue
+                foreign_table_name = local_reference['reference']['reference_table']
+
+                def statement_builder():
+                    return select(reference_column.label(SELECT_IN_KEY_LABEL),
+                                  *local_reference['reference_table_columns']).select_from(from_).where(
+                        reference_column.in_(bindparam('select_in_keys', expanding=True)))
+
+                cache_key = ('select_in',
+                             first_reference['local']['local_table'],
+                             join_table,
+                             foreign_table_name)
+                stmt = self.get_cached_statement(cache_key, statement_builder)
+                for index in range(0, len(keys), self.bulk_chunk_size):
+                    yield foreign_table_name + '_foreign', local_key, stmt, \
+                          {'select_in_keys': keys[index:index + self.bulk_chunk_size]}
+
     def get_join_by_excpression(self, stmt: BinaryExpression, join_mode=None) -> BinaryExpression:
         if not join_mode:
             return stmt
+        if self.join_strategy in (JoinStrategy.aggregate, JoinStrategy.select_in):
+            # keep the rows which have the join table rows only, the same as the inner join
+            for _, data in join_mode.items():
+                from_, correlation = self.get_join_chain(data['local_reference_pairs_set'])
+                stmt = stmt.where(exists(select(literal_column('1')).select_from(from_).where(correlation)))
+            return stmt
         for join_table, data in join_mode.items():
             for local_reference in data['local_reference_pairs_set']:
                 local = local_reference['local']['local_column']
@@ -170,45 +756,236 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
     #     delete_instance = session.query(self.model).where(and_(*filter_list))
     #     return delete_instance
 
+    def model_filter_list(self, *, filter_args: dict, extra_args: dict = None) -> List[BinaryExpression]:
+        filter_plan = self.get_filter_plan(self.model)
+        bind_params = {}
+        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
+                                                                 model=self.model_columns,
+                                                                 filter_plan=filter_plan,
+                                                                 bind_params=bind_params)
+        if extra_args:
+            filter_list += find_query_builder(param=extra_args,
+                                              model=self.model_columns,
+                                              filter_plan=filter_plan,
+                                              bind_params=bind_params)
+        return filter_list
+
+    def model_filter_values(self, *, filter_args: dict, extra_args: dict = None) -> dict:
+        filter_plan = self.get_filter_plan(self.model)
+        params = find_query_values(filter_args, self.model_columns, {}, filter_plan)
+        if extra_args:
+            find_query_values(extra_args, self.model_columns, params, filter_plan)
+        return params
+
     def model_query(self,
                     *,
                     session,
                     extra_args: dict = None,
                     filter_args: dict = None,
-                    ) -> BinaryExpression:
+                    ) -> Tuple[BinaryExpression, dict]:
 
         '''
         used for delette and update
         '''
 
-        filter_list: List[BinaryExpression] = find_query_builder(param=filter_args,
-                                                                 model=self.model_columns)
-        if extra_args:
-            filter_list += find_query_builder(param=extra_args,
-                                              model=self.model_columns)
-        stmt = select(self.model).where(and_(*filter_list))
-        return stmt
+        def statement_builder():
+            filter_list = self.model_filter_list(filter_args=filter_args, extra_args=extra_args)
+            return select(self.model).where(and_(*filter_list))
+
+        cache_key = ('model_query',
+                     query_shape(filter_args),
+                     query_shape(extra_args))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+        return stmt, self.model_filter_values(filter_args=filter_args, extra_args=extra_args)
+
+    def is_returning_supported(self, session, statement_type: str) -> bool:
+        '''
+        :param statement_type: insert, update or delete
+
+        the {statement_type}_returning flags of the dialect are set by SQLAlchemy 2.0 (for SQLite 3.35+ as well),
+        SQLAlchemy 1.4 only has full_returning (PostgreSQL and MSSQL), the SQLite compiler of it can't render RETURNING
+        '''
+        bind = session.bind
+        if bind is None:
+            bind = getattr(session, 'sync_session', session).get_bind()
+        dialect = bind.dialect
+        return getattr(dialect, f'{statement_type}_returning', getattr(dialect, 'full_returning', False))
+
+    def is_update_returning_supported(self, session, *, update_args: dict) -> bool:
+        return bool(clean_input_fields(update_args, self.model_columns)) and \
+               self.is_returning_supported(session, 'update')
+
+    def update_returning(self,
+                         *,
+                         update_args: dict,
+                         filter_args: dict,
+                         extra_args: dict = None,
+                         ) -> Tuple[BinaryExpression, dict]:
+
+        '''
+        one UPDATE ... WHERE ... RETURNING statement for the update many apis,
+        instead of loading and updating the matched rows one by one in the session
+        '''
+
+        update_columns = clean_input_fields(update_args, self.model_columns)
+        table = self.model.__table__
+
+        def statement_builder():
+            filter_list = self.model_filter_list(filter_args=filter_args, extra_args=extra_args)
+            values = {column_name: bindparam(f'update_{column_name}', type_=table.c[column_name].type)
+                      for column_name in update_columns}
+            return update(table).where(and_(*filter_list)).values(values).returning(*table.c)
+
+        cache_key = ('update_returning',
+                     query_shape(filter_args),
+                     query_shape(extra_args),
+                     tuple(update_columns))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+
+        params = self.model_filter_values(filter_args=filter_args, extra_args=extra_args)
+        for column_name, value in update_columns.items():
+            params[f'update_{column_name}'] = value
+        return stmt, params
+
+    def is_bulk_delete_supported(self) -> bool:
+        '''
+        the rows are deleted by the Core DELETE statement, unless the relationship of the model
+        has the delete cascade which is handled by the session
+        '''
+        if self.orm_delete_cascade is None:
+            self.orm_delete_cascade = any(relationship.cascade.delete
+                                          for relationship in inspect(self.model).relationships)
+        return not self.orm_delete_cascade
+
+    def delete_returning(self,
+                         *,
+                         filter_args: dict,
+                         extra_args: dict = None,
+                         ) -> Tuple[BinaryExpression, dict]:
+
+        '''
+        one DELETE ... WHERE ... RETURNING statement for the delete apis
+        '''
+
+        table = self.model.__table__
+
+        def statement_builder():
+            filter_list = self.model_filter_list(filter_args=filter_args, extra_args=extra_args)
+            return delete(table).where(and_(*filter_list)).returning(*table.c)
+
+        cache_key = ('delete_returning',
+                     query_shape(filter_args),
+                     query_shape(extra_args))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+        return stmt, self.model_filter_values(filter_args=filter_args, extra_args=extra_args)
+
+    def delete_select(self,
+                      *,
+                      filter_args: dict,
+                      extra_args: dict = None,
+                      ) -> Tuple[BinaryExpression, dict]:
+
+        '''
+        select the rows to be deleted without loading them into the session,
+        used with delete_rows if the dialect does not support DELETE ... RETURNING
+        '''
+
+        table = self.model.__table__
+
+        def statement_builder():
+            filter_list = self.model_filter_list(filter_args=filter_args, extra_args=extra_args)
+            return select(table).where(and_(*filter_list))
+
+        cache_key = ('delete_select',
+                     query_shape(filter_args),
+                     query_shape(extra_args))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+        return stmt, self.model_filter_values(filter_args=filter_args, extra_args=extra_args)
+
+    def delete_rows(self,
+                    *,
+                    rows: list,
+                    filter_args: dict,
+                    extra_args: dict = None,
+                    ) -> Iterator[Tuple[BinaryExpression, dict]]:
+
+        '''
+        the DELETE statements of the rows selected by delete_select,
+        by the primary key in chunks of bulk_chunk_size, or by the filters if the table has no primary key
+        '''
+
+        if not rows:
+            return
+        table = self.model.__table__
+        primary_key_columns = list(table.primary_key.columns)
+        if not primary_key_columns:
+            filter_list = self.model_filter_list(filter_args=filter_args, extra_args=extra_args)
+            yield delete(table).where(and_(*filter_list)), \
+                  self.model_filter_values(filter_args=filter_args, extra_args=extra_args)
+            return
+
+        def statement_builder():
+            if len(primary_key_columns) == 1:
+                primary_key_column, = primary_key_columns
+                return delete(table).where(primary_key_column.in_(bindparam('primary_key', expanding=True)))
+            return delete(table).where(tuple_(*primary_key_columns).in_(bindparam('primary_key', expanding=True)))
+
+        stmt = self.get_cached_statement(('delete_rows',), statement_builder)
+        if len(primary_key_columns) == 1:
+            primary_key_values = [row._mapping[primary_key_columns[0]] for row in rows]
+        else:
+            primary_key_values = [tuple(row._mapping[column] for column in primary_key_columns) for row in rows]
+        for index in range(0, len(primary_key_values), self.bulk_chunk_size):
+            yield stmt, {'primary_key': primary_key_values[index:index + self.bulk_chunk_size]}
 
     def get_one_with_foreign_pk(self, *,
                                  join_mode,
                                  query,
                                  target_model,
                                  abstract_param=None
-                                 ) -> BinaryExpression:
+                                 ) -> Tuple[BinaryExpression, dict]:
         model = self.foreign_table_mapping[target_model]
-        filter_list: List[BinaryExpression] = find_query_builder(param=query,
-                                                                 model=model)
-        path_filter_list: List[BinaryExpression] = path_query_builder(params=abstract_param,
-                                                                      model=self.foreign_table_mapping)
-        join_table_instance_list: list = self.get_join_select_fields(join_mode)
+        filter_plan = self.get_filter_plan(model)
 
-        if not isinstance(self.model, Table):
-            model = model.__table__
+        def statement_builder():
+            bind_params = {}
+            filter_list: List[BinaryExpression] = find_query_builder(param=query,
+                                                                     model=model,
+                                                                     filter_plan=filter_plan,
+                                                                     bind_params=bind_params)
+            path_filter_list: List[BinaryExpression] = path_query_builder(params=abstract_param,
+                                                                          model=self.foreign_table_mapping,
+                                                                          bind_params=bind_params)
+            join_table_instance_list: list = self.get_join_select_fields(join_mode)
+            table = model
+            if not isinstance(self.model, Table):
+                table = model.__table__
 
-        stmt = select(*[model] + join_table_instance_list).filter(and_(*filter_list + path_filter_list))
+            stmt = select(*[table] + join_table_instance_list).filter(and_(*filter_list + path_filter_list))
 
-        stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
-        return stmt
+            stmt = self.get_join_by_excpression(stmt, join_mode=join_mode)
+            return stmt
+
+        cache_key = ('get_one_with_foreign_pk',
+                     target_model,
+                     query_shape(query),
+                     query_shape(abstract_param),
+                     tuple(join_mode or ()))
+        stmt = self.get_cached_statement(cache_key, statement_builder)
+
+        params = find_query_values(query, model, {}, filter_plan)
+        path_query_values(abstract_param, params)
+        return stmt, params
+
+    def warm_up(self, *, request_query_model, queries: List[dict], target_model=None) -> None:
+        '''
+        build the get_many statement templates of the given example queries in advance,
+        the example query is the query params of the request, the params which are not set use the default value
+        '''
+        for query in queries:
+            query = request_query_model(**fill_query_default(request_query_model, query)).__dict__
+            query.pop('join_foreign_table', None)
+            self.get_many(query=query, join_mode=None, target_model=target_model)
 
 
     # def update(self, *,
@@ -230,8 +1007,10 @@ class SQLAlchemyGeneralSQLQueryService(ABC):
 
 
 class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
+    json_aggregate_supported = True
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
 
         """
         :param model: declarative_base model
@@ -240,125 +1019,221 @@ class SQLAlchemyPGSQLQueryService(SQLAlchemyGeneralSQLQueryService):
         super(SQLAlchemyPGSQLQueryService,
               self).__init__(model=model,
                              async_mode=async_mode,
-                             foreign_table_mapping=foreign_table_mapping)
+                             foreign_table_mapping=foreign_table_mapping,
+                             statement_cache=statement_cache,
+                             bulk_chunk_size=bulk_chunk_size,
+                             total_count_ttl=total_count_ttl,
+                             join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
 
-    def upsert(self, *,
-               insert_arg,
-               unique_fields: List[str],
-               upsert_one=True,
-               ) -> BinaryExpression:
-        insert_arg_dict: Union[list, dict] = insert_arg
+    def json_array_aggregate(self, columns: List[Tuple[str, BinaryExpression]]):
+        return func.json_agg(func.json_build_object(*self.json_object_arguments(columns)))
 
-        insert_with_conflict_handle = insert_arg_dict.pop('on_conflict', None)
-        if not upsert_one:
-            insert_arg_list: list = insert_arg_dict.pop('insert', None)
-            insert_arg_dict = []
-            for i in insert_arg_list:
-                insert_arg_dict.append(i.__dict__)
+    def get_estimated_count_statement(self, **kwargs) -> Optional[Tuple[BinaryExpression, dict]]:
+        '''
+        EXPLAIN the select of the matched rows, the planner row estimate is the estimated count
+        '''
+        select_stmt, params, _ = self.get_count_select(**kwargs)
+        compiled = select_stmt.params(params).compile(dialect=postgresql.dialect(paramstyle='named'),
+                                                      compile_kwargs={'render_postcompile': True})
+        return text(f'EXPLAIN (FORMAT JSON) {compiled}'), compiled.params
 
-        if not isinstance(insert_arg_dict, list):
-            insert_arg_dict: list[dict] = [insert_arg_dict]
-        insert_arg_dict: list[dict] = [clean_input_fields(model=self.model_columns, param=insert_arg)
-                                       for insert_arg in insert_arg_dict]
-        insert_stmt = insert(self.model).values(insert_arg_dict)
-
-        if unique_fields and insert_with_conflict_handle:
-            update_columns = clean_input_fields(insert_with_conflict_handle.__dict__.get('update_columns', None),
-                                                self.model_columns)
-            if not update_columns:
-                raise UpdateColumnEmptyException('update_columns parameter must be a non-empty list ')
-            conflict_update_dict = {}
-            for columns in update_columns:
-                conflict_update_dict[columns] = getattr(insert_stmt.excluded, columns)
-
-            conflict_list = clean_input_fields(model=self.model_columns, param=unique_fields)
-            conflict_update_dict = clean_input_fields(model=self.model_columns, param=conflict_update_dict)
-            insert_stmt = insert_stmt.on_conflict_do_update(index_elements=conflict_list,
-                                                            set_=conflict_update_dict
-                                                            )
-        insert_stmt = insert_stmt.returning(text('*'))
-        return insert_stmt
+    @staticmethod
+    def parse_estimated_count(value) -> Optional[int]:
+        if isinstance(value, str):
+            value = json.loads(value)
+        return int(value[0]['Plan']['Plan Rows'])
+
+    def is_copy_supported(self, session) -> bool:
+        bind = session.bind
+        if bind is None:
+            bind = getattr(session, 'sync_session', session).get_bind()
+        return bind.dialect.driver in COPY_DRIVERS
+
+    def get_export_copy(self, stmt: BinaryExpression, params: dict) -> CopyQuery:
+        compiled = stmt.params(params).compile(dialect=postgresql.dialect(paramstyle='format'),
+                                               compile_kwargs={'render_postcompile': True})
+        return CopyQuery(select=compiled.string, args=[compiled.params[i] for i in compiled.positiontup])
+
+    def bulk_load_copies(self, rows: List[dict], *,
+                         unique_fields: List[str],
+                         update_columns: Optional[List[str]] = None) -> Iterator[Union[CopyRows, BinaryExpression]]:
+        '''
+        the COPY (CopyRows) and the statements of the rows of the bulk load, in the order of them.
+
+        the rows are copied into the table, or into a staging table, then merged into the table by
+        INSERT ... SELECT ... ON CONFLICT DO UPDATE if update_columns is set,
+        the last one of the rows with the same values of the conflict columns wins
+        '''
+        table = self.model.__table__
+        conflict_list = self.get_conflict_list(unique_fields=unique_fields, update_columns=update_columns)
+        json_columns = [i.name for i in table.c if isinstance(i.type, JSON)]
+        preparer = postgresql.dialect().identifier_preparer
+        for columns, rows_ in group_rows(rows):
+            if not columns:
+                # COPY needs a column, the rows of the default values are inserted
+                for _ in rows_:
+                    yield insert(table)
+                continue
+            if not conflict_list or not set(conflict_list) <= set(columns):
+                # the rows without the conflict columns are not conflicted on them
+                yield CopyRows(table_name=table.name, schema_name=table.schema, columns=columns, rows=rows_,
+                               json_columns=json_columns)
+                continue
+            staging_name = f'bulk_load_{uuid.uuid4().hex}'
+            staging = preparer.quote(staging_name)
+            column_list = ', '.join(preparer.quote(i) for i in columns)
+            yield text(f'CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS '
+                       f'SELECT {column_list} FROM {preparer.format_table(table)} WITH NO DATA')
+            yield CopyRows(table_name=staging_name, schema_name=None, columns=columns, rows=rows_,
+                           json_columns=json_columns)
+            conflict_columns = ', '.join(preparer.quote(i) for i in conflict_list)
+            # the rows of the NULL conflict columns are not conflicted, they are kept as deduplicate_rows does
+            null_conflict = ''.join(f' OR {preparer.quote(i)} IS NULL' for i in conflict_list)
+            update = ', '.join(f'{preparer.quote(i)} = excluded.{preparer.quote(i)}' for i in update_columns)
+            yield text(f'INSERT INTO {preparer.format_table(table)} ({column_list}) '
+                       f'SELECT {column_list} FROM ('
+                       f'SELECT {column_list}, row_number() OVER (PARTITION BY {conflict_columns} '
+                       f'ORDER BY ctid DESC) AS bulk_load_row_number FROM {staging}) AS {staging} '
+                       f'WHERE bulk_load_row_number = 1{null_conflict} '
+                       f'ON CONFLICT ({conflict_columns}) DO UPDATE SET {update}')
+            yield text(f'DROP TABLE {staging}')
+
+    def upsert_statement(self, rows: List[dict], *, conflict_list: Optional[List[str]], update_columns):
+        table = self.model.__table__
+        if not rows[0]:
+            return pg_insert(table)
+        stmt = pg_insert(table).values(rows)
+        if conflict_list:
+            stmt = stmt.on_conflict_do_update(index_elements=conflict_list,
+                                              set_={i: getattr(stmt.excluded, i) for i in update_columns})
+        return stmt
 
 
 class SQLAlchemySQLITEQueryService(SQLAlchemyGeneralSQLQueryService):
+    json_aggregate_supported = True
+    nulls_first = True
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         statement_cache=statement_cache,
+                         bulk_chunk_size=bulk_chunk_size,
+                         total_count_ttl=total_count_ttl,
+                         join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
 
-    def upsert(self, *,
-               insert_arg,
-               unique_fields: List[str],
-               upsert_one=True,
-               ) -> BinaryExpression:
-        raise NotImplementedError
+    def json_array_aggregate(self, columns: List[Tuple[str, BinaryExpression]]):
+        return func.json_group_array(func.json_object(*self.json_object_arguments(columns)))
 
+    def get_estimated_count_statement(self, *, target_model=None, **kwargs) -> Optional[Tuple[BinaryExpression, dict]]:
+        '''
+        the row count of the table in sqlite_stat1 (collected by ANALYZE), it is the count of the whole table,
+        so the exact count is used if the rows are filtered
+        '''
+        _, params, _ = self.get_count_select(target_model=target_model, **kwargs)
+        if params or kwargs.get('join_mode', None):
+            return None
+        model = self.model
+        if target_model:
+            model = self.foreign_table_mapping[target_model]
+        table = model if isinstance(model, Table) else model.__table__
+        return text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table_name LIMIT 1'), {'table_name': table.name}
 
-class SQLAlchemyMySQLQueryService(SQLAlchemyGeneralSQLQueryService):
+    @staticmethod
+    def parse_estimated_count(value) -> Optional[int]:
+        if not value:
+            return None
+        return int(value.split()[0])
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
-        """
-        :param model: declarative_base model
-        :param async_mode: bool
-        """
-        super().__init__(model=model,
-                         async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
-        self.model = model
-        self.model_columns = model
-        self.async_mode = async_mode
+    def upsert_statement(self, rows: List[dict], *, conflict_list: Optional[List[str]], update_columns):
+        table = self.model.__table__
+        if not rows[0]:
+            # ON CONFLICT can't follow DEFAULT VALUES, the row has no unique column to conflict on
+            return sqlite_insert(table)
+        stmt = sqlite_insert(table).values(rows)
+        if conflict_list:
+            stmt = stmt.on_conflict_do_update(index_elements=conflict_list,
+                                              set_={i: getattr(stmt.excluded, i) for i in update_columns})
+        return stmt
 
-    def upsert(self, *,
-               insert_arg,
-               unique_fields: List[str],
-               upsert_one=True,
-               ) -> BinaryExpression:
-        raise NotImplementedError
+    def last_inserted_condition(self, table) -> BinaryExpression:
+        return literal_column('rowid') == func.last_insert_rowid()
 
 
-class SQLAlchemyMariaDBQueryService(SQLAlchemyGeneralSQLQueryService):
+class SQLAlchemyMySQLQueryService(SQLAlchemyGeneralSQLQueryService):
+    nulls_first = True
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         statement_cache=statement_cache,
+                         bulk_chunk_size=bulk_chunk_size,
+                         total_count_ttl=total_count_ttl,
+                         join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
 
-    def upsert(self, *,
-               insert_arg,
-               unique_fields: List[str],
-               upsert_one=True,
-               ) -> BinaryExpression:
-        raise NotImplementedError
+    def upsert_statement(self, rows: List[dict], *, conflict_list: Optional[List[str]], update_columns):
+        table = self.model.__table__
+        if not rows[0]:
+            return mysql_insert(table)
+        stmt = mysql_insert(table).values(rows)
+        if conflict_list:
+            # ON DUPLICATE KEY UPDATE has no conflict target, the row is updated on the conflict of any unique key
+            stmt = stmt.on_duplicate_key_update({i: stmt.inserted[i] for i in update_columns})
+        return stmt
+
+    def last_inserted_condition(self, table) -> BinaryExpression:
+        '''
+        LAST_INSERT_ID() is the auto increment key of the row, the row of the table without a single column primary key
+        can't be selected, it is not in the response
+        '''
+        primary_key = list(table.primary_key.columns)
+        if len(primary_key) != 1:
+            return false()
+        primary_key, = primary_key
+        return primary_key == func.last_insert_id()
+
+
+class SQLAlchemyMariaDBQueryService(SQLAlchemyMySQLQueryService):
+    '''
+    the RETURNING of MariaDB 10.5+ is not rendered by SQLAlchemy 1.4, the rows are selected after the upsert as MySQL
+    '''
 
 
 class SQLAlchemyOracleQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         statement_cache=statement_cache,
+                         bulk_chunk_size=bulk_chunk_size,
+                         total_count_ttl=total_count_ttl,
+                         join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -372,15 +1247,21 @@ class SQLAlchemyOracleQueryService(SQLAlchemyGeneralSQLQueryService):
 
 
 class SQLAlchemyMSSqlQueryService(SQLAlchemyGeneralSQLQueryService):
+    nulls_first = True
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         statement_cache=statement_cache,
+                         bulk_chunk_size=bulk_chunk_size,
+                         total_count_ttl=total_count_ttl,
+                         join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
@@ -395,14 +1276,19 @@ class SQLAlchemyMSSqlQueryService(SQLAlchemyGeneralSQLQueryService):
 
 class SQLAlchemyNotSupportQueryService(SQLAlchemyGeneralSQLQueryService):
 
-    def __init__(self, *, model, async_mode, foreign_table_mapping):
+    def __init__(self, *, model, async_mode, foreign_table_mapping, statement_cache=None, bulk_chunk_size=1000,
+                 total_count_ttl=60, join_strategy=JoinStrategy.join):
         """
         :param model: declarative_base model
         :param async_mode: bool
         """
         super().__init__(model=model,
                          async_mode=async_mode,
-                         foreign_table_mapping=foreign_table_mapping)
+                         foreign_table_mapping=foreign_table_mapping,
+                         statement_cache=statement_cache,
+                         bulk_chunk_size=bulk_chunk_size,
+                         total_count_ttl=total_count_ttl,
+                         join_strategy=join_strategy)
         self.model = model
         self.model_columns = model
         self.async_mode = async_mode
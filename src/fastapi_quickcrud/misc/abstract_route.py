@@ -1,16 +1,293 @@
-from abc import abstractmethod, ABC
+from abc import ABC
 from http import HTTPStatus
-from typing import Union
+from typing import Union, Optional, List
 
 from fastapi import \
     Depends, \
+    Query, \
     Response
-from sqlalchemy.exc import IntegrityError
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from sqlalchemy import JSON, ARRAY
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from .bulk_load import BULK_LOAD_MEDIA_TYPES, CopyRows, RecordDecodeError, RecordDecoder, bulk_load_format
+from .exceptions import BulkLoadFormatException
+from .export import EXPORT_MEDIA_TYPES
+from .query_parser import QueryParserRoute, request_query_parser
+from .type import TotalCountMode, JoinStrategy, DataFormat
+from .utils import row_mapping_plan, SELECT_IN_KEY_LABEL
+
+
+def _cursor_query_param(cursor: Optional[str] = Query(None, description='the x-next-cursor header of the previous '
+                                                                         'page, offset is ignored if it is set')):
+    return cursor
+
+
+def _no_cursor_query_param():
+    return None
+
+
+def _export_format_query_param(export_format: DataFormat = Query(DataFormat.csv, alias='format',
+                                                                  description='the format of the exported rows')):
+    return export_format
+
+
+def _find_many_route(api, path, *, request_query_model, fast_query_parser, **kwargs):
+    """
+    the decorator of the find many route, the query of it is parsed by the query parser if fast_query_parser is set
+    """
+    if not fast_query_parser:
+        return api.get(path, **kwargs)
+
+    def decorator(endpoint):
+        endpoint.query_parser = request_query_parser(request_query_model)
+        api.add_api_route(path, endpoint, methods=['GET'], route_class_override=QueryParserRoute, **kwargs)
+        return endpoint
+
+    return decorator
+
+
+def _find_many_total_count_mode(total_count_mode, *, query_service, join_mode, cursor) -> TotalCountMode:
+    """
+    COUNT(*) OVER() counts the rows after the seek predicate of the cursor, and the joined rows of the join strategy,
+    the exact count of the parents is used instead of it
+    """
+    if total_count_mode != TotalCountMode.window:
+        return total_count_mode
+    if cursor is not None or (join_mode and query_service.join_strategy == JoinStrategy.join):
+        return TotalCountMode.exact
+    return total_count_mode
+
+
+def _total_count(session, *, query_service, execute_service, total_count_mode, **kwargs) -> Optional[int]:
+    """
+    the total count of the rows matched by the find many api, None if it is counted from the page
+    """
+    if total_count_mode not in (TotalCountMode.exact, TotalCountMode.estimated, TotalCountMode.cached):
+        return None
+    stmt, params, count_key = query_service.get_count_statement(**kwargs)
+    if total_count_mode == TotalCountMode.cached:
+        total_count = query_service.count_cache.get(count_key)
+        if total_count is not None:
+            return total_count
+    if total_count_mode == TotalCountMode.estimated:
+        estimated_stmt = query_service.get_estimated_count_statement(**kwargs)
+        if estimated_stmt is not None:
+            try:
+                # the failed probe (e.g. no permission of EXPLAIN) does not abort the transaction of the request
+                with session.begin_nested():
+                    query_result = execute_service.execute(session, *estimated_stmt)
+                total_count = query_service.parse_estimated_count(query_result.scalar())
+            except DBAPIError:
+                total_count = None
+            if total_count is not None:
+                return total_count
+    total_count = execute_service.execute(session, stmt, params).scalar()
+    if total_count_mode == TotalCountMode.cached:
+        query_service.count_cache.set(count_key, total_count)
+    return total_count
+
+
+async def _async_total_count(session, *, query_service, execute_service, total_count_mode,
+                             **kwargs) -> Optional[int]:
+    if total_count_mode not in (TotalCountMode.exact, TotalCountMode.estimated, TotalCountMode.cached):
+        return None
+    stmt, params, count_key = query_service.get_count_statement(**kwargs)
+    if total_count_mode == TotalCountMode.cached:
+        total_count = query_service.count_cache.get(count_key)
+        if total_count is not None:
+            return total_count
+    if total_count_mode == TotalCountMode.estimated:
+        estimated_stmt = query_service.get_estimated_count_statement(**kwargs)
+        if estimated_stmt is not None:
+            try:
+                async with session.begin_nested():
+                    query_result = await execute_service.async_execute(session, *estimated_stmt)
+                total_count = query_service.parse_estimated_count(query_result.scalar())
+            except DBAPIError:
+                total_count = None
+            if total_count is not None:
+                return total_count
+    query_result = await execute_service.async_execute(session, stmt, params)
+    total_count = query_result.scalar()
+    if total_count_mode == TotalCountMode.cached:
+        query_service.count_cache.set(count_key, total_count)
+    return total_count
+
+
+UNIQUE_VIOLATION_MESSAGES = ('unique constraint', 'duplicate entry')
+
+
+def _unique_conflict(e: IntegrityError, *, with_message: bool = False) -> Response:
+    """
+    the 409 response of the unique constraint violation, the other integrity errors are raised
+    """
+    # the args of the MySQL drivers are (error code, message)
+    *_, err_msg = e.orig.args
+    if not any(i in str(err_msg).lower() for i in UNIQUE_VIOLATION_MESSAGES):
+        raise e
+    if with_message:
+        return Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
+    return Response(status_code=HTTPStatus.CONFLICT)
+
+
+def _upsert(session, *, query_service, execute_service, **kwargs) -> List[dict]:
+    """
+    the rows upserted by the statements of the query service, the rows of each statement are selected after it
+    if RETURNING is not supported
+    """
+    upserted_data = []
+    returning = query_service.is_returning_supported(session, 'insert')
+    for upsert_stmt, select_stmt in query_service.upsert(returning=returning, **kwargs):
+        query_result = execute_service.execute(session, upsert_stmt)
+        if select_stmt is not None:
+            query_result = execute_service.execute(session, select_stmt)
+        upserted_data += [dict(i) for i in query_result.fetchall()]
+    return upserted_data
+
+
+async def _async_upsert(session, *, query_service, execute_service, **kwargs) -> List[dict]:
+    upserted_data = []
+    returning = query_service.is_returning_supported(session, 'insert')
+    for upsert_stmt, select_stmt in query_service.upsert(returning=returning, **kwargs):
+        query_result = await execute_service.async_execute(session, upsert_stmt)
+        if select_stmt is not None:
+            query_result = await execute_service.async_execute(session, select_stmt)
+        upserted_data += [dict(i) for i in query_result.fetchall()]
+    return upserted_data
+
+
+# the body of the bulk load is streamed, it is not a parameter of the endpoint
+BULK_LOAD_REQUEST_BODY = {
+    'requestBody': {
+        'required': True,
+        'content': {
+            'text/csv': {'schema': {'type': 'string',
+                                    'description': 'the header line of the columns, then a line per row'}},
+            'application/x-ndjson': {'schema': {'type': 'string',
+                                                'description': 'a json object per line, a line per row'}}}}}
+
+
+EXPORT_RESPONSES = {
+    200: {'description': 'the exported rows, the header line of the columns then a line per row in CSV, '
+                         'or a json object per line in NDJSON',
+          'content': {media_type: {'schema': {'type': 'string'}} for media_type in EXPORT_MEDIA_TYPES.values()}}}
+
+
+def _bulk_load(session, rows, *, query_service, execute_service, **kwargs) -> None:
+    """
+    load the rows by COPY if the driver of the session supports it, else by the multiple VALUES INSERT statements
+    """
+    if query_service.is_copy_supported(session):
+        for step in query_service.bulk_load_copies(rows, **kwargs):
+            if isinstance(step, CopyRows):
+                execute_service.copy(session, step)
+            else:
+                execute_service.execute(session, step)
+        return
+    for stmt in query_service.bulk_load_statements(rows, **kwargs):
+        execute_service.execute(session, stmt)
+
+
+async def _async_bulk_load(session, rows, *, query_service, execute_service, **kwargs) -> None:
+    if query_service.is_copy_supported(session):
+        for step in query_service.bulk_load_copies(rows, **kwargs):
+            if isinstance(step, CopyRows):
+                await execute_service.async_copy(session, step)
+            else:
+                await execute_service.async_execute(session, step)
+        return
+    for stmt in query_service.bulk_load_statements(rows, **kwargs):
+        await execute_service.async_execute(session, stmt)
+
+
+async def _load_records(request: Request, *, row_model, build_row, load, chunk_size, json_columns) -> int:
+    """
+    the records of the streamed body are validated by the row model one by one, and loaded in the chunks of
+    chunk_size rows, the body is not kept in the memory. the count of the loaded rows is returned
+    """
+    load_format = bulk_load_format(request.headers.get('content-type', None))
+    if load_format is None:
+        raise BulkLoadFormatException(status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                                      detail=f'the content type should be one of {", ".join(BULK_LOAD_MEDIA_TYPES)}')
+    decoder = RecordDecoder(load_format, json_columns=json_columns)
+
+    async def records():
+        async for data in request.stream():
+            for record in decoder.feed(data):
+                yield record
+        for record in decoder.close():
+            yield record
+
+    loaded = 0
+    rows = []
+    try:
+        async for record in records():
+            rows.append(build_row(row_model.parse_obj(record).dict()))
+            if len(rows) >= chunk_size:
+                await load(rows)
+                loaded += len(rows)
+                rows = []
+    except RecordDecodeError as e:
+        raise RequestValidationError([ErrorWrapper(e, loc=('body', e.index))])
+    except ValidationError as e:
+        raise RequestValidationError([ErrorWrapper(e, loc=('body', loaded + len(rows)))])
+    if rows:
+        await load(rows)
+        loaded += len(rows)
+    return loaded
+
+
+def _select_in_rows(foreign_rows: dict, field, local_key, query_result):
+    plan = row_mapping_plan(tuple(query_result.keys()))
+    rows_by_key = foreign_rows.setdefault(field, (local_key, {}))[1]
+    for row in query_result.fetchall():
+        row = plan(row)
+        rows_by_key.setdefault(row.pop(SELECT_IN_KEY_LABEL), []).append(row)
+
+
+def _select_in_loader(session, *, query_service, execute_service, join_mode):
+    """
+    the loader of the rows of the join tables of the selected rows of the main table,
+    None if the rows of the join tables are selected with the rows of the main table
+    """
+    if not join_mode or query_service.join_strategy != JoinStrategy.select_in:
+        return None
+
+    def load(rows) -> dict:
+        foreign_rows = {}
+        for field, local_key, stmt, params in query_service.get_select_in_statements(join_mode=join_mode, rows=rows):
+            _select_in_rows(foreign_rows, field, local_key, execute_service.execute(session, stmt, params))
+        return foreign_rows
+
+    return load
+
+
+def _async_select_in_loader(session, *, query_service, execute_service, join_mode):
+    if not join_mode or query_service.join_strategy != JoinStrategy.select_in:
+        return None
+
+    async def load(rows) -> dict:
+        foreign_rows = {}
+        for field, local_key, stmt, params in query_service.get_select_in_statements(join_mode=join_mode, rows=rows):
+            query_result = await execute_service.async_execute(session, stmt, params)
+            _select_in_rows(foreign_rows, field, local_key, query_result)
+        return foreign_rows
+
+    return load
 
 
 class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
     """ This route will support the SQL SQLAlchemy dialects. """
+    # the 409 response of the upsert apis has the message of the unique constraint violation
+    unique_conflict_with_message = False
+    # the BULK_LOAD api is only built for the route sources that load the rows
+    bulk_load_supported = True
 
     @classmethod
     def find_one(cls, api,
@@ -35,15 +312,21 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                        session=Depends(db_session)):
 
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_one(filter_args=query.__dict__,
-                                             extra_args=url_param.__dict__,
-                                             join_mode=join)
-                query_result = execute_service.execute(session, stmt)
+                select_in_loader = _select_in_loader(session,
+                                                     query_service=query_service,
+                                                     execute_service=execute_service,
+                                                     join_mode=join)
+                stmt, params = query_service.get_one(filter_args=query.__dict__,
+                                                     extra_args=url_param.__dict__,
+                                                     join_mode=join)
+                query_result = execute_service.execute(session, stmt, params)
                 response_result = parsing_service.find_one(response_model=response_model,
                                                            sql_execute_result=query_result,
                                                            fastapi_response=response,
+                                                           primary_keys=query_service.get_primary_keys(),
                                                            session=session,
-                                                           join_mode=join)
+                                                           join_mode=join,
+                                                           select_in_loader=select_in_loader)
                 return response_result
         else:
             @api.get(path, status_code=200, response_model=response_model, dependencies=dependencies)
@@ -54,16 +337,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                    session=Depends(db_session)):
 
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_one(filter_args=query.__dict__,
-                                             extra_args=url_param.__dict__,
-                                             join_mode=join)
-                query_result = await execute_service.async_execute(session, stmt)
+                select_in_loader = _async_select_in_loader(session,
+                                                           query_service=query_service,
+                                                           execute_service=execute_service,
+                                                           join_mode=join)
+                stmt, params = query_service.get_one(filter_args=query.__dict__,
+                                                     extra_args=url_param.__dict__,
+                                                     join_mode=join)
+                query_result = await execute_service.async_execute(session, stmt, params)
 
                 response_result = await parsing_service.async_find_one(response_model=response_model,
                                                                        sql_execute_result=query_result,
                                                                        fastapi_response=response,
+                                                                       primary_keys=query_service.get_primary_keys(),
                                                                        session=session,
-                                                                       join_mode=join)
+                                                                       join_mode=join,
+                                                                       select_in_loader=select_in_loader)
                 return response_result
 
     @classmethod
@@ -76,47 +365,129 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                   response_model,
                   dependencies,
                   request_query_model,
-                  db_session):
+                  db_session,
+                  cursor_pagination=False,
+                  stream_yield_per=1000,
+                  total_count_mode=TotalCountMode.page,
+                  fast_query_parser=False):
+        cursor_query_param = _cursor_query_param if cursor_pagination else _no_cursor_query_param
+        route = _find_many_route(api, path,
+                                 request_query_model=request_query_model,
+                                 fast_query_parser=fast_query_parser,
+                                 dependencies=dependencies,
+                                 response_model=response_model)
 
         if async_mode:
-            @api.get(path, dependencies=dependencies, response_model=response_model)
+            @route
             async def async_get_many(response: Response,
                                      request: Request,
                                      query=Depends(request_query_model),
+                                     cursor=Depends(cursor_query_param),
                                      session=Depends(
                                          db_session)
                                      ):
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join)
+                select_in_loader = _async_select_in_loader(session,
+                                                           query_service=query_service,
+                                                           execute_service=execute_service,
+                                                           join_mode=join)
+                stream = parsing_service.is_stream_request(request)
+                count_mode = _find_many_total_count_mode(total_count_mode,
+                                                         query_service=query_service,
+                                                         join_mode=join,
+                                                         cursor=cursor)
+                window_count = count_mode == TotalCountMode.window and not stream
+                total_count = await _async_total_count(session,
+                                                       query_service=query_service,
+                                                       execute_service=execute_service,
+                                                       total_count_mode=count_mode,
+                                                       join_mode=join,
+                                                       query=query.__dict__)
+                stmt, params, cursor_columns = query_service.get_many_statement(query=query.__dict__,
+                                                                                join_mode=join,
+                                                                                cursor_pagination=cursor_pagination,
+                                                                                cursor=cursor,
+                                                                                window_count=window_count)
+
+                if stream:
+                    query_result = await execute_service.async_stream(session, stmt, params)
+                    return await parsing_service.async_find_many_stream(response_model=response_model,
+                                                                        sql_execute_result=query_result,
+                                                                        yield_per=stream_yield_per,
+                                                                        join_mode=join,
+                                                                        select_in_loader=select_in_loader,
+                                                                        total_count=total_count,
+                                                                        session=session)
 
-                query_result = await execute_service.async_execute(session, stmt)
+                query_result = await execute_service.async_execute(session, stmt, params)
 
                 parsed_response = await parsing_service.async_find_many(response_model=response_model,
                                                                         sql_execute_result=query_result,
                                                                         fastapi_response=response,
+                                                                        primary_keys=query_service.get_primary_keys(),
                                                                         join_mode=join,
+                                                                        select_in_loader=select_in_loader,
+                                                                        cursor_columns=cursor_columns,
+                                                                        limit=params.get('limit', None),
+                                                                        total_count=total_count,
                                                                         session=session)
                 return parsed_response
         else:
-            @api.get(path, dependencies=dependencies, response_model=response_model)
+            @route
             def get_many(response: Response,
                          request: Request,
                          query=Depends(request_query_model),
+                         cursor=Depends(cursor_query_param),
                          session=Depends(
                              db_session)
                          ):
                 join = query.__dict__.pop('join_foreign_table', None)
+                select_in_loader = _select_in_loader(session,
+                                                     query_service=query_service,
+                                                     execute_service=execute_service,
+                                                     join_mode=join)
+                stream = parsing_service.is_stream_request(request)
+                count_mode = _find_many_total_count_mode(total_count_mode,
+                                                         query_service=query_service,
+                                                         join_mode=join,
+                                                         cursor=cursor)
+                window_count = count_mode == TotalCountMode.window and not stream
+                total_count = _total_count(session,
+                                           query_service=query_service,
+                                           execute_service=execute_service,
+                                           total_count_mode=count_mode,
+                                           join_mode=join,
+                                           query=query.__dict__)
+
+                stmt, params, cursor_columns = query_service.get_many_statement(query=query.__dict__,
+                                                                                join_mode=join,
+                                                                                cursor_pagination=cursor_pagination,
+                                                                                cursor=cursor,
+                                                                                window_count=window_count)
+                if stream:
+                    query_result = execute_service.stream(session, stmt, params)
+                    return parsing_service.find_many_stream(response_model=response_model,
+                                                            sql_execute_result=query_result,
+                                                            yield_per=stream_yield_per,
+                                                            join_mode=join,
+                                                            select_in_loader=select_in_loader,
+                                                            total_count=total_count,
+                                                            session=session)
 
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join)
-                query_result = execute_service.execute(session, stmt)
+                query_result = execute_service.execute(session, stmt, params)
                 parsed_response = parsing_service.find_many(response_model=response_model,
                                                             sql_execute_result=query_result,
                                                             fastapi_response=response,
+                                                            primary_keys=query_service.get_primary_keys(),
                                                             join_mode=join,
+                                                            select_in_loader=select_in_loader,
+                                                            cursor_columns=cursor_columns,
+                                                            limit=params.get('limit', None),
+                                                            total_count=total_count,
                                                             session=session)
                 return parsed_response
 
-    @abstractmethod
+    @classmethod
     def upsert_one(cls, api, *,
                    path,
                    query_service,
@@ -128,9 +499,50 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                    dependencies,
                    db_session,
                    unique_list):
-        raise NotImplementedError
+        if async_mode:
+
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            async def async_insert_one_and_support_upsert(
+                    response: Response,
+                    request: Request,
+                    query: request_body_model = Depends(request_body_model),
+                    session=Depends(db_session)
+            ):
+                try:
+                    upserted_data = await _async_upsert(session,
+                                                        query_service=query_service,
+                                                        execute_service=execute_service,
+                                                        insert_arg=query.__dict__,
+                                                        unique_fields=unique_list)
+                except IntegrityError as e:
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return await parsing_service.async_upsert_one(response_model=response_model,
+                                                              sql_execute_result=upserted_data,
+                                                              fastapi_response=response,
+                                                              session=session)
+        else:
 
-    @abstractmethod
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            def insert_one_and_support_upsert(
+                    response: Response,
+                    request: Request,
+                    query: request_body_model = Depends(request_body_model),
+                    session=Depends(db_session)
+            ):
+                try:
+                    upserted_data = _upsert(session,
+                                            query_service=query_service,
+                                            execute_service=execute_service,
+                                            insert_arg=query.__dict__,
+                                            unique_fields=unique_list)
+                except IntegrityError as e:
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return parsing_service.upsert_one(response_model=response_model,
+                                                  sql_execute_result=upserted_data,
+                                                  fastapi_response=response,
+                                                  session=session)
+
+    @classmethod
     def upsert_many(cls, api, *,
                     query_service,
                     parsing_service,
@@ -143,7 +555,52 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     unique_list,
                     execute_service):
 
-        raise NotImplementedError
+        if async_mode:
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            async def async_insert_many_and_support_upsert(
+                    response: Response,
+                    request: Request,
+                    query: request_body_model = Depends(request_body_model),
+                    session=Depends(db_session)
+            ):
+                try:
+                    upserted_data = await _async_upsert(session,
+                                                        query_service=query_service,
+                                                        execute_service=execute_service,
+                                                        insert_arg=query.__dict__,
+                                                        unique_fields=unique_list,
+                                                        upsert_one=False)
+                except IntegrityError as e:
+                    # the chunks upserted before the conflict are not kept
+                    await execute_service.async_rollback(session)
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return await parsing_service.async_upsert_many(response_model=response_model,
+                                                               sql_execute_result=upserted_data,
+                                                               fastapi_response=response,
+                                                               session=session)
+        else:
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
+            def insert_many_and_support_upsert(
+                    response: Response,
+                    request: Request,
+                    query: request_body_model = Depends(request_body_model),
+                    session=Depends(db_session)
+            ):
+                try:
+                    upserted_data = _upsert(session,
+                                            query_service=query_service,
+                                            execute_service=execute_service,
+                                            insert_arg=query.__dict__,
+                                            unique_fields=unique_list,
+                                            upsert_one=False)
+                except IntegrityError as e:
+                    # the chunks upserted before the conflict are not kept
+                    execute_service.rollback(session)
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return parsing_service.upsert_many(response_model=response_model,
+                                                   sql_execute_result=upserted_data,
+                                                   fastapi_response=response,
+                                                   session=session)
 
     @classmethod
     def create_one(cls, api, *,
@@ -173,11 +630,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
                 return await parsing_service.async_create_one(response_model=response_model,
                                                               sql_execute_result=new_inserted_data,
                                                               fastapi_response=response,
@@ -199,11 +652,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
                 return parsing_service.create_one(response_model=response_model,
                                                   sql_execute_result=new_inserted_data,
                                                   fastapi_response=response,
@@ -230,6 +679,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
+                if query_service.is_returning_supported(session, 'insert'):
+                    inserted_data = []
+                    try:
+                        for insert_stmt in query_service.create_returning(insert_arg=query.__dict__,
+                                                                          create_one=False):
+                            query_result = await execute_service.async_execute(session, insert_stmt)
+                            inserted_data += [dict(i) for i in query_result.fetchall()]
+                    except IntegrityError as e:
+                        # the chunks inserted before the conflict are not kept
+                        await execute_service.async_rollback(session)
+                        return _unique_conflict(e)
+                    return await parsing_service.async_create_many(response_model=response_model,
+                                                                   sql_execute_result=inserted_data,
+                                                                   fastapi_response=response,
+                                                                   session=session)
+
                 inserted_data = query_service.create(insert_arg=query.__dict__,
                                                      create_one=False)
 
@@ -238,11 +703,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
                 return await parsing_service.async_create_many(response_model=response_model,
                                                                sql_execute_result=inserted_data,
                                                                fastapi_response=response,
@@ -256,6 +717,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session)
             ):
 
+                if query_service.is_returning_supported(session, 'insert'):
+                    inserted_data = []
+                    try:
+                        for insert_stmt in query_service.create_returning(insert_arg=query.__dict__,
+                                                                          create_one=False):
+                            query_result = execute_service.execute(session, insert_stmt)
+                            inserted_data += [dict(i) for i in query_result.fetchall()]
+                    except IntegrityError as e:
+                        # the chunks inserted before the conflict are not kept
+                        execute_service.rollback(session)
+                        return _unique_conflict(e)
+                    return parsing_service.create_many(response_model=response_model,
+                                                       sql_execute_result=inserted_data,
+                                                       fastapi_response=response,
+                                                       session=session)
+
                 # inserted_data = query.__dict__['insert']
                 update_list = query.__dict__
                 inserted_data = query_service.create(insert_arg=update_list,
@@ -266,16 +743,179 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
                 return parsing_service.create_many(response_model=response_model,
                                                    sql_execute_result=inserted_data,
                                                    fastapi_response=response,
                                                    session=session)
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  path,
+                  response_model,
+                  dependencies,
+                  request_query_model,
+                  request_body_model,
+                  db_session,
+                  unique_list):
+        '''
+        the rows of the CSV or NDJSON body are validated by the row model (request_body_model) while the body is
+        streamed, and copied into the table by COPY FROM STDIN of psycopg2 or asyncpg on PostgreSQL,
+        or inserted by the multiple VALUES INSERT statements. the rows are upserted if update_columns is set
+        '''
+        table = query_service.model.__table__
+        json_columns = [i.key for i in table.c if isinstance(i.type, (JSON, ARRAY))]
+        build_row = query_service.get_bulk_load_row_builder()
+
+        def get_update_columns(query):
+            if query.update_columns is None:
+                return None
+            return query_service.get_update_columns(query.update_columns)
+
+        if async_mode:
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies,
+                      openapi_extra=BULK_LOAD_REQUEST_BODY)
+            async def async_bulk_load_rows(
+                    response: Response,
+                    request: Request,
+                    query: request_query_model = Depends(request_query_model),
+                    session=Depends(db_session)
+            ):
+                update_columns = get_update_columns(query)
+
+                async def load(rows):
+                    await _async_bulk_load(session, rows,
+                                           query_service=query_service,
+                                           execute_service=execute_service,
+                                           unique_fields=unique_list,
+                                           update_columns=update_columns)
+
+                try:
+                    loaded = await _load_records(request,
+                                                 row_model=request_body_model,
+                                                 build_row=build_row,
+                                                 load=load,
+                                                 chunk_size=query_service.bulk_chunk_size,
+                                                 json_columns=json_columns)
+                except RequestValidationError:
+                    # the chunks loaded before the invalid row are not kept
+                    await execute_service.async_rollback(session)
+                    raise
+                except IntegrityError as e:
+                    await execute_service.async_rollback(session)
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return await parsing_service.async_bulk_load(response_model=response_model,
+                                                             sql_execute_result=loaded,
+                                                             fastapi_response=response,
+                                                             session=session)
+        else:
+            # the body is streamed by the event loop, the statements of the session run in the thread pool
+            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies,
+                      openapi_extra=BULK_LOAD_REQUEST_BODY)
+            async def bulk_load_rows(
+                    response: Response,
+                    request: Request,
+                    query: request_query_model = Depends(request_query_model),
+                    session=Depends(db_session)
+            ):
+                update_columns = get_update_columns(query)
+
+                async def load(rows):
+                    await run_in_threadpool(_bulk_load, session, rows,
+                                            query_service=query_service,
+                                            execute_service=execute_service,
+                                            unique_fields=unique_list,
+                                            update_columns=update_columns)
+
+                try:
+                    loaded = await _load_records(request,
+                                                 row_model=request_body_model,
+                                                 build_row=build_row,
+                                                 load=load,
+                                                 chunk_size=query_service.bulk_chunk_size,
+                                                 json_columns=json_columns)
+                except RequestValidationError:
+                    # the chunks loaded before the invalid row are not kept
+                    await run_in_threadpool(execute_service.rollback, session)
+                    raise
+                except IntegrityError as e:
+                    await run_in_threadpool(execute_service.rollback, session)
+                    return _unique_conflict(e, with_message=cls.unique_conflict_with_message)
+                return await run_in_threadpool(parsing_service.bulk_load,
+                                               response_model=response_model,
+                                               sql_execute_result=loaded,
+                                               fastapi_response=response,
+                                               session=session)
+
+    @classmethod
+    def export(cls, api, *,
+               query_service,
+               parsing_service,
+               execute_service,
+               async_mode,
+               path,
+               response_model,
+               dependencies,
+               request_query_model,
+               db_session,
+               stream_yield_per=1000,
+               fast_query_parser=False):
+        '''
+        the rows matched by the query of find many are selected by one statement, and streamed as CSV or NDJSON.
+        the CSV is copied out by COPY (...) TO STDOUT of psycopg2 or asyncpg on PostgreSQL, else the rows are
+        fetched from the server side cursor in the partitions of stream_yield_per rows
+        '''
+        table = query_service.model.__table__
+        columns = list(response_model.__fields__)
+        json_columns = [i.name for i in table.c if isinstance(i.type, JSON)]
+        route = _find_many_route(api, path,
+                                 request_query_model=request_query_model,
+                                 fast_query_parser=fast_query_parser,
+                                 dependencies=dependencies,
+                                 response_class=StreamingResponse,
+                                 responses=EXPORT_RESPONSES)
+
+        if async_mode:
+            @route
+            async def async_export_rows(query=Depends(request_query_model),
+                                        export_format=Depends(_export_format_query_param),
+                                        session=Depends(db_session)
+                                        ):
+                stmt, params = query_service.get_export_statement(query=query.__dict__, columns=columns)
+                if export_format == DataFormat.csv and query_service.is_copy_supported(session):
+                    chunks = execute_service.async_copy_to(session, query_service.get_export_copy(stmt, params))
+                    return await parsing_service.async_export_copy(sql_execute_result=chunks, session=session)
+
+                query_result = await execute_service.async_stream(session, stmt, params)
+                return await parsing_service.async_export(response_model=response_model,
+                                                          sql_execute_result=query_result,
+                                                          yield_per=stream_yield_per,
+                                                          export_format=export_format,
+                                                          json_columns=json_columns,
+                                                          session=session)
+        else:
+            @route
+            def export_rows(query=Depends(request_query_model),
+                            export_format=Depends(_export_format_query_param),
+                            session=Depends(db_session)
+                            ):
+                stmt, params = query_service.get_export_statement(query=query.__dict__, columns=columns)
+                if export_format == DataFormat.csv and query_service.is_copy_supported(session):
+                    chunks = execute_service.copy_to(session, query_service.get_export_copy(stmt, params))
+                    return parsing_service.export_copy(sql_execute_result=chunks, session=session)
+
+                query_result = execute_service.stream(session, stmt, params)
+                return parsing_service.export(response_model=response_model,
+                                              sql_execute_result=query_result,
+                                              yield_per=stream_yield_per,
+                                              export_format=export_format,
+                                              json_columns=json_columns,
+                                              session=session)
+
     @classmethod
     def delete_one(cls, api, *,
                    query_service,
@@ -296,15 +936,34 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                       query=Depends(request_query_model),
                                                       request_url_param_model=Depends(request_url_model),
                                                       session=Depends(db_session)):
+                if query_service.is_bulk_delete_supported():
+                    if query_service.is_returning_supported(session, 'delete'):
+                        delete_stmt, params = query_service.delete_returning(filter_args=request_url_param_model.__dict__,
+                                                                             extra_args=query.__dict__)
+                        deleted_rows = (await execute_service.async_execute(session, delete_stmt, params)).fetchall()
+                    else:
+                        select_stmt, params = query_service.delete_select(filter_args=request_url_param_model.__dict__,
+                                                                          extra_args=query.__dict__)
+                        deleted_rows = (await execute_service.async_execute(session, select_stmt, params)).fetchall()
+                        for delete_stmt, params in query_service.delete_rows(rows=deleted_rows,
+                                                                             filter_args=request_url_param_model.__dict__,
+                                                                             extra_args=query.__dict__):
+                            await execute_service.async_execute(session, delete_stmt, params)
+                    return await parsing_service.async_delete_rows(response_model=response_model,
+                                                                   sql_execute_results=deleted_rows,
+                                                                   fastapi_response=response,
+                                                                   delete_one=True,
+                                                                   session=session)
+
                 # delete_instance = query_service.model_query(
                 #     filter_args=request_url_param_model.__dict__,
                 #     extra_args=query.__dict__,
                 #     session=session)
-                filter_stmt = query_service.model_query(filter_args=request_url_param_model.__dict__,
-                                                        extra_args=query.__dict__,
-                                                        session=session)
+                filter_stmt, params = query_service.model_query(filter_args=request_url_param_model.__dict__,
+                                                                extra_args=query.__dict__,
+                                                                session=session)
 
-                tmp = await session.execute(filter_stmt)
+                tmp = await session.execute(filter_stmt, params)
                 delete_instance = tmp.scalar()
 
                 return await parsing_service.async_delete_one(response_model=response_model,
@@ -319,10 +978,29 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                           query=Depends(request_query_model),
                                           request_url_param_model=Depends(request_url_model),
                                           session=Depends(db_session)):
-                filter_stmt = query_service.model_query(filter_args=request_url_param_model.__dict__,
-                                                        extra_args=query.__dict__,
-                                                        session=session)
-                delete_instance = session.execute(filter_stmt).scalar()
+                if query_service.is_bulk_delete_supported():
+                    if query_service.is_returning_supported(session, 'delete'):
+                        delete_stmt, params = query_service.delete_returning(filter_args=request_url_param_model.__dict__,
+                                                                             extra_args=query.__dict__)
+                        deleted_rows = execute_service.execute(session, delete_stmt, params).fetchall()
+                    else:
+                        select_stmt, params = query_service.delete_select(filter_args=request_url_param_model.__dict__,
+                                                                          extra_args=query.__dict__)
+                        deleted_rows = execute_service.execute(session, select_stmt, params).fetchall()
+                        for delete_stmt, params in query_service.delete_rows(rows=deleted_rows,
+                                                                             filter_args=request_url_param_model.__dict__,
+                                                                             extra_args=query.__dict__):
+                            execute_service.execute(session, delete_stmt, params)
+                    return parsing_service.delete_rows(response_model=response_model,
+                                                       sql_execute_results=deleted_rows,
+                                                       fastapi_response=response,
+                                                       delete_one=True,
+                                                       session=session)
+
+                filter_stmt, params = query_service.model_query(filter_args=request_url_param_model.__dict__,
+                                                                extra_args=query.__dict__,
+                                                                session=session)
+                delete_instance = session.execute(filter_stmt, params).scalar()
 
                 return parsing_service.delete_one(response_model=response_model,
                                                   sql_execute_result=delete_instance,
@@ -346,10 +1024,26 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                  request: Request,
                                                  query=Depends(request_query_model),
                                                  session=Depends(db_session)):
-                filter_stmt = query_service.model_query(filter_args=query.__dict__,
-                                                        session=session)
+                if query_service.is_bulk_delete_supported():
+                    if query_service.is_returning_supported(session, 'delete'):
+                        delete_stmt, params = query_service.delete_returning(filter_args=query.__dict__)
+                        deleted_rows = (await execute_service.async_execute(session, delete_stmt, params)).fetchall()
+                    else:
+                        select_stmt, params = query_service.delete_select(filter_args=query.__dict__)
+                        deleted_rows = (await execute_service.async_execute(session, select_stmt, params)).fetchall()
+                        for delete_stmt, params in query_service.delete_rows(rows=deleted_rows,
+                                                                             filter_args=query.__dict__):
+                            await execute_service.async_execute(session, delete_stmt, params)
+                    return await parsing_service.async_delete_rows(response_model=response_model,
+                                                                   sql_execute_results=deleted_rows,
+                                                                   fastapi_response=response,
+                                                                   delete_one=False,
+                                                                   session=session)
 
-                tmp = await session.execute(filter_stmt)
+                filter_stmt, params = query_service.model_query(filter_args=query.__dict__,
+                                                                session=session)
+
+                tmp = await session.execute(filter_stmt, params)
                 data_instance = [i for i in tmp.scalars()]
                 return await parsing_service.async_delete_many(response_model=response_model,
                                                                sql_execute_results=data_instance,
@@ -362,10 +1056,26 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                      request: Request,
                                      query=Depends(request_query_model),
                                      session=Depends(db_session)):
-                filter_stmt = query_service.model_query(filter_args=query.__dict__,
-                                                        session=session)
+                if query_service.is_bulk_delete_supported():
+                    if query_service.is_returning_supported(session, 'delete'):
+                        delete_stmt, params = query_service.delete_returning(filter_args=query.__dict__)
+                        deleted_rows = execute_service.execute(session, delete_stmt, params).fetchall()
+                    else:
+                        select_stmt, params = query_service.delete_select(filter_args=query.__dict__)
+                        deleted_rows = execute_service.execute(session, select_stmt, params).fetchall()
+                        for delete_stmt, params in query_service.delete_rows(rows=deleted_rows,
+                                                                             filter_args=query.__dict__):
+                            execute_service.execute(session, delete_stmt, params)
+                    return parsing_service.delete_rows(response_model=response_model,
+                                                       sql_execute_results=deleted_rows,
+                                                       fastapi_response=response,
+                                                       delete_one=False,
+                                                       session=session)
+
+                filter_stmt, params = query_service.model_query(filter_args=query.__dict__,
+                                                                session=session)
 
-                delete_instance = [i for i in session.execute(filter_stmt).scalars()]
+                delete_instance = [i for i in session.execute(filter_stmt, params).scalars()]
 
                 return parsing_service.delete_many(response_model=response_model,
                                                    sql_execute_results=delete_instance,
@@ -395,11 +1105,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     await execute_service.async_flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
                 return await result_parser.async_post_redirect_get(response_model=response_model,
                                                                    sql_execute_result=new_inserted_data,
                                                                    fastapi_request=request,
@@ -418,11 +1124,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                 try:
                     execute_service.flush(session)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
                 return result_parser.post_redirect_get(response_model=response_model,
                                                        sql_execute_result=new_inserted_data,
@@ -455,11 +1157,11 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
-                filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
-                                                       extra_args=extra_query.__dict__,
-                                                       session=session)
+                filter_stmt, params = crud_service.model_query(filter_args=primary_key.__dict__,
+                                                               extra_args=extra_query.__dict__,
+                                                               session=session)
 
-                data_instance = await session.execute(filter_stmt)
+                data_instance = await session.execute(filter_stmt, params)
                 data_instance = data_instance.scalar()
 
                 try:
@@ -470,11 +1172,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
         else:
             @api.patch(path,
                        status_code=200,
@@ -487,11 +1185,11 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
-                filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
-                                                       extra_args=extra_query.__dict__,
-                                                       session=session)
+                filter_stmt, params = crud_service.model_query(filter_args=primary_key.__dict__,
+                                                               extra_args=extra_query.__dict__,
+                                                               session=session)
 
-                update_instance = session.execute(filter_stmt).scalar()
+                update_instance = session.execute(filter_stmt, params).scalar()
 
                 try:
                     return result_parser.update(response_model=response_model,
@@ -501,11 +1199,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
     @classmethod
     def patch_many(cls, api, *,
@@ -531,10 +1225,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session)
             ):
 
-                filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
-                                                       session=session)
+                if crud_service.is_update_returning_supported(session, update_args=patch_data.__dict__):
+                    update_stmt, params = crud_service.update_returning(update_args=patch_data.__dict__,
+                                                                        filter_args=extra_query.__dict__)
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt, params)
+                    except IntegrityError as e:
+                        return _unique_conflict(e)
+                    return await result_parser.async_update_returning(response_model=response_model,
+                                                                      sql_execute_result=query_result,
+                                                                      fastapi_response=response,
+                                                                      session=session)
+
+                filter_stmt, params = crud_service.model_query(filter_args=extra_query.__dict__,
+                                                               session=session)
 
-                tmp = await session.execute(filter_stmt)
+                tmp = await session.execute(filter_stmt, params)
                 data_instance = [i for i in tmp.scalars()]
 
                 if not data_instance:
@@ -547,11 +1253,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
         else:
             @api.patch(path,
                        status_code=200,
@@ -563,10 +1265,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session)
             ):
-                filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
-                                                       session=session)
+                if crud_service.is_update_returning_supported(session, update_args=patch_data.__dict__):
+                    update_stmt, params = crud_service.update_returning(update_args=patch_data.__dict__,
+                                                                        filter_args=extra_query.__dict__)
+                    try:
+                        query_result = execute_service.execute(session, update_stmt, params)
+                    except IntegrityError as e:
+                        return _unique_conflict(e)
+                    return result_parser.update_returning(response_model=response_model,
+                                                          sql_execute_result=query_result,
+                                                          fastapi_response=response,
+                                                          session=session)
+
+                filter_stmt, params = crud_service.model_query(filter_args=extra_query.__dict__,
+                                                               session=session)
 
-                data_instance = [i for i in session.execute(filter_stmt).scalars()]
+                data_instance = [i for i in session.execute(filter_stmt, params).scalars()]
 
                 if not data_instance:
                     return Response(status_code=HTTPStatus.NO_CONTENT)
@@ -578,11 +1292,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
     @classmethod
     def put_one(cls, api, *,
@@ -606,11 +1316,11 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
-                filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
-                                                       extra_args=extra_query.__dict__,
-                                                       session=session)
+                filter_stmt, params = crud_service.model_query(filter_args=primary_key.__dict__,
+                                                               extra_args=extra_query.__dict__,
+                                                               session=session)
 
-                data_instance = await session.execute(filter_stmt)
+                data_instance = await session.execute(filter_stmt, params)
                 data_instance = data_instance.scalar()
 
                 if not data_instance:
@@ -623,11 +1333,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
         else:
             @api.put(path, status_code=200, response_model=response_model, dependencies=dependencies)
             def entire_update_by_primary_key(
@@ -637,11 +1343,11 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
-                filter_stmt = crud_service.model_query(filter_args=primary_key.__dict__,
-                                                       extra_args=extra_query.__dict__,
-                                                       session=session)
+                filter_stmt, params = crud_service.model_query(filter_args=primary_key.__dict__,
+                                                               extra_args=extra_query.__dict__,
+                                                               session=session)
 
-                data_instance = session.execute(filter_stmt).scalar()
+                data_instance = session.execute(filter_stmt, params).scalar()
 
                 if not data_instance:
                     return Response(status_code=HTTPStatus.NOT_FOUND)
@@ -653,11 +1359,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=True)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
     @classmethod
     def put_many(cls, api, *,
@@ -679,9 +1381,21 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     extra_query: request_query_model = Depends(),
                     session=Depends(db_session),
             ):
-                filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
-                                                       session=session)
-                tmp = await session.execute(filter_stmt)
+                if crud_service.is_update_returning_supported(session, update_args=update_data.__dict__):
+                    update_stmt, params = crud_service.update_returning(update_args=update_data.__dict__,
+                                                                        filter_args=extra_query.__dict__)
+                    try:
+                        query_result = await execute_service.async_execute(session, update_stmt, params)
+                    except IntegrityError as e:
+                        return _unique_conflict(e)
+                    return await result_parser.async_update_returning(response_model=response_model,
+                                                                      sql_execute_result=query_result,
+                                                                      fastapi_response=response,
+                                                                      session=session)
+
+                filter_stmt, params = crud_service.model_query(filter_args=extra_query.__dict__,
+                                                               session=session)
+                tmp = await session.execute(filter_stmt, params)
                 data_instance = [i for i in tmp.scalars()]
 
                 if not data_instance:
@@ -694,11 +1408,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                             session=session,
                                                             update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
         else:
             @api.put(path, status_code=200, response_model=response_model, dependencies=dependencies)
@@ -709,10 +1419,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                     session=Depends(db_session),
             ):
 
-                filter_stmt = crud_service.model_query(filter_args=extra_query.__dict__,
-                                                       session=session)
+                if crud_service.is_update_returning_supported(session, update_args=update_data.__dict__):
+                    update_stmt, params = crud_service.update_returning(update_args=update_data.__dict__,
+                                                                        filter_args=extra_query.__dict__)
+                    try:
+                        query_result = execute_service.execute(session, update_stmt, params)
+                    except IntegrityError as e:
+                        return _unique_conflict(e)
+                    return result_parser.update_returning(response_model=response_model,
+                                                          sql_execute_result=query_result,
+                                                          fastapi_response=response,
+                                                          session=session)
+
+                filter_stmt, params = crud_service.model_query(filter_args=extra_query.__dict__,
+                                                               session=session)
 
-                data_instance = [i for i in session.execute(filter_stmt).scalars()]
+                data_instance = [i for i in session.execute(filter_stmt, params).scalars()]
 
                 if not data_instance:
                     return Response(status_code=HTTPStatus.NO_CONTENT)
@@ -724,11 +1446,7 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                 session=session,
                                                 update_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
+                    return _unique_conflict(e)
 
                 # return result_parser.update_many(response_model=response_model,
                 #                                  sql_execute_result=query_result,
@@ -760,17 +1478,23 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                                       ):
                 target_model = request.url.path.split("/")[-2]
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_one_with_foreign_pk(query=query.__dict__,
-                                                             join_mode=join,
-                                                             abstract_param=url_param.__dict__,
-                                                             target_model=target_model)
+                select_in_loader = _async_select_in_loader(session,
+                                                           query_service=query_service,
+                                                           execute_service=execute_service,
+                                                           join_mode=join)
+                stmt, params = query_service.get_one_with_foreign_pk(query=query.__dict__,
+                                                                     join_mode=join,
+                                                                     abstract_param=url_param.__dict__,
+                                                                     target_model=target_model)
 
-                query_result = await execute_service.async_execute(session, stmt)
+                query_result = await execute_service.async_execute(session, stmt, params)
 
                 parsed_response = await parsing_service.async_find_one(response_model=response_model,
                                                                        sql_execute_result=query_result,
                                                                        fastapi_response=response,
+                                                                       primary_keys=query_service.get_primary_keys(target_model),
                                                                        join_mode=join,
+                                                                       select_in_loader=select_in_loader,
                                                                        session=session)
                 return parsed_response
         else:
@@ -784,16 +1508,22 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                           ):
                 target_model = request.url.path.split("/")[-2]
                 join = query.__dict__.pop('join_foreign_table', None)
-
-                stmt = query_service.get_one_with_foreign_pk(query=query.__dict__,
-                                                             join_mode=join,
-                                                             abstract_param=url_param.__dict__,
-                                                             target_model=target_model)
-                query_result = execute_service.execute(session, stmt)
+                select_in_loader = _select_in_loader(session,
+                                                     query_service=query_service,
+                                                     execute_service=execute_service,
+                                                     join_mode=join)
+
+                stmt, params = query_service.get_one_with_foreign_pk(query=query.__dict__,
+                                                                     join_mode=join,
+                                                                     abstract_param=url_param.__dict__,
+                                                                     target_model=target_model)
+                query_result = execute_service.execute(session, stmt, params)
                 parsed_response = parsing_service.find_one(response_model=response_model,
                                                            sql_execute_result=query_result,
                                                            fastapi_response=response,
+                                                           primary_keys=query_service.get_primary_keys(target_model),
                                                            join_mode=join,
+                                                           select_in_loader=select_in_loader,
                                                            session=session)
                 return parsed_response
 
@@ -809,48 +1539,137 @@ class SQLAlchemyGeneralSQLBaseRouteSource(ABC):
                                request_query_model,
                                request_url_param_model,
                                function_name,
-                               db_session):
+                               db_session,
+                               cursor_pagination=False,
+                               stream_yield_per=1000,
+                               total_count_mode=TotalCountMode.page,
+                               fast_query_parser=False):
+        cursor_query_param = _cursor_query_param if cursor_pagination else _no_cursor_query_param
+        route = _find_many_route(api, path,
+                                 request_query_model=request_query_model,
+                                 fast_query_parser=fast_query_parser,
+                                 dependencies=dependencies,
+                                 response_model=response_model,
+                                 name=function_name)
 
         if async_mode:
-            @api.get(path, dependencies=dependencies, response_model=response_model, name=function_name)
+            @route
             async def async_get_many_with_foreign_tree(response: Response,
                                                        request: Request,
                                                        url_param=Depends(request_url_param_model),
                                                        query=Depends(request_query_model),
+                                                       cursor=Depends(cursor_query_param),
                                                        session=Depends(
                                                            db_session)
                                                        ):
                 target_model = request.url.path.split("/")[-1]
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join, abstract_param=url_param.__dict__,
-                                              target_model=target_model)
+                select_in_loader = _async_select_in_loader(session,
+                                                           query_service=query_service,
+                                                           execute_service=execute_service,
+                                                           join_mode=join)
+                stream = parsing_service.is_stream_request(request)
+                count_mode = _find_many_total_count_mode(total_count_mode,
+                                                         query_service=query_service,
+                                                         join_mode=join,
+                                                         cursor=cursor)
+                window_count = count_mode == TotalCountMode.window and not stream
+                total_count = await _async_total_count(session,
+                                                       query_service=query_service,
+                                                       execute_service=execute_service,
+                                                       total_count_mode=count_mode,
+                                                       join_mode=join,
+                                                       abstract_param=url_param.__dict__,
+                                                       target_model=target_model,
+                                                       query=query.__dict__)
+                stmt, params, cursor_columns = query_service.get_many_statement(query=query.__dict__,
+                                                                                join_mode=join,
+                                                                                abstract_param=url_param.__dict__,
+                                                                                target_model=target_model,
+                                                                                cursor_pagination=cursor_pagination,
+                                                                                cursor=cursor,
+                                                                                window_count=window_count)
+
+                if stream:
+                    query_result = await execute_service.async_stream(session, stmt, params)
+                    return await parsing_service.async_find_many_stream(response_model=response_model,
+                                                                        sql_execute_result=query_result,
+                                                                        yield_per=stream_yield_per,
+                                                                        join_mode=join,
+                                                                        select_in_loader=select_in_loader,
+                                                                        total_count=total_count,
+                                                                        session=session)
 
-                query_result = await execute_service.async_execute(session, stmt)
+                query_result = await execute_service.async_execute(session, stmt, params)
 
                 parsed_response = await parsing_service.async_find_many(response_model=response_model,
                                                                         sql_execute_result=query_result,
                                                                         fastapi_response=response,
+                                                                        primary_keys=query_service.get_primary_keys(target_model),
                                                                         join_mode=join,
+                                                                        select_in_loader=select_in_loader,
+                                                                        cursor_columns=cursor_columns,
+                                                                        limit=params.get('limit', None),
+                                                                        total_count=total_count,
                                                                         session=session)
                 return parsed_response
         else:
-            @api.get(path, dependencies=dependencies, response_model=response_model, name=function_name)
+            @route
             def get_many_with_foreign_tree(response: Response,
                                            request: Request,
                                            url_param=Depends(request_url_param_model),
                                            query=Depends(request_query_model),
+                                           cursor=Depends(cursor_query_param),
                                            session=Depends(
                                                db_session)
                                            ):
                 target_model = request.url.path.split("/")[-1]
                 join = query.__dict__.pop('join_foreign_table', None)
-                stmt = query_service.get_many(query=query.__dict__, join_mode=join, abstract_param=url_param.__dict__,
-                                              target_model=target_model)
-                query_result = execute_service.execute(session, stmt)
+                select_in_loader = _select_in_loader(session,
+                                                     query_service=query_service,
+                                                     execute_service=execute_service,
+                                                     join_mode=join)
+                stream = parsing_service.is_stream_request(request)
+                count_mode = _find_many_total_count_mode(total_count_mode,
+                                                         query_service=query_service,
+                                                         join_mode=join,
+                                                         cursor=cursor)
+                window_count = count_mode == TotalCountMode.window and not stream
+                total_count = _total_count(session,
+                                           query_service=query_service,
+                                           execute_service=execute_service,
+                                           total_count_mode=count_mode,
+                                           join_mode=join,
+                                           abstract_param=url_param.__dict__,
+                                           target_model=target_model,
+                                           query=query.__dict__)
+                stmt, params, cursor_columns = query_service.get_many_statement(query=query.__dict__,
+                                                                                join_mode=join,
+                                                                                abstract_param=url_param.__dict__,
+                                                                                target_model=target_model,
+                                                                                cursor_pagination=cursor_pagination,
+                                                                                cursor=cursor,
+                                                                                window_count=window_count)
+                if stream:
+                    query_result = execute_service.stream(session, stmt, params)
+                    return parsing_service.find_many_stream(response_model=response_model,
+                                                            sql_execute_result=query_result,
+                                                            yield_per=stream_yield_per,
+                                                            join_mode=join,
+                                                            select_in_loader=select_in_loader,
+                                                            total_count=total_count,
+                                                            session=session)
+
+                query_result = execute_service.execute(session, stmt, params)
                 parsed_response = parsing_service.find_many(response_model=response_model,
                                                             sql_execute_result=query_result,
                                                             fastapi_response=response,
+                                                            primary_keys=query_service.get_primary_keys(target_model),
                                                             join_mode=join,
+                                                            select_in_loader=select_in_loader,
+                                                            cursor_columns=cursor_columns,
+                                                            limit=params.get('limit', None),
+                                                            total_count=total_count,
                                                             session=session)
 
                 return parsed_response
@@ -860,127 +1679,7 @@ class SQLAlchemyPGSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
     This route will support the SQL SQLAlchemy dialects
     '''
-
-    @classmethod
-    def upsert_one(cls, api, *,
-                   path,
-                   query_service,
-                   parsing_service,
-                   execute_service,
-                   async_mode,
-                   response_model,
-                   request_body_model,
-                   dependencies,
-                   db_session,
-                   unique_list):
-        if async_mode:
-
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            async def async_insert_one_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
-
-                try:
-                    query_result = await execute_service.async_execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
-                return await parsing_service.async_upsert_one(response_model=response_model,
-                                                              sql_execute_result=query_result,
-                                                              fastapi_response=response,
-                                                              session=session)
-        else:
-
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            def insert_one_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
-
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
-                try:
-                    query_result = execute_service.execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
-                return parsing_service.upsert_one(response_model=response_model,
-                                                  sql_execute_result=query_result,
-                                                  fastapi_response=response,
-                                                  session=session)
-
-    @classmethod
-    def upsert_many(cls, api, *,
-                    query_service,
-                    parsing_service,
-                    async_mode,
-                    path,
-                    response_model,
-                    dependencies,
-                    request_body_model,
-                    db_session,
-                    unique_list,
-                    execute_service):
-
-        if async_mode:
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            async def async_insert_many_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list,
-                                            upsert_one=False)
-                try:
-                    query_result = await execute_service.async_execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
-                return await parsing_service.async_upsert_many(response_model=response_model,
-                                                               sql_execute_result=query_result,
-                                                               fastapi_response=response,
-                                                               session=session)
-        else:
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            def insert_many_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list,
-                                            upsert_one=False)
-                try:
-                    query_result = execute_service.execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT, content=err_msg)
-                    return result
-                return parsing_service.upsert_many(response_model=response_model,
-                                                   sql_execute_result=query_result,
-                                                   fastapi_response=response,
-                                                   session=session)
+    unique_conflict_with_message = True
 
 
 class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
@@ -988,69 +1687,14 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     This route will support the SQL SQLAlchemy dialects
     '''
 
-    @classmethod
-    def upsert_one(cls, api, *,
-                   path,
-                   query_service,
-                   parsing_service,
-                   execute_service,
-                   async_mode,
-                   response_model,
-                   request_body_model,
-                   dependencies,
-                   db_session,
-                   unique_list):
-        if async_mode:
-
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            async def async_insert_one_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
-
-                try:
-                    query_result = await execute_service.async_execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return await parsing_service.async_upsert_one(response_model=response_model,
-                                                              sql_execute_result=query_result,
-                                                              fastapi_response=response,
-                                                              session=session)
-        else:
-
-            @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            def insert_one_and_support_upsert(
-                    response: Response,
-                    request: Request,
-                    query: request_body_model = Depends(request_body_model),
-                    session=Depends(db_session)
-            ):
 
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list)
-                try:
-                    query_result = execute_service.execute(session, stmt)
-                except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return parsing_service.upsert_one(response_model=response_model,
-                                                  sql_execute_result=query_result,
-                                                  fastapi_response=response,
-                                                  session=session)
+class SQLAlchemyMySQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
+    '''
+    This route will support the SQL SQLAlchemy dialects
+    '''
 
     @classmethod
-    def upsert_many(cls, api, *,
+    def create_many(cls, api, *,
                     query_service,
                     parsing_service,
                     async_mode,
@@ -1061,94 +1705,70 @@ class SQLAlchemySQLLiteRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     db_session,
                     unique_list,
                     execute_service):
+        '''
+        the rows are inserted by the multiple VALUES INSERT statements of the upsert without on_conflict,
+        and selected after each statement, instead of being flushed by the session
+        '''
 
         if async_mode:
             @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            async def async_insert_many_and_support_upsert(
+            async def async_insert_many(
                     response: Response,
                     request: Request,
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
-                stmt = query_service.upsert(insert_arg=query.__dict__,
-                                            unique_fields=unique_list,
-                                            upsert_one=False)
                 try:
-                    query_result = await execute_service.async_execute(session, stmt)
+                    inserted_data = await _async_upsert(session,
+                                                        query_service=query_service,
+                                                        execute_service=execute_service,
+                                                        insert_arg=query.__dict__,
+                                                        unique_fields=unique_list,
+                                                        upsert_one=False)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return await parsing_service.async_upsert_many(response_model=response_model,
-                                                               sql_execute_result=query_result,
+                    # the chunks inserted before the conflict are not kept
+                    await execute_service.async_rollback(session)
+                    return _unique_conflict(e)
+                return await parsing_service.async_create_many(response_model=response_model,
+                                                               sql_execute_result=inserted_data,
                                                                fastapi_response=response,
                                                                session=session)
         else:
             @api.post(path, status_code=201, response_model=response_model, dependencies=dependencies)
-            def insert_many_and_support_upsert(
+            def insert_many(
                     response: Response,
                     request: Request,
                     query: request_body_model = Depends(request_body_model),
                     session=Depends(db_session)
             ):
-
-                stmt = query_service.upsert(insert_arg=query.__dict__,
+                try:
+                    inserted_data = _upsert(session,
+                                            query_service=query_service,
+                                            execute_service=execute_service,
+                                            insert_arg=query.__dict__,
                                             unique_fields=unique_list,
                                             upsert_one=False)
-                try:
-                    query_result = execute_service.execute(session, stmt)
                 except IntegrityError as e:
-                    err_msg, = e.orig.args
-                    if 'unique constraint' not in err_msg.lower():
-                        raise e
-                    result = Response(status_code=HTTPStatus.CONFLICT)
-                    return result
-                return parsing_service.upsert_many(response_model=response_model,
-                                                   sql_execute_result=query_result,
+                    # the chunks inserted before the conflict are not kept
+                    execute_service.rollback(session)
+                    return _unique_conflict(e)
+                return parsing_service.create_many(response_model=response_model,
+                                                   sql_execute_result=inserted_data,
                                                    fastapi_response=response,
                                                    session=session)
 
 
-class SQLAlchemyMySQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
+class SQLAlchemyMariadbRouteSource(SQLAlchemyMySQLRouteSource):
     '''
     This route will support the SQL SQLAlchemy dialects
     '''
 
-    @classmethod
-    def upsert_one(cls, api, *,
-                   path,
-                   query_service,
-                   parsing_service,
-                   execute_service,
-                   async_mode,
-                   response_model,
-                   request_body_model,
-                   dependencies,
-                   db_session,
-                   unique_list):
-        raise NotImplementedError
-
-    @classmethod
-    def upsert_many(cls, api, *,
-                    query_service,
-                    parsing_service,
-                    async_mode,
-                    path,
-                    response_model,
-                    dependencies,
-                    request_body_model,
-                    db_session,
-                    unique_list,
-                    execute_service):
-        raise NotImplementedError
-
 
-class SQLAlchemyMariadbRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
+class SQLAlchemyOracleRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
     This route will support the SQL SQLAlchemy dialects
     '''
+    bulk_load_supported = False
 
     @classmethod
     def upsert_one(cls, api, *,
@@ -1178,38 +1798,19 @@ class SQLAlchemyMariadbRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
-
-class SQLAlchemyOracleRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
-    '''
-    This route will support the SQL SQLAlchemy dialects
-    '''
-
-    @classmethod
-    def upsert_one(cls, api, *,
-                   path,
-                   query_service,
-                   parsing_service,
-                   execute_service,
-                   async_mode,
-                   response_model,
-                   request_body_model,
-                   dependencies,
-                   db_session,
-                   unique_list):
-        raise NotImplementedError
-
     @classmethod
-    def upsert_many(cls, api, *,
-                    query_service,
-                    parsing_service,
-                    async_mode,
-                    path,
-                    response_model,
-                    dependencies,
-                    request_body_model,
-                    db_session,
-                    unique_list,
-                    execute_service):
+    def bulk_load(cls, api, *,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  path,
+                  response_model,
+                  dependencies,
+                  request_query_model,
+                  request_body_model,
+                  db_session,
+                  unique_list):
         raise NotImplementedError
 
 
@@ -1217,6 +1818,7 @@ class SQLAlchemyMSSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
     This route will support the SQL SQLAlchemy dialects
     '''
+    bulk_load_supported = False
 
     @classmethod
     def upsert_one(cls, api, *,
@@ -1246,11 +1848,27 @@ class SQLAlchemyMSSQLRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     execute_service):
         raise NotImplementedError
 
+    @classmethod
+    def bulk_load(cls, api, *,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  path,
+                  response_model,
+                  dependencies,
+                  request_query_model,
+                  request_body_model,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
+
 
 class SQLAlchemyNotSupportRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
     '''
     This route will support the SQL SQLAlchemy dialects
     '''
+    bulk_load_supported = False
 
     @classmethod
     def upsert_one(cls, api, *,
@@ -1279,3 +1897,18 @@ class SQLAlchemyNotSupportRouteSource(SQLAlchemyGeneralSQLBaseRouteSource):
                     unique_list,
                     execute_service):
         raise NotImplementedError
+
+    @classmethod
+    def bulk_load(cls, api, *,
+                  query_service,
+                  parsing_service,
+                  execute_service,
+                  async_mode,
+                  path,
+                  response_model,
+                  dependencies,
+                  request_query_model,
+                  request_body_model,
+                  db_session,
+                  unique_list):
+        raise NotImplementedError
@@ -0,0 +1,238 @@
+import codecs
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql
+
+from .type import DataFormat
+
+BULK_LOAD_MEDIA_TYPES = {'text/csv': DataFormat.csv,
+                         'application/x-ndjson': DataFormat.ndjson,
+                         'application/jsonl': DataFormat.ndjson}
+
+
+def bulk_load_format(content_type: Optional[str]) -> Optional[DataFormat]:
+    """
+    the format of the body by the content type of the request, None if it is not supported
+    """
+    media_type, *_ = (content_type or '').split(';')
+    return BULK_LOAD_MEDIA_TYPES.get(media_type.strip().lower(), None)
+
+
+def group_rows(rows: List[dict]) -> Iterator[Tuple[Tuple[str, ...], List[dict]]]:
+    """
+    the consecutive rows with the same columns, they are loaded by one statement
+    """
+    for columns, rows_ in groupby(rows, key=lambda row: tuple(row)):
+        yield columns, list(rows_)
+
+
+class RecordDecodeError(ValueError):
+
+    def __init__(self, message: str, index: int):
+        super().__init__(message)
+        self.index = index
+
+
+class RecordDecoder(object):
+    """
+    the incremental decoder of the records of the streamed body, the chunks of the body are fed in any size,
+    the records of the complete lines are returned.
+
+    the first line of CSV is the header of the columns, the empty values are not set, a quoted value may contain
+    the newlines, so a line is complete if the count of the quotes before it is even.
+    the values of the json columns are json in CSV
+    """
+
+    def __init__(self, data_format: DataFormat, json_columns=()):
+        self.data_format = data_format
+        self.json_columns = set(json_columns)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        # the buffer is scanned for the quotes until the position, the quote is open at it if quoted is True
+        self.scanned = 0
+        self.quoted = False
+        self.columns = None
+        self.index = 0
+
+    def feed(self, data: bytes) -> List[dict]:
+        self.buffer += self._decode(data, final=False)
+        return self._records(final=False)
+
+    def close(self) -> List[dict]:
+        self.buffer += self._decode(b'', final=True)
+        return self._records(final=True)
+
+    def _decode(self, data: bytes, final: bool) -> str:
+        try:
+            return self.decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            raise RecordDecodeError(f'the body is not utf-8: {e}', self.index)
+
+    def _complete_length(self) -> int:
+        if self.data_format == DataFormat.ndjson:
+            return self.buffer.rfind('\n') + 1
+        complete = 0
+        start = self.scanned
+        while True:
+            newline = self.buffer.find('\n', start)
+            if newline < 0:
+                break
+            if self.buffer.count('"', start, newline) % 2:
+                self.quoted = not self.quoted
+            if not self.quoted:
+                complete = newline + 1
+            start = newline + 1
+        self.scanned = start - complete
+        return complete
+
+    def _records(self, final: bool) -> List[dict]:
+        if final:
+            complete, self.buffer, self.scanned, self.quoted = self.buffer, '', 0, False
+        else:
+            length = self._complete_length()
+            complete, self.buffer = self.buffer[:length], self.buffer[length:]
+        if not complete:
+            return []
+        if self.data_format == DataFormat.ndjson:
+            return self._ndjson_records(complete)
+        return self._csv_records(complete)
+
+    def _ndjson_records(self, text: str) -> List[dict]:
+        records = []
+        for line in text.split('\n'):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise RecordDecodeError(f'invalid json: {e}', self.index)
+            if not isinstance(record, dict):
+                raise RecordDecodeError('the record is not a json object', self.index)
+            records.append(record)
+            self.index += 1
+        return records
+
+    def _csv_records(self, text: str) -> List[dict]:
+        records = []
+        try:
+            for values in csv.reader(text.splitlines(keepends=True), strict=True):
+                if not values:
+                    continue
+                if self.columns is None:
+                    self.columns = values
+                    continue
+                if len(values) != len(self.columns):
+                    raise RecordDecodeError(f'the record has {len(values)} values, '
+                                            f'the header has {len(self.columns)} columns', self.index)
+                records.append(self._csv_record(values))
+                self.index += 1
+        except csv.Error as e:
+            raise RecordDecodeError(f'invalid csv: {e}', self.index)
+        return records
+
+    def _csv_record(self, values: List[str]) -> dict:
+        record = {}
+        for column, value in zip(self.columns, values):
+            if value == '':
+                continue
+            if column in self.json_columns:
+                try:
+                    value = json.loads(value)
+                except ValueError as e:
+                    raise RecordDecodeError(f'invalid json of {column}: {e}', self.index)
+            record[column] = value
+        return record
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _array_literal(values) -> str:
+    items = []
+    for value in values:
+        if value is None:
+            items.append('NULL')
+        elif isinstance(value, (list, tuple)):
+            items.append(_array_literal(value))
+        else:
+            item = _copy_text(value)
+            items.append('"' + item.replace('\\', '\\\\').replace('"', '\\"') + '"')
+    return '{' + ','.join(items) + '}'
+
+
+def _copy_text(value) -> str:
+    # the text representation of the value in PostgreSQL
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return f'{value.days} days {value.seconds}.{value.microseconds:06d} seconds'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return '\\x' + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def copy_csv_field(value, is_json=False) -> str:
+    """
+    the field of the value in the CSV of COPY, the unquoted empty field is NULL, so the empty string is quoted
+    """
+    if value is None:
+        return ''
+    if is_json:
+        return _quote(json.dumps(value))
+    text = _copy_text(value)
+    if text == '' or text == '\\.' or any(i in text for i in ',"\n\r'):
+        return _quote(text)
+    return text
+
+
+def copy_csv_line(values, is_json) -> str:
+    """
+    the line of the values in the CSV of COPY, is_json are the flags of the json values
+    """
+    return ','.join(copy_csv_field(value, is_json_) for value, is_json_ in zip(values, is_json)) + '\n'
+
+
+class CopyRows(object):
+    """
+    the rows copied into the table by COPY FROM STDIN, the CSV of them for copy_expert of psycopg2,
+    or the records of them for copy_records_to_table of asyncpg
+    """
+
+    def __init__(self, *, table_name: str, schema_name: Optional[str], columns: Tuple[str, ...], rows: List[dict],
+                 json_columns=()):
+        self.table_name = table_name
+        self.schema_name = schema_name
+        self.columns = columns
+        self.rows = rows
+        self.json_columns = set(json_columns)
+
+    def sql(self) -> str:
+        preparer = postgresql.dialect().identifier_preparer
+        table_name = preparer.quote(self.table_name)
+        if self.schema_name:
+            table_name = f'{preparer.quote_schema(self.schema_name)}.{table_name}'
+        columns = ', '.join(preparer.quote(i) for i in self.columns)
+        return f'COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+    def csv(self) -> str:
+        is_json = [i in self.json_columns for i in self.columns]
+        return ''.join(copy_csv_line([row[column] for column in self.columns], is_json) for row in self.rows)
+
+    def records(self) -> List[tuple]:
+        # the json values are encoded by asyncpg from the strings
+        records = []
+        for row in self.rows:
+            records.append(tuple(json.dumps(row[i]) if i in self.json_columns and row[i] is not None else row[i]
+                                 for i in self.columns))
+        return records
@@ -0,0 +1,451 @@
+"""
+the build step of the models of crud_router_builder, the tables are analysed by the schema builder once when
+the code is generated, the generated module contains the models as plain classes and the CRUDModel of them,
+it is passed to crud_router_builder(crud_models=...), so the models are not built when the app starts
+
+    python -m fastapi_quickcrud.misc.codegen app.models:User --crud-methods FIND_ONE FIND_MANY \\
+        --sql-type postgresql --output app/crud_models/user.py
+"""
+import argparse
+import dataclasses
+import datetime
+import decimal
+import importlib
+import keyword
+import re
+import typing
+import uuid
+from enum import Enum
+from inspect import signature
+from typing import Any, Dict, List, Optional
+
+from fastapi import params
+from pydantic import BaseConfig, BaseModel, ConstrainedStr, Field, constr
+from pydantic.fields import FieldInfo
+from sqlalchemy import Table
+
+from .covert_model import convert_table_to_model
+from .exceptions import CodeGenerationException
+from .schema_builder import ApiParameterSchemaBuilder, schema_fingerprint
+from .type import CrudMethods, SqlType
+from .utils import sqlalchemy_to_pydantic
+
+LINE_LENGTH = 120
+
+
+def import_object(path: str):
+    """
+    the object of the path of "module:attribute", e.g. "app.models:User"
+    """
+    module_name, _, attributes = path.partition(':')
+    if not attributes:
+        raise CodeGenerationException(f'{path} should be the path of "module:attribute"')
+    obj = importlib.import_module(module_name)
+    for attribute in attributes.split('.'):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+def _identifier(name: str) -> str:
+    # the names starting with __ would be mangled in the bodies of the classes
+    identifier = re.sub(r'\W', '_', name).lstrip('_') or 'name'
+    if identifier[0].isdigit():
+        identifier = '_' + identifier
+    if keyword.iskeyword(identifier):
+        identifier += '_'
+    return identifier
+
+
+class _ModuleWriter(object):
+    """
+    the source of the generated module, the objects that can be imported are imported,
+    the other ones (the models, the enums and the types built by the schema builder) are written as code
+    """
+
+    def __init__(self, references: Dict[int, str]):
+        # id of the object: "module:attribute" of it
+        self.references = references
+        self.imports: Dict[str, Dict[str, str]] = {}
+        self.names: Dict[int, str] = {}
+        self.used_names = set()
+        self.field_names = set()
+        self.blocks: List[str] = []
+        # the ids of the objects are the keys, keep them alive
+        self.objects = []
+
+    def _new_name(self, name: str) -> str:
+        name = _identifier(name)
+        unique_name = name
+        index = 1
+        while unique_name in self.used_names:
+            index += 1
+            unique_name = f'{name}_{index}'
+        self.used_names.add(unique_name)
+        return unique_name
+
+    def _import(self, module_name: str, attribute: str) -> str:
+        names = self.imports.setdefault(module_name, {})
+        if attribute not in names:
+            names[attribute] = self._new_name(attribute)
+        return names[attribute]
+
+    def _reference(self, obj) -> Optional[str]:
+        if id(obj) in self.names:
+            return self.names[id(obj)]
+        if id(obj) in self.references:
+            module_name, _, attributes = self.references[id(obj)].partition(':')
+            first, _, rest = attributes.partition('.')
+            return '.'.join(filter(None, [self._import(module_name, first), rest]))
+        module_name = getattr(obj, '__module__', None)
+        qualname = getattr(obj, '__qualname__', None)
+        if not module_name or not qualname or '<' in qualname:
+            return None
+        if module_name == 'builtins':
+            return qualname
+        try:
+            found = importlib.import_module(module_name)
+            for attribute in qualname.split('.'):
+                found = getattr(found, attribute)
+        except (ImportError, AttributeError):
+            return None
+        if found is not obj:
+            return None
+        first, _, rest = qualname.partition('.')
+        return '.'.join(filter(None, [self._import(module_name, first), rest]))
+
+    def _required_reference(self, obj) -> str:
+        reference = self._reference(obj)
+        if reference is None:
+            raise CodeGenerationException(f'{obj!r} can not be imported by the generated code')
+        return reference
+
+    def _define(self, obj, name: str, block: str):
+        self.objects.append(obj)
+        self.names[id(obj)] = name
+        self.blocks.append(block)
+        return name
+
+    @staticmethod
+    def _join(open_: str, items: List[str], close: str, indent: int) -> str:
+        line = f'{open_}{", ".join(items)}{close}'
+        if not items or indent + len(line) <= LINE_LENGTH and '\n' not in line:
+            return line
+        padding = ' ' * (indent + 4)
+        return open_ + '\n' + ''.join(f'{padding}{i},\n' for i in items) + ' ' * indent + close
+
+    def _tuple(self, items: List[str], indent: int) -> str:
+        if len(items) == 1:
+            return f'({items[0]},)'
+        return self._join('(', items, ')', indent)
+
+    def type_source(self, type_, indent=0) -> str:
+        if type_ is type(None):
+            return 'None'
+        if type_ is Any:
+            return self._import('typing', 'Any')
+        origin = typing.get_origin(type_)
+        if origin is not None:
+            args = typing.get_args(type_)
+            if origin is typing.Union:
+                if len(args) == 2 and type(None) in args:
+                    type_, = [i for i in args if i is not type(None)]
+                    return f'{self._import("typing", "Optional")}[{self.type_source(type_, indent)}]'
+                name = self._import('typing', 'Union')
+            else:
+                generic = {list: 'List', dict: 'Dict', set: 'Set', tuple: 'Tuple'}.get(origin, None)
+                if generic is None:
+                    raise CodeGenerationException(f'The type {type_!r} is not supported by the generated code')
+                name = self._import('typing', generic)
+            return self._join(f'{name}[', [self.type_source(i, indent + 4) for i in args], ']', indent)
+        reference = self._reference(type_)
+        if reference is not None:
+            return reference
+        if hasattr(type_, '__supertype__'):
+            return self._new_type(type_)
+        if isinstance(type_, type):
+            if issubclass(type_, ConstrainedStr):
+                return self._constrained_str(type_)
+            if issubclass(type_, Enum):
+                return self._enum(type_)
+            if dataclasses.is_dataclass(type_):
+                return self._dataclass(type_)
+            if issubclass(type_, BaseModel):
+                return self._model(type_)
+        raise CodeGenerationException(f'The type {type_!r} is not supported by the generated code')
+
+    def value_source(self, value, indent=0) -> str:
+        if value is None or isinstance(value, (bool, int, str, bytes)) and not isinstance(value, Enum):
+            return repr(value)
+        if value is ...:
+            return '...'
+        if isinstance(value, float) and value == value and value not in (float('inf'), float('-inf')):
+            return repr(value)
+        if isinstance(value, Enum):
+            enum_ = self.type_source(type(value))
+            if value.name.isidentifier() and not keyword.iskeyword(value.name):
+                return f'{enum_}.{value.name}'
+            return f'{enum_}({self.value_source(value.value)})'
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return f'{self._required_reference(type(value))}.fromisoformat({value.isoformat()!r})'
+        if isinstance(value, datetime.timedelta):
+            return f'{self._required_reference(type(value))}(days={value.days}, seconds={value.seconds}, ' \
+                   f'microseconds={value.microseconds})'
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return f'{self._required_reference(type(value))}({str(value)!r})'
+        if isinstance(value, list):
+            return self._join('[', [self.value_source(i, indent + 4) for i in value], ']', indent)
+        if isinstance(value, tuple):
+            return self._tuple([self.value_source(i, indent + 4) for i in value], indent)
+        if isinstance(value, (set, frozenset)):
+            if not value:
+                return f'{type(value).__name__}()'
+            # the order of the items is the same in every generation
+            return self._join('{', sorted(self.value_source(i, indent + 4) for i in value), '}', indent)
+        if isinstance(value, dict):
+            return self._join('{', [f'{self.value_source(k, indent + 4)}: {self.value_source(v, indent + 4)}'
+                                    for k, v in value.items()], '}', indent)
+        if isinstance(value, params.Param) or isinstance(value, params.Body):
+            return self._field_info(value, type(value), self._required_reference(type(value)), indent)
+        if isinstance(value, BaseModel):
+            return self._join(f'{self._required_reference(type(value))}(',
+                              [f'{name}={self.value_source(getattr(value, name), indent + 4)}'
+                               for name in type(value).__fields__ if name in value.__fields_set__],
+                              ')', indent)
+        if isinstance(value, type) or hasattr(value, '__supertype__'):
+            return self.type_source(value, indent)
+        return self._required_reference(value)
+
+    def _field_info(self, field_info, factory, factory_source: str, indent: int) -> str:
+        # the arguments of the field that are not the default of them
+        fresh = factory(field_info.default)
+        items = [self.value_source(field_info.default, indent + 4)]
+        for name, parameter in signature(factory).parameters.items():
+            if name in ('self', 'default') or parameter.kind in (parameter.VAR_KEYWORD, parameter.VAR_POSITIONAL):
+                continue
+            value = getattr(field_info, name, None)
+            if value != getattr(fresh, name, None):
+                items.append(f'{name}={self.value_source(value, indent + 4)}')
+        items += [f'{name}={self.value_source(value, indent + 4)}' for name, value in field_info.extra.items()]
+        return self._join(f'{factory_source}(', items, ')', indent)
+
+    def _rename(self, name: str, obj) -> List[str]:
+        if name == obj.__name__:
+            return []
+        return [f'{name}.__name__ = {name}.__qualname__ = {obj.__name__!r}']
+
+    def _new_type(self, type_) -> str:
+        name = self._new_name(str(type_.__name__))
+        new_type = self._import('typing', 'NewType')
+        return self._define(type_, name, f'{name} = {new_type}({self.value_source(type_.__name__)}, '
+                                         f'{self.type_source(type_.__supertype__)})')
+
+    def _constrained_str(self, type_) -> str:
+        items = []
+        for name, parameter in signature(constr).parameters.items():
+            value = getattr(type_, name, None)
+            if name == 'regex' and value is not None:
+                value = value.pattern
+            if value != parameter.default:
+                items.append(f'{name}={self.value_source(value)}')
+        name = self._new_name(type_.__name__)
+        return self._define(type_, name, f'{name} = {self._import("pydantic", "constr")}({", ".join(items)})')
+
+    def _enum(self, enum_) -> str:
+        base, = enum_.__bases__
+        base = self._required_reference(base)
+        members = [(i.name, self.value_source(i.value)) for i in enum_]
+        name = self._new_name(enum_.__name__)
+        if all(i.isidentifier() and not keyword.iskeyword(i) for i, _ in members):
+            lines = [f'class {name}({base}):'] + ([f'    {i} = {value}' for i, value in members] or ['    pass'])
+        else:
+            lines = [f'{name} = {base}({enum_.__name__!r}, '
+                     f'[{", ".join(f"({i!r}, {value})" for i, value in members)}])']
+        return self._define(enum_, name, '\n'.join(lines + self._rename(name, enum_)))
+
+    def _class_field(self, field_name: str, annotation: str, default: Optional[str]) -> str:
+        if not field_name.isidentifier() or keyword.iskeyword(field_name):
+            raise CodeGenerationException(f'The field {field_name} is not a valid name of the generated code')
+        self.field_names.add(field_name)
+        if default is None:
+            return f'    {field_name}: {annotation}'
+        return f'    {field_name}: {annotation} = {default}'
+
+    def _dataclass(self, dataclass_) -> str:
+        if dataclass_.__bases__ != (object,):
+            raise CodeGenerationException(f'The base classes of {dataclass_.__name__} are not supported '
+                                          f'by the generated code')
+        body = []
+        for field_ in dataclasses.fields(dataclass_):
+            if field_.default_factory is not dataclasses.MISSING:
+                raise CodeGenerationException(f'The default factory of {dataclass_.__name__}.{field_.name} '
+                                              f'is not supported by the generated code')
+            default = None if field_.default is dataclasses.MISSING else self.value_source(field_.default, 4)
+            body.append(self._class_field(field_.name, self.type_source(field_.type, 4), default))
+        post_init = dataclass_.__dict__.get('__post_init__', None)
+        if post_init is not None:
+            body.append(f'    __post_init__ = {self._post_init(dataclass_, post_init)}')
+        name = self._new_name(dataclass_.__name__)
+        lines = [f'@{self._import("dataclasses", "dataclass")}', f'class {name}:'] + (body or ['    pass'])
+        return self._define(dataclass_, name, '\n'.join(lines + self._rename(name, dataclass_)))
+
+    def _post_init(self, dataclass_, post_init) -> str:
+        steps = getattr(post_init, 'steps', None)
+        if steps is None:
+            raise CodeGenerationException(f'The __post_init__ of {dataclass_.__name__} is not supported '
+                                          f'by the generated code')
+        items = []
+        for function, *arguments in steps:
+            if function is ApiParameterSchemaBuilder._assign_join_table_instance:
+                arguments = [self._join_tables(i) for i in arguments]
+            else:
+                arguments = [self.value_source(i, 12) for i in arguments]
+            items.append(self._tuple([self._required_reference(function)] + arguments, 8))
+        request_post_init = self._import(ApiParameterSchemaBuilder.__module__, 'request_post_init')
+        return self._join(f'{request_post_init}([', items, '])', 4)
+
+    def _join_tables(self, mapping: Dict[str, dict]) -> str:
+        # the join tables are found again when the generated code is imported, by the tables (or the models)
+        # of the foreign keys (or the relationships) of them
+        owners = []
+        for table_name, join_table in mapping.items():
+            try:
+                owner = join_table['local_reference_pairs_set'][0]['local_table']
+            except (IndexError, KeyError):
+                raise CodeGenerationException(f'The join table {table_name} is not supported by the generated code')
+            if not isinstance(join_table['instance'], Table):
+                owner, = [i.class_ for i in join_table['instance'].registry.mappers if i.local_table is owner]
+            owners.append(f'{self.value_source(table_name)}: {self._required_reference(owner)}')
+        name = self._new_name('join_tables')
+        join_table_mapping = self._import(ApiParameterSchemaBuilder.__module__, 'join_table_mapping')
+        return self._define(mapping, name, f'{name} = {self._join(f"{join_table_mapping}({{", owners, "})", 0)}')
+
+    def _model(self, model) -> str:
+        if model.__validators__ or model.__pre_root_validators__ or model.__post_root_validators__:
+            raise CodeGenerationException(f'The validators of {model.__name__} are not supported '
+                                          f'by the generated code')
+        base, = model.__bases__
+        base = self._required_reference(base)
+        body = []
+        annotations = model.__dict__.get('__annotations__', {})
+        for field_name, field_ in model.__fields__.items():
+            annotation = annotations.get(field_name, field_.outer_type_)
+            if field_name not in annotations and field_.allow_none and annotation is not Any:
+                annotation = Optional[annotation]
+            field_info = field_.field_info
+            if field_info.extra or any(getattr(field_info, name) != getattr(FieldInfo(field_info.default), name)
+                                       for name in signature(Field).parameters if name != 'default'
+                                       and hasattr(field_info, name)):
+                default = self._field_info(field_info, Field, self._import('pydantic', 'Field'), 4)
+            else:
+                default = self.value_source(field_info.default, 4)
+            body.append(self._class_field(field_name, self.type_source(annotation, 4), default))
+        config = []
+        for config_name in dir(BaseConfig):
+            value = getattr(model.__config__, config_name)
+            if config_name.startswith('_') or callable(getattr(BaseConfig, config_name)):
+                continue
+            if value != getattr(BaseConfig, config_name):
+                config.append(f'        {config_name} = {self.value_source(value, 8)}')
+        if config:
+            body += ['', '    class Config:'] + config
+        name = self._new_name(model.__name__)
+        lines = [f'class {name}({base}):'] + (body or ['    pass'])
+        return self._define(model, name, '\n'.join(lines + self._rename(name, model)))
+
+    def source(self, header: List[str], tail: List[str]) -> str:
+        shadowed = self.field_names & self.used_names
+        if shadowed:
+            raise CodeGenerationException(f'The fields {sorted(shadowed)} shadow the names of the generated code')
+        imports = []
+        for module_name in sorted(self.imports):
+            names = [i if i == name else f'{i} as {name}' for i, name in sorted(self.imports[module_name].items())]
+            imports.append(self._join(f'from {module_name} import (', names, ')', 0)
+                           if len(names) > 1 else f'from {module_name} import {names[0]}')
+        return '\n'.join(header) + '\n' + '\n'.join(imports) + '\n\n\n' + \
+               '\n\n\n'.join(self.blocks + ['\n'.join(tail)]) + '\n'
+
+
+def generate_crud_models_module(db_model: str,
+                                *,
+                                crud_methods: List[CrudMethods],
+                                sql_type: SqlType = SqlType.postgresql,
+                                exclude_columns: Optional[List[str]] = None,
+                                foreign_include: Optional[List[str]] = None) -> str:
+    """
+    the source of the module of the models of crud_router_builder for the table (or the declarative model)
+    of the path of "module:attribute", the module defines crud_models, e.g.
+    crud_router_builder(db_model=User, crud_models=crud_models, ...) with the same sql_type and
+    foreign_include (and the crud_methods and exclude_columns of the models)
+
+    @param db_model:
+        the path of the table or the declarative model, e.g. "app.models:User"
+    @param foreign_include:
+        the paths of the tables or the declarative models of foreign_include
+    """
+    paths = [db_model] + list(foreign_include or [])
+    references = {}
+    objects = []
+    for path in paths:
+        obj = import_object(path)
+        objects.append(obj)
+        references[id(obj)] = path
+        if not isinstance(obj, Table):
+            references[id(obj.__table__)] = f'{path}.__table__'
+    table_or_model, *foreign_include = objects
+    model, no_primary_key = convert_table_to_model(table_or_model)
+    constraints = model.__table__.constraints
+    crud_models = sqlalchemy_to_pydantic(model,
+                                         crud_methods=crud_methods,
+                                         sql_type=sql_type,
+                                         exclude_columns=exclude_columns,
+                                         constraints=constraints,
+                                         foreign_include=foreign_include,
+                                         exclude_primary_key=no_primary_key)
+    fingerprint = schema_fingerprint(model,
+                                     sql_type=sql_type,
+                                     exclude_columns=exclude_columns or [],
+                                     constraints=constraints,
+                                     foreign_include=foreign_include,
+                                     exclude_primary_key=no_primary_key)
+    writer = _ModuleWriter(references)
+    writer.used_names.update(['crud_models', 'SCHEMA_FINGERPRINT'])
+    crud_models_source = writer.value_source(crud_models)
+    header = [f'# the models of {db_model}, generated by {__name__}, do not edit',
+              f'# crud_methods: {", ".join(i.value for i in crud_methods)}',
+              f'# sql_type: {SqlType(sql_type).value}, exclude_columns: {exclude_columns or []}, '
+              f'foreign_include: {list(paths[1:])}']
+    tail = ['# the schema fingerprint of the tables and the options, they are changed if it is not the same as',
+            '# schema_fingerprint() of them',
+            f'SCHEMA_FINGERPRINT = {fingerprint!r}',
+            '',
+            f'crud_models = {crud_models_source}',
+            # crud_router_builder compares it with the schema fingerprint of the tables of the router
+            'crud_models.SCHEMA_FINGERPRINT = SCHEMA_FINGERPRINT']
+    return writer.source(header, tail)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog=f'python -m {__name__}',
+                                     description='Generate the module of the models of crud_router_builder')
+    parser.add_argument('db_model', help='the path of the table or the declarative model, e.g. app.models:User')
+    parser.add_argument('--crud-methods', nargs='+', required=True, choices=[i.name for i in CrudMethods])
+    parser.add_argument('--sql-type', default=SqlType.postgresql.value, choices=[i.value for i in SqlType])
+    parser.add_argument('--exclude-columns', nargs='*', default=[])
+    parser.add_argument('--foreign-include', nargs='*', default=[],
+                        help='the paths of the tables or the declarative models of foreign_include')
+    parser.add_argument('--output', help='the path of the generated module, it is printed without it')
+    args = parser.parse_args(argv)
+    source = generate_crud_models_module(args.db_model,
+                                         crud_methods=[CrudMethods[i] for i in args.crud_methods],
+                                         sql_type=SqlType(args.sql_type),
+                                         exclude_columns=args.exclude_columns,
+                                         foreign_include=args.foreign_include)
+    if not args.output:
+        print(source, end='')
+        return
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(source)
+
+
+if __name__ == '__main__':
+    main()
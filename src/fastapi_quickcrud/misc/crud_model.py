@@ -32,6 +32,8 @@ class CRUDModel(BaseModel):
     FIND_MANY_WITH_FOREIGN_TREE: Optional[Dict[CrudMethods, RequestResponseModel]]
     PRIMARY_KEY_NAME: Optional[str]
     UNIQUE_LIST: Optional[List[str]]
+    # the schema fingerprint of the tables the models are generated from, it is set by the generated modules
+    SCHEMA_FINGERPRINT: Optional[str]
 
     def get_available_request_method(self):
         return [i for i in self.dict(exclude_unset=True, ).keys() if i in ["GET", "POST", "PUT", "PATCH", "DELETE"]]
@@ -5,6 +5,14 @@ class FindOneApiNotRegister(HTTPException):
     pass
 
 
+class InvalidCursorException(HTTPException):
+    pass
+
+
+class BulkLoadFormatException(HTTPException):
+    pass
+
+
 class CRUDBuilderException(BaseException):
     pass
 
@@ -65,6 +73,26 @@ class InvalidRequestMethod(CRUDBuilderException):
     pass
 
 
+class JoinStrategyNotSupportedException(CRUDBuilderException):
+    pass
+
+
+class BulkLoadNotSupportedException(CRUDBuilderException):
+    pass
+
+
+class LazyRouterPrefixMissing(CRUDBuilderException):
+    pass
+
+
+class CodeGenerationException(CRUDBuilderException):
+    pass
+
+
+class SchemaFingerprintMismatchException(CRUDBuilderException):
+    pass
+
+
 #
 # class NotFoundError(MongoQueryError):
 #     def __init__(self, Collection: Type[ModelType], model: BaseModel):
@@ -0,0 +1,55 @@
+from typing import List, Optional
+
+from .type import DataFormat
+
+EXPORT_MEDIA_TYPES = {DataFormat.csv: 'text/csv',
+                      DataFormat.ndjson: 'application/x-ndjson'}
+# the size of the chunks of COPY TO STDOUT, and the count of them buffered before the response is sent
+COPY_CHUNK_SIZE = 64 * 1024
+COPY_QUEUE_SIZE = 16
+
+
+class CopyQuery(object):
+    """
+    the select of the export copied out by COPY (...) TO STDOUT WITH (FORMAT csv, HEADER).
+    the select is compiled with the positional bind params (%s), the args of them are bound by the driver,
+    mogrify of psycopg2 for copy_expert, or the $n params of copy_from_query of asyncpg
+    """
+
+    def __init__(self, *, select: str, args: list):
+        self.select = select
+        self.args = args
+
+    def sql(self) -> str:
+        return f'COPY ({self.select}) TO STDOUT WITH (FORMAT csv, HEADER)'
+
+    def numbered_select(self) -> str:
+        # the same as the cursor of the asyncpg dialect of SQLAlchemy, %% is %
+        return self.select % tuple(f'${i}' for i in range(1, len(self.args) + 1))
+
+
+class ChunkBuffer(object):
+    """
+    the buffer of the writes of COPY TO STDOUT (a write for each row), they are joined into the chunks of
+    at least chunk_size bytes
+    """
+
+    def __init__(self, chunk_size: int = COPY_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.data: List[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> Optional[bytes]:
+        self.data.append(data)
+        self.size += len(data)
+        if self.size >= self.chunk_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[bytes]:
+        if not self.data:
+            return None
+        chunk = b''.join(self.data)
+        self.data = []
+        self.size = 0
+        return chunk
@@ -0,0 +1,106 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+from starlette.routing import Match, NoMatchFound
+
+# the key of the materialized route matched by the lazy route in the scope of the request
+LAZY_ROUTE_SCOPE_KEY = 'fastapi_quickcrud.route'
+
+
+class LazyCRUDRoute(APIRoute):
+    """
+    the placeholder route of the crud router of a table, the router is built when a request matches
+    the prefix of it first, or when the routes are materialized by materialize_crud_routes, e.g. for the OpenAPI,
+    the build seconds of the router are in build_seconds.
+    it is an APIRoute, so it is copied by include_router with the prefix, the tags and the dependencies of the
+    including routers, the endpoint builds the router
+    """
+
+    def __init__(self, path: str, endpoint: Callable[[], APIRouter], **kwargs):
+        kwargs['methods'] = ['GET']
+        super().__init__(path, endpoint, **kwargs)
+        # the placeholder has no method, so it is skipped by the OpenAPI until it is replaced by the routes
+        self.methods = set()
+        self.routes: Optional[List[APIRoute]] = None
+        self.build_seconds: Optional[float] = None
+
+    def materialize(self) -> List[APIRoute]:
+        if self.routes is None:
+            start = time.perf_counter()
+            router = self.endpoint()
+            # the path of the placeholder is the prefix of the including routers and the prefix of the router
+            container = APIRouter()
+            container.include_router(router,
+                                     prefix=self.path[:len(self.path) - len(router.prefix)],
+                                     tags=self.tags,
+                                     dependencies=self.dependencies,
+                                     responses=self.responses,
+                                     callbacks=self.callbacks,
+                                     deprecated=self.deprecated,
+                                     include_in_schema=self.include_in_schema)
+            self.routes = container.routes
+            self.build_seconds = time.perf_counter() - start
+        return self.routes
+
+    def matches(self, scope):
+        if scope['type'] != 'http':
+            return Match.NONE, {}
+        path = scope['path']
+        if path != self.path and not path.startswith(self.path + '/'):
+            return Match.NONE, {}
+        partial = None
+        for route in self.materialize():
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return match, {**child_scope, LAZY_ROUTE_SCOPE_KEY: route}
+            if match == Match.PARTIAL and partial is None:
+                partial = match, {**child_scope, LAZY_ROUTE_SCOPE_KEY: route}
+        return partial or (Match.NONE, {})
+
+    async def handle(self, scope, receive, send):
+        await scope[LAZY_ROUTE_SCOPE_KEY].handle(scope, receive, send)
+
+    def url_path_for(self, name: str, **path_params):
+        for route in self.materialize():
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound()
+
+
+def materialize_crud_routes(app) -> Dict[str, float]:
+    """
+    replace the lazy routes of the app (or router) by the routes of them, return the build seconds of each router
+    by the path of it, the routers of a table may be included by several prefixes
+    """
+    router = getattr(app, 'router', app)
+    routes = []
+    build_seconds = {}
+    for route in router.routes:
+        if isinstance(route, LazyCRUDRoute):
+            routes += route.materialize()
+            build_seconds[route.path] = route.build_seconds
+        else:
+            routes.append(route)
+    router.routes[:] = routes
+    if getattr(app, 'openapi_schema', None) is not None:
+        app.openapi_schema = None
+    return build_seconds
+
+
+def lazy_openapi(app):
+    """
+    materialize the lazy routes of the app when the OpenAPI schema is generated first
+    """
+    openapi = app.openapi
+
+    def materialized_openapi():
+        if app.openapi_schema is None:
+            materialize_crud_routes(app)
+        return openapi()
+
+    app.openapi = materialized_openapi
+    return app
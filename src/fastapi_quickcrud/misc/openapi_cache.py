@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from enum import Enum
+
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+
+from .lazy_route import LazyCRUDRoute
+from .schema_builder import library_version, schema_fingerprint, _type_signature
+
+
+def _stable_repr(value) -> str:
+    """
+    the repr of an option of the router that is the same in every process, the objects (e.g. the session
+    dependency) are represented by their types, the tables are in the schema fingerprint already
+    """
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, Enum):
+        return f'{type(value).__name__}.{value.name}'
+    if isinstance(value, (list, tuple, set)):
+        return '[' + ','.join(_stable_repr(i) for i in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{_stable_repr(k)}:{_stable_repr(v)}' for k, v in value.items()) + '}'
+    if isinstance(value, type):
+        return _type_signature(value)
+    return _type_signature(type(value))
+
+
+def router_fingerprint(db_model, options: dict) -> str:
+    """
+    the fingerprint of the router of crud_router_builder built from the options, before the models are built
+    """
+    fingerprint = schema_fingerprint(db_model,
+                                     sql_type=options.get('sql_type', None),
+                                     exclude_columns=options.get('exclude_columns', None),
+                                     foreign_include=options.get('foreign_include', None))
+    signature = ','.join(f'{k}={_stable_repr(v)}' for k, v in sorted(options.items()))
+    return hashlib.sha1(f'{fingerprint}|{signature}'.encode()).hexdigest()
+
+
+def _model_signature(model) -> str:
+    if model is None:
+        return 'None'
+    fields = getattr(model, '__fields__', {})
+    return _type_signature(model) + repr([(name, repr(field.outer_type_)) for name, field in fields.items()])
+
+
+def _route_signature(route) -> str:
+    if isinstance(route, LazyCRUDRoute):
+        return repr(['lazy', route.path, route.tags, route.include_in_schema,
+                     getattr(route.endpoint, 'fingerprint', None)])
+    if not isinstance(route, APIRoute):
+        return repr([type(route).__name__, getattr(route, 'path', None)])
+    dependant = get_flat_dependant(route.dependant, skip_repeats=True)
+    params = [(i.name, i.alias, repr(i.outer_type_), i.required)
+              for i in dependant.path_params + dependant.query_params
+              + dependant.header_params + dependant.cookie_params]
+    return repr([route.path, sorted(route.methods), route.name, route.operation_id, route.summary,
+                 route.description, route.response_description, route.tags, route.deprecated,
+                 route.include_in_schema, route.status_code, sorted(map(str, route.responses)), params,
+                 _model_signature(route.response_model),
+                 _model_signature(route.body_field.type_ if route.body_field else None)])
+
+
+def openapi_fingerprint(app) -> str:
+    """
+    the digest of the app and the routes of it that the OpenAPI schema is generated from, the generated models
+    are named by the schema fingerprint of the tables, so it is the same in every process of the same app
+    """
+    signature = [library_version(), app.title, app.version, app.openapi_version, app.description,
+                 repr(app.openapi_tags), repr(app.servers), app.openapi_url]
+    signature += [_route_signature(route) for route in app.routes]
+    return hashlib.sha1('|'.join(map(str, signature)).encode()).hexdigest()
+
+
+def cached_openapi(app, cache_dir: str):
+    """
+    load the OpenAPI schema of the app from the cache directory by the fingerprint of the app, it is generated
+    and written into the directory if it is not found, so the workers of an app that is not changed
+    skip the generation of it. with lazy routers, call it after lazy_openapi(app), the lazy routers are
+    not built when the schema is loaded from the cache
+    """
+    openapi = app.openapi
+
+    def openapi_from_cache():
+        if app.openapi_schema is not None:
+            return app.openapi_schema
+        # the fingerprint of the routes before the lazy routes are materialized by the generation
+        path = os.path.join(cache_dir, f'openapi_{openapi_fingerprint(app)}.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                app.openapi_schema = json.load(f)
+            return app.openapi_schema
+        except (OSError, ValueError):
+            pass
+        schema = openapi()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=cache_dir, suffix='.tmp', delete=False,
+                                             encoding='utf-8') as f:
+                json.dump(schema, f)
+            # the other workers read the whole file or nothing
+            os.replace(f.name, path)
+        except OSError as e:
+            warnings.warn(f'The OpenAPI schema is not cached into {cache_dir}: {e}')
+        return schema
+
+    app.openapi = openapi_from_cache
+    return app
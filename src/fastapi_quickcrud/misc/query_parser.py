@@ -0,0 +1,76 @@
+from copy import copy, deepcopy
+from typing import Callable
+
+from fastapi import Request
+from fastapi.dependencies.utils import get_dependant, is_scalar_sequence_field
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+
+
+def request_query_parser(request_query_model) -> Callable:
+    """
+    the dependency that parses the request query model from the query string directly, the fields of the
+    model are coerced by the same fields as the dependency of the model in FastAPI, but only the fields
+    in the query string are validated, the others are the defaults of them
+    """
+    query_fields = {field.alias: field for field in get_dependant(path='', call=request_query_model).query_params}
+    # the errors are in the order of the fields, as the errors of the dependency
+    positions = {alias: position for position, alias in enumerate(query_fields)}
+    sequence_fields = {alias for alias, field in query_fields.items() if is_scalar_sequence_field(field)}
+    required_fields = [field for field in query_fields.values() if field.required]
+    # the defaults that are None are removed by the __post_init__ of the model, the lists are copied
+    defaults = {field.name: field.default for field in query_fields.values()
+                if not field.required and field.default is not None}
+    mutable_defaults = [name for name, default in defaults.items() if isinstance(default, (list, dict, set))]
+    post_init = getattr(request_query_model, '__post_init__', None)
+
+    async def parse_query(request: Request):
+        query_params = request.query_params
+        values = dict(defaults)
+        for name in mutable_defaults:
+            values[name] = deepcopy(values[name])
+        errors = []
+        for alias in query_params.keys():
+            field = query_fields.get(alias, None)
+            if field is None:
+                continue
+            value = query_params.getlist(alias) if alias in sequence_fields else query_params[alias]
+            value_, errors_ = field.validate(value, values, loc=('query', alias))
+            if isinstance(errors_, ErrorWrapper):
+                errors.append((positions[alias], [errors_]))
+            elif isinstance(errors_, list):
+                errors.append((positions[alias], errors_))
+            else:
+                values[field.name] = value_
+        for field in required_fields:
+            if field.alias not in query_params:
+                errors.append((positions[field.alias], [ErrorWrapper(MissingError(), loc=('query', field.alias))]))
+        if errors:
+            errors.sort(key=lambda error: error[0])
+            raise RequestValidationError([error for _, errors_ in errors for error in errors_])
+        query = request_query_model.__new__(request_query_model)
+        query.__dict__.update(values)
+        if post_init is not None:
+            post_init(query)
+        return query
+
+    return parse_query
+
+
+class QueryParserRoute(APIRoute):
+    """
+    the route of which the query dependency is solved by the query parser of the endpoint (query_parser),
+    instead of the dependency of the request query model, the dependency is kept in the OpenAPI schema
+    """
+
+    def get_route_handler(self):
+        dependant = self.dependant
+        parser_dependant = get_dependant(path=self.path_format, call=self.endpoint.query_parser, name='query')
+        self.dependant = copy(dependant)
+        self.dependant.dependencies = [parser_dependant if i.name == 'query' else i for i in dependant.dependencies]
+        try:
+            return super().get_route_handler()
+        finally:
+            self.dependant = dependant
@@ -0,0 +1,93 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON
+from pydantic.utils import lenient_issubclass
+
+
+def _isoformat(value):
+    # the values aggregated into json by the database are strings already
+    if isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _bytes_decode(value):
+    if isinstance(value, str):
+        return value
+    return value.decode()
+
+
+def _total_seconds(value):
+    return value.total_seconds()
+
+
+def _enum_value(value):
+    return value.value
+
+
+def scalar_converter(type_) -> Optional[Callable]:
+    """
+    the converter of a value of the type into the json value as pydantic encodes it, None if it is json already
+    """
+    if type_ is float or lenient_issubclass(type_, Decimal):
+        return float
+    if lenient_issubclass(type_, UUID):
+        return str
+    if lenient_issubclass(type_, (datetime, date, time)):
+        return _isoformat
+    if lenient_issubclass(type_, bytes):
+        return _bytes_decode
+    if lenient_issubclass(type_, timedelta):
+        return _total_seconds
+    if lenient_issubclass(type_, Enum):
+        return _enum_value
+    return None
+
+
+def field_converter(field) -> Optional[Callable]:
+    """
+    the converter of the value of a pydantic field, the nested models and the root models are converted recursively
+    """
+    if lenient_issubclass(field.type_, BaseModel):
+        root_field = field.type_.__fields__.get('__root__', None)
+        if root_field is not None:
+            converter = field_converter(root_field)
+        else:
+            converter = ResponseEncoder(field.type_).convert
+    else:
+        converter = scalar_converter(field.type_)
+    if converter is None or field.shape == SHAPE_SINGLETON:
+        return converter
+
+    def list_converter(values):
+        return [None if value is None else converter(value) for value in values]
+
+    return list_converter
+
+
+class ResponseEncoder(object):
+    """
+    convert the response dict of the rows into json values by the field types of the response model,
+    the converters are built once for the model, so the rows are not validated by pydantic again.
+    only the fields of the response model are returned, the other columns of the row (e.g. the exclude_columns
+    selected by the statement) are dropped as the validation of the response model drops them
+    """
+
+    def __init__(self, model):
+        self.fields = [(field.alias, field_converter(field)) for field in model.__fields__.values()]
+
+    def convert(self, row: dict) -> dict:
+        response = {}
+        for key, converter in self.fields:
+            if key not in row:
+                continue
+            value = row[key]
+            if value is not None and converter is not None:
+                value = converter(value)
+            response[key] = value
+        return response
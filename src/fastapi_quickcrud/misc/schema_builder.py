@@ -1,11 +1,17 @@
+import hashlib
+import threading
 import uuid
 import warnings
 from copy import deepcopy
 from dataclasses import (make_dataclass,
-                         field)
+                         field,
+                         fields,
+                         is_dataclass)
 from enum import auto
+from functools import partial
 from typing import (Optional,
-                    Any)
+                    Any,
+                    Callable)
 from typing import (Type,
                     Dict,
                     List,
@@ -111,6 +117,133 @@ def _to_require_but_default(model: Type[BaseModelT]) -> Type[BaseModelT]:
                         __config__=config)  # type: ignore[arg-type]
 
 
+def request_post_init(steps: list):
+    """
+    the __post_init__ of the request dataclass, the steps are the (function, *arguments) of it, they are
+    compiled into the normalizer of the dataclass by the first request, the steps are not complete until
+    the schema builder is done. the steps are kept on it for the generated code of the models
+    """
+    normalizers = {}
+
+    def __post_init__(self_object):
+        type_ = type(self_object)
+        normalizer = normalizers.get(type_, None)
+        if normalizer is None:
+            normalizer = normalizers[type_] = compile_request_normalizer(steps, type_)
+        normalizer(self_object)
+
+    __post_init__.steps = steps
+    return __post_init__
+
+
+def _normalizer_by_type(compile_: Callable[[type], Callable]) -> Callable:
+    # the items of the insert list are normalized by the normalizer of the type of them
+    normalizers = {}
+
+    def normalize(item):
+        type_ = type(item)
+        normalizer = normalizers.get(type_, None)
+        if normalizer is None:
+            normalizer = normalizers[type_] = compile_(type_)
+        normalizer(item)
+
+    return normalize
+
+
+def _compile_filter_none(dataclass_) -> Callable:
+    # the fields that are the FastAPI params (the defaults of them) if they are not received
+    param_fields = tuple(i.name for i in fields(dataclass_) if type(i.default).__module__ == 'fastapi.params')
+
+    def filter_none(request_or_response_object):
+        values = request_or_response_object.__dict__
+        for name in [name for name, value in values.items() if value is None]:
+            delattr(request_or_response_object, name)
+        for name in param_fields:
+            if name in values and type(values[name]).__module__ == 'fastapi.params':
+                delattr(request_or_response_object, name)
+
+    return filter_none
+
+
+def _compile_value_of_list_to_str(dataclass_, columns) -> Callable:
+    if isinstance(columns, str):
+        columns = [columns]
+    # the fields of the names containing the name of a column, e.g. id____list of the column id
+    str_fields = tuple(i.name for i in fields(dataclass_) if any(column in i.name for column in columns))
+
+    def value_of_list_to_str(request_or_response_object):
+        values = request_or_response_object.__dict__
+        for name in str_fields:
+            value_ = values.get(name, None)
+            if value_ is not None:
+                setattr(request_or_response_object, name,
+                        [str(i) for i in value_] if isinstance(value_, list) else str(value_))
+
+    return value_of_list_to_str
+
+
+def _compile_assign_join_table_instance(join_table_mapping) -> Callable:
+    def assign_join_table_instance(request_or_response_object):
+        values = request_or_response_object.__dict__
+        if 'join_foreign_table' in values:
+            setattr(request_or_response_object, 'join_foreign_table',
+                    {str(join_table): join_table_mapping[join_table]
+                     for join_table in values['join_foreign_table'] if join_table in join_table_mapping})
+
+    return assign_join_table_instance
+
+
+def compile_request_normalizer(steps: list, dataclass_) -> Callable:
+    """
+    the normalizer of the requests of the dataclass, the same as calling the steps in order, the fields
+    of the uuid columns and the fields that may be the FastAPI params are found once for the dataclass,
+    so the request is not deep copied and the names of the fields are not matched by every request
+    """
+    if not is_dataclass(dataclass_):
+        return partial(_call_steps, steps=steps)
+    insert = 'insert' in {i.name for i in fields(dataclass_)}
+    compiled = []
+    for function, *arguments in steps:
+        if function is _filter_none:
+            compile_ = _compile_filter_none
+        elif function is ApiParameterSchemaBuilder._value_of_list_to_str:
+            compile_ = partial(_compile_value_of_list_to_str, columns=arguments[0])
+        elif function is ApiParameterSchemaBuilder._assign_join_table_instance and not insert:
+            compiled.append(_compile_assign_join_table_instance(arguments[0]))
+            continue
+        else:
+            compiled.append(partial(_call_step, function=function, arguments=arguments))
+            continue
+        if insert:
+            # the items of the insert list are normalized instead of the request
+            compiled.append(partial(_normalize_insert, normalize_item=_normalizer_by_type(compile_)))
+        else:
+            compiled.append(compile_(dataclass_))
+    compiled = tuple(compiled)
+
+    def normalize(request_or_response_object):
+        for normalize_ in compiled:
+            normalize_(request_or_response_object)
+
+    return normalize
+
+
+def _call_step(request_or_response_object, function, arguments):
+    function(request_or_response_object, *arguments)
+
+
+def _call_steps(request_or_response_object, steps):
+    for function, *arguments in steps:
+        function(request_or_response_object, *arguments)
+
+
+def _normalize_insert(request_or_response_object, normalize_item):
+    insert = list(request_or_response_object.__dict__['insert'])
+    for item in insert:
+        normalize_item(item)
+    setattr(request_or_response_object, 'insert', insert)
+
+
 def _filter_none(request_or_response_object):
     received_request = deepcopy(request_or_response_object.__dict__)
     if 'insert' in received_request:
@@ -135,12 +268,355 @@ def _filter_none(request_or_response_object):
                 delattr(request_or_response_object, name)
 
 
+# the columns of the types found by the field extraction of the schema builder
+TYPE_COLUMNS = ('uuid_type_columns',
+                'str_type_columns',
+                'number_type_columns',
+                'datetime_type_columns',
+                'timedelta_type_columns',
+                'bool_type_columns',
+                'json_type_columns',
+                'array_type_columns')
+
+
+class SchemaAnalysisCache(object):
+    """
+    the analysis of the tables shared by the schema builders of many routers, e.g. by metadata_crud_router_builder,
+    the fields and the foreign tables (and the response models of them) of a table are analysed once,
+    the columns of the types and the response models found by the analysis are replayed into the builders
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._analysis = {}
+
+    def get_or_build(self, key, builder):
+        analysis = self._analysis.get(key, None)
+        if analysis is None:
+            self.misses += 1
+            analysis = builder()
+            self._analysis[key] = analysis
+        else:
+            self.hits += 1
+        return analysis
+
+    def clear(self) -> None:
+        self._analysis.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._analysis)}
+
+    def __len__(self):
+        return len(self._analysis)
+
+
+def _type_signature(type_) -> str:
+    if isinstance(type_, type):
+        return f'{type_.__module__}.{type_.__qualname__}'
+    return repr(type_)
+
+
+class ForeignResponseModelRegistry(object):
+    """
+    the response models of the foreign tables shared by all the routers, keyed by the table name and the fields
+    (the names and the types of the columns), so a table joined by many routers has one item model and one list model
+    in the process and in the OpenAPI, the name of the model is the digest of the fields instead of a random uuid
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._models = {}
+        self._lock = threading.RLock()
+
+    def _get_or_create(self, key, create):
+        with self._lock:
+            model = self._models.get(key, None)
+            if model is None:
+                self.misses += 1
+                model = create()
+                self._models[key] = model
+            else:
+                self.hits += 1
+            return model
+
+    @staticmethod
+    def _digest(table_name: str, fields: Tuple[Tuple[str, Any], ...]) -> str:
+        signature = ','.join(f'{name}:{_type_signature(type_)}' for name, type_ in fields)
+        return hashlib.sha1(f'{table_name}({signature})'.encode()).hexdigest()[:12]
+
+    def item_model(self, table_name: str, fields: Tuple[Tuple[str, Any], ...]) -> Type[BaseModel]:
+        def create():
+            response_model_dataclass = make_dataclass(
+                f'foreign_{table_name}_{self._digest(table_name, fields)}_FindManyResponseItemModel',
+                [(name, type_, None) for name, type_ in fields],
+            )
+            response_item_model = _model_from_dataclass(response_model_dataclass)
+            return _add_orm_model_config_into_pydantic_model(response_item_model,
+                                                             config=OrmConfig)
+
+        return self._get_or_create(('item', table_name, fields), create)
+
+    def list_model(self, table_name: str, fields: Tuple[Tuple[str, Any], ...], *, nullable: bool,
+                   model_name_suffix: str) -> Type[BaseModel]:
+        def create():
+            response_item_model = self.item_model(table_name, fields)
+            item_list = Union[List[response_item_model], None] if nullable else List[response_item_model]
+            return create_model(
+                f'foreign_{table_name}_{self._digest(table_name, fields)}_{model_name_suffix}',
+                **{'__root__': (item_list, None)}
+            )
+
+        return self._get_or_create(('list', table_name, fields, nullable, model_name_suffix), create)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._models)}
+
+    def __len__(self):
+        return len(self._models)
+
+
+foreign_response_model_registry = ForeignResponseModelRegistry()
+
+# the version of the fingerprint, change it if the generated models change without a change of the tables
+SCHEMA_FINGERPRINT_VERSION = 1
+
+
+def library_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version('fastapi_quickcrud')
+    except Exception:
+        return 'unknown'
+
+
+def _constraints_signature(constraints) -> str:
+    return repr(sorted(f'{type(i).__name__}{sorted(i.columns.keys())}' for i in constraints or []))
+
+
+def _default_signature(default) -> str:
+    '''
+    the default of a column without the memory addresses in the repr of it, the callables are represented
+    by the names of them, and the clauses by the SQL of them
+    '''
+    if not hasattr(default, 'arg'):
+        # None or a Sequence
+        return repr(default)
+    arg = default.arg
+    if getattr(default, 'is_callable', False):
+        # the callable is wrapped by SQLAlchemy, the wrapper has the module and the name of it
+        name = getattr(arg, '__qualname__', getattr(arg, '__name__', None))
+        arg = f'callable:{getattr(arg, "__module__", None)}.{name}'
+    elif hasattr(arg, 'compile'):
+        arg = f'clause:{arg}'
+    else:
+        arg = repr(arg)
+    return f'{type(default).__name__}({arg})'
+
+
+def _table_signature(table: Table) -> str:
+    columns = ','.join(f'{column.key}:{column.type!r}:{column.nullable}:{column.primary_key}:{column.unique}:'
+                       f'{_default_signature(column.default)}:{_default_signature(column.server_default)}:'
+                       f'{column.comment!r}:'
+                       f'{sorted(i.target_fullname for i in column.foreign_keys)}'
+                       for column in table.c)
+    return f'{table.fullname}({columns}){_constraints_signature(table.constraints)}'
+
+
+def schema_fingerprint(db_model, *, sql_type, exclude_columns=None, constraints=None, foreign_include=None,
+                       exclude_primary_key=False) -> str:
+    """
+    the digest of the tables and the options the models of db_model are built from, with the library version,
+    the names of the generated models are made from it, so they are the same in every process (e.g. every worker)
+    as long as the tables and the options are the same
+    """
+    db_model, _ = convert_table_to_model(db_model)
+    tables = [db_model.__table__]
+    tables += [convert_table_to_model(i)[0].__table__ for i in foreign_include or []]
+    if not exclude_primary_key:
+        tables += [relationship.target for relationship in inspect(db_model).relationships]
+    signature = '|'.join([str(SCHEMA_FINGERPRINT_VERSION),
+                          library_version(),
+                          str(getattr(sql_type, 'value', sql_type)),
+                          repr(sorted(exclude_columns or [])),
+                          _constraints_signature(constraints),
+                          str(exclude_primary_key)]
+                         + [_table_signature(table) for table in tables])
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+
+def model_name_key(fingerprint: str, crud_methods=None, options_fingerprint: Optional[str] = None) -> str:
+    """
+    the key in the names of the generated models, the digest of the schema fingerprint, the crud methods and
+    the fingerprint of the options of the router, so the routers of the same table in an app have their own names,
+    and the names are the same in every process whatever the build order of the routers is
+    """
+    signature = [fingerprint, repr([getattr(i, 'value', i) for i in crud_methods or []]), str(options_fingerprint)]
+    return hashlib.sha1('|'.join(signature).encode()).hexdigest()[:12]
+
+
+def foreign_key_join_tables(table: Table) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    the join tables of the foreign keys of the columns of the table, and the foreign tables of the local columns
+    """
+    foreign_key_table = {}
+    reference_mapper = {}
+    for column in table.c:
+        if column.foreign_keys:
+            foreign_column, = column.foreign_keys
+            foreign_table = foreign_column.column.table
+            foreign_table_name = str(foreign_table.__str__())
+            local = str(foreign_column.parent).split('.')
+            reference = foreign_column.target_fullname.split('.')
+            local_reference_pairs = [{'local': {"local_table": local[0],
+                                                "local_column": local[1]},
+                                      "reference": {"reference_table": reference[0],
+                                                    "reference_column": reference[1]},
+                                      'reference_table': foreign_table,
+                                      'reference_table_columns': foreign_table.c,
+                                      'local_table': foreign_column.parent.table,
+                                      'local_table_columns': foreign_column.parent.table.c}]
+
+            reference_mapper[local[1]] = {"foreign_table": foreign_table_name,
+                                          "foreign_table_name": foreign_table_name}
+            foreign_key_table[foreign_table_name] = {'local_reference_pairs_set': local_reference_pairs,
+                                                     'instance': foreign_table,
+                                                     'db_column': foreign_table}
+    return foreign_key_table, reference_mapper
+
+
+def relationship_join_tables(model) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    the join tables of the relationships of the declarative model, and the foreign tables of the local columns
+    """
+    mapper = inspect(model)
+    foreign_key_table = {}
+    reference_mapper = {}
+    for r in mapper.relationships:
+        local, = r.local_columns
+        local = mapper.get_property_by_column(local).expression
+        local_table = str(local).split('.')[0]
+        local_column = str(local).split('.')[1]
+        local_table_instance = local.table
+
+        foreign_table = r.mapper.class_
+        foreign_table_name = foreign_table.__tablename__
+        foreign_secondary_table_name = ''
+        if r.secondary_synchronize_pairs:
+            # foreign_table_name = r.secondary.key
+            foreign_secondary_table_name = str(r.secondary.key)
+
+        local_reference_pairs = []
+        for i in r.synchronize_pairs:
+            for column in i:
+                table_name_ = str(column).split('.')[0]
+                column_name_ = str(column).split('.')[1]
+                if table_name_ not in [foreign_secondary_table_name, foreign_table_name]:
+                    continue
+
+                reference_table = table_name_
+                reference_column = column_name_
+                reference_table_instance = column.table
+                if r.secondary_synchronize_pairs:
+
+                    exclude = True
+                else:
+
+                    reference_mapper[local_column] = {"foreign_table": foreign_table,
+                                                      "foreign_table_name": foreign_table_name}
+                    exclude = False
+                local_reference_pairs.append({'local': {"local_table": local_table,
+                                                        "local_column": local_column},
+                                              "reference": {"reference_table": reference_table,
+                                                            "reference_column": reference_column},
+                                              'local_table': local_table_instance,
+                                              'local_table_columns': local_table_instance.c,
+                                              'reference_table': reference_table_instance,
+                                              'reference_table_columns': reference_table_instance.c,
+                                              'exclude': exclude})
+        for i in r.secondary_synchronize_pairs:
+            local_table_: str = None
+            local_column_: str = None
+            reference_table_: str = None
+            reference_column_: str = None
+            local_table_instance_: Table = None
+            reference_table_instance_: Table = None
+            for column in i:
+
+                table_name_ = str(column).split('.')[0]
+                column_name_ = str(column).split('.')[1]
+                if table_name_ == foreign_secondary_table_name:
+                    local_table_ = str(column).split('.')[0]
+                    local_column_ = str(column).split('.')[1]
+                    local_table_instance_ = column.table
+                if table_name_ == foreign_table_name:
+                    reference_table_ = str(column).split('.')[0]
+                    reference_column_ = str(column).split('.')[1]
+                    reference_table_instance_ = column.table
+
+            reference_mapper[local_column_] = {"foreign_table": foreign_table,
+                                                    "foreign_table_name": foreign_table_name}
+            local_reference_pairs.append({'local': {"local_table": local_table_,
+                                                    "local_column": local_column_},
+                                          "reference": {"reference_table": reference_table_,
+                                                        "reference_column": reference_column_},
+                                          'local_table': local_table_instance_,
+                                          'local_table_columns': local_table_instance_.c,
+                                          'reference_table': reference_table_instance_,
+                                          'reference_table_columns': reference_table_instance_.c,
+                                          'exclude': False})
+
+        foreign_key_table[foreign_table_name] = {'local_reference_pairs_set': local_reference_pairs,
+                                                 'instance': foreign_table,
+                                                 'db_column': foreign_table}
+    return foreign_key_table, reference_mapper
+
+
+def join_table_mapping(owners: Dict[str, Any]) -> Dict[str, dict]:
+    """
+    the join tables by the names, each of them is found in the relationships (or the foreign keys of a Table)
+    of the owner of it, it is the join_foreign_table mapping of the generated code
+    """
+    mapping = {}
+    for table_name, owner in owners.items():
+        if isinstance(owner, Table):
+            join_tables, _ = foreign_key_join_tables(owner)
+        else:
+            join_tables, _ = relationship_join_tables(owner)
+        mapping[table_name] = join_tables[table_name]
+    return mapping
+
+
 class ApiParameterSchemaBuilder:
     unsupported_data_types = ["BLOB"]
     partial_supported_data_types = ["INTERVAL", "JSON", "JSONB"]
 
     def __init__(self, db_model: Type, sql_type, exclude_column=None, constraints=None, exclude_primary_key=False,
-                 foreign_include=False):
+                 foreign_include=False, analysis_cache: Optional[SchemaAnalysisCache] = None, crud_methods=None,
+                 options_fingerprint: Optional[str] = None):
+        self.analysis_cache = analysis_cache
+        self.fingerprint = schema_fingerprint(db_model,
+                                              sql_type=sql_type,
+                                              exclude_columns=exclude_column,
+                                              constraints=constraints,
+                                              foreign_include=foreign_include,
+                                              exclude_primary_key=exclude_primary_key)
+        self.model_name_key = model_name_key(self.fingerprint, crud_methods, options_fingerprint)
+        # the names built twice by the builder are numbered in the build order of it, it is fixed by the crud methods
+        self._model_names: Dict[str, int] = {}
         self.constraints = constraints
         self.exclude_primary_key = exclude_primary_key
         if exclude_column is None:
@@ -159,9 +635,6 @@ class ApiParameterSchemaBuilder:
             self.db_name: str = db_model.__tablename__
             self.__columns = db_model.__table__.c
         model = self.__db_model
-        self.primary_key_str, self._primary_key_dataclass_model, self._primary_key_field_definition \
-            = self._extract_primary()
-        self.unique_fields: List[str] = self._extract_unique()
         self.uuid_type_columns = []
         self.str_type_columns = []
         self.number_type_columns = []
@@ -170,6 +643,9 @@ class ApiParameterSchemaBuilder:
         self.bool_type_columns = []
         self.json_type_columns = []
         self.array_type_columns = []
+        self.primary_key_str, self._primary_key_dataclass_model, self._primary_key_field_definition \
+            = self._extract_primary()
+        self.unique_fields: List[str] = self._extract_unique()
         self.foreign_table_response_model_sets: Dict[TableNameT, ResponseModelT] = {}
         self.all_field: List[dict] = self._extract_all_field()
         self.sql_type = sql_type
@@ -177,10 +653,22 @@ class ApiParameterSchemaBuilder:
         if not foreign_include:
             foreign_include = []
         self.foreign_include = foreign_include
-        self.foreign_mapper = self.__foreign_mapper_builder()
-        self.relation_level = self._extra_relation_level()
+        self.foreign_mapper = self._cached_analysis(('foreign_mapper', self.exclude_primary_key)
+                                                    + tuple(self.foreign_include),
+                                                    self.__foreign_mapper_builder)
+        self.relation_level = self._cached_analysis(('relation_level', self.__db_model)
+                                                    + tuple(self.foreign_mapper),
+                                                    self._extra_relation_level)
         self.table_of_foreign, self.reference_mapper = self.extra_foreign_table()
 
+    def _model_name(self, name: str) -> str:
+        name = f'{self.db_name}_{self.model_name_key}_{name}'
+        count = self._model_names.get(name, 0) + 1
+        self._model_names[name] = count
+        if count == 1:
+            return name
+        return f'{name}_{count}'
+
     def __foreign_mapper_builder(self):
         foreign_mapper = {}
         if self.exclude_primary_key:
@@ -212,13 +700,39 @@ class ApiParameterSchemaBuilder:
         else:
             return self.__get_table_name_from_model(table)
 
+    def _cached_analysis(self, key, analyse):
+        '''
+        the analysis of the shared cache, the columns of the types and the foreign response models added by it
+        are recorded in the cache and added into the builder again when it is hit
+        '''
+        if self.analysis_cache is None:
+            return analyse()
+
+        def analyse_with_side_effects():
+            type_columns = {name: len(getattr(self, name)) for name in TYPE_COLUMNS}
+            response_models = set(self.foreign_table_response_model_sets)
+            result = analyse()
+            type_columns = {name: getattr(self, name)[length:] for name, length in type_columns.items()}
+            response_models = {k: v for k, v in self.foreign_table_response_model_sets.items()
+                               if k not in response_models}
+            return result, type_columns, response_models
+
+        result, type_columns, response_models = self.analysis_cache.get_or_build(key + (tuple(self._exclude_column),),
+                                                                                 analyse_with_side_effects)
+        for name, columns in type_columns.items():
+            getattr(self, name).extend(columns)
+        self.foreign_table_response_model_sets.update(response_models)
+        return result
+
     def extra_foreign_table(self, db_model=None) -> Dict[ForeignKeyName, dict]:
         if db_model is None:
             db_model = self.__db_model
         if self.exclude_primary_key:
-            return self._extra_foreign_table_from_table()
+            return self._cached_analysis(('foreign_table_from_table', self.__db_model_table),
+                                         self._extra_foreign_table_from_table)
         else:
-            return self._extra_foreign_table_from_declarative_base(db_model)
+            return self._cached_analysis(('foreign_table_from_declarative_base', db_model),
+                                         lambda: self._extra_foreign_table_from_declarative_base(db_model))
 
     def _extract_primary(self, db_model_table=None) -> Union[tuple, Tuple[Union[str, Any],
                                                                           DataClassT,
@@ -276,15 +790,14 @@ class ApiParameterSchemaBuilder:
         primary_column_name = str(primary_key_column.key)
         primary_field_definitions = (primary_column_name, column_type, default)
 
-        primary_columns_model: DataClassT = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PrimaryKeyModel',
+        request_validation = [(self._value_of_list_to_str, self.uuid_type_columns)]
+        primary_columns_model: DataClassT = make_dataclass(self._model_name('PrimaryKeyModel'),
                                                            [(primary_field_definitions[0],
                                                              primary_field_definitions[1],
                                                              Query(primary_field_definitions[2],
                                                                    description=description))],
                                                            namespace={
-                                                               '__post_init__': lambda
-                                                                   self_object: self._value_of_list_to_str(
-                                                                   self_object, self.uuid_type_columns)
+                                                               '__post_init__': request_post_init(request_validation)
                                                            })
 
         assert primary_column_name and primary_columns_model and primary_field_definitions
@@ -328,13 +841,16 @@ class ApiParameterSchemaBuilder:
         return column.comment
 
     def _extract_all_field(self, columns=None) -> List[dict]:
-        fields: List[dict] = []
         if not columns:
             columns = self.__columns
         elif isinstance(columns, DeclarativeMeta):
             columns = columns.__table__.c
         elif isinstance(columns, Table):
             columns = columns.c
+        return self._cached_analysis(('all_field',) + tuple(columns), lambda: self._extract_fields(columns))
+
+    def _extract_fields(self, columns) -> List[dict]:
+        fields: List[dict] = []
         for column in columns:
             column_name = str(column.key)
             column_foreign = [i.target_fullname for i in column.foreign_keys]
@@ -411,75 +927,17 @@ class ApiParameterSchemaBuilder:
         return fields
 
     def _extra_foreign_table_from_table(self) -> Dict[str, Table]:
-        foreign_key_table = {}
-        reference_mapper = {}
-        for column in self.__columns:
-            if column.foreign_keys:
-                foreign_column, = column.foreign_keys
-                foreign_table = foreign_column.column.table
-                all_fields_ = self._extract_all_field(foreign_table.c)
-                foreign_table_name = str(foreign_table.__str__())
-                local = str(foreign_column.parent).split('.')
-                reference = foreign_column.target_fullname.split('.')
-
-                class BaseClass(object):
-                    def __init__(self):
-                        pass
-
-                TableClass = type(f'{foreign_table_name}', (BaseClass,), {})
-                # table_class = mapper(TableClass, foreign_table)
-
-                local_reference_pairs = [{'local': {"local_table": local[0],
-                                                    "local_column": local[1]},
-                                          "reference": {"reference_table": reference[0],
-                                                        "reference_column": reference[1]},
-                                          'reference_table': foreign_table,
-                                          'reference_table_columns': foreign_table.c,
-                                          'local_table': foreign_column.parent.table,
-                                          'local_table_columns': foreign_column.parent.table.c}]
-
-                reference_mapper[local[1]] = {"foreign_table": foreign_table_name,
-                                              "foreign_table_name": foreign_table_name}
-                # foreign_key_table[foreign_table_name] = foreign_table
-                # all_column = {}
-                column_label = {}
-                for i in foreign_table.c:
-                    column_name = str(i).split('.')[1]
-                    setattr(TableClass, column_name, i)
-                    column_label[column_name] = i
-
-                foreign_key_table[foreign_table_name] = {'local_reference_pairs_set': local_reference_pairs,
-                                                         'fields': all_fields_,
-                                                         'instance': foreign_table,
-                                                         'db_column': TableClass,
-                                                         'column_label': column_label}
-
-                response_fields = []
-                for i in all_fields_:
-                    response_fields.append((i['column_name'],
-                                            i['column_type'],
-                                            None))
-                response_model_dataclass = make_dataclass(
-                    f'foreign_{foreign_table_name + str(uuid.uuid4())}_FindManyResponseItemModel',
-                    response_fields,
-                )
-                response_item_model = _model_from_dataclass(response_model_dataclass)
-
-                response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model,
-                                                                                config=OrmConfig)
-                # response_item_model = _add_validators(response_item_model,
-                #                                            config=OrmConfig)
-                response_model = create_model(
-                    f'foreign_{foreign_table_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
-                    **{'__root__': (List[response_item_model], None)}
-                )
-
-                self.foreign_table_response_model_sets[foreign_table_name] = response_model
-                foreign_key_table[foreign_table_name] = {'local_reference_pairs_set': local_reference_pairs,
-                                                         'fields': all_fields_,
-                                                         'instance': foreign_table,
-                                                         'db_column': foreign_table}
-
+        foreign_key_table, reference_mapper = foreign_key_join_tables(self.__db_model_table)
+        for foreign_table_name, join_table in foreign_key_table.items():
+            all_fields_ = self._extract_all_field(join_table['instance'].c)
+            join_table['fields'] = all_fields_
+            response_fields = tuple((i['column_name'], i['column_type']) for i in all_fields_)
+            response_model = foreign_response_model_registry.list_model(
+                foreign_table_name,
+                response_fields,
+                nullable=False,
+                model_name_suffix='UpsertManyResponseListModel')
+            self.foreign_table_response_model_sets[foreign_table_name] = response_model
         return foreign_key_table, reference_mapper
 
     def _extra_relation_level(self, model=None, processed_table=None) -> Dict[str, Table]:
@@ -504,134 +962,18 @@ class ApiParameterSchemaBuilder:
         return relation_level
 
     def _extra_foreign_table_from_declarative_base(self, model) -> Dict[str, Table]:
-        mapper = inspect(model)
-        foreign_key_table = {}
-        reference_mapper = {}
-        for r in mapper.relationships:
-            local, = r.local_columns
-            local = mapper.get_property_by_column(local).expression
-            local_table = str(local).split('.')[0]
-            local_column = str(local).split('.')[1]
-            local_table_instance = local.table
-
-            foreign_table = r.mapper.class_
-            foreign_table_name = foreign_table.__tablename__
-            foreign_secondary_table_name = ''
-            if r.secondary_synchronize_pairs:
-                # foreign_table_name = r.secondary.key
-                foreign_secondary_table_name = str(r.secondary.key)
-
-            local_reference_pairs = []
-            '''
-                        for i in r.synchronize_pairs:
-                if r.secondary_synchronize_pairs:
-                    local = str(i[0]).split('.')
-                    reference = str(i[1]).split('.')
-                    local_table_instance = i[0].table
-                    reference_table_instance = i[1].table
-                else:
-                    local = str(r.local).split('.')
-                    reference = str(i[0]).split('.')
-                    local_table_instance = r.local.table
-                    reference_table_instance = i[0].table
-                local_table = local[0]
-                local_column = local[1]
-                reference_table = reference[0]
-                reference_column = reference[1]
-                self.reference_mapper[local_column] = foreign_table_name
-                local_reference_pairs.append({'local': {"local_table": local_table,
-                                                        "local_column": local_column},
-                                              "reference": {"reference_table": reference_table,
-                                                            "reference_column": reference_column},
-                                              'local_table': local_table_instance,
-                                              'local_table_columns': local_table_instance.c,
-                                              'reference_table': reference_table_instance,
-                                              'reference_table_columns': reference_table_instance.c})
-
-            '''
-            for i in r.synchronize_pairs:
-                for column in i:
-                    table_name_ = str(column).split('.')[0]
-                    column_name_ = str(column).split('.')[1]
-                    if table_name_ not in [foreign_secondary_table_name, foreign_table_name]:
-                        continue
-
-                    reference_table = table_name_
-                    reference_column = column_name_
-                    reference_table_instance = column.table
-                    if r.secondary_synchronize_pairs:
-
-                        exclude = True
-                    else:
-
-                        reference_mapper[local_column] = {"foreign_table": foreign_table,
-                                                          "foreign_table_name": foreign_table_name}
-                        exclude = False
-                    local_reference_pairs.append({'local': {"local_table": local_table,
-                                                            "local_column": local_column},
-                                                  "reference": {"reference_table": reference_table,
-                                                                "reference_column": reference_column},
-                                                  'local_table': local_table_instance,
-                                                  'local_table_columns': local_table_instance.c,
-                                                  'reference_table': reference_table_instance,
-                                                  'reference_table_columns': reference_table_instance.c,
-                                                  'exclude': exclude})
-            for i in r.secondary_synchronize_pairs:
-                local_table_: str = None
-                local_column_: str = None
-                reference_table_: str = None
-                reference_column_: str = None
-                local_table_instance_: Table = None
-                reference_table_instance_: Table = None
-                for column in i:
-
-                    table_name_ = str(column).split('.')[0]
-                    column_name_ = str(column).split('.')[1]
-                    if table_name_ == foreign_secondary_table_name:
-                        local_table_ = str(column).split('.')[0]
-                        local_column_ = str(column).split('.')[1]
-                        local_table_instance_ = column.table
-                    if table_name_ == foreign_table_name:
-                        reference_table_ = str(column).split('.')[0]
-                        reference_column_ = str(column).split('.')[1]
-                        reference_table_instance_ = column.table
-
-                reference_mapper[local_column_] = {"foreign_table": foreign_table,
-                                                        "foreign_table_name": foreign_table_name}
-                local_reference_pairs.append({'local': {"local_table": local_table_,
-                                                        "local_column": local_column_},
-                                              "reference": {"reference_table": reference_table_,
-                                                            "reference_column": reference_column_},
-                                              'local_table': local_table_instance_,
-                                              'local_table_columns': local_table_instance_.c,
-                                              'reference_table': reference_table_instance_,
-                                              'reference_table_columns': reference_table_instance_.c,
-                                              'exclude': False})
-
+        foreign_key_table, reference_mapper = relationship_join_tables(model)
+        for foreign_table_name, join_table in foreign_key_table.items():
+            foreign_table = join_table['instance']
             all_fields_ = self._extract_all_field(foreign_table.__table__.c)
-            response_fields = []
-            for i in all_fields_:
-                response_fields.append((i['column_name'],
-                                        i['column_type'],
-                                        None))
-            response_model_dataclass = make_dataclass(
-                f'foreign_{foreign_table_name + str(uuid.uuid4())}_FindManyResponseItemModel',
+            join_table['fields'] = all_fields_
+            response_fields = tuple((i['column_name'], i['column_type']) for i in all_fields_)
+            response_model = foreign_response_model_registry.list_model(
+                foreign_table_name,
                 response_fields,
-            )
-            response_item_model = _model_from_dataclass(response_model_dataclass)
-
-            response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model,
-                                                                            config=OrmConfig)
-
-            response_model = create_model(
-                f'foreign_{foreign_table_name + str(uuid.uuid4())}_GetManyResponseForeignModel',
-                **{'__root__': (Union[List[response_item_model], None], None)}
-            )
+                nullable=True,
+                model_name_suffix='GetManyResponseForeignModel')
             self.foreign_table_response_model_sets[foreign_table] = response_model
-            foreign_key_table[foreign_table_name] = {'local_reference_pairs_set': local_reference_pairs,
-                                                     'fields': all_fields_,
-                                                     'instance': foreign_table,
-                                                     'db_column': foreign_table}
         return foreign_key_table, reference_mapper
 
     @staticmethod
@@ -785,7 +1127,7 @@ class ApiParameterSchemaBuilder:
             table_of_foreign = self.table_of_foreign
         if not self.table_of_foreign:
             return result_
-        table_name_enum = StrEnum('TableName' + str(uuid.uuid4()),
+        table_name_enum = StrEnum(self._model_name('TableName'),
                                   {table_name: auto() for table_name in table_of_foreign})
 
         result_.append(('join_foreign_table', Optional[List[table_name_enum]], Query(None)))
@@ -845,7 +1187,7 @@ class ApiParameterSchemaBuilder:
         return result_
 
     def upsert_one(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         request_fields = []
         response_fields = []
 
@@ -857,7 +1199,7 @@ class ApiParameterSchemaBuilder:
                                  description='update_columns should contain which columns you want to update '
                                              'when the unique columns got conflict'))
         conflict_model = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_Upsert_one_request_update_columns_when_conflict_request_body_model',
+            self._model_name('Upsert_one_request_update_columns_when_conflict_request_body_model'),
             [conflict_columns])
         on_conflict_handle = [('on_conflict', Optional[conflict_model],
                                Body(None))]
@@ -874,17 +1216,15 @@ class ApiParameterSchemaBuilder:
 
         # Ready the uuid to str validator
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
         #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Upsert_one_request_model',
+        request_body_model = make_dataclass(self._model_name('Upsert_one_request_model'),
                                             request_fields + on_conflict_handle,
                                             namespace={
-                                                '__post_init__': lambda self_object: [i(self_object)
-                                                                                      for i in request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Upsert_one_response_model',
+        response_model_dataclass = make_dataclass(self._model_name('Upsert_one_response_model'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -904,7 +1244,7 @@ class ApiParameterSchemaBuilder:
                                  description='update_columns should contain which columns you want to update '
                                              'when the unique columns got conflict'))
         conflict_model = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_Upsert_many_request_update_columns_when_conflict_request_body_model',
+            self._model_name('Upsert_many_request_update_columns_when_conflict_request_body_model'),
             [conflict_columns])
         on_conflict_handle = [('on_conflict', Optional[conflict_model],
                                Body(None))]
@@ -919,29 +1259,26 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
 
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
 
         insert_item_field_model_pydantic = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyInsertItemRequestModel',
+            self._model_name('UpsertManyInsertItemRequestModel'),
             insert_fields
         )
 
         # Create List Model with contains item
         insert_list_field = [('insert', List[insert_item_field_model_pydantic], Body(...))]
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyRequestBody',
+        request_body_model = make_dataclass(self._model_name('UpsertManyRequestBody'),
                                             insert_list_field + on_conflict_handle
                                             ,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]}
+                                                '__post_init__': request_post_init(request_validation)}
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseItemModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpsertManyResponseItemModel'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -949,14 +1286,14 @@ class ApiParameterSchemaBuilder:
         response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
+            self._model_name('UpsertManyResponseListModel'),
             **{'__root__': (List[response_item_model], None)}
         )
 
         return None, request_body_model, response_model
 
     def create_one(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         request_fields = []
         response_fields = []
 
@@ -973,17 +1310,15 @@ class ApiParameterSchemaBuilder:
 
         # Ready the uuid to str validator
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
         #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Create_one_request_model',
+        request_body_model = make_dataclass(self._model_name('Create_one_request_model'),
                                             request_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [i(self_object)
-                                                                                      for i in request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_Create_one_response_model',
+        response_model_dataclass = make_dataclass(self._model_name('Create_one_response_model'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -1005,29 +1340,26 @@ class ApiParameterSchemaBuilder:
                                     i['column_type'],
                                     Body(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
 
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
 
         insert_item_field_model_pydantic = make_dataclass(
-            f'{self.db_name + str(uuid.uuid4())}_CreateManyInsertItemRequestModel',
+            self._model_name('CreateManyInsertItemRequestModel'),
             insert_fields
         )
 
         # Create List Model with contains item
         insert_list_field = [('insert', List[insert_item_field_model_pydantic], Body(...))]
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_CreateManyRequestBody',
+        request_body_model = make_dataclass(self._model_name('CreateManyRequestBody'),
                                             insert_list_field
                                             ,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]}
+                                                '__post_init__': request_post_init(request_validation)}
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseItemModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpsertManyResponseItemModel'),
                                                   response_fields)
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
@@ -1035,28 +1367,38 @@ class ApiParameterSchemaBuilder:
         response_item_model = _add_orm_model_config_into_pydantic_model(response_item_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpsertManyResponseListModel',
+            self._model_name('UpsertManyResponseListModel'),
             **{'__root__': (List[response_item_model], None)}
         )
 
         return None, request_body_model, response_model
 
-    def find_many(self) -> Tuple:
+    def bulk_load(self) -> Tuple:
+        # the body is streamed, the rows of it are validated by the row model one by one
+        row_fields = {}
+        all_field = deepcopy(self.all_field)
+        for i in all_field:
+            row_fields[i['column_name']] = (i['column_type'],
+                                            pydantic.Field(i['column_default'], description=i['column_description']))
+        row_model = create_model(self._model_name('BulkLoadRowModel'), **row_fields)
+
+        update_columns = ('update_columns',
+                          Optional[List[str]],
+                          Query(None,
+                                description='the rows are upserted if it is set, update_columns should contain '
+                                            'which columns you want to update when the unique columns got conflict'))
+        request_query_model = make_dataclass(self._model_name('BulkLoadRequestQueryModel'), [update_columns])
+
+        response_model = create_model(self._model_name('BulkLoadResponseModel'),
+                                      loaded=(int, pydantic.Field(..., description='the count of the loaded rows')))
+        return request_query_model, row_model, response_model
+
+    def _find_many_request_query_model(self, name: str, join_foreign_table: bool = True):
         query_param: List[dict] = self._get_fizzy_query_param()
         query_param: List[Tuple] = self._assign_pagination_param(query_param)
-        query_param: List[Union[Tuple, Dict]] = self._assign_foreign_join(query_param)
+        if join_foreign_table:
+            query_param: List[Union[Tuple, Dict]] = self._assign_foreign_join(query_param)
 
-        response_fields = []
-        all_field = deepcopy(self.all_field)
-        for local_column, refer_table_info in self.reference_mapper.items():
-            response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
-                                    self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
-                                    None))
-        for i in all_field:
-            response_fields.append((i['column_name'],
-                                    i['column_type'],
-                                    None))
-            # i['column_type']))
         request_fields = []
         for i in query_param:
             assert isinstance(i, Tuple) or isinstance(i, dict)
@@ -1067,22 +1409,33 @@ class ApiParameterSchemaBuilder:
                                        i['column_type'],
                                        Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
-        if self.table_of_foreign:
-            request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                           self.table_of_foreign))
+        request_validation = [(_filter_none,)]
+        if self.table_of_foreign and join_foreign_table:
+            request_validation.append((self._assign_join_table_instance, self.table_of_foreign))
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
 
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindManyRequestBody',
-                                             request_fields,
-                                             namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]}
-                                             )
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindManyResponseItemModel',
+        return make_dataclass(self._model_name(name),
+                              request_fields,
+                              namespace={
+                                  '__post_init__': request_post_init(request_validation)}
+                              )
+
+    def find_many(self) -> Tuple:
+        request_query_model = self._find_many_request_query_model('FindManyRequestBody')
+
+        response_fields = []
+        all_field = deepcopy(self.all_field)
+        for local_column, refer_table_info in self.reference_mapper.items():
+            response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
+                                    self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
+                                    None))
+        for i in all_field:
+            response_fields.append((i['column_name'],
+                                    i['column_type'],
+                                    None))
+            # i['column_type']))
+        response_model_dataclass = make_dataclass(self._model_name('FindManyResponseItemModel'),
                                                   response_fields,
                                                   )
         response_list_item_model = _model_from_dataclass(response_model_dataclass)
@@ -1090,12 +1443,23 @@ class ApiParameterSchemaBuilder:
                                                                              config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_FindManyResponseListModel',
+            self._model_name('FindManyResponseListModel'),
             **{'__root__': (Union[List[response_list_item_model], Any], None), '__base__': ExcludeUnsetBaseModel}
         )
 
         return request_query_model, None, response_model
 
+    def export(self) -> Tuple:
+        # the same filters and pagination as find many, the rows are flat, so the foreign tables are not joined
+        request_query_model = self._find_many_request_query_model('ExportRequestQueryModel',
+                                                                  join_foreign_table=False)
+        row_fields = {}
+        all_field = deepcopy(self.all_field)
+        for i in all_field:
+            row_fields[i['column_name']] = (i['column_type'], None)
+        response_model = create_model(self._model_name('ExportRowModel'), **row_fields)
+        return request_query_model, None, response_model
+
     def _extra_relation_primary_key(self, relation_dbs):
         primary_key_columns = []
         foreign_table_name = ""
@@ -1150,12 +1514,11 @@ class ApiParameterSchemaBuilder:
                                                                                       description=description)))
 
         # TODO test foreign uuid key
-        primary_columns_model: DataClassT = make_dataclass(f'{foreign_table_name + str(uuid.uuid4())}_PrimaryKeyModel',
+        request_validation = [(self._value_of_list_to_str, self.uuid_type_columns)]
+        primary_columns_model: DataClassT = make_dataclass(self._model_name(f'{foreign_table_name}_PrimaryKeyModel'),
                                                            primary_key_columns,
                                                            namespace={
-                                                               '__post_init__': lambda
-                                                                   self_object: self._value_of_list_to_str(
-                                                                   self_object, self.uuid_type_columns)
+                                                               '__post_init__': request_post_init(request_validation)
                                                            })
         assert primary_column_names and primary_columns_model and primary_key_columns
         return primary_column_names, primary_columns_model, primary_key_columns
@@ -1185,34 +1548,28 @@ class ApiParameterSchemaBuilder:
                 request_fields.append((i['column_name'],
                                        i['column_type'],
                                        Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
         if self.table_of_foreign:
-            request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                           self.table_of_foreign))
+            request_validation.append((self._assign_join_table_instance, self.table_of_foreign))
 
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindOneRequestBody',
+        request_query_model = make_dataclass(self._model_name('FindOneRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_FindOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('FindOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': request_post_init(request_validation)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_FindOneResponseListModel',
+            self._model_name('FindOneResponseListModel'),
             **{'__root__': (response_model, None), '__base__': ExcludeUnsetBaseModel}
         )
 
@@ -1233,26 +1590,21 @@ class ApiParameterSchemaBuilder:
             request_fields.append((i['column_name'],
                                    i['column_type'],
                                    Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
+        response_validation = []
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-            response_validation = [lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                  self.uuid_type_columns)]
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteOneRequestBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+            response_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('DeleteOneRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
-        response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteOneResponseModel',
+        response_model = make_dataclass(self._model_name('DeleteOneResponseModel'),
                                         response_fields,
                                         namespace={
-                                            '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                  for validator_ in
-                                                                                  response_validation]}
+                                            '__post_init__': request_post_init(response_validation)}
                                         )
         response_model = _model_from_dataclass(response_model)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1273,40 +1625,35 @@ class ApiParameterSchemaBuilder:
             request_fields.append((i['column_name'],
                                    i['column_type'],
                                    Query(i['column_default'], description=i['column_description'])))
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
+        response_validation = []
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-            response_validation = [lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                  self.uuid_type_columns)]
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyRequestBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+            response_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('DeleteManyRequestBody'),
                                              request_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
-        # response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseModel',
+        # response_model = make_dataclass(self._model_name('DeleteManyResponseModel'),
         #                                 response_fields,
         #                                 namespace={
         #                                     '__post_init__': lambda self_object: [validator_(self_object)
         #                                                                           for validator_ in
         #                                                                           response_validation]}
         #                                 )
-        response_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseModel',
+        response_model = make_dataclass(self._model_name('DeleteManyResponseModel'),
                                         response_fields,
                                         namespace={
-                                            '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                  for validator_ in
-                                                                                  response_validation]}
+                                            '__post_init__': request_post_init(response_validation)}
                                         )
         response_model = _model_from_dataclass(response_model)
 
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_DeleteManyResponseListModel',
+            self._model_name('DeleteManyResponseListModel'),
             **{'__root__': (List[response_model], None)}
         )
 
@@ -1335,34 +1682,27 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneRequestQueryBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('PatchOneRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('PatchOneRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PatchOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': request_post_init(request_validation)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1392,34 +1732,27 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneRequestQueryBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('UpdateOneRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('UpdateOneRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateOneResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpdateOneResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': request_post_init(request_validation)}
                                                   )
         response_model = _model_from_dataclass(response_model_dataclass)
 
@@ -1458,36 +1791,31 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyRequestQueryBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('UpdateManyRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('UpdateManyRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_UpdateManyResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('UpdateManyResponseModel'),
                                                   response_fields,
                                                   )
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
         response_model_pydantic = _add_orm_model_config_into_pydantic_model(response_model_pydantic, config=OrmConfig)
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_UpdateManyResponseListModel',
+            self._model_name('UpdateManyResponseListModel'),
             **{'__root__': (List[response_model_pydantic], None)}
         )
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1526,40 +1854,33 @@ class ApiParameterSchemaBuilder:
                                          i['column_type'],
                                          Query(i['column_default'], description=i['column_description'])))
 
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
-        request_query_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyRequestQueryBody',
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
+        request_query_model = make_dataclass(self._model_name('PatchManyRequestQueryBody'),
                                              request_query_fields,
                                              namespace={
-                                                 '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                       for validator_ in
-                                                                                       request_validation]
+                                                 '__post_init__': request_post_init(request_validation)
                                              }
                                              )
 
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyRequestBodyBody',
+        request_body_model = make_dataclass(self._model_name('PatchManyRequestBodyBody'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                      for validator_ in
-                                                                                      request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             }
                                             )
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PatchManyResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PatchManyResponseModel'),
                                                   response_fields,
                                                   namespace={
-                                                      '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                            for validator_ in
-                                                                                            request_validation]}
+                                                      '__post_init__': request_post_init(request_validation)}
                                                   )
         response_model_pydantic = _model_from_dataclass(response_model_dataclass)
 
         response_model_pydantic = _add_orm_model_config_into_pydantic_model(response_model_pydantic, config=OrmConfig)
         response_model = create_model(
-            f'{self.db_name + str(uuid.uuid4())}_PatchManyResponseListModel',
+            self._model_name('PatchManyResponseListModel'),
             **{'__root__': (List[response_model_pydantic], None)}
         )
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1567,7 +1888,7 @@ class ApiParameterSchemaBuilder:
         return None, request_query_model, request_body_model, response_model
 
     def post_redirect_get(self) -> Tuple:
-        request_validation = [lambda self_object: _filter_none(self_object)]
+        request_validation = [(_filter_none,)]
         request_body_fields = []
         response_body_fields = []
 
@@ -1583,18 +1904,15 @@ class ApiParameterSchemaBuilder:
 
         # Ready the uuid to str validator
         if self.uuid_type_columns:
-            request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                     self.uuid_type_columns))
+            request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
         #
-        request_body_model = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PostAndRedirectRequestModel',
+        request_body_model = make_dataclass(self._model_name('PostAndRedirectRequestModel'),
                                             request_body_fields,
                                             namespace={
-                                                '__post_init__': lambda self_object: [validator(self_object)
-                                                                                      for validator in
-                                                                                      request_validation]
+                                                '__post_init__': request_post_init(request_validation)
                                             })
 
-        response_model_dataclass = make_dataclass(f'{self.db_name + str(uuid.uuid4())}_PostAndRedirectResponseModel',
+        response_model_dataclass = make_dataclass(self._model_name('PostAndRedirectResponseModel'),
                                                   response_body_fields)
         response_model = _model_from_dataclass(response_model_dataclass)
         response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
@@ -1643,39 +1961,33 @@ class ApiParameterSchemaBuilder:
                     request_fields.append((i['column_name'],
                                            i['column_type'],
                                            Query(i['column_default'], description=i['column_description'])))
-            request_validation = [lambda self_object: _filter_none(self_object)]
+            request_validation = [(_filter_none,)]
 
             if table_of_foreign:
-                request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                               total_table_of_foreign))
+                request_validation.append((self._assign_join_table_instance, total_table_of_foreign))
             if self.uuid_type_columns:
-                request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                         self.uuid_type_columns))
+                request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
             for local_column, refer_table_info in reference_mapper.items():
                 response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
                                         self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
                                         None))
 
             request_query_model = make_dataclass(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneForeignTreeRequestBody',
+                self._model_name(f'{"_".join(pk_list)}_FindOneForeignTreeRequestBody'),
                 request_fields,
                 namespace={
-                    '__post_init__': lambda self_object: [validator_(self_object)
-                                                          for validator_ in
-                                                          request_validation]}
+                    '__post_init__': request_post_init(request_validation)}
             )
-            response_model_dataclass = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseModel',
+            response_model_dataclass = make_dataclass(self._model_name(f'{"_".join(pk_list)}_FindOneResponseModel'),
                                                       response_fields,
                                                       namespace={
-                                                          '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                                for validator_ in
-                                                                                                request_validation]}
+                                                          '__post_init__': request_post_init(request_validation)}
                                                       )
             response_model = _model_from_dataclass(response_model_dataclass)
             response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
             response_model = create_model(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindManyResponseListModel',
+                self._model_name(f'{"_".join(pk_list)}_FindManyResponseListModel'),
                 **{'__root__': (Union[List[response_model], Any], None), '__base__': ExcludeUnsetBaseModel}
             )
 
@@ -1735,41 +2047,35 @@ class ApiParameterSchemaBuilder:
                     request_fields.append((i['column_name'],
                                            i['column_type'],
                                            Query(i['column_default'], description=i['column_description'])))
-            request_validation = [lambda self_object: _filter_none(self_object)]
+            request_validation = [(_filter_none,)]
 
             if table_of_foreign:
-                request_validation.append(lambda self_object: self._assign_join_table_instance(self_object,
-                                                                                               total_table_of_foreign))
+                request_validation.append((self._assign_join_table_instance, total_table_of_foreign))
             if self.uuid_type_columns:
-                request_validation.append(lambda self_object: self._value_of_list_to_str(self_object,
-                                                                                         self.uuid_type_columns))
+                request_validation.append((self._value_of_list_to_str, self.uuid_type_columns))
 
             for local_column, refer_table_info in reference_mapper.items():
                 response_fields.append((f"{refer_table_info['foreign_table_name']}_foreign",
                                         self.foreign_table_response_model_sets[refer_table_info['foreign_table']],
                                         None))
 
-            request_query_model = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneRequestBody',
+            request_query_model = make_dataclass(self._model_name(f'{"_".join(pk_list)}_FindOneRequestBody'),
                                                  request_fields,
                                                  namespace={
-                                                     '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                           for validator_ in
-                                                                                           request_validation]
+                                                     '__post_init__': request_post_init(request_validation)
                                                  }
                                                  )
 
-            response_model_dataclass = make_dataclass(f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseModel',
+            response_model_dataclass = make_dataclass(self._model_name(f'{"_".join(pk_list)}_FindOneResponseModel'),
                                                       response_fields,
                                                       namespace={
-                                                          '__post_init__': lambda self_object: [validator_(self_object)
-                                                                                                for validator_ in
-                                                                                                request_validation]}
+                                                          '__post_init__': request_post_init(request_validation)}
                                                       )
             response_model = _model_from_dataclass(response_model_dataclass)
             response_model = _add_orm_model_config_into_pydantic_model(response_model, config=OrmConfig)
 
             response_model = create_model(
-                f'{"_".join(pk_list) + str(uuid.uuid4())}_FindOneResponseListModel',
+                self._model_name(f'{"_".join(pk_list)}_FindOneResponseListModel'),
                 **{'__root__': (response_model, None), '__base__': ExcludeUnsetBaseModel}
             )
             _response_model = {}
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import fields, MISSING
+from typing import Any, Hashable, Optional
+
+from pydantic.fields import FieldInfo
+
+
+class StatementCache(object):
+    """
+    LRU cache of the select statement templates built by the query service,
+    keyed by the statement shape (route, filter fields, operators, order spec, join set),
+    the cached statement only contains bind parameters so the request need to bind the values only
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._statements = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            stmt = self._statements.get(key, None)
+            if stmt is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._statements.move_to_end(key)
+            return stmt
+
+    def set(self, key: Hashable, stmt: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._statements[key] = stmt
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> dict:
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._statements),
+                'max_size': self.max_size}
+
+    def __len__(self):
+        return len(self._statements)
+
+
+class CountCache(object):
+    """
+    TTL cache of the total count of the find many apis, keyed by the filter shape and the filter values
+    """
+
+    def __init__(self, ttl: float = 60, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            item = self._counts.get(key, None)
+            if item is None:
+                return None
+            count, expire_at = item
+            if expire_at < time.monotonic():
+                del self._counts[key]
+                return None
+            return count
+
+    def set(self, key: Hashable, count: int) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._counts[key] = (count, time.monotonic() + self.ttl)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def __len__(self):
+        return len(self._counts)
+
+
+def fill_query_default(request_query_model, query: dict) -> dict:
+    """
+    fill the fields which are not in the query with the default value of the request query model,
+    the same as what FastAPI passes into the dataclass for the query params which are not set
+    """
+    query = dict(query)
+    for field in fields(request_query_model):
+        if field.name in query:
+            continue
+        default = field.default
+        if isinstance(default, FieldInfo):
+            default = default.default
+        if default is Ellipsis or default is MISSING:
+            continue
+        query[field.name] = default
+    return query
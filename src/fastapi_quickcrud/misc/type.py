@@ -19,6 +19,25 @@ class Ordering(StrEnum):
     ASC = auto()
 
 
+class JoinStrategy(StrEnum):
+    join = auto()
+    aggregate = auto()
+    select_in = auto()
+
+
+class DataFormat(StrEnum):
+    csv = auto()
+    ndjson = auto()
+
+
+class TotalCountMode(StrEnum):
+    page = auto()
+    exact = auto()
+    window = auto()
+    estimated = auto()
+    cached = auto()
+
+
 class CrudMethods(Enum):
     FIND_ONE = "FIND_ONE"
     FIND_MANY = "FIND_MANY"
@@ -35,6 +54,8 @@ class CrudMethods(Enum):
     POST_REDIRECT_GET = "POST_REDIRECT_GET"
     FIND_ONE_WITH_FOREIGN_TREE = "FIND_ONE_WITH_FOREIGN_TREE"
     FIND_MANY_WITH_FOREIGN_TREE = "FIND_MANY_WITH_FOREIGN_TREE"
+    BULK_LOAD = "BULK_LOAD"
+    EXPORT = "EXPORT"
 
     @staticmethod
     def get_table_full_crud_method():
@@ -77,6 +98,10 @@ class CRUDRequestMapping(Enum):
     UPSERT_ONE = RequestMethods.POST
     UPSERT_MANY = RequestMethods.POST
 
+    BULK_LOAD = RequestMethods.POST
+
+    EXPORT = RequestMethods.GET
+
     DELETE_ONE = RequestMethods.DELETE
     DELETE_MANY = RequestMethods.DELETE
 
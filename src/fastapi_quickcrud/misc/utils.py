@@ -1,8 +1,12 @@
+import base64
+import json
+from functools import lru_cache
+from http import HTTPStatus
 from itertools import groupby
-from typing import Type, List, Union, TypeVar, Optional
+from typing import Type, List, Union, TypeVar, Optional, Dict, Iterable, Iterator, Tuple
 
-from pydantic import BaseModel, BaseConfig
-from sqlalchemy import Column, Integer
+from pydantic import BaseModel, BaseConfig, parse_obj_as, ValidationError
+from sqlalchemy import Column, Integer, bindparam, tuple_, and_
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql.elements import \
     or_, \
@@ -12,8 +16,8 @@ from sqlalchemy.sql.schema import Table
 
 from .covert_model import convert_table_to_model
 from .crud_model import RequestResponseModel, CRUDModel
-from .exceptions import QueryOperatorNotFound, PrimaryMissing, UnknownColumn
-from .schema_builder import ApiParameterSchemaBuilder
+from .exceptions import QueryOperatorNotFound, PrimaryMissing, UnknownColumn, InvalidCursorException
+from .schema_builder import ApiParameterSchemaBuilder, SchemaAnalysisCache
 from .type import \
     CrudMethods, \
     CRUDRequestMapping, \
@@ -30,13 +34,27 @@ BaseModel.Config.arbitrary_types_allowed = True
 
 BaseModelT = TypeVar('BaseModelT', bound=BaseModel)
 
+# the label of the COUNT(*) OVER() column of the find many statement
+TOTAL_COUNT_LABEL = '__total_count'
+# the label of the key column of the main table in the select in statement of the join table
+SELECT_IN_KEY_LABEL = '__select_in_key'
+
 __all__ = [
     'sqlalchemy_to_pydantic',
     # 'sqlalchemy_table_to_pydantic',
     'find_query_builder',
+    'build_filter_plan',
+    'query_shape',
+    'seek_query_builder',
+    'encode_cursor',
+    'decode_cursor',
     'Base',
     'clean_input_fields',
     'group_find_many_join',
+    'iter_group_find_many_join',
+    'join_group_key',
+    'row_mapping_plan',
+    'stitch_select_in_rows',
     'convert_table_to_model']
 
 unsupported_data_types = ["BLOB"]
@@ -66,37 +84,145 @@ def clean_input_fields(param: Union[dict, list], model: Base):
         return stmt
 
 
-def find_query_builder(param: dict, model: Base) -> List[Union[BinaryExpression]]:
+def _filter_column(model: Union[Base, Table], column_name: str):
+    if isinstance(model, Table):
+        return model.c[column_name]
+    return getattr(model, column_name)
+
+
+def _compile_filter_field(field_name: str, model: Union[Base, Table]) -> Optional[tuple]:
+    """
+    resolve a request query field into (column, operator field name)
+    the operator field name is None for the plain equal filter,
+    and the whole entry is None for the operator fields, they are consumed with their value field
+    """
+    if ExtraFieldType.Comparison_operator in field_name or ExtraFieldType.Matching_pattern in field_name:
+        return None
+    if ExtraFieldTypePrefix.List in field_name:
+        type_ = ExtraFieldTypePrefix.List
+    elif ExtraFieldTypePrefix.From in field_name:
+        type_ = ExtraFieldTypePrefix.From
+    elif ExtraFieldTypePrefix.To in field_name:
+        type_ = ExtraFieldTypePrefix.To
+    elif ExtraFieldTypePrefix.Str in field_name:
+        type_ = ExtraFieldTypePrefix.Str
+    else:
+        return _filter_column(model, field_name), None
+    table_column_name = field_name.replace(type_, "")
+    return _filter_column(model, table_column_name), field_name + process_type_map[type_]
+
+
+def build_filter_plan(model: Union[Base, Table]) -> Dict[str, Optional[tuple]]:
+    """
+    compile every query field the schema builder can generate for the model or the table,
+    so that the request only need to do one dict lookup for each query param it has set
+    """
+    filter_plan = {}
+    table = model if isinstance(model, Table) else getattr(model, '__table__', None)
+    if table is None:
+        return filter_plan
+    for column in table.c:
+        column_name = str(column.key)
+        if not isinstance(model, Table) and not hasattr(model, column_name):
+            continue
+        for field_name in [column_name] + [column_name + prefix for prefix in ExtraFieldTypePrefix]:
+            filter_plan[field_name] = _compile_filter_field(field_name, model)
+            if filter_plan[field_name] and filter_plan[field_name][1]:
+                filter_plan[filter_plan[field_name][1]] = None
+    return filter_plan
+
+
+def _bind_value(value, operator, bind_params: Optional[dict], as_bindparam: bool = True):
+    """
+    collect the value into bind_params and replace it with bind parameter(s),
+    the value is returned as it is if bind_params is None
+    """
+    if bind_params is None:
+        return value
+
+    def new_bindparam(value_, expanding=False):
+        name = f'filter_{len(bind_params)}'
+        bind_params[name] = value_
+        if as_bindparam:
+            return bindparam(name, expanding=expanding)
+
+    if isinstance(value, list):
+        if operator in (ItemComparisonOperators.In, ItemComparisonOperators.Not_in):
+            return new_bindparam(value, expanding=True)
+        return [new_bindparam(i) for i in value]
+    return new_bindparam(value)
+
+
+def find_query_builder(param: dict, model: Base, filter_plan: dict = None,
+                       bind_params: dict = None) -> List[Union[BinaryExpression]]:
     query = []
+    if filter_plan is None:
+        filter_plan = {}
     for column_name, value in param.items():
-        if ExtraFieldType.Comparison_operator in column_name or ExtraFieldType.Matching_pattern in column_name:
-            continue
-        if ExtraFieldTypePrefix.List in column_name:
-            type_ = ExtraFieldTypePrefix.List
-        elif ExtraFieldTypePrefix.From in column_name:
-            type_ = ExtraFieldTypePrefix.From
-        elif ExtraFieldTypePrefix.To in column_name:
-            type_ = ExtraFieldTypePrefix.To
-        elif ExtraFieldTypePrefix.Str in column_name:
-            type_ = ExtraFieldTypePrefix.Str
+        if column_name in filter_plan:
+            compiled_field = filter_plan[column_name]
         else:
-            query.append((getattr(model, column_name) == value))
-            # raise Exception('known error')
+            compiled_field = _compile_filter_field(column_name, model)
+        if compiled_field is None:
+            continue
+        column, operator_column_name = compiled_field
+        if operator_column_name is None:
+            query.append((column == _bind_value(value, None, bind_params)))
             continue
         sub_query = []
-        table_column_name = column_name.replace(type_, "")
-        operator_column_name = column_name + process_type_map[type_]
         operators = param.get(operator_column_name, None)
         if not operators:
             raise QueryOperatorNotFound(f'The query operator of {column_name} not found!')
         if not isinstance(operators, list):
             operators = [operators]
         for operator in operators:
-            sub_query.append(process_map[operator](getattr(model, table_column_name), value))
+            sub_query.append(process_map[operator](column, _bind_value(value, operator, bind_params)))
         query.append((or_(*sub_query)))
     return query
 
 
+def find_query_values(param: dict, model: Base, bind_params: dict, filter_plan: dict = None) -> dict:
+    """
+    collect the bind values of the query in the same order as find_query_builder(bind_params=...) names them,
+    used when the statement template is from the statement cache
+    """
+    if filter_plan is None:
+        filter_plan = {}
+    for column_name, value in param.items():
+        if column_name in filter_plan:
+            compiled_field = filter_plan[column_name]
+        else:
+            compiled_field = _compile_filter_field(column_name, model)
+        if compiled_field is None:
+            continue
+        _, operator_column_name = compiled_field
+        if operator_column_name is None:
+            _bind_value(value, None, bind_params, as_bindparam=False)
+            continue
+        operators = param.get(operator_column_name, None)
+        if not isinstance(operators, list):
+            operators = [operators]
+        for operator in operators:
+            _bind_value(value, operator, bind_params, as_bindparam=False)
+    return bind_params
+
+
+def query_shape(param: Optional[dict]) -> tuple:
+    """
+    the part of the query which decides the statement, the values are replaced by bind parameters,
+    so only the operators and the length of the list values are kept
+    """
+    if not param:
+        return ()
+    shape = []
+    for column_name, value in param.items():
+        if ExtraFieldType.Comparison_operator in column_name or ExtraFieldType.Matching_pattern in column_name:
+            shape.append((column_name, tuple(value) if isinstance(value, list) else value))
+        else:
+            shape.append((column_name, len(value) if isinstance(value, list) else None))
+    return tuple(shape)
+
+
 class OrmConfig(BaseConfig):
     orm_mode = True
 
@@ -108,7 +234,9 @@ def sqlalchemy_to_pydantic(
         exclude_columns: List[str] = None,
         constraints=None,
         foreign_include: Optional[any] = None,
-        exclude_primary_key=False) -> CRUDModel:
+        exclude_primary_key=False,
+        analysis_cache: Optional[SchemaAnalysisCache] = None,
+        options_fingerprint: Optional[str] = None) -> CRUDModel:
     db_model, _ = convert_table_to_model(db_model)
     if exclude_columns is None:
         exclude_columns = []
@@ -120,7 +248,10 @@ def sqlalchemy_to_pydantic(
                                               exclude_column=exclude_columns,
                                               sql_type=sql_type,
                                               foreign_include=foreign_include,
-                                              exclude_primary_key=exclude_primary_key)
+                                              exclude_primary_key=exclude_primary_key,
+                                              analysis_cache=analysis_cache,
+                                              crud_methods=crud_methods,
+                                              options_fingerprint=options_fingerprint)
 
     REQUIRE_PRIMARY_KEY_CRUD_METHOD = [CrudMethods.DELETE_ONE.value,
                                        CrudMethods.FIND_ONE.value,
@@ -152,6 +283,14 @@ def sqlalchemy_to_pydantic(
             request_query_model, \
             request_body_model, \
             response_model = model_builder.create_many()
+        elif crud_method.value == CrudMethods.BULK_LOAD.value:
+            request_query_model, \
+            request_body_model, \
+            response_model = model_builder.bulk_load()
+        elif crud_method.value == CrudMethods.EXPORT.value:
+            request_query_model, \
+            request_body_model, \
+            response_model = model_builder.export()
         elif crud_method.value == CrudMethods.DELETE_ONE.value:
             request_url_param_model, \
             request_query_model, \
@@ -319,16 +458,99 @@ def table_to_declarative_base(db_model):
     return tmp
 
 
-def group_find_many_join(list_of_dict: List[dict]) -> List[dict]:
-    def group_by_foreign_key(item):
-        tmp = {}
-        for k, v in item.items():
-            if '_foreign' not in k:
-                tmp[k] = v
-        return tmp
+def group_find_many_join(list_of_dict: List[dict], primary_keys: Optional[List[str]] = None) -> List[dict]:
+    """
+    merge the rows of the same parent row in one pass, the rows are keyed by the primary key of the parent
+    (all the parent columns if there is no primary key), so the rows of a parent don't need to be adjacent,
+    and the parents are returned in the order they are first seen
+    """
+    if not list_of_dict:
+        return []
+    foreign_keys = [k for k in list_of_dict[0] if '_foreign' in k]
+    parent_keys = [k for k in list_of_dict[0] if '_foreign' not in k]
+    key_columns = primary_keys if primary_keys and all(k in parent_keys for k in primary_keys) else parent_keys
+    if len(key_columns) == 1:
+        key_column = key_columns[0]
+
+        def group_key(row):
+            return row[key_column]
+    else:
+        def group_key(row):
+            return tuple([row[k] for k in key_columns])
+
+    parents = {}
+    for row in list_of_dict:
+        key = group_key(row)
+        try:
+            parent = parents.get(key, None)
+        except TypeError:
+            # unhashable values, e.g. the json or array columns
+            key = repr(key)
+            parent = parents.get(key, None)
+        if parent is None:
+            parent = {k: row[k] for k in parent_keys}
+            for k in foreign_keys:
+                parent[k] = [row[k]]
+            parents[key] = parent
+        else:
+            for k in foreign_keys:
+                parent[k].append(row[k])
+    return list(parents.values())
+
+
+class RowMappingPlan(object):
+    """
+    build the response dict of a row by the label layout of the statement,
+    the foreign columns (labeled as `{foreign table}_____{column}`) are nested into a dict of the foreign table
+    """
+
+    def __init__(self, keys: Tuple[str, ...]):
+        self.keys = keys
+        self.flat_keys = []
+        self.flat_index = []
+        nested = {}
+        for index, key in enumerate(keys):
+            if '_____' in key:
+                foreign_key, foreign_column = key.split('_____')
+                nested.setdefault(foreign_key, ([], []))
+                nested[foreign_key][0].append(foreign_column)
+                nested[foreign_key][1].append(index)
+            else:
+                self.flat_keys.append(key)
+                self.flat_index.append(index)
+        self.nested = [(key, tuple(columns), tuple(index)) for key, (columns, index) in nested.items()]
+        self.is_flat = not self.nested and self.flat_index == list(range(len(keys)))
+
+    def __call__(self, row) -> dict:
+        if self.is_flat:
+            return dict(zip(self.flat_keys, row))
+        response = {key: row[index] for key, index in zip(self.flat_keys, self.flat_index)}
+        for key, columns, index in self.nested:
+            response[key] = {column: row[i] for column, i in zip(columns, index)}
+        return response
+
+
+@lru_cache(maxsize=1024)
+def row_mapping_plan(keys: Tuple[str, ...]) -> RowMappingPlan:
+    """
+    the plan is built once for each label layout (the statement shape), e.g. row_mapping_plan(tuple(result.keys()))
+    """
+    return RowMappingPlan(keys)
+
+
+def join_group_key(item: dict) -> dict:
+    tmp = {}
+    for k, v in item.items():
+        if '_foreign' not in k:
+            tmp[k] = v
+    return tmp
 
-    response_list = []
-    for key, group in groupby(list_of_dict, group_by_foreign_key):
+
+def iter_group_find_many_join(list_of_dict: Iterable[dict]) -> Iterator[dict]:
+    """
+    merge the adjacent rows of the same parent row lazily, so the rows can be grouped while they are fetched
+    """
+    for key, group in groupby(list_of_dict, join_group_key):
         response = {}
         for i in group:
             for k, v in i.items():
@@ -340,11 +562,21 @@ def group_find_many_join(list_of_dict: List[dict]) -> List[dict]:
             for response_ in response:
                 i.pop(response_, None)
             result = {**i, **response}
-        response_list.append(result)
-    return response_list
+        yield result
+
 
+def stitch_select_in_rows(list_of_dict: List[dict], foreign_rows: dict) -> List[dict]:
+    """
+    set the rows of the join tables to the rows of the main table by the key column,
+    foreign_rows is {the field of the join table: (the key column of the main table, {key: [rows]})}
+    """
+    for field, (local_key, rows_by_key) in foreign_rows.items():
+        for item in list_of_dict:
+            item[field] = rows_by_key.get(item[local_key], [])
+    return list_of_dict
 
-def path_query_builder(params, model) -> List[Union[BinaryExpression]]:
+
+def path_query_builder(params, model, bind_params: dict = None) -> List[Union[BinaryExpression]]:
     query = []
     if not params:
         return query
@@ -353,5 +585,84 @@ def path_query_builder(params, model) -> List[Union[BinaryExpression]]:
         assert len(table_with_column) == 2
         table_name, column_name = table_with_column
         table_model = model[table_name]
-        query.append((getattr(table_model, column_name) == param_value))
+        query.append((getattr(table_model, column_name) == _bind_value(param_value, None, bind_params)))
     return query
+
+
+def _seek_after(column, desc: bool, value, nulls_last: bool) -> Optional[BinaryExpression]:
+    """
+    the rows after the value of the column, the NULLs are after every value if nulls_last, else before them,
+    the value is None if it is NULL, None is returned if no row is after it
+    """
+    if value is None:
+        return None if nulls_last else column.isnot(None)
+    after = column < value if desc else column > value
+    if nulls_last and column.nullable:
+        return or_(after, column.is_(None))
+    return after
+
+
+def seek_query_builder(columns: list, desc_list: List[bool], values: list, nulls_first: bool = False) \
+        -> BinaryExpression:
+    """
+    the rows after the values in the ordering of the columns,
+    a row value comparison if all the columns are in the same direction, so that it can use the composite index.
+    a value is None if it is NULL, the NULLs are before the values of the column in the ascending order
+    if nulls_first (SQLite, MySQL), else after them (PostgreSQL), as the database orders them
+    """
+    nulls_last_list = [desc if nulls_first else not desc for desc in desc_list]
+    nullable = any(value is None or column.nullable and nulls_last
+                   for column, value, nulls_last in zip(columns, values, nulls_last_list))
+    if len(set(desc_list)) == 1 and not nullable:
+        desc, = set(desc_list)
+        if len(columns) == 1:
+            left, right = columns[0], values[0]
+        else:
+            left, right = tuple_(*columns), tuple_(*values)
+        return left < right if desc else left > right
+    query = []
+    for index, (column, desc, value, nulls_last) in enumerate(zip(columns, desc_list, values, nulls_last_list)):
+        after = _seek_after(column, desc, value, nulls_last)
+        if after is None:
+            continue
+        equal_list = [columns[i].is_(None) if values[i] is None else columns[i] == values[i] for i in range(index)]
+        query.append(and_(*equal_list, after))
+    return or_(*query)
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise InvalidCursorException(status_code=HTTPStatus.BAD_REQUEST, detail='invalid cursor')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursorException(status_code=HTTPStatus.BAD_REQUEST, detail='invalid cursor')
+    result = []
+    for column, value in zip(columns, values):
+        if value is None:
+            if not column.nullable:
+                raise InvalidCursorException(status_code=HTTPStatus.BAD_REQUEST, detail='invalid cursor')
+            result.append(value)
+            continue
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            result.append(value)
+            continue
+        try:
+            result.append(parse_obj_as(python_type, value))
+        except ValidationError:
+            raise InvalidCursorException(status_code=HTTPStatus.BAD_REQUEST, detail='invalid cursor')
+    return result
+
+
+def path_query_values(params, bind_params: dict) -> dict:
+    if not params:
+        return bind_params
+    for param_value in params.values():
+        _bind_value(param_value, None, bind_params, as_bindparam=False)
+    return bind_params
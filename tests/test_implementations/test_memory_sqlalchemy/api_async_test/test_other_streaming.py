@@ -0,0 +1,55 @@
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class StreamTable(Base):
+    __tablename__ = 'test_stream_async'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+route_1 = crud_router_builder(db_model=StreamTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              async_mode=True,
+                              stream_yield_per=3,
+                              prefix="/test",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def test_stream_find_many():
+    data = [{"int4_value": i, "varchar_value": f"value_{i}"} for i in range(10)]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+
+    query = {'int4_value____from': 2, 'order_by_columns': ['int4_value:DESC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers={'accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers).json()
+    assert [i['int4_value'] for i in rows] == list(range(9, 1, -1))
@@ -0,0 +1,100 @@
+import json
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base, relationship
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class BulkDeleteTable(Base):
+    __tablename__ = 'test_bulk_delete'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+class BulkDeleteParent(Base):
+    __tablename__ = 'test_bulk_delete_parent'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    children = relationship('BulkDeleteChild', cascade='all, delete-orphan')
+
+
+class BulkDeleteChild(Base):
+    __tablename__ = 'test_bulk_delete_child'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    parent_id = Column(Integer, ForeignKey('test_bulk_delete_parent.primary_key'))
+
+
+route_1 = crud_router_builder(db_model=BulkDeleteTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                                  CrudMethods.DELETE_ONE,
+                                  CrudMethods.DELETE_MANY,
+                              ],
+                              bulk_chunk_size=2,
+                              prefix="/test",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def test_delete_in_chunks_without_returning_support():
+    data = [{"int4_value": i, "varchar_value": f"value_{i}"} for i in range(10)]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    primary_keys = [i['primary_key'] for i in response.json()]
+
+    response = client.delete(f'/test/{primary_keys[0]}', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['int4_value'] == 0
+    response = client.delete(f'/test/{primary_keys[0]}', headers=headers)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+    query = {'int4_value____from': 5}
+    response = client.delete(f'/test?{urlencode(query)}', headers=headers)
+    assert response.status_code == 200
+    assert sorted(i['int4_value'] for i in response.json()) == [5, 6, 7, 8, 9]
+    response = client.delete(f'/test?{urlencode(query)}', headers=headers)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+    response = client.get('/test', headers=headers)
+    assert [i['int4_value'] for i in response.json()] == [1, 2, 3, 4]
+
+
+def test_delete_returning_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=BulkDeleteTable,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_bulk_delete': BulkDeleteTable})
+    stmt, params = query_service.delete_returning(filter_args={'int4_value____from': 5,
+                                                               'int4_value____from_____comparison_operator':
+                                                                   'Greater_than_or_equal_to'})
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith('DELETE FROM test_bulk_delete WHERE test_bulk_delete.int4_value >= %(filter_0)s')
+    assert 'RETURNING test_bulk_delete.primary_key, test_bulk_delete.int4_value, test_bulk_delete.varchar_value' in sql
+    assert params == {'filter_0': 5}
+
+
+def test_delete_cascade_keep_session_delete():
+    query_service = SQLAlchemyPGSQLQueryService(model=BulkDeleteParent,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_bulk_delete_parent': BulkDeleteParent})
+    assert not query_service.is_bulk_delete_supported()
@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class BulkInsertTable(Base):
+    __tablename__ = 'test_bulk_insert'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    int8_value = Column(Integer, server_default=text("99"))
+    varchar_value = Column(String)
+
+
+route_1 = crud_router_builder(db_model=BulkInsertTable,
+                              crud_methods=[
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              prefix="/test",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def test_create_many_without_returning_support():
+    data = [{"int4_value": 1, "varchar_value": "value_1"},
+            {"int4_value": 2, "int8_value": 2}]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    assert [(i['int4_value'], i['int8_value']) for i in response.json()] == [(1, 99), (2, 2)]
+
+
+def test_create_returning_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=BulkInsertTable,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_bulk_insert': BulkInsertTable},
+                                                bulk_chunk_size=2)
+    rows = [{'int4_value': 1, 'varchar_value': 'a'},
+            {'int4_value': 2, 'varchar_value': 'b'},
+            {'int4_value': 3, 'varchar_value': 'c'},
+            {'int4_value': 4},
+            {'int4_value': 5}]
+    insert_arg = {'insert': [SimpleNamespace(**row) for row in rows]}
+    stmts = list(query_service.create_returning(insert_arg=insert_arg, create_one=False))
+    assert len(stmts) == 3
+
+    compiled = [stmt.compile(dialect=postgresql.dialect()) for stmt in stmts]
+    assert str(compiled[0]).startswith('INSERT INTO test_bulk_insert (int4_value, varchar_value) VALUES '
+                                       '(%(int4_value_m0)s, %(varchar_value_m0)s), '
+                                       '(%(int4_value_m1)s, %(varchar_value_m1)s)')
+    assert str(compiled[0]).endswith('RETURNING test_bulk_insert.primary_key, test_bulk_insert.int4_value, '
+                                     'test_bulk_insert.int8_value, test_bulk_insert.varchar_value')
+    assert compiled[1].params == {'int4_value_m0': 3, 'varchar_value_m0': 'c'}
+    assert str(compiled[2]).startswith('INSERT INTO test_bulk_insert (int4_value) VALUES '
+                                       '(%(int4_value_m0)s), (%(int4_value_m1)s)')
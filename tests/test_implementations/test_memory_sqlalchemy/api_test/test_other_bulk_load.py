@@ -0,0 +1,288 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, JSON, Date, create_engine, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_execute import SQLALchemyExecuteService
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.bulk_load import CopyRows, RecordDecodeError, RecordDecoder, bulk_load_format, \
+    copy_csv_field
+from src.fastapi_quickcrud.misc.exceptions import BulkLoadNotSupportedException
+from src.fastapi_quickcrud.misc.type import DataFormat, CrudMethods, SqlType
+
+Base = declarative_base()
+
+
+class BulkLoad(Base):
+    __tablename__ = 'test_bulk_load'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True)
+    int4_value = Column(Integer, nullable=False, default=0)
+    json_value = Column(JSON)
+    date_value = Column(Date)
+
+
+CSV_BODY = 'name,int4_value,json_value,date_value\n' \
+           'a,1,"{""key"": ""a, b""}",2021-01-01\n' \
+           '"multi\nline",2,,\n' \
+           'c,,{},2021-01-03\n'
+
+
+def decode(data_format, body: bytes, **kwargs):
+    # the body is fed byte by byte, as the smallest chunks of the stream
+    decoder = RecordDecoder(data_format, **kwargs)
+    records = []
+    for i in range(len(body)):
+        records += decoder.feed(body[i:i + 1])
+    return records + decoder.close()
+
+
+def test_decode_csv():
+    records = decode(DataFormat.csv, CSV_BODY.encode(), json_columns=['json_value'])
+    assert records == [{'name': 'a', 'int4_value': '1', 'json_value': {'key': 'a, b'}, 'date_value': '2021-01-01'},
+                       {'name': 'multi\nline', 'int4_value': '2'},
+                       {'name': 'c', 'json_value': {}, 'date_value': '2021-01-03'}]
+    # the last line without the newline
+    assert decode(DataFormat.csv, 'name\r\né'.encode()) == [{'name': 'é'}]
+
+
+def test_decode_ndjson():
+    body = '{"name": "a"}\n\n{"name": "é", "int4_value": 2}'.encode()
+    assert decode(DataFormat.ndjson, body) == [{'name': 'a'}, {'name': 'é', 'int4_value': 2}]
+
+
+def test_decode_error():
+    with pytest.raises(RecordDecodeError) as e:
+        decode(DataFormat.csv, b'name,int4_value\na,1\nb\n')
+    assert e.value.index == 1
+    with pytest.raises(RecordDecodeError) as e:
+        decode(DataFormat.ndjson, b'{"name": "a"}\n[1]\n')
+    assert e.value.index == 1
+    with pytest.raises(RecordDecodeError):
+        decode(DataFormat.ndjson, b'{"name": "\xff"}\n')
+
+
+def test_bulk_load_format():
+    assert bulk_load_format('text/csv; charset=utf-8') == DataFormat.csv
+    assert bulk_load_format('application/x-ndjson') == DataFormat.ndjson
+    assert bulk_load_format('application/json') is None
+    assert bulk_load_format(None) is None
+
+
+def test_copy_csv():
+    assert [copy_csv_field(i) for i in [None, '', 'a,b', 'a"b', True, date(2021, 1, 2), b'\x01', [1, None, 'a"']]] == \
+           ['', '""', '"a,b"', '"a""b"', 'true', '2021-01-02', '\\x01', '"{""1"",NULL,""a\\""""}"']
+    copy_rows = CopyRows(table_name='test_bulk_load', schema_name='public', columns=('name', 'json_value'),
+                         rows=[{'name': 'a\nb', 'json_value': {'key': 'value'}}, {'name': '', 'json_value': None}],
+                         json_columns=['json_value'])
+    assert copy_rows.sql() == 'COPY public.test_bulk_load (name, json_value) FROM STDIN WITH (FORMAT csv)'
+    assert copy_rows.csv() == '"a\nb","{""key"": ""value""}"\n"",\n'
+    assert copy_rows.records() == [('a\nb', '{"key": "value"}'), ('', None)]
+
+
+def test_copy_steps():
+    query_service = SQLAlchemyPGSQLQueryService(model=BulkLoad, async_mode=False, foreign_table_mapping={})
+    rows = [{'name': 'a', 'int4_value': 1}, {'name': 'b', 'int4_value': 2}, {}]
+    copy_rows, insert_stmt = query_service.bulk_load_copies(rows, unique_fields=['name'])
+    assert isinstance(copy_rows, CopyRows)
+    assert (copy_rows.table_name, copy_rows.columns, copy_rows.rows) == ('test_bulk_load', ('name', 'int4_value'),
+                                                                         rows[:2])
+    # the row of the default values
+    assert insert_stmt.table is BulkLoad.__table__ and not insert_stmt._values
+
+    create_stmt, copy_rows, merge_stmt, drop_stmt = query_service.bulk_load_copies(rows[:2], unique_fields=['name'],
+                                                                                   update_columns=['int4_value'])
+    staging = copy_rows.table_name
+    assert str(create_stmt) == f'CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS ' \
+                               f'SELECT name, int4_value FROM test_bulk_load WITH NO DATA'
+    assert str(merge_stmt) == f'INSERT INTO test_bulk_load (name, int4_value) SELECT name, int4_value FROM (' \
+                              f'SELECT name, int4_value, row_number() OVER (PARTITION BY name ORDER BY ctid DESC) ' \
+                              f'AS bulk_load_row_number FROM {staging}) AS {staging} ' \
+                              f'WHERE bulk_load_row_number = 1 OR name IS NULL ' \
+                              f'ON CONFLICT (name) DO UPDATE SET int4_value = excluded.int4_value'
+    assert str(drop_stmt) == f'DROP TABLE {staging}'
+
+
+class UniqueViolation(Exception):
+    pgcode = '23505'
+
+
+class CopyCursor(object):
+
+    def __init__(self, copied):
+        self.copied = copied
+
+    def copy_expert(self, sql, file):
+        if 'conflict' in file.getvalue():
+            raise UniqueViolation('duplicate key value violates unique constraint')
+        self.copied.append((sql, file.read()))
+
+    def close(self):
+        pass
+
+
+class CopyConnection(object):
+    # the psycopg2 connection of the session, only the cursor of COPY is used by the test
+
+    def __init__(self):
+        self.copied = []
+
+    def cursor(self):
+        return CopyCursor(self.copied)
+
+
+class CopySession(object):
+
+    def __init__(self):
+        self.dbapi_connection = CopyConnection()
+
+    def connection(self):
+        return type('Connection', (), {'connection': self.dbapi_connection})()
+
+
+def test_copy_expert():
+    session = CopySession()
+    copy_rows = CopyRows(table_name='test_bulk_load', schema_name=None, columns=('name',), rows=[{'name': 'a'}])
+    SQLALchemyExecuteService.copy(session, copy_rows)
+    assert session.dbapi_connection.copied == [('COPY test_bulk_load (name) FROM STDIN WITH (FORMAT csv)', 'a\n')]
+    copy_rows.rows = [{'name': 'conflict'}]
+    with pytest.raises(IntegrityError) as e:
+        SQLALchemyExecuteService.copy(session, copy_rows)
+    assert 'unique constraint' in str(e.value.orig)
+
+
+def build(async_mode):
+    if async_mode:
+        engine = create_async_engine('sqlite+aiosqlite://', connect_args={"check_same_thread": False},
+                                     poolclass=StaticPool)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+        async def create_all():
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+
+        asyncio.get_event_loop().run_until_complete(create_all())
+
+        async def get_transaction_session():
+            async with session() as db:
+                yield db
+
+        sync_engine = engine.sync_engine
+    else:
+        engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(engine)
+
+        def get_transaction_session():
+            db = session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        sync_engine = engine
+
+    statements = []
+    event.listen(sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    app = FastAPI()
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=BulkLoad,
+                                           crud_methods=[CrudMethods.BULK_LOAD, CrudMethods.FIND_MANY],
+                                           sql_type=SqlType.sqlite,
+                                           async_mode=async_mode,
+                                           bulk_chunk_size=2,
+                                           prefix='/test',
+                                           tags=['test']))
+    return TestClient(app), statements
+
+
+@pytest.fixture(params=[False, True], ids=['sync', 'async'])
+def bulk_load_app(request):
+    return build(request.param)
+
+
+def rows_of(client):
+    response = client.get('/test', params={'order_by_columns': 'id'})
+    if response.status_code == 204:
+        return []
+    return [{i: row[i] for i in ['id', 'name', 'int4_value', 'json_value', 'date_value']} for row in response.json()]
+
+
+def chunks(body: str, size: int = 7):
+    data = body.encode()
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def test_bulk_load_csv(bulk_load_app):
+    client, statements = bulk_load_app
+    response = client.post('/test/bulk_load', data=chunks(CSV_BODY), headers={'content-type': 'text/csv'})
+    assert response.status_code == 201
+    assert response.json() == {'loaded': 3}
+    assert response.headers['x-total-count'] == '3'
+    assert rows_of(client) == [
+        {'id': 1, 'name': 'a', 'int4_value': 1, 'json_value': {'key': 'a, b'}, 'date_value': '2021-01-01'},
+        {'id': 2, 'name': 'multi\nline', 'int4_value': 2, 'json_value': None, 'date_value': None},
+        {'id': 3, 'name': 'c', 'int4_value': 0, 'json_value': {}, 'date_value': '2021-01-03'}]
+    # the chunks of 2 rows, the empty value of int4_value is the default of it
+    assert len([i for i in statements if i.startswith('INSERT')]) == 2
+
+
+def test_bulk_load_ndjson_upsert(bulk_load_app):
+    client, _ = bulk_load_app
+    body = '\n'.join(json.dumps({'name': f'name {i}', 'int4_value': i}) for i in range(3))
+    response = client.post('/test/bulk_load', data=body, headers={'content-type': 'application/x-ndjson'})
+    assert response.json() == {'loaded': 3}
+    body = '\n'.join(json.dumps({'name': f'name {i}', 'int4_value': i * 10}) for i in [2, 3, 2])
+    response = client.post('/test/bulk_load', data=body, params={'update_columns': ['int4_value']},
+                           headers={'content-type': 'application/x-ndjson'})
+    assert response.json() == {'loaded': 3}
+    assert [(i['name'], i['int4_value']) for i in rows_of(client)] == \
+           [('name 0', 0), ('name 1', 1), ('name 2', 20), ('name 3', 30)]
+    # without update_columns the conflict rolls back the chunks loaded before it
+    body = '\n'.join(json.dumps({'name': f'name {i}'}) for i in [4, 5, 0])
+    response = client.post('/test/bulk_load', data=body, headers={'content-type': 'application/x-ndjson'})
+    assert response.status_code == 409
+    assert len(rows_of(client)) == 4
+
+
+def test_bulk_load_invalid(bulk_load_app):
+    client, _ = bulk_load_app
+    body = 'name,int4_value\na,1\nb,2\nc,x\n'
+    response = client.post('/test/bulk_load', data=body, headers={'content-type': 'text/csv'})
+    assert response.status_code == 422
+    error, = response.json()['detail']
+    assert error['loc'] == ['body', 2, 'int4_value']
+    assert rows_of(client) == []
+
+    response = client.post('/test/bulk_load', data='name\na\n"b\n', headers={'content-type': 'text/csv'})
+    assert response.status_code == 422
+    assert response.json()['detail'][0]['loc'] == ['body', 1]
+
+    response = client.post('/test/bulk_load', data='[]', headers={'content-type': 'application/json'})
+    assert response.status_code == 415
+
+
+def test_bulk_load_not_supported():
+    for sql_type in [SqlType.oracle, SqlType.mssql]:
+        try:
+            crud_router_builder(db_session=lambda: None,
+                                db_model=BulkLoad,
+                                crud_methods=[CrudMethods.BULK_LOAD],
+                                sql_type=sql_type,
+                                async_mode=False,
+                                prefix='/not_supported')
+        except BulkLoadNotSupportedException:
+            pass
+        else:
+            assert False
@@ -0,0 +1,80 @@
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class BulkUpdateTable(Base):
+    __tablename__ = 'test_bulk_update'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+route_1 = crud_router_builder(db_model=BulkUpdateTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                                  CrudMethods.PATCH_MANY,
+                                  CrudMethods.UPDATE_MANY,
+                              ],
+                              prefix="/test",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def test_update_many_without_returning_support():
+    data = [{"int4_value": i, "varchar_value": f"value_{i}"} for i in range(10)]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+
+    query = {'int4_value____from': 5}
+    response = client.patch(f'/test?{urlencode(query)}', headers=headers,
+                            data=json.dumps({"varchar_value": "patched"}))
+    assert response.status_code == 200
+    assert response.headers['x-total-count'] == '5'
+    assert {i['varchar_value'] for i in response.json()} == {'patched'}
+
+    query = {'int4_value____to': 2}
+    response = client.put(f'/test?{urlencode(query)}', headers=headers,
+                          data=json.dumps({"int4_value": 100, "varchar_value": "updated"}))
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+    response = client.get('/test', headers=headers)
+    assert sorted(i['varchar_value'] for i in response.json()) == \
+           ['patched'] * 5 + ['updated'] * 3 + ['value_3', 'value_4']
+
+
+def test_update_returning_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=BulkUpdateTable,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_bulk_update': BulkUpdateTable})
+    stmt, params = query_service.update_returning(update_args={'varchar_value': 'patched'},
+                                                  filter_args={'int4_value____list': [1, 2],
+                                                               'int4_value____list_____comparison_operator': 'In'})
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith('UPDATE test_bulk_update SET varchar_value=%(update_varchar_value)s')
+    assert 'WHERE test_bulk_update.int4_value IN' in sql
+    assert 'RETURNING test_bulk_update.primary_key, test_bulk_update.int4_value, test_bulk_update.varchar_value' in sql
+    assert params == {'filter_0': [1, 2], 'update_varchar_value': 'patched'}
@@ -0,0 +1,166 @@
+import dataclasses
+import importlib.util
+import json
+import re
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.codegen import generate_crud_models_module, main
+from src.fastapi_quickcrud.misc.exceptions import CodeGenerationException, SchemaFingerprintMismatchException
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class CodegenParent(Base):
+    __tablename__ = 'test_codegen_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False, default='parent')
+    int4_value = Column(Integer)
+    children = relationship('CodegenChild')
+
+
+class CodegenChild(Base):
+    __tablename__ = 'test_codegen_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_codegen_parent.id'))
+    name = Column(String)
+
+
+class CodegenLambdaDefault(Base):
+    __tablename__ = 'test_codegen_lambda_default'
+    id = Column(Integer, primary_key=True)
+    int4_value = Column(Integer, nullable=False, default=lambda: 1)
+
+
+Base.metadata.create_all(engine)
+
+crud_methods = [CrudMethods.FIND_ONE, CrudMethods.FIND_MANY, CrudMethods.CREATE_ONE, CrudMethods.PATCH_ONE,
+                CrudMethods.DELETE_ONE, CrudMethods.FIND_MANY_WITH_FOREIGN_TREE]
+
+
+def path_of(model):
+    return f'{__name__}:{model.__name__}'
+
+
+def import_generated(tmp_path, source):
+    path = tmp_path / 'generated_crud_models.py'
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location('generated_crud_models', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_app(**kwargs):
+    app = FastAPI()
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=CodegenParent,
+                                           crud_methods=crud_methods,
+                                           foreign_include=[CodegenChild],
+                                           sql_type=SqlType.sqlite,
+                                           async_mode=False,
+                                           prefix='/test',
+                                           tags=['test'],
+                                           **kwargs))
+    return app
+
+
+def test_generated_models(tmp_path):
+    source = generate_crud_models_module(path_of(CodegenParent),
+                                         crud_methods=crud_methods,
+                                         sql_type=SqlType.sqlite,
+                                         foreign_include=[path_of(CodegenChild)])
+    assert 'make_dataclass' not in source and 'create_model' not in source
+    module = import_generated(tmp_path, source)
+    find_many = module.crud_models.GET[CrudMethods.FIND_MANY]
+    assert find_many.requestQueryModel.__module__ == 'generated_crud_models'
+    assert len(module.SCHEMA_FINGERPRINT) == 40
+    assert module.crud_models.SCHEMA_FINGERPRINT == module.SCHEMA_FINGERPRINT
+
+    def schema(app):
+        # the names of the models are keyed by the options of the router
+        return re.sub(r'_[0-9a-f]{12}(?=_)', '', json.dumps(app.openapi(), sort_keys=True))
+
+    generated_app = build_app(crud_models=module.crud_models)
+    assert schema(generated_app) == schema(build_app())
+
+    client = TestClient(generated_app)
+    response = client.post('/test', json={'id': 1, 'int4_value': 10})
+    assert response.status_code == 201
+    assert response.json() == {'id': 1, 'name': 'parent', 'int4_value': 10}
+    with session() as db:
+        db.add(CodegenChild(id=1, parent_id=1, name='child'))
+        db.commit()
+    response = client.get('/test/1?join_foreign_table=test_codegen_child')
+    assert response.json()['test_codegen_child_foreign'] == [{'id': 1, 'parent_id': 1, 'name': 'child'}]
+    assert client.patch('/test/1', json={'int4_value': 20}).status_code == 200
+    assert [i['int4_value'] for i in client.get('/test?int4_value____from=15').json()] == [20]
+    response = client.get('/test/1/test_codegen_child')
+    assert [i['name'] for i in response.json()] == ['child']
+    assert client.delete('/test/1').status_code == 200
+
+
+def test_generated_models_of_changed_table(tmp_path):
+    source = generate_crud_models_module(path_of(CodegenChild),
+                                         crud_methods=[CrudMethods.FIND_MANY],
+                                         sql_type=SqlType.sqlite)
+    module = import_generated(tmp_path, source)
+
+    def build(db_model, **kwargs):
+        return crud_router_builder(db_session=get_transaction_session,
+                                   db_model=db_model,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   crud_models=module.crud_models,
+                                   sql_type=SqlType.sqlite,
+                                   async_mode=False,
+                                   prefix='/test',
+                                   **kwargs)
+
+    build(CodegenChild)
+
+    class ChangedCodegenChild(declarative_base()):
+        __tablename__ = 'test_codegen_child'
+        id = Column(Integer, primary_key=True)
+        parent_id = Column(Integer)
+        name = Column(String)
+        int4_value = Column(Integer)
+
+    with pytest.raises(SchemaFingerprintMismatchException):
+        build(ChangedCodegenChild)
+    with pytest.raises(SchemaFingerprintMismatchException):
+        build(CodegenChild, exclude_columns=['name'])
+
+
+def test_generated_module_of_command(tmp_path):
+    output = tmp_path / 'crud_models.py'
+    main([path_of(CodegenChild), '--crud-methods', 'FIND_ONE', 'FIND_MANY', '--sql-type', 'sqlite',
+          '--exclude-columns', 'name', '--output', str(output)])
+    module = import_generated(tmp_path, output.read_text())
+    request_query_model = module.crud_models.GET[CrudMethods.FIND_MANY].requestQueryModel
+    assert {i.name.split('____')[0] for i in dataclasses.fields(request_query_model)} >= {'id', 'parent_id'}
+    assert not [i for i in dataclasses.fields(request_query_model) if i.name.startswith('name')]
+
+
+def test_model_not_written_as_code():
+    with pytest.raises(CodeGenerationException):
+        generate_crud_models_module(path_of(CodegenLambdaDefault),
+                                    crud_methods=[CrudMethods.CREATE_ONE],
+                                    sql_type=SqlType.sqlite)
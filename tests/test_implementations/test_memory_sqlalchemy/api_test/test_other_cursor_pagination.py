@@ -0,0 +1,276 @@
+import json
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, bindparam, create_engine, insert, select
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemySQLITEQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods
+from src.fastapi_quickcrud.misc.utils import encode_cursor, seek_query_builder
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class CursorPaginationTable(Base):
+    __tablename__ = 'test_cursor_pagination'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String, nullable=False)
+    timestamp_value = Column(DateTime, nullable=False)
+
+
+route_1 = crud_router_builder(db_model=CursorPaginationTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              cursor_pagination=True,
+                              prefix="/test",
+                              tags=["test"]
+                              )
+
+
+class CursorParentTable(Base):
+    __tablename__ = 'test_cursor_parent'
+    id = Column(Integer, primary_key=True)
+    children = relationship('CursorChildTable')
+
+
+class CursorChildTable(Base):
+    __tablename__ = 'test_cursor_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_cursor_parent.id'))
+
+
+class CursorNullableTable(Base):
+    __tablename__ = 'test_cursor_nullable'
+    id = Column(Integer, primary_key=True)
+    int4_value = Column(Integer)
+    varchar_value = Column(String)
+
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(engine, tables=[CursorParentTable.__table__, CursorChildTable.__table__,
+                                         CursorNullableTable.__table__])
+nullable_rows = [{'id': i,
+                  'int4_value': None if i % 2 else i % 3,
+                  'varchar_value': None if i % 3 == 0 else f'value_{i % 2}'} for i in range(1, 9)]
+with engine.begin() as connection:
+    connection.execute(insert(CursorNullableTable.__table__), nullable_rows)
+    connection.execute(insert(CursorParentTable.__table__), [{'id': i} for i in range(1, 5)])
+    # the parents have 3, 1, 2 and 0 children
+    connection.execute(insert(CursorChildTable.__table__), [{'id': i, 'parent_id': parent_id} for i, parent_id in
+                                                            enumerate([1, 1, 1, 2, 3, 3], start=1)])
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+route_2 = crud_router_builder(db_model=CursorParentTable,
+                              db_session=get_transaction_session,
+                              crud_methods=[CrudMethods.FIND_MANY],
+                              cursor_pagination=True,
+                              prefix="/test_parent",
+                              tags=["test"]
+                              )
+route_3 = crud_router_builder(db_model=CursorNullableTable,
+                              db_session=get_transaction_session,
+                              crud_methods=[CrudMethods.FIND_MANY],
+                              cursor_pagination=True,
+                              prefix="/test_nullable",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1, route_2, route_3]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+start_time = datetime(2021, 7, 24, 2, 54, 53)
+data = [{"int4_value": i % 4,
+         "varchar_value": f"value_{i % 3}",
+         "timestamp_value": (start_time + timedelta(minutes=i % 5)).isoformat()} for i in range(10)]
+response = client.post('/test', headers=headers, data=json.dumps(data))
+assert response.status_code == 201
+all_rows = client.get('/test', headers=headers).json()
+
+
+def fetch_all_pages(query, path='/test'):
+    rows = []
+    cursor = None
+    pages = 0
+    while True:
+        page_query = dict(query)
+        if cursor:
+            page_query['cursor'] = cursor
+        response = client.get(f'{path}?{urlencode(page_query, doseq=True)}', headers=headers)
+        if response.status_code == HTTPStatus.NO_CONTENT:
+            break
+        assert response.status_code == 200
+        pages += 1
+        rows += response.json()
+        cursor = response.headers.get('x-next-cursor', None)
+        if not cursor:
+            break
+    return rows, pages
+
+
+def test_cursor_pagination_by_primary_key():
+    rows, pages = fetch_all_pages({'limit': 3})
+    assert rows == sorted(all_rows, key=lambda i: i['primary_key'])
+    assert pages == 4
+
+    rows, pages = fetch_all_pages({'limit': 5})
+    assert rows == sorted(all_rows, key=lambda i: i['primary_key'])
+    assert pages == 2
+
+
+def test_cursor_pagination_with_duplicate_order_value():
+    rows, _ = fetch_all_pages({'limit': 3, 'order_by_columns': ['int4_value:DESC']})
+    assert rows == sorted(all_rows, key=lambda i: (i['int4_value'], i['primary_key']), reverse=True)
+
+
+def test_cursor_pagination_with_mixed_order_direction():
+    rows, _ = fetch_all_pages({'limit': 4, 'order_by_columns': ['varchar_value:DESC', 'int4_value']})
+    expected = sorted(all_rows, key=lambda i: (i['int4_value'], i['primary_key']))
+    expected = sorted(expected, key=lambda i: i['varchar_value'], reverse=True)
+    assert rows == expected
+
+
+def test_cursor_pagination_by_datetime_with_filter():
+    query = {'limit': 2, 'order_by_columns': ['timestamp_value'],
+             'int4_value____list': [1, 2, 3]}
+    rows, _ = fetch_all_pages(query)
+    expected = sorted([i for i in all_rows if i['int4_value'] in [1, 2, 3]],
+                      key=lambda i: (i['timestamp_value'], i['primary_key']))
+    assert rows == expected
+
+
+def test_cursor_ignore_offset():
+    response = client.get(f'/test?{urlencode({"limit": 2})}', headers=headers)
+    cursor = response.headers['x-next-cursor']
+    response = client.get(f'/test?{urlencode({"limit": 2, "offset": 4, "cursor": cursor})}', headers=headers)
+    assert [i['primary_key'] for i in response.json()] == [i['primary_key'] for i in all_rows[2:4]]
+
+
+def test_invalid_cursor():
+    response = client.get(f'/test?{urlencode({"limit": 2, "cursor": "invalid"})}', headers=headers)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_cursor_pagination_with_join():
+    for limit in [1, 2, 3, 4, 5]:
+        rows, pages = fetch_all_pages({'limit': limit, 'join_foreign_table': 'test_cursor_child'},
+                                      path='/test_parent')
+        # the limit counts the parents, all the rows of a parent are in the same page
+        assert [(i['id'], sorted(j['id'] for j in i['test_cursor_child_foreign'])) for i in rows] == [
+            (1, [1, 2, 3]), (2, [4]), (3, [5, 6])]
+        assert pages == (3 + limit - 1) // limit
+
+
+def test_cursor_pagination_with_join_of_more_children_than_limit():
+    # the parent 1 has 3 children
+    response = client.get(f'/test_parent?{urlencode({"limit": 2, "join_foreign_table": "test_cursor_child"})}',
+                          headers=headers)
+    assert [(i['id'], sorted(j['id'] for j in i['test_cursor_child_foreign'])) for i in response.json()] == [
+        (1, [1, 2, 3]), (2, [4])]
+    query = {'limit': 2, 'join_foreign_table': 'test_cursor_child', 'cursor': response.headers['x-next-cursor']}
+    response = client.get(f'/test_parent?{urlencode(query)}', headers=headers)
+    assert [(i['id'], sorted(j['id'] for j in i['test_cursor_child_foreign'])) for i in response.json()] == [
+        (3, [5, 6])]
+    assert 'x-next-cursor' not in response.headers
+
+
+def test_keyset_of_table():
+    table = Table('test_cursor_pagination', Base.metadata, extend_existing=True)
+    query_service = SQLAlchemySQLITEQueryService(model=CursorPaginationTable,
+                                                 async_mode=False,
+                                                 foreign_table_mapping={'test_cursor_pagination': table})
+    assert query_service.get_keyset(table, [('int4_value', True)]) == [('int4_value', True), ('primary_key', True)]
+    cursor = client.get(f'/test?{urlencode({"limit": 2})}', headers=headers).headers['x-next-cursor']
+    stmt, params, cursor_columns = query_service.get_many_statement(join_mode=None,
+                                                                    query={'limit': 2},
+                                                                    target_model='test_cursor_pagination',
+                                                                    cursor_pagination=True,
+                                                                    cursor=cursor)
+    assert cursor_columns == ['primary_key']
+    assert params == {'cursor_0': all_rows[1]['primary_key'], 'limit': 2}
+    assert 'test_cursor_pagination.primary_key > :cursor_0' in str(stmt)
+
+
+def nulls_sorted(rows, columns, nulls_first=True):
+    # the NULLs are before the values in the ascending order if nulls_first, as SQLite orders them
+    for column, desc in reversed(columns):
+        values = sorted([i for i in rows if i[column] is not None], key=lambda i: i[column], reverse=desc)
+        nulls = [i for i in rows if i[column] is None]
+        rows = nulls + values if nulls_first != desc else values + nulls
+    return rows
+
+
+def test_cursor_pagination_with_null_order_value():
+    orders = [[('int4_value', False)],
+              [('int4_value', True)],
+              [('varchar_value', False), ('int4_value', False)],
+              [('varchar_value', True), ('int4_value', False)],
+              [('int4_value', True), ('varchar_value', True)]]
+    for order in orders:
+        expected = nulls_sorted(sorted(nullable_rows, key=lambda i: i['id'], reverse=order[-1][1]), order)
+        for limit in [1, 2, 3]:
+            query = {'limit': limit,
+                     'order_by_columns': [f'{column}:DESC' if desc else column for column, desc in order]}
+            rows, _ = fetch_all_pages(query, path='/test_nullable')
+            # every row is in a page once, in the order of the database
+            assert rows == expected, (order, limit)
+
+
+def test_seek_of_nulls_last():
+    # the ordering of PostgreSQL, the NULLs are after the values in the ascending order
+    table = CursorNullableTable.__table__
+    for order in [[('int4_value', False)], [('int4_value', True)], [('varchar_value', True), ('int4_value', False)]]:
+        keyset = order + [('id', order[-1][1])]
+        columns = [table.c[column] for column, _ in keyset]
+        order_by = [(column.desc() if desc else column.asc()) for column, (_, desc) in zip(columns, keyset)]
+        order_by = [i.nullsfirst() if desc else i.nullslast() for i, (_, desc) in zip(order_by, keyset)]
+        expected = nulls_sorted(sorted(nullable_rows, key=lambda i: i['id'], reverse=order[-1][1]), order,
+                                nulls_first=False)
+        rows = []
+        cursor_values = None
+        with engine.connect() as connection:
+            while True:
+                stmt = select(table).order_by(*order_by).limit(2)
+                params = {}
+                if cursor_values is not None:
+                    values = [None if value is None else bindparam(f'cursor_{index}')
+                              for index, value in enumerate(cursor_values)]
+                    params = {f'cursor_{index}': value for index, value in enumerate(cursor_values)
+                              if value is not None}
+                    stmt = stmt.where(seek_query_builder(columns, [desc for _, desc in keyset], values,
+                                                         nulls_first=False))
+                page = [dict(i._mapping) for i in connection.execute(stmt, params)]
+                if not page:
+                    break
+                rows += page
+                cursor_values = [page[-1][column] for column, _ in keyset]
+        assert rows == expected, order
+
+
+def test_null_cursor_of_not_null_column():
+    response = client.get(f'/test?{urlencode({"limit": 2, "cursor": encode_cursor([None])})}', headers=headers)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
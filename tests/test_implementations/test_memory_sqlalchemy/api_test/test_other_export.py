@@ -0,0 +1,205 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, JSON, Date, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_execute import SQLALchemyExecuteService
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.export import ChunkBuffer, CopyQuery
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+
+class Export(Base):
+    __tablename__ = 'test_export'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String)
+    int4_value = Column(Integer, nullable=False, default=0)
+    json_value = Column(JSON)
+    date_value = Column(Date)
+
+
+CSV_BODY = 'name,int4_value,json_value,date_value\n' \
+           'a,1,"{""key"": ""a, b""}",2021-01-01\n' \
+           '"multi\nline",2,,\n' \
+           'c,3,{},2021-01-03\n'
+
+
+def build(async_mode, **kwargs):
+    if async_mode:
+        engine = create_async_engine('sqlite+aiosqlite://', connect_args={"check_same_thread": False},
+                                     poolclass=StaticPool)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+
+        async def create_all():
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+
+        asyncio.get_event_loop().run_until_complete(create_all())
+
+        async def get_transaction_session():
+            async with session() as db:
+                yield db
+
+        sync_engine = engine.sync_engine
+    else:
+        engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        Base.metadata.create_all(engine)
+
+        def get_transaction_session():
+            db = session()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        sync_engine = engine
+
+    statements = []
+    event.listen(sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    app = FastAPI()
+    # the path of the primary key of find one is registered before the export api
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=Export,
+                                           crud_methods=[CrudMethods.FIND_ONE, CrudMethods.EXPORT,
+                                                         CrudMethods.BULK_LOAD],
+                                           sql_type=SqlType.sqlite,
+                                           async_mode=async_mode,
+                                           stream_yield_per=2,
+                                           prefix='/test',
+                                           tags=['test'],
+                                           **kwargs))
+    client = TestClient(app)
+    assert client.post('/test/bulk_load', data=CSV_BODY, headers={'content-type': 'text/csv'}).status_code == 201
+    statements.clear()
+    return client, statements
+
+
+@pytest.fixture(params=[(False, False), (True, False), (False, True)], ids=['sync', 'async', 'fast_query_parser'])
+def export_app(request):
+    async_mode, fast_query_parser = request.param
+    return build(async_mode, fast_query_parser=fast_query_parser)
+
+
+def test_export_csv(export_app):
+    client, statements = export_app
+    response = client.get('/test/export', params={'order_by_columns': 'id'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/csv')
+    # the same CSV as the bulk load body, the empty value is null
+    assert response.text == 'id,name,int4_value,json_value,date_value\n' \
+                            '1,a,1,"{""key"": ""a, b""}",2021-01-01\n' \
+                            '2,"multi\nline",2,,\n' \
+                            '3,c,3,"{}",2021-01-03\n'
+    # one statement for all the partitions of the rows
+    assert len([i for i in statements if i.startswith('SELECT')]) == 1
+
+
+def test_export_ndjson(export_app):
+    client, _ = export_app
+    response = client.get('/test/export', params={'format': 'ndjson',
+                                                  'int4_value____from': 2,
+                                                  'order_by_columns': 'id:DESC'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert [json.loads(i) for i in response.text.splitlines()] == [
+        {'id': 3, 'name': 'c', 'int4_value': 3, 'json_value': {}, 'date_value': '2021-01-03'},
+        {'id': 2, 'name': 'multi\nline', 'int4_value': 2, 'json_value': None, 'date_value': None}]
+
+
+def test_export_filters(export_app):
+    client, _ = export_app
+    response = client.get('/test/export', params={'name____str': 'a', 'limit': 1})
+    assert response.text.splitlines()[1:] == ['1,a,1,"{""key"": ""a, b""}",2021-01-01']
+    response = client.get('/test/export', params={'name____str': 'nothing'})
+    assert response.status_code == 200
+    assert response.text == 'id,name,int4_value,json_value,date_value\n'
+    assert client.get('/test/export', params={'format': 'xml'}).status_code == 422
+    assert client.get('/test/1').json()['name'] == 'a'
+    operation = client.get('/openapi.json').json()['paths']['/test/export']['get']
+    assert set(operation['responses']['200']['content']) == {'text/csv', 'application/x-ndjson'}
+    assert 'join_foreign_table' not in [i['name'] for i in operation['parameters']]
+
+
+def test_export_copy_query():
+    query_service = SQLAlchemyPGSQLQueryService(model=Export, async_mode=False, foreign_table_mapping={})
+    stmt, params = query_service.get_export_statement(query={'name____str': ['a%', 'b'],
+                                                             'name____str_____matching_pattern': ['case_sensitive'],
+                                                             'order_by_columns': ['id'],
+                                                             'limit': 10},
+                                                      columns=['id', 'name'])
+    copy_query = query_service.get_export_copy(stmt, params)
+    assert copy_query.sql().startswith('COPY (SELECT test_export.id, test_export.name \nFROM test_export')
+    assert copy_query.sql().endswith(') TO STDOUT WITH (FORMAT csv, HEADER)')
+    assert copy_query.args == ['a%', 'b', 10]
+    assert copy_query.numbered_select().count('$') == 3
+    assert copy_query.numbered_select().endswith('ORDER BY test_export.id ASC \n LIMIT $3')
+
+
+def test_chunk_buffer():
+    buffer = ChunkBuffer(chunk_size=4)
+    assert [buffer.write(i) for i in [b'ab', b'cd', b'e']] == [None, b'abcd', None]
+    assert buffer.flush() == b'e'
+    assert buffer.flush() is None
+
+
+class CopyCursor(object):
+
+    def __init__(self, rows, copied):
+        self.rows = rows
+        self.copied = copied
+
+    def mogrify(self, sql, args):
+        return (sql % tuple(repr(i) for i in args)).encode()
+
+    def copy_expert(self, sql, file):
+        self.copied.append(sql)
+        for row in self.rows:
+            if row is None:
+                raise RuntimeError('canceling statement due to statement timeout')
+            file.write(row)
+
+    def close(self):
+        pass
+
+
+class CopySession(object):
+    # the session of the psycopg2 connection, only the cursor of COPY is used by the test
+
+    def __init__(self, rows):
+        self.copied = []
+        cursor = CopyCursor(rows, self.copied)
+        self.dbapi_connection = type('Connection', (), {'cursor': lambda _: cursor})()
+
+    def connection(self):
+        return type('Connection', (), {'connection': self.dbapi_connection})()
+
+
+def test_copy_to():
+    copy_query = CopyQuery(select='SELECT id FROM test_export WHERE name = %s', args=['a'])
+    rows = [b'id\n'] + [b'%d\n' % i for i in range(50000)]
+    session = CopySession(rows)
+    chunks = list(SQLALchemyExecuteService.copy_to(session, copy_query))
+    assert session.copied == [b"COPY (SELECT id FROM test_export WHERE name = 'a') TO STDOUT WITH (FORMAT csv, HEADER)"]
+    assert b''.join(chunks) == b''.join(rows)
+    # the rows are written in the chunks
+    assert len(chunks) > 1
+
+    # the error of COPY is raised by the stream
+    with pytest.raises(RuntimeError):
+        list(SQLALchemyExecuteService.copy_to(CopySession([b'id\n', None]), copy_query))
+
+    # COPY is stopped if the stream is closed before the end of it
+    stream = SQLALchemyExecuteService.copy_to(CopySession(rows * 100), copy_query)
+    next(stream)
+    stream.close()
@@ -0,0 +1,131 @@
+import json
+import re
+
+from fastapi import FastAPI
+from fastapi.dependencies import utils
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class FastQueryParser(Base):
+    __tablename__ = 'test_fast_query_parser'
+    id = Column(Integer, primary_key=True)
+    int4_value = Column(Integer)
+    varchar_value = Column(String)
+    children = relationship('FastQueryParserChild')
+
+
+class FastQueryParserChild(Base):
+    __tablename__ = 'test_fast_query_parser_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_fast_query_parser.id'))
+    int4_value = Column(Integer)
+
+
+Base.metadata.create_all(engine)
+with session() as db:
+    db.add_all([FastQueryParser(id=i, int4_value=i * 10, varchar_value=f'value {i}') for i in range(1, 6)])
+    db.add_all([FastQueryParserChild(id=i, parent_id=1 + i % 2, int4_value=i) for i in range(1, 7)])
+    db.commit()
+
+
+def build_client(fast_query_parser):
+    app = FastAPI()
+    app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                           db_model=FastQueryParser,
+                                           crud_methods=[CrudMethods.FIND_MANY,
+                                                         CrudMethods.FIND_MANY_WITH_FOREIGN_TREE],
+                                           foreign_include=[FastQueryParserChild],
+                                           sql_type=SqlType.sqlite,
+                                           async_mode=False,
+                                           fast_query_parser=fast_query_parser,
+                                           prefix='/test',
+                                           tags=['test']))
+    return TestClient(app)
+
+
+client = build_client(fast_query_parser=False)
+fast_client = build_client(fast_query_parser=True)
+
+
+def test_same_response():
+    queries = ['',
+               'int4_value____from=20&int4_value____to=40',
+               'int4_value____list=10&int4_value____list=50',
+               'varchar_value____str=value%25&varchar_value____str_____matching_pattern=case_sensitive',
+               'id____from=2&id____from_____comparison_operator=Greater_than&limit=2&offset=1',
+               'id____list=1&id____list=2&id____list_____comparison_operator=Not_in&unknown=1',
+               'int4_value____from=a&limit=b',
+               'id____from_____comparison_operator=unknown',
+               'int4_value____list=a&int4_value____list=1']
+    for query in queries:
+        response = client.get(f'/test?{query}')
+        fast_response = fast_client.get(f'/test?{query}')
+        assert fast_response.status_code == response.status_code, query
+        assert fast_response.json() == response.json(), query
+    assert [i['id'] for i in fast_client.get('/test?int4_value____from=20&int4_value____to=40').json()] == [2, 3, 4]
+    assert fast_client.get('/test?limit=b').status_code == 422
+
+
+def test_same_response_of_foreign_tree():
+    queries = ['',
+               'int4_value____from=2&int4_value____to=5',
+               'int4_value____list=1&int4_value____list=3',
+               'id____from=2&limit=1&offset=1',
+               'int4_value____from=a',
+               'id____from_____comparison_operator=unknown']
+    for parent_id in [1, 2, 9]:
+        for query in queries:
+            path = f'/test/{parent_id}/test_fast_query_parser_child?{query}'
+            response = client.get(path)
+            fast_response = fast_client.get(path)
+            assert fast_response.status_code == response.status_code, path
+            assert fast_response.content == response.content, path
+    response = fast_client.get('/test/2/test_fast_query_parser_child?int4_value____from=2&int4_value____to=5')
+    assert response.json() and all(2 <= i['int4_value'] <= 5 for i in response.json())
+
+
+def test_same_openapi():
+    def parameters(client_, path):
+        # the names of the models are keyed by the options of the router
+        return re.sub(r'_[0-9a-f]{12}(?=_)', '', json.dumps(client_.app.openapi()['paths'][path]['get']['parameters']))
+
+    for path in ['/test', '/test/{test_fast_query_parser__pk__id}/test_fast_query_parser_child']:
+        assert parameters(fast_client, path) == parameters(client, path)
+
+
+def test_only_query_string_validated(monkeypatch):
+    validated = []
+    request_params_to_args = utils.request_params_to_args
+
+    def counted_request_params_to_args(required_params, received_params):
+        validated.extend(required_params)
+        return request_params_to_args(required_params, received_params)
+
+    monkeypatch.setattr(utils, 'request_params_to_args', counted_request_params_to_args)
+    assert client.get('/test?int4_value____from=20').status_code == 200
+    assert len(validated) > 10
+    validated.clear()
+    assert fast_client.get('/test?int4_value____from=20').status_code == 200
+    assert not validated
+    # only the primary key of the path is validated by the foreign tree api
+    assert fast_client.get('/test/1/test_fast_query_parser_child?int4_value____from=2').status_code == 200
+    assert len(validated) == 1
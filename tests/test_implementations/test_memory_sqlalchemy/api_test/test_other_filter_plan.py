@@ -0,0 +1,90 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc import utils
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class FilterPlanParent(Base):
+    __tablename__ = 'test_filter_plan_parent'
+    id = Column(Integer, primary_key=True)
+    int4_value = Column(Integer)
+    children = relationship('FilterPlanChild')
+
+
+class FilterPlanChild(Base):
+    __tablename__ = 'test_filter_plan_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_filter_plan_parent.id'))
+    int4_value = Column(Integer)
+    varchar_value = Column(String)
+
+
+# the foreign table is queried by the table of it
+child_table = FilterPlanChild.__table__
+
+Base.metadata.create_all(engine)
+with session() as db:
+    db.add(FilterPlanParent(id=1, int4_value=1))
+    db.execute(child_table.insert(), [{'id': i, 'parent_id': 1, 'int4_value': i * 10,
+                                       'varchar_value': f'value {i}'} for i in range(1, 6)])
+    db.commit()
+
+app = FastAPI()
+app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                       db_model=FilterPlanParent,
+                                       crud_methods=[CrudMethods.FIND_MANY, CrudMethods.FIND_MANY_WITH_FOREIGN_TREE],
+                                       foreign_include=[child_table],
+                                       sql_type=SqlType.sqlite,
+                                       async_mode=False,
+                                       prefix='/test',
+                                       tags=['test']))
+client = TestClient(app)
+
+
+def test_filter_plan_of_table():
+    filter_plan = utils.build_filter_plan(child_table)
+    assert filter_plan['int4_value'] == (child_table.c.int4_value, None)
+    assert filter_plan['int4_value____list'] == (child_table.c.int4_value,
+                                                 'int4_value____list_____comparison_operator')
+    assert filter_plan['int4_value____list_____comparison_operator'] is None
+    assert filter_plan['varchar_value____str'] == (child_table.c.varchar_value,
+                                                   'varchar_value____str_____matching_pattern')
+    assert filter_plan['varchar_value____str_____matching_pattern'] is None
+    assert filter_plan.keys() == utils.build_filter_plan(FilterPlanChild).keys()
+
+
+def test_filter_plan_used(monkeypatch):
+    def compile_filter_field(field_name, model):
+        raise AssertionError(f'{field_name} is not in the filter plan')
+
+    # the filter plan of the foreign table is built by the first request of it
+    assert client.get('/test/1/test_filter_plan_child').status_code == 200
+    # the fields are only compiled again if they are not in the filter plan
+    monkeypatch.setattr(utils, '_compile_filter_field', compile_filter_field)
+    response = client.get('/test/1/test_filter_plan_child',
+                          params={'int4_value____list': [20, 30, 40],
+                                  'int4_value____list_____comparison_operator': 'Not_in',
+                                  'varchar_value____str': 'value%',
+                                  'int4_value____from': 20})
+    assert response.status_code == 200
+    assert [i['id'] for i in response.json()] == [5]
+    response = client.get('/test', params={'int4_value____list': [1], 'id': 1})
+    assert [i['id'] for i in response.json()] == [1]
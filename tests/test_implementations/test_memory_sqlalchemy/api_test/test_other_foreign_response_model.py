@@ -0,0 +1,67 @@
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.orm import declarative_base, relationship
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.schema_builder import foreign_response_model_registry
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class SharedParent(Base):
+    __tablename__ = 'test_shared_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class SharedChildA(Base):
+    __tablename__ = 'test_shared_child_a'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_shared_parent.id'))
+    parent = relationship('SharedParent')
+
+
+class SharedChildB(Base):
+    __tablename__ = 'test_shared_child_b'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_shared_parent.id'))
+    parent = relationship('SharedParent')
+
+
+def foreign_model_of(router):
+    response_model = router.routes[0].response_model
+    item_model = response_model.__fields__['__root__'].sub_fields[0].type_
+    return item_model.__fields__['test_shared_parent_foreign'].type_
+
+
+def test_foreign_response_model_shared_by_routers():
+    app = FastAPI()
+    routers = [crud_router_builder(db_model=model,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   prefix=f'/{model.__tablename__}',
+                                   tags=['test'],
+                                   async_mode=False)
+               for model in [SharedChildA, SharedChildB]]
+    [app.include_router(i) for i in routers]
+
+    assert foreign_model_of(routers[0]) is foreign_model_of(routers[1])
+    assert foreign_response_model_registry.info()['hits'] > 0
+    components = [i for i in app.openapi()['components']['schemas'] if i.startswith('foreign_test_shared_parent')]
+    assert len([i for i in components if i.endswith('_FindManyResponseItemModelWithValidators')]) == 1
+    assert len([i for i in components if i.endswith('_GetManyResponseForeignModel')]) == 1
+
+
+def test_foreign_response_model_of_other_fields():
+    routers = [crud_router_builder(db_model=SharedChildA,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   exclude_columns=exclude_columns,
+                                   prefix='/test',
+                                   tags=['test'],
+                                   async_mode=False)
+               for exclude_columns in [[], ['name']]]
+    shared, excluded = [foreign_model_of(i) for i in routers]
+    assert shared is not excluded
+    assert shared.__name__ != excluded.__name__
+    item_schema, = excluded.schema()['definitions'].values()
+    assert set(item_schema['properties']) == {'id'}
@@ -0,0 +1,174 @@
+from datetime import datetime
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, create_engine, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyGeneralSQLQueryService, SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.exceptions import JoinStrategyNotSupportedException
+from src.fastapi_quickcrud.misc.type import CrudMethods, JoinStrategy, SqlType
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+association_table = Table('test_aggregate_association', Base.metadata,
+                          Column('left_id', ForeignKey('test_aggregate_parent.id')),
+                          Column('right_id', ForeignKey('test_aggregate_tag.id')))
+
+
+class AggregateParent(Base):
+    __tablename__ = 'test_aggregate_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    children = relationship('AggregateChild')
+    tags = relationship('AggregateTag', secondary=association_table)
+
+
+class AggregateChild(Base):
+    __tablename__ = 'test_aggregate_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_aggregate_parent.id'))
+    timestamp_value = Column(DateTime)
+    parent = relationship('AggregateParent')
+
+
+class AggregateTag(Base):
+    __tablename__ = 'test_aggregate_tag'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(AggregateParent.__table__), [{'id': i, 'name': f'parent_{i}'} for i in range(1, 5)])
+    connection.execute(insert(AggregateChild.__table__),
+                       [{'id': i, 'parent_id': i % 3 + 1, 'timestamp_value': datetime(2021, 7, 20 + i)} for i in range(1, 8)])
+    connection.execute(insert(AggregateTag.__table__), [{'id': i, 'name': f'tag_{i}'} for i in range(1, 4)])
+    connection.execute(insert(association_table), [{'left_id': 1, 'right_id': 1}, {'left_id': 1, 'right_id': 2},
+                                                   {'left_id': 2, 'right_id': 3}])
+
+routes = []
+for join_strategy in JoinStrategy:
+    routes += [crud_router_builder(db_session=get_transaction_session,
+                                   db_model=AggregateParent,
+                                   crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                   join_strategy=join_strategy,
+                                   prefix=f"/{join_strategy}/parent",
+                                   tags=["parent"]),
+               crud_router_builder(db_session=get_transaction_session,
+                                   db_model=AggregateChild,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   join_strategy=join_strategy,
+                                   prefix=f"/{join_strategy}/child",
+                                   tags=["child"])]
+[app.include_router(i) for i in routes]
+
+client = TestClient(app)
+
+
+def sort_foreign(response):
+    for i in response if isinstance(response, list) else [response]:
+        for key, value in i.items():
+            if key.endswith('_foreign'):
+                value.sort(key=lambda item: item['id'])
+    return response
+
+
+def assert_same_response(path, query):
+    query = {'order_by_columns': 'id', **query}
+    joined = client.get(f'/join{path}?{urlencode(query, doseq=True)}')
+    aggregated = client.get(f'/aggregate{path}?{urlencode(query, doseq=True)}')
+    assert joined.status_code == aggregated.status_code == 200
+    assert sort_foreign(joined.json()) == sort_foreign(aggregated.json())
+    return aggregated.json()
+
+
+def test_aggregate_one_to_many():
+    response = assert_same_response('/parent', {'join_foreign_table': 'test_aggregate_child'})
+    assert [(i['id'], len(i['test_aggregate_child_foreign'])) for i in response] == [(1, 2), (2, 3), (3, 2)]
+    assert response[0]['test_aggregate_child_foreign'][0]['timestamp_value'] == '2021-07-23T00:00:00'
+
+
+def test_aggregate_many_to_many():
+    response = assert_same_response('/parent', {'join_foreign_table': 'test_aggregate_tag'})
+    assert [[j['name'] for j in i['test_aggregate_tag_foreign']] for i in response] == [['tag_1', 'tag_2'],
+                                                                                      ['tag_3']]
+
+
+def test_aggregate_multiple_tables():
+    # the join strategy repeats the rows of a join table for each row of the other join table
+    query = {'join_foreign_table': ['test_aggregate_child', 'test_aggregate_tag']}
+    response = client.get(f'/aggregate/parent?{urlencode(query, doseq=True)}').json()
+    assert [(len(i['test_aggregate_child_foreign']), len(i['test_aggregate_tag_foreign'])) for i in response] == \
+           [(2, 2), (3, 1)]
+
+
+def test_aggregate_limit_by_parent():
+    response = client.get(f'/aggregate/parent?{urlencode({"join_foreign_table": "test_aggregate_child", "limit": 2})}')
+    assert [len(i['test_aggregate_child_foreign']) for i in response.json()] == [2, 3]
+
+
+def test_aggregate_many_to_one_and_find_one():
+    assert_same_response('/child', {'join_foreign_table': 'test_aggregate_parent'})
+    response = assert_same_response('/parent/2', {'join_foreign_table': 'test_aggregate_child'})
+    assert [i['id'] for i in response['test_aggregate_child_foreign']] == [1, 4, 7]
+
+
+def test_aggregate_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=AggregateParent,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_aggregate_parent': AggregateParent},
+                                                join_strategy=JoinStrategy.aggregate)
+    join_mode = {'test_aggregate_child': {'local_reference_pairs_set': [
+        {'local': {'local_column': 'id'},
+         'reference': {'reference_table': 'test_aggregate_child', 'reference_column': 'parent_id'},
+         'local_table_columns': AggregateParent.__table__.c,
+         'reference_table': AggregateChild.__table__,
+         'reference_table_columns': AggregateChild.__table__.c,
+         'exclude': False}]}}
+    stmt, _ = query_service.get_many(join_mode=join_mode, query={})
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "(SELECT json_agg(json_build_object('id', test_aggregate_child.id, 'parent_id', " \
+           "test_aggregate_child.parent_id, 'timestamp_value', test_aggregate_child.timestamp_value)) AS json_agg_1 \n" \
+           "FROM test_aggregate_child \n" \
+           "WHERE test_aggregate_parent.id = test_aggregate_child.parent_id) AS test_aggregate_child_foreign" in sql
+    assert 'WHERE (EXISTS (SELECT 1 \nFROM test_aggregate_child \n' \
+           'WHERE test_aggregate_parent.id = test_aggregate_child.parent_id))' in sql
+
+
+def test_aggregate_not_supported():
+    try:
+        crud_router_builder(db_session=get_transaction_session,
+                            db_model=AggregateTag,
+                            sql_type=SqlType.oracle,
+                            join_strategy=JoinStrategy.aggregate,
+                            prefix="/not_supported")
+    except JoinStrategyNotSupportedException:
+        pass
+    else:
+        assert False
+
+
+def test_aggregate_supported_query_services():
+    for query_service in SQLAlchemyGeneralSQLQueryService.__subclasses__():
+        # the aggregate join strategy is only built for the query services that aggregate the json arrays
+        assert query_service.json_aggregate_supported == hasattr(query_service, 'json_array_aggregate')
@@ -0,0 +1,30 @@
+from src.fastapi_quickcrud.misc.utils import group_find_many_join
+
+
+def rows():
+    return [{'id': 1, 'name': 'a', 'child_foreign': {'id': 1}, 'toy_foreign': {'id': 10}},
+            {'id': 2, 'name': 'b', 'child_foreign': {'id': 2}, 'toy_foreign': {'id': 20}},
+            {'id': 1, 'name': 'a', 'child_foreign': {'id': 3}, 'toy_foreign': {'id': 30}}]
+
+
+def test_group_unordered_rows_by_primary_key():
+    assert group_find_many_join(rows(), ['id']) == [
+        {'id': 1, 'name': 'a', 'child_foreign': [{'id': 1}, {'id': 3}], 'toy_foreign': [{'id': 10}, {'id': 30}]},
+        {'id': 2, 'name': 'b', 'child_foreign': [{'id': 2}], 'toy_foreign': [{'id': 20}]}]
+
+
+def test_group_without_primary_key():
+    assert group_find_many_join(rows()) == group_find_many_join(rows(), ['id'])
+    assert group_find_many_join(rows(), ['not_selected']) == group_find_many_join(rows(), ['id'])
+
+
+def test_group_unhashable_parent_columns():
+    data = [{'tags': ['x'], 'child_foreign': {'id': 1}},
+            {'tags': ['x'], 'child_foreign': {'id': 2}},
+            {'tags': ['y'], 'child_foreign': {'id': 3}}]
+    assert group_find_many_join(data) == [{'tags': ['x'], 'child_foreign': [{'id': 1}, {'id': 2}]},
+                                          {'tags': ['y'], 'child_foreign': [{'id': 3}]}]
+
+
+def test_group_empty_rows():
+    assert group_find_many_join([], ['id']) == []
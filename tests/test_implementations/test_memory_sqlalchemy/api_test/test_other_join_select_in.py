@@ -0,0 +1,180 @@
+import json
+from datetime import datetime
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Table, create_engine, event, insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods, JoinStrategy
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+association_table = Table('test_select_in_association', Base.metadata,
+                          Column('left_id', ForeignKey('test_select_in_parent.id')),
+                          Column('right_id', ForeignKey('test_select_in_tag.id')))
+
+
+class SelectInParent(Base):
+    __tablename__ = 'test_select_in_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    children = relationship('SelectInChild')
+    tags = relationship('SelectInTag', secondary=association_table)
+
+
+class SelectInChild(Base):
+    __tablename__ = 'test_select_in_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_select_in_parent.id'))
+    timestamp_value = Column(DateTime)
+    parent = relationship('SelectInParent')
+
+
+class SelectInTag(Base):
+    __tablename__ = 'test_select_in_tag'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(SelectInParent.__table__), [{'id': i, 'name': f'parent_{i}'} for i in range(1, 5)])
+    connection.execute(insert(SelectInChild.__table__),
+                       [{'id': i, 'parent_id': i % 3 + 1, 'timestamp_value': datetime(2021, 7, 20 + i)}
+                        for i in range(1, 8)])
+    connection.execute(insert(SelectInTag.__table__), [{'id': i, 'name': f'tag_{i}'} for i in range(1, 4)])
+    connection.execute(insert(association_table), [{'left_id': 1, 'right_id': 1}, {'left_id': 1, 'right_id': 2},
+                                                   {'left_id': 2, 'right_id': 3}])
+
+routes = []
+for join_strategy in [JoinStrategy.join, JoinStrategy.select_in]:
+    routes += [crud_router_builder(db_session=get_transaction_session,
+                                   db_model=SelectInParent,
+                                   crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                   join_strategy=join_strategy,
+                                   bulk_chunk_size=2,
+                                   prefix=f"/{join_strategy}/parent",
+                                   tags=["parent"]),
+               crud_router_builder(db_session=get_transaction_session,
+                                   db_model=SelectInChild,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   join_strategy=join_strategy,
+                                   prefix=f"/{join_strategy}/child",
+                                   tags=["child"])]
+[app.include_router(i) for i in routes]
+
+client = TestClient(app)
+
+
+def sort_foreign(response):
+    for i in response if isinstance(response, list) else [response]:
+        for key, value in i.items():
+            if key.endswith('_foreign'):
+                value.sort(key=lambda item: item['id'])
+    return response
+
+
+def assert_same_response(path, query):
+    query = {'order_by_columns': 'id', **query}
+    joined = client.get(f'/join{path}?{urlencode(query, doseq=True)}')
+    selected = client.get(f'/select_in{path}?{urlencode(query, doseq=True)}')
+    assert joined.status_code == selected.status_code == 200
+    assert sort_foreign(joined.json()) == sort_foreign(selected.json())
+    return selected.json()
+
+
+def test_select_in_one_to_many():
+    response = assert_same_response('/parent', {'join_foreign_table': 'test_select_in_child'})
+    assert [(i['id'], len(i['test_select_in_child_foreign'])) for i in response] == [(1, 2), (2, 3), (3, 2)]
+
+
+def test_select_in_many_to_many():
+    response = assert_same_response('/parent', {'join_foreign_table': 'test_select_in_tag'})
+    assert [[j['name'] for j in i['test_select_in_tag_foreign']] for i in response] == [['tag_1', 'tag_2'],
+                                                                                       ['tag_3']]
+
+
+def test_select_in_many_to_one_and_find_one():
+    assert_same_response('/child', {'join_foreign_table': 'test_select_in_parent'})
+    response = assert_same_response('/parent/2', {'join_foreign_table': 'test_select_in_child'})
+    assert [i['id'] for i in response['test_select_in_child_foreign']] == [1, 4, 7]
+
+
+def test_select_in_limit_and_total_count_by_parent():
+    query = {'join_foreign_table': ['test_select_in_child', 'test_select_in_tag'], 'order_by_columns': 'id'}
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(f'/select_in/parent?{urlencode({**query, "limit": 2}, doseq=True)}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200
+    assert response.headers['x-total-count'] == '2'
+    assert [(len(i['test_select_in_child_foreign']), len(i['test_select_in_tag_foreign']))
+            for i in sort_foreign(response.json())] == [(2, 2), (3, 1)]
+    # the page of the parents and one WHERE IN statement for each join table
+    assert len(statements) == 3
+
+
+def test_select_in_stream():
+    query = {'join_foreign_table': 'test_select_in_child', 'order_by_columns': 'id'}
+    response = client.get(f'/select_in/parent?{urlencode(query)}', headers={'accept': 'application/x-ndjson'})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(i['id'], len(i['test_select_in_child_foreign'])) for i in rows] == [(1, 2), (2, 3), (3, 2)]
+
+
+def test_select_in_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=SelectInParent,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_select_in_parent': SelectInParent},
+                                                join_strategy=JoinStrategy.select_in,
+                                                bulk_chunk_size=2)
+    join_mode = {'test_select_in_child': {'local_reference_pairs_set': [
+        {'local': {'local_table': 'test_select_in_parent', 'local_column': 'id'},
+         'reference': {'reference_table': 'test_select_in_child', 'reference_column': 'parent_id'},
+         'local_table_columns': SelectInParent.__table__.c,
+         'reference_table': SelectInChild.__table__,
+         'reference_table_columns': SelectInChild.__table__.c,
+         'exclude': False}]}}
+    stmt, _ = query_service.get_many(join_mode=join_mode, query={})
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith('SELECT test_select_in_parent.id, test_select_in_parent.name \n'
+                          'FROM test_select_in_parent')
+
+    with engine.connect() as connection:
+        rows = connection.execute(stmt).fetchall()
+    statements = list(query_service.get_select_in_statements(join_mode=join_mode, rows=rows))
+    assert [(field, local_key, params) for field, local_key, _, params in statements] == [
+        ('test_select_in_child_foreign', 'id', {'select_in_keys': [1, 2]}),
+        ('test_select_in_child_foreign', 'id', {'select_in_keys': [3]})]
+    sql = str(statements[0][2].compile(dialect=postgresql.dialect()))
+    assert sql == 'SELECT test_select_in_child.parent_id AS __select_in_key, test_select_in_child.id, ' \
+                  'test_select_in_child.parent_id, test_select_in_child.timestamp_value \n' \
+                  'FROM test_select_in_child \n' \
+                  'WHERE test_select_in_child.parent_id IN (__[POSTCOMPILE_select_in_keys])'
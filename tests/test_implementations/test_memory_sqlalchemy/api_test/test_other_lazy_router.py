@@ -0,0 +1,114 @@
+import json
+
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.exceptions import LazyRouterPrefixMissing
+from src.fastapi_quickcrud.misc.lazy_route import LazyCRUDRoute, lazy_openapi, materialize_crud_routes
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+
+class LazyTable(Base):
+    __tablename__ = 'test_lazy'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+class LazyOtherTable(Base):
+    __tablename__ = 'test_lazy_other'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    varchar_value = Column(String)
+
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def build_app():
+    app = FastAPI()
+    api = APIRouter()
+    for model, prefix in [(LazyTable, '/test'), (LazyOtherTable, '/test_other')]:
+        api.include_router(crud_router_builder(db_model=model,
+                                               crud_methods=[CrudMethods.FIND_ONE,
+                                                             CrudMethods.FIND_MANY,
+                                                             CrudMethods.CREATE_ONE],
+                                               lazy=True,
+                                               prefix=prefix,
+                                               tags=["test"]))
+    app.include_router(api, prefix='/api', tags=['api'])
+    return app
+
+
+def test_lazy_router_built_on_first_request():
+    app = build_app()
+    lazy_routes = [i for i in app.routes if isinstance(i, LazyCRUDRoute)]
+    assert [(i.path, i.name, i.routes) for i in lazy_routes] == [('/api/test', 'test_lazy', None),
+                                                                 ('/api/test_other', 'test_lazy_other', None)]
+
+    client = TestClient(app)
+    response = client.post('/api/test', headers=headers, data=json.dumps({"int4_value": 1, "varchar_value": "a"}))
+    assert response.status_code == 201
+    primary_key = response.json()["primary_key"]
+    response = client.get(f'/api/test/{primary_key}', headers=headers)
+    assert response.status_code == 200
+    assert response.json()['varchar_value'] == 'a'
+    assert client.delete('/api/test', headers=headers).status_code == 405
+    assert lazy_routes[0].build_seconds is not None
+    assert [i.path for i in lazy_routes[0].routes] == ['/api/test/{primary_key}', '/api/test', '/api/test']
+    assert lazy_routes[0].routes[0].tags == ['api', 'test']
+    # the router of the other prefix is not built
+    assert lazy_routes[1].routes is None
+    assert client.get('/api/test_unknown', headers=headers).status_code == 404
+    assert lazy_routes[1].routes is None
+
+
+def test_lazy_router_openapi():
+    app = build_app()
+    assert '/api/test' not in app.openapi()['paths']
+
+    app = lazy_openapi(build_app())
+    client = TestClient(app)
+    paths = client.get('/openapi.json').json()['paths']
+    assert set(paths) == {'/api/test', '/api/test/{primary_key}', '/api/test_other', '/api/test_other/{primary_key}'}
+    assert not [i for i in app.routes if isinstance(i, LazyCRUDRoute)]
+
+
+def test_materialize_crud_routes():
+    app = build_app()
+    build_seconds = materialize_crud_routes(app)
+    assert sorted(build_seconds) == ['/api/test', '/api/test_other']
+    assert all(i >= 0 for i in build_seconds.values())
+    assert len([i for i in app.routes if i.path.startswith('/api/')]) == 6
+    assert TestClient(app).get('/api/test_other', headers=headers).status_code == 204
+
+
+def test_lazy_router_included_twice():
+    app = FastAPI()
+    router = crud_router_builder(db_model=LazyOtherTable,
+                                 crud_methods=[CrudMethods.FIND_MANY],
+                                 lazy=True,
+                                 prefix='/test_other',
+                                 tags=["test"])
+    app.include_router(router, prefix='/v1')
+    app.include_router(router, prefix='/v2', include_in_schema=False)
+    build_seconds = materialize_crud_routes(app)
+    # the build seconds of the routers of the same table are kept by the path
+    assert sorted(build_seconds) == ['/v1/test_other', '/v2/test_other']
+    assert set(app.openapi()['paths']) == {'/v1/test_other'}
+
+
+def test_lazy_router_without_prefix():
+    try:
+        crud_router_builder(db_model=LazyTable, lazy=True, tags=["test"])
+    except LazyRouterPrefixMissing:
+        pass
+    else:
+        assert False
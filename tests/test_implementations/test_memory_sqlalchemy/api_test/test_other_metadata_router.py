@@ -0,0 +1,205 @@
+import re
+
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, create_engine, event, insert
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder, metadata_crud_router_builder
+from src.fastapi_quickcrud.misc.schema_builder import SchemaAnalysisCache
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class MetadataParent(Base):
+    __tablename__ = 'test_metadata_parent'
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    children = relationship('MetadataChild', back_populates='parent')
+
+
+class MetadataChild(Base):
+    __tablename__ = 'test_metadata_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_metadata_parent.id'))
+    name = Column(String)
+    parent = relationship('MetadataParent', back_populates='children')
+
+
+class MetadataOther(Base):
+    __tablename__ = 'test_metadata_other'
+    id = Column(Integer, primary_key=True)
+    password = Column(String)
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(MetadataParent.__table__), [{'id': 1, 'name': 'parent_1'}])
+    connection.execute(insert(MetadataChild.__table__), [{'id': i, 'parent_id': 1, 'name': f'child_{i}'}
+                                                         for i in range(1, 3)])
+
+
+def test_metadata_router_of_declarative_base():
+    cache = SchemaAnalysisCache()
+    routers = metadata_crud_router_builder(metadata_or_base=Base,
+                                           db_session=get_transaction_session,
+                                           schema_analysis_cache=cache,
+                                           tables=['test_metadata_parent', 'test_metadata_child'],
+                                           table_options={'test_metadata_parent': {
+                                               'crud_methods': [CrudMethods.FIND_ONE, CrudMethods.FIND_MANY]}},
+                                           crud_methods=[CrudMethods.FIND_MANY],
+                                           async_mode=False)
+    assert list(routers) == ['test_metadata_parent', 'test_metadata_child']
+    assert cache.info()['hits'] > 0
+    assert cache.info()['size'] == len(cache)
+
+    app = FastAPI()
+    [app.include_router(i) for i in routers.values()]
+    client = TestClient(app)
+    response = client.get('/test_metadata_parent/1?join_foreign_table=test_metadata_child')
+    assert response.status_code == 200
+    assert sorted(i['name'] for i in response.json()['test_metadata_child_foreign']) == ['child_1', 'child_2']
+    response = client.get('/test_metadata_child?join_foreign_table=test_metadata_parent&order_by_columns=id')
+    assert response.status_code == 200
+    assert [i['test_metadata_parent_foreign'][0]['name'] for i in response.json()] == ['parent_1', 'parent_1']
+    assert client.get('/test_metadata_child/1').status_code == 404
+    assert client.get('/test_metadata_other').status_code == 404
+    assert routers['test_metadata_child'].routes[0].tags == ['test_metadata_child']
+
+
+def test_metadata_router_of_schema():
+    schema_base = declarative_base()
+    schema_engine = create_engine('sqlite://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    event.listen(schema_engine, 'connect',
+                 lambda connection, _: connection.execute("ATTACH DATABASE ':memory:' AS test_metadata_schema"))
+    schema_session = sessionmaker(autocommit=False, autoflush=False, bind=schema_engine)
+
+    def get_schema_session():
+        db = schema_session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    class SchemaParent(schema_base):
+        __tablename__ = 'test_schema_parent'
+        __table_args__ = {'schema': 'test_metadata_schema'}
+        id = Column(Integer, primary_key=True)
+        children = relationship('SchemaChild', back_populates='parent')
+
+    class SchemaChild(schema_base):
+        __tablename__ = 'test_schema_child'
+        __table_args__ = {'schema': 'test_metadata_schema'}
+        id = Column(Integer, primary_key=True)
+        parent_id = Column(Integer, ForeignKey('test_metadata_schema.test_schema_parent.id'))
+        parent = relationship('SchemaParent', back_populates='children')
+
+    schema_base.metadata.create_all(schema_engine)
+    with schema_engine.begin() as connection:
+        connection.execute(insert(SchemaParent.__table__), [{'id': 1}])
+        connection.execute(insert(SchemaChild.__table__), [{'id': i, 'parent_id': 1} for i in range(1, 3)])
+
+    routers = metadata_crud_router_builder(metadata_or_base=schema_base,
+                                           db_session=get_schema_session,
+                                           crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                           async_mode=False)
+    assert list(routers) == ['test_metadata_schema.test_schema_parent', 'test_metadata_schema.test_schema_child']
+    parent_router = routers['test_metadata_schema.test_schema_parent']
+    assert parent_router.prefix == '/test_metadata_schema_test_schema_parent'
+    assert parent_router.routes[0].tags == ['test_metadata_schema_test_schema_parent']
+    # the routers are built by the mapped classes, the relationships join the foreign tables
+    app = FastAPI()
+    [app.include_router(i) for i in routers.values()]
+    client = TestClient(app)
+    response = client.get('/test_metadata_schema_test_schema_parent/1?join_foreign_table=test_schema_child')
+    assert response.status_code == 200
+    assert sorted(i['id'] for i in response.json()['test_schema_child_foreign']) == [1, 2]
+    response = client.get('/test_metadata_schema_test_schema_child?join_foreign_table=test_schema_parent'
+                          '&order_by_columns=id')
+    assert response.status_code == 200
+    assert [i['test_schema_parent_foreign'][0]['id'] for i in response.json()] == [1, 1]
+
+
+def test_metadata_router_of_metadata():
+    metadata = MetaData()
+    Table('test_metadata_table', metadata,
+          Column('id', Integer, primary_key=True),
+          Column('name', String))
+    routers = metadata_crud_router_builder(metadata_or_base=metadata,
+                                           crud_methods=[CrudMethods.CREATE_ONE, CrudMethods.FIND_MANY],
+                                           async_mode=False)
+    app = FastAPI()
+    app.include_router(routers['test_metadata_table'])
+    client = TestClient(app)
+    assert client.post('/test_metadata_table', json={'id': 1, 'name': 'a'}).status_code == 201
+    assert client.get('/test_metadata_table').json() == [{'id': 1, 'name': 'a'}]
+
+
+def test_shared_cache_builds_the_same_models():
+    cache = SchemaAnalysisCache()
+    kwargs = dict(db_session=get_transaction_session,
+                  db_model=MetadataParent,
+                  crud_methods=[CrudMethods.FIND_ONE],
+                  exclude_columns=['name'],
+                  async_mode=False)
+    uncached = crud_router_builder(**kwargs)
+    cached = crud_router_builder(schema_analysis_cache=cache, **kwargs)
+    assert cache.info()['misses'] > 0
+    crud_router_builder(schema_analysis_cache=cache, **kwargs)
+    assert cache.info()['hits'] > 0
+
+    def schema(router):
+        # the names of the models are keyed by the options of the router
+        return re.sub(r'_[0-9a-f]{12}(?=_)', '',
+                      router.routes[0].response_model.schema_json())
+
+    assert schema(uncached) == schema(cached)
+    assert '"name"' not in schema(cached)
+
+
+def test_shared_cache_with_foreign_include():
+    cache = SchemaAnalysisCache()
+    kwargs = dict(db_session=get_transaction_session,
+                  db_model=MetadataParent,
+                  crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                CrudMethods.FIND_ONE_WITH_FOREIGN_TREE, CrudMethods.FIND_MANY_WITH_FOREIGN_TREE],
+                  foreign_include=[MetadataChild],
+                  prefix='/test_metadata_parent',
+                  async_mode=False)
+    uncached = crud_router_builder(**kwargs)
+    cached = crud_router_builder(schema_analysis_cache=cache, **kwargs)
+    hits = cache.info()['hits']
+    # the child router shares the analysis of the parent table
+    crud_router_builder(schema_analysis_cache=cache, **{**kwargs,
+                                                        'db_model': MetadataChild,
+                                                        'foreign_include': [MetadataParent]})
+    crud_router_builder(schema_analysis_cache=cache, **kwargs)
+    assert cache.info()['hits'] > hits
+    assert {'foreign_mapper', 'relation_level'} <= {i[0] for i in cache._analysis}
+
+    def schemas(router):
+        return [(i.path, re.sub(r'_[0-9a-f]{12}(?=_)', '',
+                                i.response_model.schema_json())) for i in router.routes]
+
+    assert any('test_metadata_child' in path for path, _ in schemas(cached))
+    assert schemas(uncached) == schemas(cached)
+
+    app = FastAPI()
+    app.include_router(cached)
+    client = TestClient(app)
+    response = client.get('/test_metadata_parent/1/test_metadata_child')
+    assert response.status_code == 200
+    assert sorted(i['name'] for i in response.json()) == ['child_1', 'child_2']
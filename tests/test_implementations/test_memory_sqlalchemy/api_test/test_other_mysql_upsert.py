@@ -0,0 +1,142 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, create_engine, event, literal_column, select
+from sqlalchemy.dialects import mysql, registry
+from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql import elements, visitors
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyMySQLQueryService
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+
+# the stand-in of MySQL, ON DUPLICATE KEY UPDATE is rendered as ON CONFLICT DO UPDATE without the conflict target
+# of SQLite 3.35+, which updates the row on the conflict of any unique key as well
+class MySQLStandInCompiler(SQLiteCompiler):
+
+    def visit_on_duplicate_key_update(self, on_duplicate, **kw):
+        def replace(obj):
+            if isinstance(obj, elements.ColumnClause) and obj.table is on_duplicate.inserted_alias:
+                return literal_column('excluded.' + self.preparer.quote(obj.name))
+            return None
+
+        clauses = []
+        for name, value in on_duplicate.update.items():
+            value = visitors.replacement_traverse(value, {}, replace)
+            clauses.append(f'{self.preparer.quote(name)} = {self.process(value.self_group(), use_schema=False)}')
+        return 'ON CONFLICT DO UPDATE SET ' + ', '.join(clauses)
+
+    def visit_last_insert_id_func(self, fn, **kw):
+        return 'last_insert_rowid()'
+
+
+class MySQLStandInDialect(SQLiteDialect_pysqlite):
+    statement_compiler = MySQLStandInCompiler
+
+
+registry.impls['sqlite.mysql_stand_in'] = lambda: MySQLStandInDialect
+
+Base = declarative_base()
+
+
+class MySQLUpsert(Base):
+    __tablename__ = 'test_mysql_upsert'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(32), unique=True)
+    int4_value = Column(Integer, nullable=False, default=0)
+
+
+def build(sql_type):
+    engine = create_engine('sqlite+mysql_stand_in://', connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(engine)
+
+    def get_transaction_session():
+        db = session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    app = FastAPI()
+    for crud_method, prefix in [(CrudMethods.UPSERT_MANY, '/test'), (CrudMethods.CREATE_MANY, '/test_create')]:
+        app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                               db_model=MySQLUpsert,
+                                               crud_methods=[crud_method],
+                                               sql_type=sql_type,
+                                               async_mode=False,
+                                               bulk_chunk_size=2,
+                                               prefix=prefix,
+                                               tags=['test']))
+    return TestClient(app), session, statements
+
+
+@pytest.fixture(params=[SqlType.mysql, SqlType.mariadb])
+def upsert_app(request):
+    return build(request.param)
+
+
+def test_compiled_upsert():
+    query_service = SQLAlchemyMySQLQueryService(model=MySQLUpsert, async_mode=False, foreign_table_mapping={},
+                                                bulk_chunk_size=2)
+    rows = [SimpleNamespace(name=f'name {i}', int4_value=i) for i in range(3)]
+    statements = list(query_service.upsert(insert_arg={'insert': rows,
+                                                       'on_conflict': SimpleNamespace(update_columns=['int4_value'])},
+                                           unique_fields=['name'],
+                                           upsert_one=False,
+                                           returning=False))
+    assert len(statements) == 2
+    upsert_stmt, select_stmt = statements[0]
+    compiled = str(upsert_stmt.compile(dialect=mysql.dialect()))
+    assert compiled == 'INSERT INTO test_mysql_upsert (name, int4_value) VALUES (%s, %s), (%s, %s) ' \
+                       'ON DUPLICATE KEY UPDATE int4_value = VALUES(int4_value)'
+    compiled = select_stmt.compile(dialect=mysql.dialect(), compile_kwargs={'render_postcompile': True})
+    assert 'WHERE test_mysql_upsert.name IN (%s, %s) ORDER BY test_mysql_upsert.name' in str(compiled)
+    # the row without the primary key and the unique columns is selected by LAST_INSERT_ID()
+    (upsert_stmt, select_stmt), = query_service.upsert(insert_arg={'int4_value': 1}, unique_fields=['name'],
+                                                       returning=False)
+    assert 'ON DUPLICATE KEY' not in str(upsert_stmt.compile(dialect=mysql.dialect()))
+    assert 'WHERE test_mysql_upsert.id = last_insert_id()' in str(select_stmt.compile(dialect=mysql.dialect()))
+
+
+def test_upsert_many(upsert_app):
+    client, session, statements = upsert_app
+    rows = [{'id': i, 'name': f'name {i}', 'int4_value': i} for i in range(1, 6)]
+    response = client.post('/test', json={'insert': rows})
+    assert response.status_code == 201
+    assert response.json() == rows
+
+    statements.clear()
+    update = [{'name': f'name {i}', 'int4_value': i * 10} for i in range(1, 6)] + [{'name': 'name 6'}]
+    response = client.post('/test', json={'insert': update, 'on_conflict': {'update_columns': ['int4_value']}})
+    assert response.status_code == 201
+    assert response.json() == [{'id': i, 'name': f'name {i}', 'int4_value': i * 10} for i in range(1, 6)] + \
+           [{'id': 6, 'name': 'name 6', 'int4_value': 0}]
+    # the chunks of 2 rows, each one is selected after it
+    assert len([i for i in statements if i.startswith('INSERT')]) == 3
+    assert len([i for i in statements if i.startswith('SELECT')]) == 3
+    with session() as db:
+        assert db.execute(select(MySQLUpsert.int4_value).order_by(MySQLUpsert.id)).scalars().all() == \
+               [10, 20, 30, 40, 50, 0]
+
+
+def test_create_many(upsert_app):
+    client, session, statements = upsert_app
+    response = client.post('/test_create', json=[{'name': f'name {i}'} for i in range(3)])
+    assert response.status_code == 201
+    assert response.json() == [{'id': i + 1, 'name': f'name {i}', 'int4_value': 0} for i in range(3)]
+    assert len([i for i in statements if i.startswith('INSERT')]) == 2
+    response = client.post('/test_create', json=[{'name': 'name 3'}, {'name': 'name 0'}])
+    assert response.status_code == 409
+    with session() as db:
+        assert db.execute(select(MySQLUpsert.name)).scalars().all() == [f'name {i}' for i in range(3)]
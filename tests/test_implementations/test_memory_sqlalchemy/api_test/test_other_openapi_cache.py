@@ -0,0 +1,140 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.lazy_route import LazyCRUDRoute, lazy_openapi, materialize_crud_routes
+from src.fastapi_quickcrud.misc.openapi_cache import cached_openapi, openapi_fingerprint
+from src.fastapi_quickcrud.misc.schema_builder import schema_fingerprint
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+Base = declarative_base()
+
+
+class OpenApiCacheTable(Base):
+    __tablename__ = 'test_openapi_cache'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+def build_app(cache_dir, **kwargs):
+    app = FastAPI()
+    app.include_router(crud_router_builder(db_model=OpenApiCacheTable,
+                                           crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                           lazy=True,
+                                           prefix='/test',
+                                           tags=['test'],
+                                           **kwargs))
+    return cached_openapi(lazy_openapi(app), cache_dir)
+
+
+def test_openapi_cache(tmp_path):
+    cache_dir = str(tmp_path / 'openapi')
+    app = build_app(cache_dir)
+    fingerprint = openapi_fingerprint(app)
+    paths = TestClient(app).get('/openapi.json').json()['paths']
+    assert set(paths) == {'/test', '/test/{primary_key}'}
+    assert os.listdir(cache_dir) == [f'openapi_{fingerprint}.json']
+
+    # the app of another worker loads the schema without building the lazy routers
+    app = build_app(cache_dir)
+    assert openapi_fingerprint(app) == fingerprint
+    assert TestClient(app).get('/openapi.json').json()['paths'] == paths
+    lazy_route, = [i for i in app.routes if isinstance(i, LazyCRUDRoute)]
+    assert lazy_route.routes is None
+
+    # the options of the router change the fingerprint
+    app = build_app(cache_dir, exclude_columns=['varchar_value'])
+    assert openapi_fingerprint(app) != fingerprint
+    schema = app.openapi()
+    assert len(os.listdir(cache_dir)) == 2
+    assert 'varchar_value' not in str(schema['components'])
+
+
+def test_model_names_of_schema_fingerprint():
+    def build_router(**kwargs):
+        return crud_router_builder(db_model=OpenApiCacheTable,
+                                   crud_methods=[CrudMethods.FIND_MANY],
+                                   sql_type=SqlType.sqlite,
+                                   tags=['test'],
+                                   **kwargs)
+
+    router = build_router(exclude_columns=['int4_value'], prefix='/test')
+    fingerprint = schema_fingerprint(OpenApiCacheTable,
+                                     sql_type=SqlType.sqlite,
+                                     exclude_columns=['int4_value'],
+                                     constraints=OpenApiCacheTable.__table__.constraints)
+    name = router.routes[0].response_model.__name__
+    assert re.fullmatch(r'test_openapi_cache_[0-9a-f]{12}_FindManyResponseListModel', name)
+    # the names are the same for the same tables and options, they are not numbered by the build order
+    assert build_router(exclude_columns=['int4_value'], prefix='/test').routes[0].response_model.__name__ == name
+    assert build_router(exclude_columns=['int4_value'], prefix='/test_2').routes[0].response_model.__name__ != name
+    assert fingerprint != schema_fingerprint(OpenApiCacheTable,
+                                             sql_type=SqlType.sqlite,
+                                             constraints=OpenApiCacheTable.__table__.constraints)
+
+
+def test_model_names_of_lazy_routers_in_any_build_order():
+    def build_app(build_order):
+        app = FastAPI()
+        for prefix in ['/test_a', '/test_b']:
+            app.include_router(crud_router_builder(db_model=OpenApiCacheTable,
+                                                   crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY],
+                                                   sql_type=SqlType.sqlite,
+                                                   lazy=True,
+                                                   prefix=prefix,
+                                                   tags=['test']))
+        client = TestClient(app)
+        # the first request of the worker builds the router of it
+        for prefix in build_order:
+            assert client.get(prefix).status_code in (200, 204)
+        materialize_crud_routes(app)
+        assert set(app.openapi()['paths']) == {'/test_a', '/test_a/{primary_key}', '/test_b', '/test_b/{primary_key}'}
+        return {route.path: route.response_model.__name__ for route in app.routes
+                if getattr(route, 'response_model', None) is not None}
+
+    names = build_app(['/test_a', '/test_b'])
+    assert len(names) == 4 and len(set(names.values())) == 4
+    assert build_app(['/test_b', '/test_a']) == names
+
+
+FINGERPRINT_SCRIPT = """
+import datetime
+import uuid
+
+from sqlalchemy import Column, DateTime, Integer, String, text
+from sqlalchemy.orm import declarative_base
+
+from src.fastapi_quickcrud.misc.schema_builder import schema_fingerprint
+from src.fastapi_quickcrud.misc.type import SqlType
+
+Base = declarative_base()
+
+
+class CallableDefaultTable(Base):
+    __tablename__ = 'test_callable_default'
+    primary_key = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    int4_value = Column(Integer, default=1)
+    timestamp_value = Column(DateTime, default=datetime.datetime.utcnow, server_default=text('CURRENT_TIMESTAMP'))
+
+
+print(schema_fingerprint(CallableDefaultTable, sql_type=SqlType.sqlite,
+                         constraints=CallableDefaultTable.__table__.constraints))
+"""
+
+
+def test_schema_fingerprint_of_callable_defaults_in_processes():
+    # the fingerprint has no memory address of the defaults, it is the same in every process
+    root = Path(__file__).resolve().parents[4]
+    fingerprints = [subprocess.run([sys.executable, '-c', FINGERPRINT_SCRIPT], cwd=root, check=True,
+                                   capture_output=True, text=True).stdout.strip() for _ in range(2)]
+    assert len(fingerprints[0]) == 40
+    assert fingerprints[0] == fingerprints[1]
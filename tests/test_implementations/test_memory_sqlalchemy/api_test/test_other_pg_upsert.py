@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+from src.fastapi_quickcrud.misc import abstract_query
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService, deduplicate_rows
+
+Base = declarative_base()
+
+
+class PGUpsert(Base):
+    __tablename__ = 'test_pg_upsert'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(32), unique=True)
+    int4_value = Column(Integer)
+
+
+query_service = SQLAlchemyPGSQLQueryService(model=PGUpsert, async_mode=False, foreign_table_mapping={})
+
+
+def upsert_statements(rows, **kwargs):
+    insert_arg = {'insert': [SimpleNamespace(**i) for i in rows],
+                  'on_conflict': SimpleNamespace(update_columns=['int4_value'])}
+    statements = list(query_service.upsert(insert_arg=insert_arg, unique_fields=['name'], upsert_one=False,
+                                           **kwargs))
+    return [upsert_stmt.compile(dialect=postgresql.dialect()) for upsert_stmt, _ in statements]
+
+
+def test_deduplicated_rows():
+    rows = [{'name': 'a', 'int4_value': 1}, {'name': None, 'int4_value': 2}, {'name': 'b', 'int4_value': 3},
+            {'name': 'a', 'int4_value': 4}, {'name': None, 'int4_value': 5}]
+    assert deduplicate_rows(rows, ['name']) == [{'name': 'a', 'int4_value': 4}, {'name': None, 'int4_value': 2},
+                                                {'name': 'b', 'int4_value': 3}, {'name': None, 'int4_value': 5}]
+
+
+def test_compiled_upsert():
+    compiled, = upsert_statements([{'name': 'a', 'int4_value': 1}, {'name': 'b', 'int4_value': 2},
+                                   {'name': 'a', 'int4_value': 3}])
+    assert str(compiled) == 'INSERT INTO test_pg_upsert (name, int4_value) ' \
+                            'VALUES (%(name_m0)s, %(int4_value_m0)s), (%(name_m1)s, %(int4_value_m1)s) ' \
+                            'ON CONFLICT (name) DO UPDATE SET int4_value = excluded.int4_value ' \
+                            'RETURNING test_pg_upsert.id, test_pg_upsert.name, test_pg_upsert.int4_value'
+    # the last row of the name wins
+    assert compiled.params == {'name_m0': 'a', 'int4_value_m0': 3, 'name_m1': 'b', 'int4_value_m1': 2}
+
+
+def test_chunks_of_bind_params_limit(monkeypatch):
+    monkeypatch.setattr(abstract_query, 'MAX_BIND_PARAMS', 4)
+    statements = upsert_statements([{'name': str(i), 'int4_value': i} for i in range(5)])
+    assert [len(i.params) for i in statements] == [4, 4, 2]
+    assert all('ON CONFLICT (name) DO UPDATE' in str(i) for i in statements)
@@ -0,0 +1,90 @@
+import uuid
+from dataclasses import fields
+
+import pytest
+from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import declarative_base, relationship
+
+from src.fastapi_quickcrud.misc import schema_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+from src.fastapi_quickcrud.misc.utils import sqlalchemy_to_pydantic
+
+Base = declarative_base()
+
+
+class NormalizerParent(Base):
+    __tablename__ = 'test_normalizer_parent'
+    id = Column(Integer, primary_key=True)
+    uuid_value = Column(UUID(as_uuid=True))
+    varchar_value = Column(String)
+    children = relationship('NormalizerChild')
+
+
+class NormalizerChild(Base):
+    __tablename__ = 'test_normalizer_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_normalizer_parent.id'))
+
+
+crud_models = sqlalchemy_to_pydantic(NormalizerParent,
+                                     crud_methods=[CrudMethods.FIND_ONE, CrudMethods.FIND_MANY,
+                                                   CrudMethods.CREATE_MANY],
+                                     sql_type=SqlType.postgresql)
+
+uuid_values = [uuid.uuid4(), uuid.uuid4()]
+
+
+def normalized(dataclass_, legacy, **kwargs):
+    post_init = dataclass_.__post_init__
+    if legacy:
+        # the steps without the compiled normalizer
+        dataclass_.__post_init__ = lambda self_object: schema_builder._call_steps(self_object, post_init.steps)
+    try:
+        return dataclass_(**kwargs)
+    finally:
+        dataclass_.__post_init__ = post_init
+
+
+@pytest.fixture
+def no_deepcopy(monkeypatch):
+    def deepcopy(*args):
+        raise AssertionError('the request is deep copied')
+
+    monkeypatch.setattr(schema_builder, 'deepcopy', deepcopy)
+
+
+def test_find_many_normalizer(no_deepcopy):
+    request_query_model = crud_models.GET[CrudMethods.FIND_MANY].requestQueryModel
+    kwargs = {'uuid_value____list': uuid_values, 'varchar_value____str': ['a%'], 'id____from': None,
+              'join_foreign_table': ['test_normalizer_child']}
+    request = normalized(request_query_model, legacy=False, **kwargs)
+    assert request.uuid_value____list == [str(i) for i in uuid_values]
+    assert set(request.join_foreign_table) == {'test_normalizer_child'}
+    # the fields of the FastAPI params and None are removed
+    assert 'id____from' not in request.__dict__ and 'varchar_value____list' not in request.__dict__
+    assert 'varchar_value____str' in request.__dict__
+
+
+def test_compiled_normalizers_of_the_steps():
+    find_one = crud_models.GET[CrudMethods.FIND_ONE]
+    create_many = crud_models.POST[CrudMethods.CREATE_MANY]
+    insert_item_model = fields(create_many.requestBodyModel)[0].type.__args__[0]
+    cases = [
+        (find_one.requestUrlParamModel, lambda: {'id': 1}),
+        (find_one.requestQueryModel, lambda: {'uuid_value____list': uuid_values,
+                                              'join_foreign_table': ['test_normalizer_child', 'unknown']}),
+        (create_many.requestBodyModel, lambda: {'insert': [insert_item_model(uuid_value=uuid_values[0]),
+                                                           insert_item_model(id=2, varchar_value='a')]}),
+    ]
+    for dataclass_, kwargs in cases:
+        compiled = normalized(dataclass_, legacy=False, **kwargs())
+        legacy = normalized(dataclass_, legacy=True, **kwargs())
+        assert compiled.__dict__.keys() == legacy.__dict__.keys()
+        for name, value in compiled.__dict__.items():
+            if name == 'insert':
+                assert [i.__dict__ for i in value] == [i.__dict__ for i in legacy.__dict__[name]]
+            else:
+                assert value == legacy.__dict__[name]
+    insert = normalized(create_many.requestBodyModel, legacy=False, **cases[2][1]()).insert
+    assert [i.__dict__ for i in insert] == [{'uuid_value': str(uuid_values[0])}, {'id': 2, 'varchar_value': 'a'}]
@@ -0,0 +1,135 @@
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.dialects import registry
+from sqlalchemy.dialects.postgresql.base import PGCompiler
+from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+
+# SQLite 3.35+ supports RETURNING, but the SQLite compiler of SQLAlchemy 1.4 can't render it,
+# the dialect of the test renders it as PostgreSQL does, so the RETURNING path of the routes runs end to end
+class ReturningSQLiteCompiler(SQLiteCompiler):
+    returning_clause = PGCompiler.returning_clause
+
+
+class ReturningSQLiteDialect(SQLiteDialect_pysqlite):
+    statement_compiler = ReturningSQLiteCompiler
+    full_returning = True
+    implicit_returning = False
+
+
+registry.impls['sqlite.returning_test'] = lambda: ReturningSQLiteDialect
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite+returning_test://', connect_args={"check_same_thread": False}, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    db = session()
+    try:
+        yield db
+        # the session is committed by the dependency, the rows of a failed request must be rolled back by the route
+        db.commit()
+    finally:
+        db.close()
+
+
+class ReturningTable(Base):
+    __tablename__ = 'test_returning'
+    primary_key = Column(Integer, primary_key=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+Base.metadata.create_all(engine)
+
+route_1 = crud_router_builder(db_session=get_transaction_session,
+                              db_model=ReturningTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                                  CrudMethods.PATCH_MANY,
+                                  CrudMethods.UPDATE_MANY,
+                                  CrudMethods.DELETE_ONE,
+                                  CrudMethods.DELETE_MANY,
+                              ],
+                              bulk_chunk_size=2,
+                              prefix="/test",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+statements = []
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def values():
+    return sorted((i['primary_key'], i['int4_value']) for i in client.get('/test', headers=headers).json())
+
+
+def test_returning_routes():
+    statements.clear()
+    data = [{"primary_key": i, "int4_value": i, "varchar_value": f"value_{i}"} for i in range(1, 6)]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    assert [i['primary_key'] for i in response.json()] == [1, 2, 3, 4, 5]
+    inserts = [i for i in statements if i.startswith('INSERT')]
+    assert len(inserts) == 3
+    assert all('RETURNING' in i for i in inserts)
+
+    statements.clear()
+    query = {'int4_value____from': 2, 'int4_value____to': 3}
+    response = client.patch(f'/test?{urlencode(query)}', headers=headers, data=json.dumps({'int4_value': 10}))
+    assert response.status_code == 200
+    assert sorted(i['primary_key'] for i in response.json()) == [2, 3]
+    response = client.put(f'/test?{urlencode({"int4_value____list": [10]}, doseq=True)}', headers=headers,
+                          data=json.dumps({'int4_value': 20, 'varchar_value': 'updated'}))
+    assert response.status_code == 200
+    assert {i['varchar_value'] for i in response.json()} == {'updated'}
+    assert [i for i in statements if i.startswith('UPDATE')] and \
+           all('RETURNING' in i for i in statements if i.startswith('UPDATE'))
+    assert values() == [(1, 1), (2, 20), (3, 20), (4, 4), (5, 5)]
+
+    statements.clear()
+    response = client.delete('/test/1', headers=headers)
+    assert response.status_code == 200
+    response = client.delete(f'/test?{urlencode({"int4_value____list": [20]}, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert sorted(i['primary_key'] for i in response.json()) == [2, 3]
+    deletes = [i for i in statements if i.startswith('DELETE')]
+    assert len(deletes) == 2
+    assert all('RETURNING' in i for i in deletes)
+    assert values() == [(4, 4), (5, 5)]
+
+
+def test_create_many_conflict_rolls_back_the_inserted_chunks():
+    before = values()
+    # the first chunk is inserted, the second chunk conflicts with the primary key 4
+    data = [{"primary_key": i, "int4_value": i} for i in [6, 7, 4]]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 409
+    assert values() == before
@@ -0,0 +1,15 @@
+from src.fastapi_quickcrud.misc.utils import row_mapping_plan
+
+
+def test_row_mapping_plan():
+    keys = ('id', 'name', 'child_foreign_____id', 'child_foreign_____parent_id', 'age')
+    plan = row_mapping_plan(keys)
+    assert plan is row_mapping_plan(keys)
+    assert plan((1, 'a', 2, 1, 30)) == {'id': 1, 'name': 'a', 'age': 30,
+                                        'child_foreign': {'id': 2, 'parent_id': 1}}
+
+
+def test_row_mapping_plan_without_foreign_column():
+    plan = row_mapping_plan(('id', 'name'))
+    assert plan.is_flat
+    assert plan((1, 'a')) == {'id': 1, 'name': 'a'}
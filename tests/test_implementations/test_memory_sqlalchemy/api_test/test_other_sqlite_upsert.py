@@ -0,0 +1,132 @@
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String, create_engine, event, select
+from sqlalchemy.dialects import registry
+from sqlalchemy.dialects.postgresql.base import PGCompiler
+from sqlalchemy.dialects.sqlite.base import SQLiteCompiler
+from sqlalchemy.dialects.sqlite.pysqlite import SQLiteDialect_pysqlite
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods, SqlType
+
+
+# the SQLite compiler of SQLAlchemy 1.4 can't render RETURNING, the dialect of the test renders it as PostgreSQL does,
+# so the upserted rows are returned by RETURNING instead of being selected after each statement
+class ReturningSQLiteCompiler(SQLiteCompiler):
+    returning_clause = PGCompiler.returning_clause
+
+
+class ReturningSQLiteDialect(SQLiteDialect_pysqlite):
+    statement_compiler = ReturningSQLiteCompiler
+    full_returning = True
+    implicit_returning = False
+
+
+registry.impls['sqlite.upsert_returning_test'] = lambda: ReturningSQLiteDialect
+
+Base = declarative_base()
+
+
+class SQLiteUpsert(Base):
+    __tablename__ = 'test_sqlite_upsert'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True)
+    int4_value = Column(Integer, nullable=False, default=0)
+
+
+def build(url):
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(engine)
+
+    def get_transaction_session():
+        db = session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    app = FastAPI()
+    # the upsert one and the upsert many apis are both POST of the prefix
+    for crud_method, prefix in [(CrudMethods.UPSERT_ONE, '/test_one'), (CrudMethods.UPSERT_MANY, '/test')]:
+        app.include_router(crud_router_builder(db_session=get_transaction_session,
+                                               db_model=SQLiteUpsert,
+                                               crud_methods=[crud_method],
+                                               sql_type=SqlType.sqlite,
+                                               async_mode=False,
+                                               bulk_chunk_size=2,
+                                               prefix=prefix,
+                                               tags=['test']))
+    return TestClient(app), session, statements
+
+
+@pytest.fixture(params=['sqlite://', 'sqlite+upsert_returning_test://'])
+def upsert_app(request):
+    return build(request.param)
+
+
+def table_rows(session):
+    with session() as db:
+        return [dict(i) for i in db.execute(select(SQLiteUpsert.__table__).order_by('id')).mappings()]
+
+
+def test_upsert_many(upsert_app):
+    client, session, statements = upsert_app
+    rows = [{'id': i, 'name': f'name {i}', 'int4_value': i} for i in range(1, 6)]
+    response = client.post('/test', json={'insert': rows})
+    assert response.status_code == 201
+    assert response.json() == rows
+    assert response.headers['x-total-count'] == '5'
+
+    statements.clear()
+    update = [{'name': f'name {i}', 'int4_value': i * 10} for i in range(5, 0, -1)]
+    response = client.post('/test', json={'insert': update, 'on_conflict': {'update_columns': ['int4_value']}})
+    assert response.status_code == 201
+    assert sorted(response.json(), key=lambda row: row['id']) == \
+           [{'id': i, 'name': f'name {i}', 'int4_value': i * 10} for i in range(1, 6)]
+    # 5 rows in chunks of 2 rows
+    upserts = [i for i in statements if i.startswith('INSERT')]
+    assert len(upserts) == 3
+    assert all('ON CONFLICT (name) DO UPDATE' in i for i in upserts)
+    assert table_rows(session) == sorted(response.json(), key=lambda row: row['id'])
+
+
+def test_upsert_many_deduplicated(upsert_app):
+    client, session, _ = upsert_app
+    rows = [{'id': 1, 'name': 'a', 'int4_value': 1}, {'id': 2, 'name': 'b', 'int4_value': 2},
+            {'id': 1, 'name': 'a', 'int4_value': 3}]
+    response = client.post('/test', json={'insert': rows, 'on_conflict': {'update_columns': ['int4_value']}})
+    assert response.status_code == 201
+    assert response.json() == [{'id': 1, 'name': 'a', 'int4_value': 3}, {'id': 2, 'name': 'b', 'int4_value': 2}]
+    assert table_rows(session) == response.json()
+
+
+def test_upsert_many_conflict_rolled_back(upsert_app):
+    client, session, _ = upsert_app
+    assert client.post('/test', json={'insert': [{'id': 1, 'name': 'a'}]}).status_code == 201
+    response = client.post('/test', json={'insert': [{'id': 2, 'name': 'b'}, {'id': 3, 'name': 'c'},
+                                                     {'id': 4, 'name': 'a'}]})
+    assert response.status_code == 409
+    assert [i['id'] for i in table_rows(session)] == [1]
+
+
+def test_upsert_one(upsert_app):
+    client, session, _ = upsert_app
+    response = client.post('/test_one', json={'name': 'a', 'int4_value': 1})
+    assert response.status_code == 201
+    assert response.json() == {'id': 1, 'name': 'a', 'int4_value': 1}
+    response = client.post('/test_one', json={'name': 'a', 'int4_value': 2,
+                                              'on_conflict': {'update_columns': ['int4_value']}})
+    assert response.json() == {'id': 1, 'name': 'a', 'int4_value': 2}
+    # the row without the primary key and the unique columns
+    response = client.post('/test_one', json={'int4_value': 3})
+    assert response.json() == {'id': 2, 'name': None, 'int4_value': 3}
+    response = client.post('/test', json={'insert': [{'int4_value': 4}, {'int4_value': 5}]})
+    assert response.json() == [{'id': 3, 'name': None, 'int4_value': 4}, {'id': 4, 'name': None, 'int4_value': 5}]
+    assert client.post('/test_one', json={'name': 'a', 'int4_value': 3}).status_code == 409
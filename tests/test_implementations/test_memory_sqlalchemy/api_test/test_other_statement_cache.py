@@ -0,0 +1,172 @@
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.orm import declarative_base
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud import StatementCache
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+
+class StatementCacheTable(Base):
+    __tablename__ = 'test_statement_cache'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+class StatementCacheOtherTable(Base):
+    __tablename__ = 'test_statement_cache_other'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+statement_cache = StatementCache()
+
+route_1 = crud_router_builder(db_model=StatementCacheTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_ONE,
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                                  CrudMethods.DELETE_MANY,
+                              ],
+                              statement_cache=statement_cache,
+                              statement_cache_warm_up=[{'int4_value____list': [1],
+                                                        'order_by_columns': ['primary_key:DESC']}],
+                              prefix="/test",
+                              tags=["test"]
+                              )
+# the other table shares the cache, the statements of the routers must not be mixed
+route_2 = crud_router_builder(db_model=StatementCacheOtherTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_ONE,
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                                  CrudMethods.DELETE_MANY,
+                              ],
+                              statement_cache=statement_cache,
+                              prefix="/test_other",
+                              tags=["test"]
+                              )
+[app.include_router(i) for i in [route_1, route_2]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def create_data():
+    data = [{"int4_value": i, "varchar_value": f"value_{i}"} for i in range(1, 6)]
+    response = client.post('/test', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_warm_up():
+    assert statement_cache.info()['size'] == 1
+    assert statement_cache.misses == 1
+
+
+def test_same_shape_reuse_statement():
+    create_data()
+    hits = statement_cache.hits
+    misses = statement_cache.misses
+
+    query = {'int4_value____list': [2], 'order_by_columns': ['primary_key:DESC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert [i['int4_value'] for i in response.json()] == [2]
+
+    query = {'int4_value____list': [4], 'order_by_columns': ['primary_key:DESC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert [i['int4_value'] for i in response.json()] == [4]
+
+    assert statement_cache.hits == hits + 2
+    assert statement_cache.misses == misses
+
+
+def test_different_shape_build_new_statement():
+    misses = statement_cache.misses
+
+    query = {'int4_value____list': [1, 3, 5], 'order_by_columns': ['primary_key:DESC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert [i['int4_value'] for i in response.json()] == [5, 3, 1]
+
+    query = {'int4_value____from': 2, 'int4_value____to': 4, 'limit': 2, 'offset': 1,
+             'order_by_columns': ['primary_key:ASC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert [i['int4_value'] for i in response.json()] == [3, 4]
+
+    query = {'int4_value____from': 1, 'int4_value____to': 5, 'limit': 1, 'offset': 3,
+             'order_by_columns': ['primary_key:ASC']}
+    response = client.get(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert [i['int4_value'] for i in response.json()] == [4]
+
+    assert statement_cache.misses == misses + 2
+
+
+def test_find_one_and_delete_many_with_cache():
+    response = client.get('/test', headers=headers)
+    primary_keys = [i['primary_key'] for i in response.json()]
+
+    for primary_key in primary_keys[:2]:
+        response = client.get(f'/test/{primary_key}', headers=headers)
+        assert response.status_code == 200
+        assert response.json()['primary_key'] == primary_key
+
+    query = {'varchar_value____str': ['value_1', 'value_2'],
+             'varchar_value____str_____matching_pattern': ['case_sensitive']}
+    response = client.delete(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    query = {'varchar_value____str': ['value_3', 'value_4'],
+             'varchar_value____str_____matching_pattern': ['case_sensitive']}
+    misses = statement_cache.misses
+    response = client.delete(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert statement_cache.misses == misses
+
+
+def test_shared_cache_of_two_tables():
+    data = [{"int4_value": i, "varchar_value": f"other_{i}"} for i in range(1, 4)]
+    response = client.post('/test_other', headers=headers, data=json.dumps(data))
+    assert response.status_code == 201
+    other_primary_key = response.json()[0]['primary_key']
+    primary_key = create_data()[0]['primary_key']
+    assert primary_key != other_primary_key
+
+    for prefix, value in [(f'/test/{primary_key}', 'value_1'), (f'/test_other/{other_primary_key}', 'other_1')]:
+        response = client.get(prefix, headers=headers)
+        assert response.status_code == 200
+        assert response.json()['varchar_value'] == value
+
+    query = {'int4_value____list': [1, 2]}
+    response = client.delete(f'/test_other?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    response = client.delete(f'/test?{urlencode(query, doseq=True)}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+    response = client.get('/test_other', headers=headers)
+    assert [i['varchar_value'] for i in response.json()] == ['other_3']
+    response = client.get('/test', headers=headers)
+    assert 'value_1' not in [i['varchar_value'] for i in response.json()]
+    assert 'value_3' in [i['varchar_value'] for i in response.json()]
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class StreamParent(Base):
+    __tablename__ = 'test_stream_parent'
+    id = Column(Integer, primary_key=True)
+    varchar_value = Column(String)
+    timestamp_value = Column(DateTime)
+    children = relationship('StreamChild')
+
+
+class StreamChild(Base):
+    __tablename__ = 'test_stream_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_stream_parent.id'))
+
+
+Base.metadata.create_all(engine)
+
+route_1 = crud_router_builder(db_session=get_transaction_session,
+                              db_model=StreamParent,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              stream_yield_per=2,
+                              prefix="/parent",
+                              tags=["parent"]
+                              )
+route_2 = crud_router_builder(db_session=get_transaction_session,
+                              db_model=StreamChild,
+                              crud_methods=[
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              prefix="/child",
+                              tags=["child"]
+                              )
+[app.include_router(i) for i in [route_1, route_2]]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+stream_headers = {
+    'accept': 'application/x-ndjson',
+}
+
+start_time = datetime(2021, 7, 24, 2, 54, 53)
+parents = [{"id": i, "varchar_value": f"value_{i}", "timestamp_value": (start_time + timedelta(days=i)).isoformat()}
+           for i in range(1, 6)]
+assert client.post('/parent', headers=headers, data=json.dumps(parents)).status_code == 201
+children = [{"id": i, "parent_id": i % 3 + 1} for i in range(1, 10)]
+assert client.post('/child', headers=headers, data=json.dumps(children)).status_code == 201
+
+
+def stream_rows(response):
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_stream_find_many():
+    query = {'order_by_columns': ['id:DESC'], 'id____from': 2}
+    response = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=stream_headers)
+    expected = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=headers).json()
+    assert stream_rows(response) == expected
+    assert [i['id'] for i in expected] == [5, 4, 3, 2]
+
+
+def test_stream_find_many_with_join():
+    query = {'join_foreign_table': 'test_stream_child', 'order_by_columns': ['id']}
+    response = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=stream_headers)
+    expected = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=headers).json()
+    rows = stream_rows(response)
+    assert rows == expected
+    assert [len(i['test_stream_child_foreign']) for i in rows] == [3, 3, 3]
+
+
+def test_stream_empty_result():
+    response = client.get(f'/parent?{urlencode({"id____from": 100})}', headers=stream_headers)
+    assert stream_rows(response) == []
+
+
+def test_stream_find_many_with_join_by_duplicate_order_value():
+    shared_parents = [{"id": i, "varchar_value": "value_shared", "timestamp_value": start_time.isoformat()}
+                      for i in [6, 7]]
+    assert client.post('/parent', headers=headers, data=json.dumps(shared_parents)).status_code == 201
+    shared_children = [{"id": i, "parent_id": 6 + i % 2} for i in range(10, 14)]
+    assert client.post('/child', headers=headers, data=json.dumps(shared_children)).status_code == 201
+
+    query = {'join_foreign_table': 'test_stream_child', 'order_by_columns': ['varchar_value'], 'id____from': 6}
+    response = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=stream_headers)
+    expected = client.get(f'/parent?{urlencode(query, doseq=True)}', headers=headers).json()
+    rows = stream_rows(response)
+    # the rows of a parent are adjacent, so each parent is one line with all of its children
+    assert [(i['id'], sorted(j['id'] for j in i['test_stream_child_foreign'])) for i in rows] == [
+        (6, [10, 12]), (7, [11, 13])]
+    assert rows == expected
@@ -0,0 +1,216 @@
+import asyncio
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, insert, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.abstract_execute import SQLALchemyExecuteService
+from src.fastapi_quickcrud.misc.abstract_query import SQLAlchemyPGSQLQueryService, SQLAlchemySQLITEQueryService
+from src.fastapi_quickcrud.misc.abstract_route import _async_total_count
+from src.fastapi_quickcrud.misc.type import CrudMethods, TotalCountMode
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class TotalCountTable(Base):
+    __tablename__ = 'test_total_count'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    int4_value = Column(Integer, nullable=False)
+    varchar_value = Column(String)
+
+
+class TotalCountParent(Base):
+    __tablename__ = 'test_total_count_parent'
+    id = Column(Integer, primary_key=True)
+    children = relationship('TotalCountChild')
+
+
+class TotalCountChild(Base):
+    __tablename__ = 'test_total_count_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_total_count_parent.id'))
+
+
+Base.metadata.create_all(engine)
+with engine.begin() as connection:
+    connection.execute(insert(TotalCountParent.__table__), [{'id': i} for i in range(1, 4)])
+    connection.execute(insert(TotalCountChild.__table__), [{'id': i, 'parent_id': parent_id} for i, parent_id in
+                                                           enumerate([1, 1, 1, 2, 2, 3], start=1)])
+
+routes = [crud_router_builder(db_session=get_transaction_session,
+                              db_model=TotalCountTable,
+                              crud_methods=[
+                                  CrudMethods.FIND_MANY,
+                                  CrudMethods.CREATE_MANY,
+                              ],
+                              total_count_mode=total_count_mode,
+                              prefix=f"/{total_count_mode}",
+                              tags=["test"]
+                              ) for total_count_mode in TotalCountMode]
+routes.append(crud_router_builder(db_session=get_transaction_session,
+                                  db_model=TotalCountTable,
+                                  crud_methods=[CrudMethods.FIND_MANY],
+                                  total_count_mode=TotalCountMode.window,
+                                  cursor_pagination=True,
+                                  prefix="/window_cursor",
+                                  tags=["test"]))
+routes += [crud_router_builder(db_session=get_transaction_session,
+                               db_model=TotalCountParent,
+                               crud_methods=[CrudMethods.FIND_MANY],
+                               total_count_mode=total_count_mode,
+                               prefix=f"/parent_{total_count_mode}",
+                               tags=["test"]) for total_count_mode in [TotalCountMode.window, TotalCountMode.exact]]
+[app.include_router(i) for i in routes]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+data = [{"int4_value": i, "varchar_value": f"value_{i % 2}"} for i in range(10)]
+assert client.post('/page', headers=headers, data=json.dumps(data)).status_code == 201
+
+
+def get_total_count(total_count_mode, query):
+    response = client.get(f'/{total_count_mode}?{urlencode(query)}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == min(query.get('limit', 10), 5)
+    return response.headers['x-total-count']
+
+
+def test_page_count():
+    assert get_total_count('page', {'varchar_value____list': 'value_0', 'limit': 2}) == '2'
+
+
+def test_exact_count():
+    assert get_total_count('exact', {'varchar_value____list': 'value_0', 'limit': 2}) == '5'
+    assert get_total_count('exact', {'varchar_value____list': 'value_0', 'limit': 2, 'offset': 2}) == '5'
+
+
+def test_window_count():
+    assert get_total_count('window', {'varchar_value____list': 'value_1', 'limit': 3}) == '5'
+    response = client.get(f'/window?{urlencode({"limit": 2})}', headers=headers)
+    assert '__total_count' not in response.json()[0]
+
+
+def test_estimated_count():
+    # no sqlite_stat1 before ANALYZE, the exact count is used
+    assert get_total_count('estimated', {'varchar_value____list': 'value_0', 'limit': 2}) == '5'
+    with engine.begin() as connection:
+        connection.execute(text('CREATE INDEX ix_test_total_count_int4_value ON test_total_count (int4_value)'))
+        connection.execute(text('ANALYZE'))
+    assert get_total_count('estimated', {'limit': 2}) == '10'
+    # the row count of the table is not the count of the filtered rows
+    assert get_total_count('estimated', {'varchar_value____list': 'value_0', 'limit': 2}) == '5'
+
+
+def raise_on_estimate(execute):
+    # the estimate probe fails as EXPLAIN without the permission of it on PostgreSQL
+    def execute_(session, stmt, params=None):
+        if 'sqlite_stat1' in str(stmt):
+            raise ProgrammingError(str(stmt), params, Exception('permission denied'))
+        return execute(session, stmt, params)
+
+    return execute_
+
+
+def test_estimated_count_of_failed_probe(monkeypatch):
+    monkeypatch.setattr(SQLALchemyExecuteService, 'execute',
+                        staticmethod(raise_on_estimate(SQLALchemyExecuteService.execute)))
+    assert get_total_count('estimated', {'limit': 2}) == get_total_count('exact', {'limit': 2})
+
+
+def test_async_estimated_count_of_failed_probe():
+    class Result:
+        def scalar(self):
+            return 7
+
+    class ExecuteService:
+        @staticmethod
+        async def async_execute(session, stmt, params=None):
+            raise_on_estimate(lambda *args: Result())(session, stmt, params)
+            return Result()
+
+    class Session:
+        def begin_nested(self):
+            return self
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+    query_service = SQLAlchemySQLITEQueryService(model=TotalCountTable,
+                                                 async_mode=True,
+                                                 foreign_table_mapping={})
+    total_count = asyncio.run(_async_total_count(Session(),
+                                                 query_service=query_service,
+                                                 execute_service=ExecuteService,
+                                                 total_count_mode=TotalCountMode.estimated,
+                                                 join_mode=None,
+                                                 query={}))
+    assert total_count == 7
+
+
+def test_cached_count():
+    query = {'int4_value____from': 5, 'limit': 2}
+    assert get_total_count('cached', query) == '5'
+    assert client.post('/page', headers=headers, data=json.dumps([{"int4_value": 100}])).status_code == 201
+    assert get_total_count('cached', query) == '5'
+    assert get_total_count('exact', query) == '6'
+    assert get_total_count('cached', {'int4_value____from': 6, 'limit': 2}) == '5'
+
+
+def test_estimated_count_statement():
+    query_service = SQLAlchemyPGSQLQueryService(model=TotalCountTable,
+                                                async_mode=False,
+                                                foreign_table_mapping={'test_total_count': TotalCountTable})
+    query = {'int4_value____list': [1, 2], 'int4_value____list_____comparison_operator': 'In', 'limit': 10}
+    stmt, params = query_service.get_estimated_count_statement(join_mode=None, query=query)
+    assert str(stmt).startswith('EXPLAIN (FORMAT JSON) SELECT test_total_count.primary_key')
+    assert 'WHERE test_total_count.int4_value IN (:filter_0_1, :filter_0_2)' in str(stmt)
+    assert params == {'filter_0_1': 1, 'filter_0_2': 2}
+    assert query_service.parse_estimated_count('[{"Plan": {"Plan Rows": 42}}]') == 42
+
+
+def test_window_count_with_cursor():
+    total_count = get_total_count('exact', {'limit': 3})
+    response = client.get(f'/window_cursor?{urlencode({"limit": 3})}', headers=headers)
+    assert response.headers['x-total-count'] == total_count
+    cursor = response.headers['x-next-cursor']
+    response = client.get(f'/window_cursor?{urlencode({"limit": 3, "cursor": cursor})}', headers=headers)
+    assert len(response.json()) == 3
+    # the rows before the cursor are counted as well
+    assert response.headers['x-total-count'] == total_count
+
+
+def test_count_of_the_joined_parents():
+    for total_count_mode in ['window', 'exact']:
+        query = {'join_foreign_table': 'test_total_count_child', 'limit': 10}
+        response = client.get(f'/parent_{total_count_mode}?{urlencode(query)}', headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        assert response.headers['x-total-count'] == '3'
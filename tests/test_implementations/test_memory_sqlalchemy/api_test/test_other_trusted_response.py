@@ -0,0 +1,139 @@
+import json
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+from sqlalchemy import BigInteger, Boolean, CHAR, Column, Date, DateTime, Float, ForeignKey, Integer, \
+    LargeBinary, Numeric, SmallInteger, String, Text, Time, create_engine
+from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.testclient import TestClient
+
+from src.fastapi_quickcrud.crud_router import crud_router_builder
+from src.fastapi_quickcrud.misc.type import CrudMethods
+
+app = FastAPI()
+
+Base = declarative_base()
+
+engine = create_engine('sqlite://', echo=True,
+                       connect_args={"check_same_thread": False}, pool_recycle=7200, poolclass=StaticPool)
+session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def get_transaction_session():
+    try:
+        db = session()
+        yield db
+    finally:
+        db.close()
+
+
+class TrustedResponseTable(Base):
+    __tablename__ = 'test_trusted_response'
+    primary_key = Column(Integer, primary_key=True, autoincrement=True)
+    bool_value = Column(Boolean, nullable=False, default=False)
+    char_value = Column(CHAR(10))
+    date_value = Column(Date)
+    float4_value = Column(Float, nullable=False)
+    int2_value = Column(SmallInteger, nullable=False)
+    int8_value = Column(BigInteger, default=99)
+    numeric_value = Column(Numeric)
+    text_value = Column(Text)
+    time_value = Column(Time)
+    timestamp_value = Column(DateTime)
+    varchar_value = Column(String)
+    children = relationship('TrustedResponseChild')
+
+
+class TrustedResponseChild(Base):
+    __tablename__ = 'test_trusted_response_child'
+    id = Column(Integer, primary_key=True)
+    parent_id = Column(Integer, ForeignKey('test_trusted_response.primary_key'))
+    timestamp_value = Column(DateTime)
+
+
+Base.metadata.create_all(engine)
+
+crud_methods = [CrudMethods.FIND_ONE, CrudMethods.FIND_MANY, CrudMethods.CREATE_MANY]
+routes = [crud_router_builder(db_session=get_transaction_session,
+                              db_model=TrustedResponseTable,
+                              crud_methods=crud_methods,
+                              trusted_response=trusted_response,
+                              prefix=f"/{'trusted' if trusted_response else 'validated'}",
+                              tags=["test"]
+                              ) for trusted_response in [True, False]]
+routes += [crud_router_builder(db_session=get_transaction_session,
+                               db_model=TrustedResponseTable,
+                               crud_methods=crud_methods,
+                               trusted_response=trusted_response,
+                               exclude_columns=['text_value', 'timestamp_value'],
+                               prefix=f"/{'trusted' if trusted_response else 'validated'}_exclude",
+                               tags=["test"]
+                               ) for trusted_response in [True, False]]
+routes.append(crud_router_builder(db_session=get_transaction_session,
+                                  db_model=TrustedResponseChild,
+                                  crud_methods=[CrudMethods.CREATE_MANY],
+                                  prefix="/child",
+                                  tags=["child"]
+                                  ))
+[app.include_router(i) for i in routes]
+
+client = TestClient(app)
+
+headers = {
+    'accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+data = [{"bool_value": True, "char_value": "string", "date_value": "2021-07-24", "float4_value": 1,
+         "int2_value": 2, "numeric_value": 3.5, "text_value": "text", "time_value": "18:18:18",
+         "timestamp_value": "2021-07-24T02:54:53.285000", "varchar_value": "value_1"},
+        {"float4_value": 0.5, "int2_value": 3}]
+assert client.post('/validated', headers=headers, data=json.dumps(data)).status_code == 201
+children = [{"id": 1, "parent_id": 1, "timestamp_value": "2021-07-25T02:54:53"},
+            {"id": 2, "parent_id": 1, "timestamp_value": "2021-07-26T02:54:53"}]
+assert client.post('/child', headers=headers, data=json.dumps(children)).status_code == 201
+
+
+def assert_same_response(path):
+    trusted = client.get(f'/trusted{path}', headers=headers)
+    validated = client.get(f'/validated{path}', headers=headers)
+    assert trusted.status_code == validated.status_code == 200
+    assert trusted.headers['x-total-count'] == validated.headers['x-total-count']
+    assert trusted.json() == validated.json()
+    return trusted.json()
+
+
+def test_trusted_find_many():
+    response = assert_same_response('')
+    assert response[0]['float4_value'] == 1.0
+    assert response[0]['timestamp_value'] == '2021-07-24T02:54:53.285000'
+    assert response[1]['int8_value'] == 99
+
+
+def test_trusted_find_many_with_join():
+    query = {'join_foreign_table': 'test_trusted_response_child'}
+    response = assert_same_response(f'?{urlencode(query)}')
+    assert response[0]['test_trusted_response_child_foreign'][1]['timestamp_value'] == '2021-07-26T02:54:53'
+
+
+def test_trusted_find_one():
+    assert_same_response('/1')
+    assert client.get('/trusted/100', headers=headers).status_code == 404
+
+
+def test_trusted_stream():
+    response = client.get('/trusted', headers={'accept': 'application/x-ndjson'})
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == client.get('/validated', headers=headers).json()
+
+
+def test_trusted_exclude_columns():
+    for path in ['_exclude', '_exclude/1', f'_exclude?{urlencode({"join_foreign_table": "test_trusted_response_child"})}']:
+        response = assert_same_response(path)
+        for row in response if isinstance(response, list) else [response]:
+            assert 'text_value' not in row and 'timestamp_value' not in row
+            for child in row.get('test_trusted_response_child_foreign', None) or []:
+                assert 'timestamp_value' not in child
+    response = client.get('/trusted_exclude', headers={'accept': 'application/x-ndjson'})
+    assert all('text_value' not in json.loads(line) for line in response.text.splitlines())